@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+get_config throughput: re-reading config.json per lookup vs ConfigSnapshot.
+
+Builds a small synthetic repo with a config.json that sets a handful of keys,
+then measures in-process lookups per second over the keys fluxctl reads on
+its hot paths (tracker hooks, state backend, checkpoints, epic defaults):
+
+    reload     what get_config did before the snapshot: read config.json,
+               rebuild the defaults and deep-merge them on every call
+    get_config get_config() through the process-wide snapshot (one stat)
+    snapshot   lookups on a held ConfigSnapshot (no stat)
+
+and checks that every mode returns the same values, including right after
+config.json is rewritten.
+
+Usage:
+    python3 scripts/bench/config_lookup.py [--lookups 20000] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from generate import generate
+
+KEYS = [
+    "tracker.provider",
+    "tracker.teamId",
+    "state.backend",
+    "state.journal.compactBytes",
+    "checkpoint.keep",
+    "workflow.technicalLevel",
+    "workflow.defaultScopeMode",
+    "review.severities",
+    "review.backend",
+    "missing.key",
+]
+CONFIG = {
+    "review": {"backend": "codex"},
+    "tracker": {"provider": "none"},
+    "checkpoint": {"keep": 5},
+    "workflow": {"technicalLevel": "technical"},
+}
+
+
+def reload_lookup(key: str, default=None):
+    """get_config as it was before ConfigSnapshot."""
+    from fluxctl_pkg.config import deep_merge, get_default_config, load_raw_config
+
+    config = deep_merge(get_default_config(), load_raw_config(strict=False))
+    for part in key.split("."):
+        if not isinstance(config, dict):
+            return default
+        config = config.get(part, {})
+        if config == {}:
+            return default
+    return config if config != {} else default
+
+
+def _rate(lookup, lookups: int) -> dict:
+    started = time.perf_counter()
+    for i in range(lookups):
+        lookup(KEYS[i % len(KEYS)])
+    elapsed = time.perf_counter() - started
+    return {
+        "lookups": lookups,
+        "per_sec": round(lookups / elapsed),
+        "us_per_lookup": round(elapsed / lookups * 1e6, 3),
+    }
+
+
+def run_bench(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory(prefix="flux-config-") as tmp:
+        root = Path(tmp) / "repo"
+        generate(root, 1, 1)
+        config_path = root / ".flux" / "config.json"
+        config_path.write_text(json.dumps(CONFIG))
+        os.environ.update(FLUX_STATE_DIR=str(Path(tmp) / "state"), FLUX_NO_SERVER="1")
+        os.chdir(root)
+
+        from fluxctl_pkg.config import get_config, get_config_snapshot, set_config
+
+        get_config("state.backend")  # Warm imports and the repo context
+        snapshot = get_config_snapshot()
+        results = {
+            "reload": _rate(reload_lookup, max(1, args.lookups // 20)),
+            "get_config": _rate(get_config, args.lookups),
+            "snapshot": _rate(snapshot.get, args.lookups),
+        }
+
+        matches = all(reload_lookup(k) == get_config(k) == snapshot.get(k) for k in KEYS)
+        set_config("tracker.provider", "linear")
+        matches = matches and get_config("tracker.provider") == reload_lookup("tracker.provider") == "linear"
+
+    baseline = results["reload"]["per_sec"]
+    return {
+        "keys": len(KEYS),
+        "throughput": results,
+        "speedup": {mode: round(r["per_sec"] / baseline, 1) for mode, r in results.items()},
+        "matches": matches,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"{'mode':<11} {'lookups':>8} {'per sec':>12} {'us/lookup':>10} {'speedup':>8}")
+    for mode, stats in report["throughput"].items():
+        print(
+            f"{mode:<11} {stats['lookups']:>8} {stats['per_sec']:>12,} "
+            f"{stats['us_per_lookup']:>10} {report['speedup'][mode]:>7}x"
+        )
+    if not report["matches"]:
+        print("WARNING: snapshot lookups differ from re-reading config.json")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark get_config lookups")
+    parser.add_argument("--lookups", type=int, default=20000, help="Lookups per snapshot mode")
+    parser.add_argument("--json", action="store_true", help="JSON report")
+    args = parser.parse_args()
+
+    report = run_bench(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if not report["matches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic .flux/ generator for fluxctl benchmarks.
+
+Writes epic/task definitions, specs with filler prose and (optionally)
+runtime state straight to disk (no fluxctl calls per record), so large trees
+build in seconds. The same seed and sizes always produce the same tree.
+Named sizes run from `tiny` (10 tasks) to `huge` (10,000 epics, 100,000 tasks).
+
+Usage:
+    python3 scripts/bench/generate.py DIR --epics 4 --tasks 25 --dep-density 0.3
+    python3 scripts/bench/generate.py DIR --size large --runtime 0.3
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+FLUXCTL = SCRIPTS_DIR / "fluxctl.py"
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+from fluxctl_pkg.epics import create_epic_spec  # noqa: E402
+from fluxctl_pkg.state import LocalFileStateStore  # noqa: E402
+from fluxctl_pkg.tasks import create_task_spec  # noqa: E402
+
+# Fixed timestamp: generated trees are byte-identical across runs
+GENERATED_AT = "2026-01-01T00:00:00.000000Z"
+
+# name -> (epics, tasks per epic)
+SIZES = {
+    "tiny": (2, 5),
+    "small": (10, 20),
+    "medium": (50, 20),
+    "large": (500, 20),
+    "xlarge": (2_000, 25),
+    "huge": (10_000, 10),
+}
+
+WORDS = (
+    "api auth cache client config data deploy endpoint error event handler index "
+    "job layer log migration model module parser pipeline queue request response "
+    "route schema server service session state storage stream test token user "
+    "validate worker add update remove refactor support ensure handle return"
+).split()
+
+
+def _write_json(path: Path, data: dict) -> None:
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 14))]
+    return " ".join(words).capitalize() + "."
+
+
+def _prose(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _fill_spec(spec: str, heading: str, rng: random.Random) -> str:
+    """Replace the TBD under a section heading with a few sentences of filler."""
+    return spec.replace(f"## {heading}\nTBD", f"## {heading}\n{_prose(rng, rng.randint(2, 6))}", 1)
+
+
+def _acceptance(rng: random.Random) -> str:
+    return "\n".join(f"- [ ] {_sentence(rng)}" for _ in range(rng.randint(2, 5)))
+
+
+def _runtime_record(
+    rng: random.Random, deps: list[str], statuses: dict[str, str], worker: int
+) -> dict:
+    """Runtime state consistent with the DAG: only tasks whose deps are done finish."""
+    roll = rng.random()
+    if roll < 0.6 and all(statuses.get(d) == "done" for d in deps):
+        return {"status": "done", "assignee": f"bench-{worker}", "updated_at": GENERATED_AT}
+    if roll < 0.85:
+        return {
+            "status": "in_progress",
+            "assignee": f"bench-{worker}",
+            "claimed_at": GENERATED_AT,
+            "claim_note": "",
+            "updated_at": GENERATED_AT,
+        }
+    return {
+        "status": "blocked",
+        "blocked_reason": _sentence(rng),
+        "updated_at": GENERATED_AT,
+    }
+
+
+def init_repo(root: Path) -> None:
+    """git init + fluxctl init in root (created if missing)."""
+    root.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    env = dict(os.environ, FLUX_NO_SERVER="1")
+    subprocess.run(
+        [sys.executable, str(FLUXCTL), "init", "--json"],
+        cwd=root,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+
+
+def generate(
+    root: Path,
+    epics: int,
+    tasks_per_epic: int,
+    dep_density: float = 0.3,
+    seed: int = 0,
+    runtime: float = 0.0,
+    epic_dep_density: float = 0.0,
+    state_dir: Optional[Path] = None,
+) -> dict:
+    """Initialize root and write a synthetic .flux/ tree.
+
+    dep_density is the probability that a task depends on earlier tasks in its
+    epic (one or two of them, chosen at random), so 0 gives fully parallel
+    epics and 1 gives long chains; epic_dep_density does the same for an epic
+    depending on one earlier epic. runtime is the fraction of tasks given
+    runtime state (done, in progress or blocked), written to state_dir (the
+    repo's default state dir if None). Returns a summary of what was written.
+    """
+    rng = random.Random(seed)
+    # Separate streams, so adding prose or runtime state leaves the DAG as is
+    text_rng = random.Random(f"{seed}-text")
+    state_rng = random.Random(f"{seed}-state")
+    init_repo(root)
+    flux_dir = root / ".flux"
+    edges = 0
+    epic_edges = 0
+    records: dict[str, dict] = {}
+    statuses: dict[str, str] = {}
+    for e in range(1, epics + 1):
+        epic_id = f"fn-{e}-bench"
+        epic_deps: list[str] = []
+        if e > 1 and state_rng.random() < epic_dep_density:
+            epic_deps = [f"fn-{state_rng.randint(1, e - 1)}-bench"]
+            epic_edges += 1
+        _write_json(
+            flux_dir / "epics" / f"{epic_id}.json",
+            {
+                "id": epic_id,
+                "title": f"Bench epic {e}",
+                "status": "open",
+                "depends_on_epics": epic_deps,
+                "spec_path": f".flux/specs/{epic_id}.md",
+                "next_task": tasks_per_epic + 1,
+                "created_at": GENERATED_AT,
+                "updated_at": GENERATED_AT,
+            },
+        )
+        epic_spec = create_epic_spec(epic_id, f"Bench epic {e}")
+        for heading in ("Overview", "Scope", "Approach"):
+            epic_spec = _fill_spec(epic_spec, heading, text_rng)
+        (flux_dir / "specs" / f"{epic_id}.md").write_text(epic_spec, encoding="utf-8")
+        for t in range(1, tasks_per_epic + 1):
+            task_id = f"{epic_id}.{t}"
+            deps: list[str] = []
+            if t > 1 and rng.random() < dep_density:
+                picks = rng.sample(range(1, t), min(t - 1, rng.randint(1, 2)))
+                deps = [f"{epic_id}.{d}" for d in sorted(picks)]
+                edges += len(deps)
+            _write_json(
+                flux_dir / "tasks" / f"{task_id}.json",
+                {
+                    "id": task_id,
+                    "epic": epic_id,
+                    "title": f"Bench task {t}",
+                    "status": "todo",
+                    "priority": rng.choice([None, 1, 2, 3]),
+                    "depends_on": deps,
+                    "assignee": None,
+                    "claimed_at": None,
+                    "claim_note": "",
+                    "spec_path": f".flux/tasks/{task_id}.md",
+                    "created_at": GENERATED_AT,
+                    "updated_at": GENERATED_AT,
+                },
+            )
+            task_spec = create_task_spec(task_id, f"Bench task {t}", _acceptance(text_rng))
+            (flux_dir / "tasks" / f"{task_id}.md").write_text(
+                _fill_spec(task_spec, "Description", text_rng), encoding="utf-8"
+            )
+            if runtime and state_rng.random() < runtime:
+                records[task_id] = _runtime_record(state_rng, deps, statuses, len(records) % 8)
+                statuses[task_id] = records[task_id]["status"]
+    if records:
+        store = LocalFileStateStore(state_dir or root / ".git" / "flux-state")
+        store.save_many(records)
+    return {
+        "root": str(root),
+        "epics": epics,
+        "tasks": epics * tasks_per_epic,
+        "dependency_edges": edges,
+        "epic_dependency_edges": epic_edges,
+        "runtime_records": len(records),
+        "seed": seed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic .flux/ tree")
+    parser.add_argument("dir", help="Target directory (git repo is created there)")
+    parser.add_argument("--size", choices=SIZES, help="Named size (overrides --epics/--tasks)")
+    parser.add_argument("--epics", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=25, help="Tasks per epic")
+    parser.add_argument("--dep-density", type=float, default=0.3)
+    parser.add_argument("--epic-dep-density", type=float, default=0.0)
+    parser.add_argument("--runtime", type=float, default=0.0, help="Fraction of tasks with runtime state")
+    parser.add_argument("--state-dir", help="Where runtime state goes (default: the repo's state dir)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    epics, tasks = SIZES[args.size] if args.size else (args.epics, args.tasks)
+    summary = generate(
+        Path(args.dir),
+        epics,
+        tasks,
+        args.dep_density,
+        args.seed,
+        runtime=args.runtime,
+        epic_dep_density=args.epic_dep_density,
+        state_dir=Path(args.state_dir) if args.state_dir else None,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark: how fluxctl commands behave as .flux/ grows.
+
+For each size (see generate.SIZES, `tiny` to `huge` = 10k epics / 100k tasks)
+it generates a fresh deterministic tree with dependency DAGs between tasks
+and epics, filler specs and runtime state, then times:
+
+    list, ready, next, session-state, validate --all, checkpoint save, task create
+
+in-process (a worker process calling run_captured repeatedly: warm caches, as
+under `fluxctl serve`; the first, cold call is reported separately) and as
+subprocesses (`fluxctl.py ...`, interpreter startup included). `task create`
+and `checkpoint save` write, so they run last and every run adds a task or
+re-saves (usually deduplicated) checkpoint.
+
+Results are JSON for trend tracking; --compare flags commands whose latency
+grew by more than --threshold between two result files (exit 1 if any).
+
+Usage:
+    python3 scripts/bench/scale.py --sizes tiny,small,medium --out results.json
+    python3 scripts/bench/scale.py --sizes large,huge --runs 3 --cli-runs 1
+    python3 scripts/bench/scale.py --compare base.json results.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from generate import FLUXCTL, SCRIPTS_DIR, SIZES, generate
+from stress import percentiles
+
+SCHEMA_VERSION = 1
+APPROVE = "I_APPROVE_CREATING_EPICS_AND_TASKS"
+BENCH_EPIC = "fn-1-bench"
+
+# label -> argv; read-only commands first, writers last
+COMMANDS = {
+    "list": ["list", "--json"],
+    "ready": ["ready", "--epic", BENCH_EPIC, "--json"],
+    "next": ["next", "--json"],
+    "session-state": ["session-state", "--json"],
+    "validate --all": ["validate", "--all", "--json"],
+    "checkpoint save": ["checkpoint", "save", "--epic", BENCH_EPIC, "--json"],
+    "task create": [
+        "task", "create", "--epic", BENCH_EPIC, "--title", "Scale bench task",
+        "--approve", APPROVE, "--json",
+    ],
+}
+
+
+# --- Measuring ---
+
+
+def run_worker(args: argparse.Namespace) -> None:
+    """In-process timings for every command; JSON on stdout."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from fluxctl_pkg.__main__ import run_captured
+
+    timings = {}
+    for label in args.commands.split(","):
+        argv = COMMANDS[label]
+        samples = []
+        for _ in range(args.runs + 1):
+            started = time.perf_counter()
+            code, _, err = run_captured(argv)
+            samples.append(time.perf_counter() - started)
+            if code != 0:
+                raise SystemExit(f"scale: `{label}` failed ({code}): {err.strip()}")
+        timings[label] = {"first_ms": round(samples[0] * 1000, 3), **percentiles(samples[1:])}
+    print(json.dumps(timings))
+
+
+def _env() -> dict:
+    return dict(os.environ, FLUX_ACTOR="bench-0", FLUX_NO_SERVER="1")
+
+
+def time_in_process(root: Path, commands: list[str], runs: int) -> dict:
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(Path(__file__).resolve()),
+            "--worker",
+            "--commands",
+            ",".join(commands),
+            "--runs",
+            str(runs),
+        ],
+        cwd=root,
+        env=_env(),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr.strip() or f"scale: worker exited {result.returncode}")
+    return json.loads(result.stdout)
+
+
+def time_subprocess(root: Path, label: str, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, str(FLUXCTL), *COMMANDS[label]],
+            cwd=root,
+            env=_env(),
+            capture_output=True,
+            text=True,
+        )
+        samples.append(time.perf_counter() - started)
+        if result.returncode != 0:
+            raise SystemExit(f"scale: `{label}` failed ({result.returncode}): {result.stdout.strip()}")
+    return percentiles(samples)
+
+
+def bench_size(name: str, args: argparse.Namespace, base: Path) -> list[dict]:
+    epics, tasks_per_epic = SIZES[name]
+    root = base / name
+    started = time.perf_counter()
+    fixture = generate(
+        root,
+        epics,
+        tasks_per_epic,
+        args.dep_density,
+        args.seed,
+        runtime=args.runtime,
+        epic_dep_density=args.epic_dep_density,
+    )
+    generate_s = round(time.perf_counter() - started, 2)
+    # Primed, so session-state takes its full objective/readiness path
+    subprocess.run(
+        [sys.executable, str(FLUXCTL), "prime-mark", "--status", "done", "--json"],
+        cwd=root,
+        env=_env(),
+        check=True,
+        capture_output=True,
+    )
+    if not args.json:
+        print(f"{name}: {fixture['tasks']} tasks generated in {generate_s}s", file=sys.stderr)
+    # Freshly written files sit inside the index's racy window and would be
+    # re-read on every call: measure the settled tree
+    time.sleep(2.1)
+
+    selected = args.commands.split(",")
+    commands = [label for label in COMMANDS if label in selected]
+    rows = []
+    base_row = {"size": name, "epics": epics, "tasks": fixture["tasks"]}
+    # Subprocess runs first: the in-process worker's writes would otherwise
+    # leave the tree inside the racy window again
+    readers = [label for label in commands if label not in ("checkpoint save", "task create")]
+    writers = [label for label in commands if label not in readers]
+    if args.cli_runs:
+        for label in readers:
+            stats = time_subprocess(root, label, args.cli_runs)
+            rows.append({**base_row, "command": label, "mode": "subprocess", **stats})
+    if args.runs and readers:
+        for label, stats in time_in_process(root, readers, args.runs).items():
+            rows.append({**base_row, "command": label, "mode": "in_process", **stats})
+    for label in writers:
+        if args.runs:
+            stats = time_in_process(root, [label], args.runs)[label]
+            rows.append({**base_row, "command": label, "mode": "in_process", **stats})
+        if args.cli_runs:
+            stats = time_subprocess(root, label, args.cli_runs)
+            rows.append({**base_row, "command": label, "mode": "subprocess", **stats})
+    for row in rows:
+        row["generate_s"] = generate_s
+    return rows
+
+
+def _git_rev() -> str:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS_DIR, capture_output=True, text=True
+    )
+    return result.stdout.strip() or "unknown"
+
+
+def run_scale(args: argparse.Namespace) -> dict:
+    sizes = args.sizes.split(",")
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        raise SystemExit(f"scale: unknown sizes {unknown} (choose from {', '.join(SIZES)})")
+    results = []
+    with tempfile.TemporaryDirectory(prefix="flux-scale-") as tmp:
+        base = Path(args.keep) if args.keep else Path(tmp)
+        base.mkdir(parents=True, exist_ok=True)
+        for name in sizes:
+            results.extend(bench_size(name, args, base))
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": {
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "sizes": sizes,
+            "runs": args.runs,
+            "cli_runs": args.cli_runs,
+            "dep_density": args.dep_density,
+            "epic_dep_density": args.epic_dep_density,
+            "runtime": args.runtime,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+# --- Comparing ---
+
+
+def compare(base: dict, new: dict, threshold: float, min_delta_ms: float, metric: str) -> dict:
+    """Match rows on (size, command, mode) and flag latency growth above threshold."""
+
+    def keyed(report: dict) -> dict:
+        return {(r["size"], r["command"], r["mode"]): r for r in report["results"]}
+
+    old_rows, new_rows = keyed(base), keyed(new)
+    rows, regressions, improvements = [], [], []
+    for key in [k for k in new_rows if k in old_rows]:
+        before, after = old_rows[key].get(metric), new_rows[key].get(metric)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before if before else 0.0
+        row = {
+            "size": key[0],
+            "command": key[1],
+            "mode": key[2],
+            "base_ms": before,
+            "new_ms": after,
+            "change": round(change, 3),
+            "status": "ok",
+        }
+        if abs(after - before) >= min_delta_ms:
+            if change > threshold:
+                row["status"] = "regression"
+                regressions.append(row)
+            elif change < -threshold:
+                row["status"] = "improvement"
+                improvements.append(row)
+        rows.append(row)
+    return {
+        "metric": metric,
+        "threshold": threshold,
+        "min_delta_ms": min_delta_ms,
+        "base_rev": base.get("environment", {}).get("git_rev"),
+        "new_rev": new.get("environment", {}).get("git_rev"),
+        "rows": rows,
+        "regressions": len(regressions),
+        "improvements": len(improvements),
+        "only_in_base": [list(k) for k in old_rows if k not in new_rows],
+        "only_in_new": [list(k) for k in new_rows if k not in old_rows],
+    }
+
+
+# --- Reporting ---
+
+
+def print_report(report: dict) -> None:
+    env = report["environment"]
+    print(f"fluxctl scale benchmark @ {env['git_rev']} (Python {env['python']}, {env['cpus']} CPUs)")
+    print(f"{'size':<7} {'tasks':>7} {'command':<16} {'mode':<11} {'first':>9} {'p50':>9} {'p95':>9}  (ms)")
+    for row in report["results"]:
+        first = row.get("first_ms", "")
+        print(
+            f"{row['size']:<7} {row['tasks']:>7} {row['command']:<16} {row['mode']:<11} "
+            f"{first:>9} {row.get('p50', ''):>9} {row.get('p95', ''):>9}"
+        )
+
+
+def print_comparison(result: dict) -> None:
+    print(
+        f"{result['metric']} {result['base_rev']} -> {result['new_rev']} "
+        f"(threshold {result['threshold']:.0%}, min delta {result['min_delta_ms']}ms)"
+    )
+    print(f"{'size':<7} {'command':<16} {'mode':<11} {'base':>9} {'new':>9} {'change':>8}")
+    for row in result["rows"]:
+        flag = {"regression": "  REGRESSION", "improvement": "  improved"}.get(row["status"], "")
+        print(
+            f"{row['size']:<7} {row['command']:<16} {row['mode']:<11} "
+            f"{row['base_ms']:>9} {row['new_ms']:>9} {row['change']:>+8.1%}{flag}"
+        )
+    print(f"{result['regressions']} regressions, {result['improvements']} improvements")
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("schema_version") != SCHEMA_VERSION:
+        raise SystemExit(f"scale: {path} is not a schema {SCHEMA_VERSION} result file")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time fluxctl commands on synthetic repos of growing size")
+    parser.add_argument("--sizes", default="tiny,small,medium", help=f"Comma-separated: {', '.join(SIZES)}")
+    parser.add_argument(
+        "--commands", default=",".join(COMMANDS), help="Comma-separated subset of: " + ", ".join(COMMANDS)
+    )
+    parser.add_argument("--runs", type=int, default=10, help="In-process runs per command (0 to skip)")
+    parser.add_argument("--cli-runs", type=int, default=3, help="Subprocess runs per command (0 to skip)")
+    parser.add_argument("--dep-density", type=float, default=0.3)
+    parser.add_argument("--epic-dep-density", type=float, default=0.1)
+    parser.add_argument("--runtime", type=float, default=0.3, help="Fraction of tasks with runtime state")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", help="Build fixtures in this directory and keep them")
+    parser.add_argument("--out", help="Write the JSON results here")
+    parser.add_argument("--json", action="store_true", help="JSON report on stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative growth flagged as regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore changes smaller than this")
+    parser.add_argument("--metric", choices=["p50", "p95", "first_ms"], default="p50")
+    # Internal: in-process worker entry point
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    if args.compare:
+        result = compare(
+            _load(args.compare[0]), _load(args.compare[1]), args.threshold, args.min_delta_ms, args.metric
+        )
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print_comparison(result)
+        if result["regressions"]:
+            sys.exit(1)
+        return
+
+    unknown = [label for label in args.commands.split(",") if label not in COMMANDS]
+    if unknown:
+        raise SystemExit(f"scale: unknown commands {unknown}")
+    report = run_scale(args)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
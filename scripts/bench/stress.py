@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress benchmark for fluxctl runtime state.
+
+Generates a synthetic .flux/, gives each of N workers its own git worktree
+(all sharing one FLUX_STATE_DIR, as parallel Ralph workers do) and lets every
+worker loop `next -> start -> done` (or `block`) until nothing is left. Then
+it reports throughput, per-command latency percentiles, lock wait time, CAS
+conflicts, rejected claims, double claims and lost updates.
+
+Workers run commands in-process by default, which lets them time lock waits
+and count compare-and-swap retries; --subprocess runs the real CLI for every
+command instead (startup cost included, lock stats unavailable).
+
+Usage:
+    python3 scripts/bench/stress.py --workers 8 --epics 4 --tasks 25
+    python3 scripts/bench/stress.py --backend sqlite --json > sqlite.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from generate import FLUXCTL, SCRIPTS_DIR, generate
+
+COMMANDS = ("next", "start", "done", "block")
+
+
+# --- Worker ---
+
+
+def _instrument_state(stats: dict) -> None:
+    """Time lock acquisition and count CAS conflicts inside this process."""
+    from fluxctl_pkg import state
+
+    flock = state._flock
+
+    def timed_flock(f, op):
+        if op == state.LOCK_UN:
+            return flock(f, op)
+        started = time.perf_counter()
+        try:
+            return flock(f, op)
+        finally:
+            stats["lock_waits"].append(time.perf_counter() - started)
+
+    state._flock = timed_flock
+
+    transaction = state.SqliteStateStore._transaction
+
+    @contextmanager
+    def timed_transaction(self):
+        outer = not self._depth
+        started = time.perf_counter()
+        with transaction(self) as conn:
+            if outer:  # BEGIN IMMEDIATE waits for the write lock
+                stats["lock_waits"].append(time.perf_counter() - started)
+            yield conn
+
+    state.SqliteStateStore._transaction = timed_transaction
+
+    next_versions = state.StateStore._next_versions
+
+    def counted_next_versions(self, records, expected_versions):
+        try:
+            return next_versions(self, records, expected_versions)
+        except state.VersionConflict:
+            stats["cas_conflicts"] += 1
+            raise
+
+    state.StateStore._next_versions = counted_next_versions
+
+
+def _runner(subprocess_mode: bool):
+    """Return run(argv) -> (code, stdout) for this worker's mode."""
+    if subprocess_mode:
+        env = dict(os.environ, FLUX_NO_SERVER="1")
+
+        def run(argv):
+            result = subprocess.run(
+                [sys.executable, str(FLUXCTL), *argv], env=env, capture_output=True, text=True
+            )
+            return result.returncode, result.stdout
+
+        return run
+
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from fluxctl_pkg.__main__ import run_captured
+
+    def run(argv):
+        code, stdout, _ = run_captured(argv)
+        return code, stdout
+
+    return run
+
+
+def _parse(stdout: str) -> dict:
+    try:
+        return json.loads(stdout)
+    except ValueError:
+        return {}
+
+
+def run_worker(args: argparse.Namespace) -> None:
+    """Loop next -> start -> done/block until next has nothing; write a JSON log."""
+    import random
+
+    stats: dict = {"lock_waits": [], "cas_conflicts": 0}
+    run = _runner(args.subprocess)
+    if not args.subprocess:
+        _instrument_state(stats)
+    rng = random.Random(args.seed)
+    reason_file = Path(args.log).with_suffix(".reason.md")
+    reason_file.write_text("Blocked by stress benchmark\n", encoding="utf-8")
+
+    samples: list[tuple[str, float]] = []
+    events: list[dict] = []
+
+    def timed(argv: list[str]) -> tuple[int, dict]:
+        started = time.perf_counter()
+        code, stdout = run(argv)
+        samples.append((argv[0], time.perf_counter() - started))
+        return code, _parse(stdout)
+
+    # Start barrier: all workers begin at the same wall-clock instant
+    time.sleep(max(0.0, args.start_at - time.time()))
+    deadline = time.monotonic() + args.max_seconds
+    failures: Counter = Counter()
+    while time.monotonic() < deadline:
+        code, unit = timed(["next", "--json"])
+        if code != 0:
+            events.append({"op": "error", "cmd": "next", "error": unit.get("error")})
+            break
+        task_id = unit.get("task")
+        if unit.get("status") != "work" or not task_id:
+            break  # Nothing left for this worker (all done, blocked or claimed)
+
+        code, result = timed(["start", task_id, "--json"])
+        if code != 0:
+            # Another worker claimed it between our next and start
+            events.append({"op": "rejected", "task": task_id, "error": result.get("error")})
+            continue
+        events.append({"op": "start", "task": task_id})
+
+        if rng.random() < args.block_rate:
+            argv = ["block", task_id, "--reason-file", str(reason_file), "--json"]
+        else:
+            argv = ["done", task_id, "--summary", "stress", "--json"]
+        code, result = timed(argv)
+        if code != 0:
+            events.append({"op": "error", "cmd": argv[0], "task": task_id, "error": result.get("error")})
+            failures[task_id] += 1
+            if failures[task_id] > 1:
+                break  # next keeps returning a task we cannot finish
+            continue
+        events.append({"op": argv[0], "task": task_id})
+
+    log = {
+        "actor": os.environ.get("FLUX_ACTOR"),
+        "samples": samples,
+        "events": events,
+        "lock_waits": stats["lock_waits"] if not args.subprocess else None,
+        "cas_conflicts": stats["cas_conflicts"] if not args.subprocess else None,
+    }
+    Path(args.log).write_text(json.dumps(log), encoding="utf-8")
+
+
+# --- Coordinator ---
+
+
+def percentiles(values: list[float]) -> dict:
+    """count/p50/p95/p99/max in ms (nearest rank)."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50": rank(50),
+        "p95": rank(95),
+        "p99": rank(99),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _git(root: Path, *argv: str) -> None:
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="flux-bench",
+        GIT_AUTHOR_EMAIL="bench@flux.invalid",
+        GIT_COMMITTER_NAME="flux-bench",
+        GIT_COMMITTER_EMAIL="bench@flux.invalid",
+    )
+    subprocess.run(["git", *argv], cwd=root, env=env, check=True, capture_output=True)
+
+
+def setup_worktrees(root: Path, workers: int) -> list[Path]:
+    """Commit the generated .flux/ and add one detached worktree per worker."""
+    _git(root, "add", ".flux")
+    _git(root, "commit", "-q", "-m", "bench fixture")
+    trees = []
+    for i in range(workers):
+        tree = root.parent / f"worker-{i + 1}"
+        _git(root, "worktree", "add", "-q", "--detach", str(tree))
+        trees.append(tree)
+    return trees
+
+
+def final_runtime(root: Path, state_dir: Path, backend: str) -> dict[str, dict]:
+    """All runtime records as the store sees them after the run."""
+    code = (
+        "import json, sys; sys.path.insert(0, sys.argv[1]);"
+        "from fluxctl_pkg.state import get_state_store;"
+        "print(json.dumps(get_state_store().load_all()))"
+    )
+    env = dict(os.environ, FLUX_STATE_DIR=str(state_dir), FLUX_STATE_BACKEND=backend)
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(SCRIPTS_DIR)],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def analyze(logs: list[dict], runtime: dict[str, dict], wall: float, total_tasks: int) -> dict:
+    latencies: dict[str, list[float]] = defaultdict(list)
+    starts: dict[str, set] = defaultdict(set)
+    writes: Counter = Counter()
+    finished: dict[str, str] = {}
+    rejected = errors = 0
+    for log in logs:
+        for cmd, seconds in log["samples"]:
+            latencies[cmd].append(seconds)
+        for event in log["events"]:
+            op = event["op"]
+            if op == "start":
+                starts[event["task"]].add(log["actor"])
+                writes[event["task"]] += 1
+            elif op in ("done", "block"):
+                finished[event["task"]] = "done" if op == "done" else "blocked"
+                writes[event["task"]] += 1
+            elif op == "rejected":
+                rejected += 1
+            else:
+                errors += 1
+
+    # A double claim is a task two actors both started successfully. A lost
+    # update is a successful write whose effect is missing from the final
+    # state: fewer version bumps than writes, or a finished status overwritten.
+    double_claims = sorted(task for task, actors in starts.items() if len(actors) > 1)
+    lost_updates = 0
+    for task_id, count in writes.items():
+        record = runtime.get(task_id) or {}
+        version = record.get("version") if isinstance(record.get("version"), int) else 0
+        lost_updates += max(0, count - version)
+        if task_id in finished and record.get("status") != finished[task_id]:
+            lost_updates += 1
+
+    lock_waits = [w for log in logs for w in (log["lock_waits"] or [])]
+    in_process = all(log["lock_waits"] is not None for log in logs)
+    commands = sum(len(v) for v in latencies.values())
+    done = sum(1 for status in finished.values() if status == "done")
+    return {
+        "wall_seconds": round(wall, 3),
+        "tasks": total_tasks,
+        "completed": done,
+        "blocked": len(finished) - done,
+        "unfinished": total_tasks - len(finished),
+        "throughput": {
+            "tasks_per_second": round(len(finished) / wall, 2) if wall else None,
+            "commands_per_second": round(commands / wall, 2) if wall else None,
+        },
+        "latency_ms": {cmd: percentiles(latencies[cmd]) for cmd in COMMANDS if latencies[cmd]},
+        "lock_wait_ms": (
+            {**percentiles(lock_waits), "total": round(sum(lock_waits) * 1000, 3)}
+            if in_process
+            else None
+        ),
+        "cas_conflicts": sum(log["cas_conflicts"] for log in logs) if in_process else None,
+        "rejected_claims": rejected,
+        "double_claims": double_claims,
+        "lost_updates": lost_updates,
+        "errors": errors,
+    }
+
+
+def run_stress(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory(prefix="flux-stress-") as tmp:
+        base = Path(args.keep) if args.keep else Path(tmp)
+        base.mkdir(parents=True, exist_ok=True)
+        root = base / "repo"
+        state_dir = base / "state"
+        fixture = generate(root, args.epics, args.tasks, args.dep_density, args.seed)
+        trees = setup_worktrees(root, args.workers)
+
+        start_at = time.time() + 0.5 + 0.05 * args.workers  # Time for workers to import
+        procs = []
+        for i, tree in enumerate(trees):
+            log = base / f"worker-{i + 1}.json"
+            env = dict(
+                os.environ,
+                FLUX_ACTOR=f"worker-{i + 1}",
+                FLUX_STATE_DIR=str(state_dir),
+                FLUX_STATE_BACKEND=args.backend,
+                FLUX_NO_SERVER="1",
+            )
+            argv = [
+                sys.executable,
+                str(Path(__file__).resolve()),
+                "--worker",
+                "--log",
+                str(log),
+                "--start-at",
+                repr(start_at),
+                "--seed",
+                str(args.seed + i + 1),
+                "--block-rate",
+                str(args.block_rate),
+                "--max-seconds",
+                str(args.max_seconds),
+            ]
+            if args.subprocess:
+                argv.append("--subprocess")
+            procs.append((subprocess.Popen(argv, cwd=tree, env=env), log))
+
+        for proc, _ in procs:
+            proc.wait()
+        wall = time.time() - start_at
+        failed = [i + 1 for i, (proc, _) in enumerate(procs) if proc.returncode != 0]
+        if failed:
+            raise SystemExit(f"stress: workers {failed} crashed")
+        logs = [json.loads(log.read_text(encoding="utf-8")) for _, log in procs]
+        runtime = final_runtime(root, state_dir, args.backend)
+
+    report = analyze(logs, runtime, wall, fixture["tasks"])
+    report["config"] = {
+        "workers": args.workers,
+        "backend": args.backend,
+        "mode": "subprocess" if args.subprocess else "in-process",
+        "epics": args.epics,
+        "tasks_per_epic": args.tasks,
+        "dep_density": args.dep_density,
+        "dependency_edges": fixture["dependency_edges"],
+        "block_rate": args.block_rate,
+        "seed": args.seed,
+    }
+    return report
+
+
+def print_report(report: dict) -> None:
+    config = report["config"]
+    print(
+        f"{config['workers']} workers, {config['backend']} backend ({config['mode']}), "
+        f"{report['tasks']} tasks, {config['dependency_edges']} dependency edges"
+    )
+    print(
+        f"wall {report['wall_seconds']}s: {report['completed']} done, "
+        f"{report['blocked']} blocked, {report['unfinished']} unfinished; "
+        f"{report['throughput']['tasks_per_second']} tasks/s, "
+        f"{report['throughput']['commands_per_second']} commands/s"
+    )
+    print(f"{'command':<8} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+    for cmd, stats in report["latency_ms"].items():
+        print(
+            f"{cmd:<8} {stats['count']:>6} {stats['p50']:>9} {stats['p95']:>9} "
+            f"{stats['p99']:>9} {stats['max']:>9}"
+        )
+    waits = report["lock_wait_ms"]
+    if waits is None:
+        print("lock wait: n/a (--subprocess)")
+    elif waits["count"]:
+        print(
+            f"lock wait: {waits['count']} acquisitions, total {waits['total']}ms, "
+            f"p95 {waits['p95']}ms, max {waits['max']}ms; "
+            f"CAS conflicts {report['cas_conflicts']}"
+        )
+    print(
+        f"rejected claims {report['rejected_claims']}, "
+        f"double claims {len(report['double_claims'])}, "
+        f"lost updates {report['lost_updates']}, errors {report['errors']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stress fluxctl runtime state with parallel workers")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backend", choices=["file", "journal", "sqlite"], default="file")
+    parser.add_argument("--epics", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=25, help="Tasks per epic")
+    parser.add_argument("--dep-density", type=float, default=0.3)
+    parser.add_argument("--block-rate", type=float, default=0.0, help="Chance a worker blocks instead of finishing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-seconds", type=float, default=300.0, help="Per-worker time limit")
+    parser.add_argument("--subprocess", action="store_true", help="Run the CLI per command")
+    parser.add_argument("--keep", help="Build the fixture in this directory and keep it")
+    parser.add_argument("--json", action="store_true", help="JSON report")
+    # Internal: worker process entry point
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--log", help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+    report = run_stress(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if report["double_claims"] or report["lost_updates"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
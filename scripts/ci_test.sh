@@ -114,6 +114,11 @@ NEXT_JSON="$(fluxctl next --json)"
 NEXT_TASK="$("$PYTHON_BIN" -c "import json,sys; print(json.load(sys.stdin).get('task',''))" <<< "$NEXT_JSON")"
 [[ "$NEXT_TASK" == "$TASK2_ID" ]] && pass "next picks high priority task" || fail "next picks high priority (expected $TASK2_ID, got $NEXT_TASK)"
 
+# next --slots returns the same first pick as next, without duplicates
+SLOTS_JSON="$(fluxctl next --slots 3 --json)"
+SLOTS_CHECK="$("$PYTHON_BIN" -c 'import json,sys; s=json.load(sys.stdin)["slots"]; ids=[u["task"] for u in s]; print(ids[0] if ids and len(set(ids))==len(ids) else "bad")' <<< "$SLOTS_JSON")"
+[[ "$SLOTS_CHECK" == "$TASK2_ID" ]] && pass "next --slots leads with next's pick" || fail "next --slots (got $SLOTS_CHECK)"
+
 # start task
 fluxctl start "$TASK2_ID" --json >/dev/null && pass "start task" || fail "start task"
 
@@ -274,7 +279,7 @@ EOF
 "$PYTHON_BIN" - "$TEST_DIR" << 'PYTEST'
 import sys
 sys.path.insert(0, sys.argv[1] + "/scripts")
-from fluxctl import extract_symbols_from_file
+from fluxctl_pkg.review import extract_symbols_from_file
 from pathlib import Path
 
 test_dir = Path(sys.argv[1])
@@ -544,6 +549,207 @@ fluxctl task reset "$CASCADE_T1" --cascade --json >/dev/null
 T2_STATUS="$(fluxctl show "$CASCADE_T2" --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["status"])')"
 [[ "$T2_STATUS" == "todo" ]] && pass "task reset --cascade" || fail "cascade reset: t2 status=$T2_STATUS"
 
+# Test dependency cycles are rejected (dep add and task set-deps)
+set +e
+CYCLE_OUT="$(fluxctl dep add "$CASCADE_T1" "$CASCADE_T2" --json)"
+CYCLE_RC=$?
+set -e
+[[ "$CYCLE_RC" != "0" && "$CYCLE_OUT" == *"$CASCADE_T1 -> $CASCADE_T2 -> $CASCADE_T1"* ]] && pass "dep add rejects cycle with path" || fail "dep add cycle: rc=$CYCLE_RC out=$CYCLE_OUT"
+set +e
+fluxctl task set-deps "$CASCADE_T1" --deps "$CASCADE_T2" --json >/dev/null
+CYCLE_RC=$?
+set -e
+T1_DEPS="$(fluxctl show "$CASCADE_T1" --json | "$PYTHON_BIN" -c 'import json,sys; print(len(json.load(sys.stdin)["depends_on"]))')"
+[[ "$CYCLE_RC" != "0" && "$T1_DEPS" == "0" ]] && pass "task set-deps rejects cycle" || fail "set-deps cycle: rc=$CYCLE_RC deps=$T1_DEPS"
+
+# next --slots --claim claims ready tasks for distinct actors
+echo "{\"epics\": [\"$CASCADE_EPIC\"]}" > "$TEST_DIR/slots_epics.json"
+CLAIM_JSON="$(fluxctl next --slots 2 --claim --actors worker-a,worker-b --epics-file "$TEST_DIR/slots_epics.json" --json)"
+CLAIMED="$("$PYTHON_BIN" -c 'import json,sys; s=json.load(sys.stdin)["slots"]; print(",".join(u["task"]+"="+u["actor"] for u in s if u.get("claimed")))' <<< "$CLAIM_JSON")"
+T1_ASSIGNEE="$(fluxctl show "$CASCADE_T1" --json | "$PYTHON_BIN" -c 'import json,sys; d=json.load(sys.stdin); print(d["status"], d.get("assignee"))')"
+[[ "$CLAIMED" == "$CASCADE_T1=worker-a" && "$T1_ASSIGNEE" == "in_progress worker-a" ]] && pass "next --slots --claim" || fail "slots claim: $CLAIMED / $T1_ASSIGNEE"
+
+# Test runtime records are versioned and a stale expected_version conflicts
+CAS_OUT="$(PYTHONPATH="$TEST_DIR/scripts" "$PYTHON_BIN" -c '
+import sys
+from fluxctl_pkg.state import VersionConflict, get_state_store, runtime_version
+store = get_state_store()
+data = store.load_runtime(sys.argv[1])
+read = runtime_version(data)
+saved = store.save_runtime(sys.argv[1], data, expected_version=read)
+try:
+    store.save_runtime(sys.argv[1], data, expected_version=read)
+    print("no conflict")
+except VersionConflict as e:
+    print(saved - read, e.actual - e.expected)
+' "$CASCADE_T1")"
+[[ "$CAS_OUT" == "1 1" ]] && pass "runtime versions and stale-write conflict" || fail "versioned CAS: $CAS_OUT"
+
+# Test start --siblings claims ready siblings in the same operation
+SIB_EPIC="$(fluxctl epic create --title "Siblings test" --approve "I_APPROVE_CREATING_EPICS_AND_TASKS" --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["id"])')"
+for title in One Two Three; do
+  fluxctl task create --epic "$SIB_EPIC" --title "$title" --approve "I_APPROVE_CREATING_EPICS_AND_TASKS" --json >/dev/null
+done
+SIB_OUT="$(fluxctl start "$SIB_EPIC.1" --siblings 1 --json | "$PYTHON_BIN" -c 'import json,sys; print(",".join(json.load(sys.stdin)["siblings"]))')"
+SIB_STATUS="$(fluxctl show "$SIB_EPIC.2" --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["status"])')"
+SIB_REST="$(fluxctl show "$SIB_EPIC.3" --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["status"])')"
+[[ "$SIB_OUT" == "$SIB_EPIC.2" && "$SIB_STATUS" == "in_progress" && "$SIB_REST" == "todo" ]] && pass "start --siblings" || fail "start --siblings: $SIB_OUT $SIB_STATUS $SIB_REST"
+
+# Test persistent index tracks out-of-band runtime edits
+fluxctl index --rebuild --json >/dev/null
+STATE_FILE="$(fluxctl state-path --task "$CASCADE_T2" --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["task_state_path"])')"
+sed -i.bak 's/"todo"/"done"/' "$STATE_FILE" && rm -f "$STATE_FILE.bak"
+LISTED_STATUS="$(fluxctl list --json | "$PYTHON_BIN" -c 'import json,sys; d=json.load(sys.stdin); print([t["status"] for t in d["tasks"] if t["id"]==sys.argv[1]][0])' "$CASCADE_T2")"
+[[ "$LISTED_STATUS" == "done" ]] && pass "index picks up runtime state edits" || fail "index stale: status=$LISTED_STATUS"
+INDEX_PATH="$(fluxctl index --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["path"])')"
+[[ "$INDEX_PATH" != "$PWD/.flux/"* && -f "$INDEX_PATH" && ! -e .flux/.index.json ]] && pass "index lives in the state dir" || fail "index written into .flux/: $INDEX_PATH"
+
+# Test validate --all reuses cached per-epic results and revalidates edited epics
+set +e
+fluxctl validate --all --json >/dev/null
+VAL_CACHE="$(fluxctl validate --all --json | "$PYTHON_BIN" -c 'import json,sys; d=json.load(sys.stdin); print(d["cache"]["misses"], d["cache"]["hits"] == d["total_epics"])')"
+SIB_SPEC=".flux/tasks/$SIB_EPIC.3.md"
+cp "$SIB_SPEC" "$TEST_DIR/sib_spec.bak"
+sed -i.bak 's/^## Acceptance/## Criteria/' "$SIB_SPEC" && rm -f "$SIB_SPEC.bak"
+VAL_EDIT="$(fluxctl validate --all --json | "$PYTHON_BIN" -c 'import json,sys; d=json.load(sys.stdin); print(d["cache"]["misses"], d["valid"])')"
+set -e
+[[ "$VAL_CACHE" == "0 True" && "$VAL_EDIT" == "1 False" ]] && pass "validate --all caches unchanged epics" || fail "validate cache: $VAL_CACHE / $VAL_EDIT"
+
+# Test validate --changed-since only revalidates epics touched since a ref
+git add .flux && git -c user.name=ci -c user.email=ci@example.com commit -q --no-verify -m "flux state"
+set +e
+CHANGED_OUT="$(fluxctl validate --changed-since HEAD --json | "$PYTHON_BIN" -c 'import json,sys; d=json.load(sys.stdin); print(len(d["epics"]), d["unchanged_epics"] > 0)')"
+cp "$TEST_DIR/sib_spec.bak" "$SIB_SPEC"
+CHANGED_EPICS="$(fluxctl validate --changed-since HEAD --json | "$PYTHON_BIN" -c 'import json,sys; d=json.load(sys.stdin); print(",".join(e["epic"] for e in d["epics"]), d["valid"])')"
+set -e
+[[ "$CHANGED_OUT" == "0 True" && "$CHANGED_EPICS" == "$SIB_EPIC True" ]] && pass "validate --changed-since" || fail "changed-since: $CHANGED_OUT / $CHANGED_EPICS"
+
+# Test checkpoints: dedup of unchanged saves, blob reuse, diff and restore by ID
+set +e
+CK_FIRST="$(fluxctl checkpoint save --epic "$SIB_EPIC" --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["checkpoint_id"])')"
+CK_AGAIN="$(fluxctl checkpoint save --epic "$SIB_EPIC" --json | "$PYTHON_BIN" -c 'import json,sys; d=json.load(sys.stdin); print(d["created"], d["blobs_written"])')"
+echo "checkpoint edit" >> "$SIB_SPEC"
+CK_EDIT="$(fluxctl checkpoint save --epic "$SIB_EPIC" --json | "$PYTHON_BIN" -c 'import json,sys; d=json.load(sys.stdin); print(d["created"], d["blobs_written"])')"
+CK_DIFF="$(fluxctl checkpoint diff --epic "$SIB_EPIC" --json | "$PYTHON_BIN" -c 'import json,sys; print(",".join(c["file"] for c in json.load(sys.stdin)["changes"]))')"
+CK_COUNT="$(fluxctl checkpoint list --epic "$SIB_EPIC" --json | "$PYTHON_BIN" -c 'import json,sys; print(len(json.load(sys.stdin)["checkpoints"]))')"
+fluxctl checkpoint restore --epic "$SIB_EPIC" --id "$CK_FIRST" --json >/dev/null
+CK_SPEC="$(grep -c "checkpoint edit" "$SIB_SPEC")"
+fluxctl checkpoint delete --epic "$SIB_EPIC" --json >/dev/null
+set -e
+[[ "$CK_AGAIN" == "False 0" && "$CK_EDIT" == "True 1" && "$CK_COUNT" == "2" ]] && pass "checkpoint save dedups unchanged state" || fail "checkpoint save: $CK_AGAIN / $CK_EDIT / $CK_COUNT"
+[[ "$CK_DIFF" == "tasks/$SIB_EPIC.3.md" && "$CK_SPEC" == "0" ]] && pass "checkpoint diff and restore --id" || fail "checkpoint diff/restore: $CK_DIFF / $CK_SPEC"
+[[ ! -e ".flux/.checkpoints/$SIB_EPIC.json" && -z "$(ls .flux/.checkpoints/objects)" ]] && pass "checkpoint delete removes unreferenced blobs" || fail "checkpoint store not cleaned up"
+
+# Test watch: resume from a cursor, then a live change event
+set +e
+WATCH_CURSOR="$(fluxctl watch --once | "$PYTHON_BIN" -c 'import json,sys; print(json.loads(sys.stdin.readline())["cursor"])')"
+fluxctl start "$SIB_EPIC.3" --json >/dev/null
+WATCH_RESUME="$(fluxctl watch --once --since "$WATCH_CURSOR" --epic "$SIB_EPIC" | "$PYTHON_BIN" -c 'import json,sys; print(",".join(json.loads(l)["type"] for l in sys.stdin))')"
+fluxctl watch --epic "$SIB_EPIC" --count 1 --timeout 20 > "$TEST_DIR/watch.out" &
+WATCH_PID=$!
+for _ in $(seq 50); do [[ -s "$TEST_DIR/watch.out" ]] && break; sleep 0.1; done
+fluxctl done "$SIB_EPIC.3" --json >/dev/null
+wait "$WATCH_PID"
+WATCH_LIVE="$(tail -n 1 "$TEST_DIR/watch.out" | "$PYTHON_BIN" -c 'import json,sys; d=json.load(sys.stdin); print(d["type"], d["task"], d["to"])')"
+set -e
+[[ "$WATCH_RESUME" == "watch.started,task.claimed,task.status" ]] && pass "watch --since replays missed changes" || fail "watch --since: $WATCH_RESUME"
+[[ "$WATCH_LIVE" == "task.status $SIB_EPIC.3 done" ]] && pass "watch streams live changes" || fail "watch live: $WATCH_LIVE"
+
+# Test list/tasks JSONL output: field projection and cursor paging
+ALL_IDS="$(fluxctl tasks --epic "$SIB_EPIC" --json | "$PYTHON_BIN" -c 'import json,sys; print(",".join(t["id"] for t in json.load(sys.stdin)["tasks"]))')"
+PAGED_IDS=""
+CURSOR_ARGS=()
+for _ in $(seq 20); do
+  PAGE="$(fluxctl tasks --epic "$SIB_EPIC" --format jsonl --fields id --limit 2 "${CURSOR_ARGS[@]}")"
+  PAGED_IDS="$PAGED_IDS$("$PYTHON_BIN" -c 'import json,sys; print("".join(json.loads(l)["id"] + "," for l in sys.stdin if "id" in json.loads(l)), end="")' <<< "$PAGE")"
+  NEXT="$("$PYTHON_BIN" -c 'import json,sys; print(json.loads(sys.stdin.read().splitlines()[-1]).get("next_cursor") or "")' <<< "$PAGE")"
+  [[ -z "$NEXT" ]] && break
+  CURSOR_ARGS=(--cursor "$NEXT")
+done
+[[ "${PAGED_IDS%,}" == "$ALL_IDS" ]] && pass "tasks --limit/--cursor pages through every task" || fail "paged=$PAGED_IDS all=$ALL_IDS"
+DONE_KEYS="$(fluxctl list --epic "$SIB_EPIC" --status done --format jsonl --fields id,status | "$PYTHON_BIN" -c 'import json,sys; print(";".join(",".join(f"{k}={v}" for k, v in json.loads(l).items()) for l in sys.stdin))')"
+[[ "$DONE_KEYS" == "type=epic,id=$SIB_EPIC,status=open;type=task,id=$SIB_EPIC.3,status=done" ]] && pass "list --format jsonl filters and projects records" || fail "list jsonl: $DONE_KEYS"
+
+# Test query: has_dep over dependency records, group by with count
+QUERY_DEP="$(fluxctl query "has_dep(id = $CASCADE_T1)" --format jsonl --fields id | "$PYTHON_BIN" -c 'import json,sys; print(",".join(json.loads(l)["id"] for l in sys.stdin))')"
+QUERY_GROUPS="$(fluxctl query "epic = $SIB_EPIC and status != todo group by status count" --json | "$PYTHON_BIN" -c 'import json,sys; print(",".join(str(g["key"]) + "=" + str(g["count"]) for g in json.load(sys.stdin)["groups"]))')"
+[[ "$QUERY_DEP" == "$CASCADE_T2" ]] && pass "query has_dep(...) matches on dependency fields" || fail "query has_dep: $QUERY_DEP"
+[[ "$QUERY_GROUPS" == "done=1,in_progress=2" ]] && pass "query group by ... count" || fail "query group by: $QUERY_GROUPS"
+
+# Test ID allocator: reserved block, task create --id, parallel creates stay unique
+RESERVED="$(fluxctl task reserve-ids --epic "$SIB_EPIC" --count 2 --json | "$PYTHON_BIN" -c 'import json,sys; print(" ".join(json.load(sys.stdin)["ids"]))')"
+read -r RES_A RES_B <<< "$RESERVED"
+fluxctl task create --epic "$SIB_EPIC" --title "Reserved B" --id "$RES_B" --deps "$RES_A" --approve "I_APPROVE_CREATING_EPICS_AND_TASKS" --json >/dev/null
+fluxctl task create --epic "$SIB_EPIC" --title "Reserved A" --id "$RES_A" --approve "I_APPROVE_CREATING_EPICS_AND_TASKS" --json >/dev/null
+[[ -f ".flux/tasks/$RES_A.json" && -f ".flux/tasks/$RES_B.json" ]] && pass "task reserve-ids + create --id" || fail "reserved: $RESERVED"
+for i in 1 2 3 4; do
+  fluxctl task create --epic "$SIB_EPIC" --title "Parallel $i" --approve "I_APPROVE_CREATING_EPICS_AND_TASKS" --json > "$TEST_DIR/par$i.json" &
+done
+wait
+PAR_IDS="$("$PYTHON_BIN" -c 'import json,sys; print(len({json.load(open(p))["id"] for p in sys.argv[1:]}))' "$TEST_DIR"/par?.json)"
+[[ "$PAR_IDS" == "4" ]] && pass "parallel task creates get distinct IDs" || fail "parallel ids: $PAR_IDS"
+fluxctl task create --epic "$SIB_EPIC" --title "Unreserved" --id "$SIB_EPIC.999" --approve "I_APPROVE_CREATING_EPICS_AND_TASKS" --json >/dev/null 2>&1 && fail "create --id accepted an unreserved ID" || pass "create --id rejects unreserved IDs"
+
+# Test FLUX_PROFILE: JSON report on stderr, Chrome trace via --profile-out
+PROFILE_PHASES="$(fluxctl --profile tasks --epic "$SIB_EPIC" --json 2>&1 >/dev/null | "$PYTHON_BIN" -c 'import json,sys; r=json.load(sys.stdin); print(r["command"], r["counters"]["files_opened"] > 0, sorted(r["phases_ms"]) == sorted(["startup","parse","load","compute","write","subprocess","output"]))')"
+[[ "$PROFILE_PHASES" == "tasks True True" ]] && pass "--profile reports phases and file counters" || fail "profile report: $PROFILE_PHASES"
+fluxctl --profile-out "$TEST_DIR/trace.json" --profile-format chrome start "$SIB_EPIC.1" --force --json >/dev/null
+TRACE_SPANS="$("$PYTHON_BIN" -c 'import json,sys; d=json.load(open(sys.argv[1])); names={e["name"] for e in d["traceEvents"] if e["ph"]=="X"}; print("command start" in names, "atomic_write" in names, d["otherData"]["counters"]["renames"] > 0)' "$TEST_DIR/trace.json")"
+[[ "$TRACE_SPANS" == "True True True" ]] && pass "--profile-format chrome writes trace events" || fail "trace: $TRACE_SPANS"
+
+# Test SQLite state backend round-trip via migrate-state --to
+BEFORE_LIST="$(fluxctl list --json)"
+fluxctl migrate-state --to sqlite --clean --json >/dev/null
+SQLITE_BACKEND="$(fluxctl state-path --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["backend"])')"
+[[ "$SQLITE_BACKEND" == "sqlite" ]] && pass "migrate-state --to sqlite switches backend" || fail "backend after migrate: $SQLITE_BACKEND"
+[[ "$(fluxctl list --json)" == "$BEFORE_LIST" ]] && pass "sqlite backend preserves runtime state" || fail "list differs after sqlite migration"
+fluxctl migrate-state --to file --clean --json >/dev/null
+[[ "$(fluxctl list --json)" == "$BEFORE_LIST" ]] && pass "migrate-state --to file round-trips" || fail "list differs after migrating back to file"
+
+# Test journal state backend: appends instead of rewrites, compaction folds back
+fluxctl migrate-state --to journal --json >/dev/null
+JOURNAL_PATH="$(fluxctl state-path --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["journal_path"])')"
+fluxctl start "$CASCADE_T1" --force --json >/dev/null  # Claimed by worker-a above
+fluxctl done "$CASCADE_T1" --json >/dev/null
+[[ "$(wc -l < "$JOURNAL_PATH" | tr -d ' ')" == "2" ]] && pass "journal backend appends runtime updates" || fail "journal lines: $(wc -l < "$JOURNAL_PATH")"
+J_STATUS="$(fluxctl show "$CASCADE_T1" --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["status"])')"
+[[ "$J_STATUS" == "done" ]] && pass "journal reads fold log over snapshot" || fail "journal status=$J_STATUS"
+fluxctl migrate-state --to file --json >/dev/null
+[[ ! -s "$JOURNAL_PATH" ]] && pass "leaving journal backend compacts the log" || fail "journal not compacted"
+J_STATUS="$(fluxctl show "$CASCADE_T1" --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["status"])')"
+[[ "$J_STATUS" == "done" ]] && pass "compaction preserves journaled state" || fail "after compaction status=$J_STATUS"
+
+# Test fluxctl serve answers read commands with identical output
+LOCAL_LIST="$(FLUX_NO_SERVER=1 fluxctl list --json)"
+fluxctl serve --detach --idle-timeout 60 --json >/dev/null
+[[ "$(fluxctl list --json)" == "$LOCAL_LIST" ]] && pass "serve forwards read commands" || fail "served list differs from local"
+SERVED="$(fluxctl serve --status --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["requests"])')"
+[[ "$SERVED" -ge 1 ]] && pass "serve --status counts requests" || fail "server handled $SERVED requests"
+fluxctl serve --stop --json >/dev/null
+RUNNING="$(fluxctl serve --status --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["running"])')"
+[[ "$RUNNING" == "False" ]] && pass "serve --stop" || fail "server still running after --stop"
+
+# Test fluxctl batch runs many commands in one process, --atomic rolls back
+BATCH_EPIC="$(fluxctl epic create --title "Batch test" --approve "I_APPROVE_CREATING_EPICS_AND_TASKS" --json | "$PYTHON_BIN" -c 'import json,sys; print(json.load(sys.stdin)["id"])')"
+BATCH_SUMMARY="$(cat <<EOF | fluxctl batch | tail -n 1
+{"argv": ["task", "create", "--epic", "$BATCH_EPIC", "--title", "One", "--approve", "I_APPROVE_CREATING_EPICS_AND_TASKS", "--json"]}
+{"argv": ["task", "create", "--epic", "$BATCH_EPIC", "--title", "Two", "--approve", "I_APPROVE_CREATING_EPICS_AND_TASKS", "--json"]}
+{"argv": ["dep", "add", "$BATCH_EPIC.2", "$BATCH_EPIC.1", "--json"]}
+{"argv": ["task", "set-description", "$BATCH_EPIC.1", "--file", "-", "--json"], "stdin": "From batch stdin"}
+EOF
+)"
+echo "$BATCH_SUMMARY" | "$PYTHON_BIN" -c 'import json,sys; d=json.load(sys.stdin); sys.exit(0 if d["succeeded"] == 4 else 1)' && pass "batch runs commands" || fail "batch summary: $BATCH_SUMMARY"
+[[ "$(fluxctl cat "$BATCH_EPIC.1")" == *"From batch stdin"* ]] && pass "batch passes stdin payload" || fail "batch stdin payload missing"
+BATCH_BEFORE="$(fluxctl tasks --epic "$BATCH_EPIC" --json)"
+set +e
+cat <<EOF | fluxctl batch --atomic >/dev/null
+{"argv": ["task", "create", "--epic", "$BATCH_EPIC", "--title", "Three", "--approve", "I_APPROVE_CREATING_EPICS_AND_TASKS", "--json"]}
+{"argv": ["dep", "add", "$BATCH_EPIC.3", "fn-999.1", "--json"]}
+EOF
+BATCH_RC=$?
+set -e
+[[ "$BATCH_RC" -ne 0 && "$(fluxctl tasks --epic "$BATCH_EPIC" --json)" == "$BATCH_BEFORE" ]] && pass "batch --atomic rolls back on failure" || fail "batch --atomic left changes (rc=$BATCH_RC)"
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Summary
 # ─────────────────────────────────────────────────────────────────────────────
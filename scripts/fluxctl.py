@@ -10,6 +10,15 @@ import os
 # Ensure the scripts directory is on the path so fluxctl_pkg is importable
 sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
 
+if __name__ == "__main__":
+    # Answer read commands from a running `fluxctl serve` when there is one;
+    # only fall through to the (much heavier) full CLI import otherwise.
+    from fluxctl_pkg.client import forward
+
+    code = forward(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+
 from fluxctl_pkg.__main__ import main
 
 if __name__ == "__main__":
@@ -0,0 +1,4 @@
+import time
+
+# Process start as seen by the package: the "startup" phase of FLUX_PROFILE.
+STARTED_NS = time.perf_counter_ns()
@@ -1,112 +1,120 @@
+"""
+fluxctl_pkg.__main__ - CLI entry point: lazy command registry and dispatch.
+
+Every subcommand is registered with its name, help text and a builder that
+adds its arguments. Only the dispatched command's builder runs, and command
+modules are imported only when their handler is called, so cheap commands
+like `detect` do not pay for importing review/codex/host/epics or for building
+the full argparse tree. `fluxctl --help` still lists every command.
+"""
+
 import argparse
+import atexit
+import contextlib
+import io
+import os
+import sys
+import traceback
+from typing import Callable, Optional
 
 from .utils import (
     EPIC_STATUS, TASK_STATUS, OBJECTIVE_KINDS, SCOPE_MODES,
     TECHNICAL_LEVELS, IMPLEMENTATION_TARGETS, WORKFLOW_STATUSES, PRIME_STATUSES,
     CREATE_APPROVAL_PHRASE,
     SESSION_PHASES,
+    report_subprocess_count,
+    reset_subprocess_count,
 )
-from .init import cmd_init, cmd_detect, cmd_status, cmd_state_path, cmd_agentmap, cmd_migrate_state
-from .config import (
-    cmd_config_edit,
-    cmd_config_get,
-    cmd_config_list,
-    cmd_config_set,
-    cmd_config_toggle,
-    cmd_review_backend,
-)
-from .architecture import cmd_architecture_status, cmd_architecture_path, cmd_architecture_write
-from .epics import (
-    cmd_epic_create, cmd_show, cmd_epics, cmd_list, cmd_cat,
-    cmd_epic_set_plan, cmd_epic_set_plan_review_status, cmd_epic_set_completion_review_status,
-    cmd_epic_set_branch, cmd_epic_set_title, cmd_epic_add_dep, cmd_epic_rm_dep,
-    cmd_epic_set_backend, cmd_epic_set_context, cmd_epic_set_workflow,
-    cmd_objective_current, cmd_objective_switch, cmd_scope_status, cmd_session_state,
-    cmd_artifact_write, cmd_artifact_read, cmd_prime_status, cmd_prime_mark,
-    cmd_epic_close, cmd_checkpoint_save, cmd_checkpoint_restore, cmd_checkpoint_delete,
-    cmd_validate, cmd_session_phase_get, cmd_session_phase_set,
-)
-from .tasks import (
-    cmd_task_create, cmd_dep_add, cmd_task_set_deps, cmd_tasks,
-    cmd_task_set_backend, cmd_task_show_backend,
-    cmd_task_set_description, cmd_task_set_acceptance, cmd_task_set_spec,
-    cmd_task_reset, cmd_ready, cmd_next, cmd_start, cmd_done, cmd_block,
-)
-from .ralph import (
-    cmd_ralph_pause, cmd_ralph_resume, cmd_ralph_stop, cmd_ralph_status,
-    cmd_prep_chat, cmd_rp_windows, cmd_rp_pick_window, cmd_rp_ensure_workspace,
-    cmd_rp_builder, cmd_rp_prompt_get, cmd_rp_prompt_set, cmd_rp_select_get,
-    cmd_rp_select_add, cmd_rp_chat_send, cmd_rp_prompt_export, cmd_rp_setup_review,
-)
-from .codex import cmd_codex_check
-from .host import cmd_doctor, cmd_env, cmd_version
-from .review import cmd_codex_impl_review, cmd_codex_plan_review, cmd_codex_completion_review
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="fluxctl - CLI for .flux/ task tracking",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-    )
-    subparsers = parser.add_subparsers(dest="command", required=True)
+# --- Command registry ---
+
+# name -> (help, builder); insertion order is the order shown in --help
+COMMANDS: dict[str, tuple[str, Callable[[argparse.ArgumentParser], None]]] = {}
+
+
+def command(name: str, help: str):
+    """Register a subcommand builder (adds the command's arguments)."""
+
+    def register(builder: Callable[[argparse.ArgumentParser], None]):
+        COMMANDS[name] = (help, builder)
+        return builder
+
+    return register
+
+
+def _handler(module: str, name: str) -> Callable[[argparse.Namespace], None]:
+    """Command handler that imports fluxctl_pkg.<module> on first call."""
 
-    # init
-    p_init = subparsers.add_parser("init", help="Initialize .flux/ directory")
+    def run(args: argparse.Namespace) -> None:
+        # __import__ rather than importlib: same result, but it goes through
+        # the import machinery that `python -X importtime` instruments.
+        mod = __import__(f"{__package__}.{module}", fromlist=[name])
+        return getattr(mod, name)(args)
+
+    run.__qualname__ = name
+    return run
+
+
+# --- Commands ---
+
+
+@command("init", "Initialize .flux/ directory")
+def _add_init(p_init: argparse.ArgumentParser) -> None:
     p_init.add_argument("--json", action="store_true", help="JSON output")
-    p_init.set_defaults(func=cmd_init)
+    p_init.set_defaults(func=_handler("init", "cmd_init"))
 
-    # detect
-    p_detect = subparsers.add_parser("detect", help="Check if .flux/ exists")
+
+@command("detect", "Check if .flux/ exists")
+def _add_detect(p_detect: argparse.ArgumentParser) -> None:
     p_detect.add_argument("--json", action="store_true", help="JSON output")
-    p_detect.set_defaults(func=cmd_detect)
+    p_detect.set_defaults(func=_handler("init", "cmd_detect"))
+
 
-    # status
-    p_status = subparsers.add_parser("status", help="Show .flux state and active runs")
+@command("status", "Show .flux state and active runs")
+def _add_status(p_status: argparse.ArgumentParser) -> None:
     p_status.add_argument("--json", action="store_true", help="JSON output")
-    p_status.set_defaults(func=cmd_status)
+    p_status.set_defaults(func=_handler("init", "cmd_status"))
 
-    # env
-    p_env = subparsers.add_parser(
-        "env", help="Detect the active host and report Flux runtime/adapter versions"
-    )
+
+@command("env", "Detect the active host and report Flux runtime/adapter versions")
+def _add_env(p_env: argparse.ArgumentParser) -> None:
     p_env.add_argument("--json", action="store_true", help="JSON output")
-    p_env.set_defaults(func=cmd_env)
+    p_env.set_defaults(func=_handler("host", "cmd_env"))
 
-    # doctor
-    p_doctor = subparsers.add_parser(
-        "doctor", help="Host-aware Flux diagnostics and update guidance"
-    )
+
+@command("doctor", "Host-aware Flux diagnostics and update guidance")
+def _add_doctor(p_doctor: argparse.ArgumentParser) -> None:
     p_doctor.add_argument("--json", action="store_true", help="JSON output")
-    p_doctor.set_defaults(func=cmd_doctor)
+    p_doctor.set_defaults(func=_handler("host", "cmd_doctor"))
 
-    # version
-    p_version = subparsers.add_parser("version", help="Show Flux runtime version")
+
+@command("version", "Show Flux runtime version")
+def _add_version(p_version: argparse.ArgumentParser) -> None:
     p_version.add_argument("--json", action="store_true", help="JSON output")
     p_version.add_argument(
         "--verbose",
         action="store_true",
         help="Include host/runtime diagnostics in JSON output",
     )
-    p_version.set_defaults(func=cmd_version)
+    p_version.set_defaults(func=_handler("host", "cmd_version"))
 
-    # session-state
-    p_session_state = subparsers.add_parser(
-        "session-state", help="Summarize current workflow routing state"
-    )
+
+@command("session-state", "Summarize current workflow routing state")
+def _add_session_state(p_session_state: argparse.ArgumentParser) -> None:
     p_session_state.add_argument("--json", action="store_true", help="JSON output")
-    p_session_state.set_defaults(func=cmd_session_state)
+    p_session_state.set_defaults(func=_handler("epics", "cmd_session_state"))
 
-    # session-phase
-    p_session_phase = subparsers.add_parser(
-        "session-phase", help="Get or set the current session lifecycle phase"
-    )
+
+@command("session-phase", "Get or set the current session lifecycle phase")
+def _add_session_phase(p_session_phase: argparse.ArgumentParser) -> None:
     session_phase_sub = p_session_phase.add_subparsers(
         dest="session_phase_cmd", required=True
     )
 
     p_sp_get = session_phase_sub.add_parser("get", help="Get current session phase")
     p_sp_get.add_argument("--json", action="store_true", help="JSON output")
-    p_sp_get.set_defaults(func=cmd_session_phase_get)
+    p_sp_get.set_defaults(func=_handler("epics", "cmd_session_phase_get"))
 
     p_sp_set = session_phase_sub.add_parser("set", help="Set current session phase")
     p_sp_set.add_argument("phase", choices=SESSION_PHASES, help="Phase to set")
@@ -114,57 +122,55 @@ def main() -> None:
     p_sp_set.add_argument("--epic-id", help="Associated epic ID")
     p_sp_set.add_argument("--task-id", help="Associated task ID")
     p_sp_set.add_argument("--json", action="store_true", help="JSON output")
-    p_sp_set.set_defaults(func=cmd_session_phase_set)
+    p_sp_set.set_defaults(func=_handler("epics", "cmd_session_phase_set"))
 
-    # prime-status
-    p_prime_status = subparsers.add_parser(
-        "prime-status", help="Show whether this repository has been primed"
-    )
+
+@command("prime-status", "Show whether this repository has been primed")
+def _add_prime_status(p_prime_status: argparse.ArgumentParser) -> None:
     p_prime_status.add_argument("--json", action="store_true", help="JSON output")
-    p_prime_status.set_defaults(func=cmd_prime_status)
+    p_prime_status.set_defaults(func=_handler("epics", "cmd_prime_status"))
 
-    # prime-mark
-    p_prime_mark = subparsers.add_parser(
-        "prime-mark", help="Internal helper to persist prime-state metadata"
-    )
+
+@command("prime-mark", "Internal helper to persist prime-state metadata")
+def _add_prime_mark(p_prime_mark: argparse.ArgumentParser) -> None:
     p_prime_mark.add_argument(
         "--status", required=True, choices=PRIME_STATUSES, help="Prime status"
     )
     p_prime_mark.add_argument("--version", help="Flux version associated with this prime run")
     p_prime_mark.add_argument("--json", action="store_true", help="JSON output")
-    p_prime_mark.set_defaults(func=cmd_prime_mark)
+    p_prime_mark.set_defaults(func=_handler("epics", "cmd_prime_mark"))
 
-    # scope-status
-    p_scope_status = subparsers.add_parser(
-        "scope-status", help="Show current scoped workflow progress"
-    )
+
+@command("scope-status", "Show current scoped workflow progress")
+def _add_scope_status(p_scope_status: argparse.ArgumentParser) -> None:
     p_scope_status.add_argument("--objective", help="Epic ID (defaults to active objective)")
     p_scope_status.add_argument("--json", action="store_true", help="JSON output")
-    p_scope_status.set_defaults(func=cmd_scope_status)
+    p_scope_status.set_defaults(func=_handler("epics", "cmd_scope_status"))
 
-    # config
-    p_config = subparsers.add_parser("config", help="Config commands")
+
+@command("config", "Config commands")
+def _add_config(p_config: argparse.ArgumentParser) -> None:
     config_sub = p_config.add_subparsers(dest="config_cmd", required=True)
 
     p_config_get = config_sub.add_parser("get", help="Get config value")
     p_config_get.add_argument("key", help="Config key (e.g., review.backend)")
     p_config_get.add_argument("--json", action="store_true", help="JSON output")
-    p_config_get.set_defaults(func=cmd_config_get)
+    p_config_get.set_defaults(func=_handler("config", "cmd_config_get"))
 
     p_config_set = config_sub.add_parser("set", help="Set config value")
     p_config_set.add_argument("key", help="Config key (e.g., review.backend)")
     p_config_set.add_argument("value", help="Config value")
     p_config_set.add_argument("--json", action="store_true", help="JSON output")
-    p_config_set.set_defaults(func=cmd_config_set)
+    p_config_set.set_defaults(func=_handler("config", "cmd_config_set"))
 
     p_config_list = config_sub.add_parser("list", help="List current config")
     p_config_list.add_argument("--json", action="store_true", help="JSON output")
-    p_config_list.set_defaults(func=cmd_config_list)
+    p_config_list.set_defaults(func=_handler("config", "cmd_config_list"))
 
     p_config_toggle = config_sub.add_parser("toggle", help="Toggle boolean config value")
     p_config_toggle.add_argument("key", help="Boolean config key (e.g., planSync.enabled)")
     p_config_toggle.add_argument("--json", action="store_true", help="JSON output")
-    p_config_toggle.set_defaults(func=cmd_config_toggle)
+    p_config_toggle.set_defaults(func=_handler("config", "cmd_config_toggle"))
 
     p_config_edit = config_sub.add_parser("edit", help="Open config file in an editor")
     p_config_edit.add_argument(
@@ -172,28 +178,27 @@ def main() -> None:
         help="Editor command override (defaults to $VISUAL/$EDITOR)",
     )
     p_config_edit.add_argument("--json", action="store_true", help="JSON output")
-    p_config_edit.set_defaults(func=cmd_config_edit)
+    p_config_edit.set_defaults(func=_handler("config", "cmd_config_edit"))
 
-    # review-backend (helper for skills)
-    p_review_backend = subparsers.add_parser(
-        "review-backend", help="Get review backend (ASK if not configured)"
-    )
+
+# review-backend (helper for skills)
+@command("review-backend", "Get review backend (ASK if not configured)")
+def _add_review_backend(p_review_backend: argparse.ArgumentParser) -> None:
     p_review_backend.add_argument("--json", action="store_true", help="JSON output")
-    p_review_backend.set_defaults(func=cmd_review_backend)
+    p_review_backend.set_defaults(func=_handler("config", "cmd_review_backend"))
 
-    # architecture
-    p_architecture = subparsers.add_parser(
-        "architecture", help="Canonical architecture diagram commands"
-    )
+
+@command("architecture", "Canonical architecture diagram commands")
+def _add_architecture(p_architecture: argparse.ArgumentParser) -> None:
     architecture_sub = p_architecture.add_subparsers(dest="architecture_cmd", required=True)
 
     p_architecture_status = architecture_sub.add_parser("status", help="Show architecture status")
     p_architecture_status.add_argument("--json", action="store_true", help="JSON output")
-    p_architecture_status.set_defaults(func=cmd_architecture_status)
+    p_architecture_status.set_defaults(func=_handler("architecture", "cmd_architecture_status"))
 
     p_architecture_path = architecture_sub.add_parser("path", help="Show architecture file path")
     p_architecture_path.add_argument("--json", action="store_true", help="JSON output")
-    p_architecture_path.set_defaults(func=cmd_architecture_path)
+    p_architecture_path.set_defaults(func=_handler("architecture", "cmd_architecture_path"))
 
     p_architecture_write = architecture_sub.add_parser("write", help="Write architecture diagram")
     p_architecture_write.add_argument(
@@ -207,10 +212,12 @@ def main() -> None:
     p_architecture_write.add_argument("--summary", help="Short summary of the architecture change")
     p_architecture_write.add_argument("--source", help="Command or workflow that updated it")
     p_architecture_write.add_argument("--json", action="store_true", help="JSON output")
-    p_architecture_write.set_defaults(func=cmd_architecture_write)
+    p_architecture_write.set_defaults(func=_handler("architecture", "cmd_architecture_write"))
+
 
-    # epic create
-    p_epic = subparsers.add_parser("epic", help="Epic commands")
+# epic create
+@command("epic", "Epic commands")
+def _add_epic(p_epic: argparse.ArgumentParser) -> None:
     epic_sub = p_epic.add_subparsers(dest="epic_cmd", required=True)
 
     p_epic_create = epic_sub.add_parser("create", help="Create new epic")
@@ -242,7 +249,7 @@ def main() -> None:
         help="Implementation target (defaults to workflow.defaultImplementationTarget config)",
     )
     p_epic_create.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_create.set_defaults(func=cmd_epic_create)
+    p_epic_create.set_defaults(func=_handler("epics", "cmd_epic_create"))
 
     p_epic_set_context = epic_sub.add_parser("set-context", help="Set epic workflow context")
     p_epic_set_context.add_argument("id", help="Epic ID (e.g., fn-1, fn-1-add-auth)")
@@ -260,7 +267,7 @@ def main() -> None:
         "--activate", action="store_true", help="Make this the active objective"
     )
     p_epic_set_context.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_set_context.set_defaults(func=cmd_epic_set_context)
+    p_epic_set_context.set_defaults(func=_handler("epics", "cmd_epic_set_context"))
 
     p_epic_set_workflow = epic_sub.add_parser("set-workflow", help="Set epic workflow state")
     p_epic_set_workflow.add_argument("id", help="Epic ID (e.g., fn-1, fn-1-add-auth)")
@@ -291,13 +298,13 @@ def main() -> None:
         "--activate", action="store_true", help="Make this the active objective"
     )
     p_epic_set_workflow.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_set_workflow.set_defaults(func=cmd_epic_set_workflow)
+    p_epic_set_workflow.set_defaults(func=_handler("epics", "cmd_epic_set_workflow"))
 
     p_epic_set_plan = epic_sub.add_parser("set-plan", help="Set epic spec from file")
     p_epic_set_plan.add_argument("id", help="Epic ID (e.g., fn-1, fn-1-add-auth)")
     p_epic_set_plan.add_argument("--file", required=True, help="Markdown file (use '-' for stdin)")
     p_epic_set_plan.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_set_plan.set_defaults(func=cmd_epic_set_plan)
+    p_epic_set_plan.set_defaults(func=_handler("epics", "cmd_epic_set_plan"))
 
     p_epic_set_review = epic_sub.add_parser(
         "set-plan-review-status", help="Set plan review status"
@@ -310,7 +317,7 @@ def main() -> None:
         help="Plan review status",
     )
     p_epic_set_review.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_set_review.set_defaults(func=cmd_epic_set_plan_review_status)
+    p_epic_set_review.set_defaults(func=_handler("epics", "cmd_epic_set_plan_review_status"))
 
     p_epic_set_completion_review = epic_sub.add_parser(
         "set-completion-review-status", help="Set completion review status"
@@ -323,13 +330,13 @@ def main() -> None:
         help="Completion review status",
     )
     p_epic_set_completion_review.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_set_completion_review.set_defaults(func=cmd_epic_set_completion_review_status)
+    p_epic_set_completion_review.set_defaults(func=_handler("epics", "cmd_epic_set_completion_review_status"))
 
     p_epic_set_branch = epic_sub.add_parser("set-branch", help="Set epic branch name")
     p_epic_set_branch.add_argument("id", help="Epic ID (e.g., fn-1, fn-1-add-auth)")
     p_epic_set_branch.add_argument("--branch", required=True, help="Branch name")
     p_epic_set_branch.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_set_branch.set_defaults(func=cmd_epic_set_branch)
+    p_epic_set_branch.set_defaults(func=_handler("epics", "cmd_epic_set_branch"))
 
     p_epic_set_title = epic_sub.add_parser(
         "set-title", help="Rename epic by setting a new title (updates slug)"
@@ -337,24 +344,24 @@ def main() -> None:
     p_epic_set_title.add_argument("id", help="Epic ID (e.g., fn-1, fn-1-add-auth)")
     p_epic_set_title.add_argument("--title", required=True, help="New title for the epic")
     p_epic_set_title.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_set_title.set_defaults(func=cmd_epic_set_title)
+    p_epic_set_title.set_defaults(func=_handler("epics", "cmd_epic_set_title"))
 
     p_epic_close = epic_sub.add_parser("close", help="Close epic")
     p_epic_close.add_argument("id", help="Epic ID (e.g., fn-1, fn-1-add-auth)")
     p_epic_close.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_close.set_defaults(func=cmd_epic_close)
+    p_epic_close.set_defaults(func=_handler("epics", "cmd_epic_close"))
 
     p_epic_add_dep = epic_sub.add_parser("add-dep", help="Add epic-level dependency")
     p_epic_add_dep.add_argument("epic", help="Epic ID")
     p_epic_add_dep.add_argument("depends_on", help="Epic ID to depend on")
     p_epic_add_dep.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_add_dep.set_defaults(func=cmd_epic_add_dep)
+    p_epic_add_dep.set_defaults(func=_handler("epics", "cmd_epic_add_dep"))
 
     p_epic_rm_dep = epic_sub.add_parser("rm-dep", help="Remove epic-level dependency")
     p_epic_rm_dep.add_argument("epic", help="Epic ID")
     p_epic_rm_dep.add_argument("depends_on", help="Epic ID to remove from deps")
     p_epic_rm_dep.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_rm_dep.set_defaults(func=cmd_epic_rm_dep)
+    p_epic_rm_dep.set_defaults(func=_handler("epics", "cmd_epic_rm_dep"))
 
     p_epic_set_backend = epic_sub.add_parser(
         "set-backend", help="Set default backend specs for impl/review/sync"
@@ -370,10 +377,12 @@ def main() -> None:
         "--sync", help="Default sync backend spec (e.g., 'claude:haiku')"
     )
     p_epic_set_backend.add_argument("--json", action="store_true", help="JSON output")
-    p_epic_set_backend.set_defaults(func=cmd_epic_set_backend)
+    p_epic_set_backend.set_defaults(func=_handler("epics", "cmd_epic_set_backend"))
 
-    # task create
-    p_task = subparsers.add_parser("task", help="Task commands")
+
+# task create
+@command("task", "Task commands")
+def _add_task(p_task: argparse.ArgumentParser) -> None:
     task_sub = p_task.add_subparsers(dest="task_cmd", required=True)
 
     p_task_create = task_sub.add_parser("create", help="Create new task")
@@ -390,20 +399,31 @@ def main() -> None:
     p_task_create.add_argument(
         "--priority", type=int, help="Priority (lower = earlier)"
     )
+    p_task_create.add_argument(
+        "--id", help="Use an ID reserved with 'task reserve-ids' (e.g., fn-1.4)"
+    )
     p_task_create.add_argument("--json", action="store_true", help="JSON output")
-    p_task_create.set_defaults(func=cmd_task_create)
+    p_task_create.set_defaults(func=_handler("tasks", "cmd_task_create"))
+
+    p_task_reserve = task_sub.add_parser(
+        "reserve-ids", help="Reserve a block of task IDs for bulk planning"
+    )
+    p_task_reserve.add_argument("--epic", required=True, help="Epic ID (e.g., fn-1, fn-1-add-auth)")
+    p_task_reserve.add_argument("--count", type=int, required=True, help="Number of IDs to reserve")
+    p_task_reserve.add_argument("--json", action="store_true", help="JSON output")
+    p_task_reserve.set_defaults(func=_handler("tasks", "cmd_task_reserve_ids"))
 
     p_task_desc = task_sub.add_parser("set-description", help="Set task description")
     p_task_desc.add_argument("id", help="Task ID (e.g., fn-1.2, fn-1-add-auth.2)")
     p_task_desc.add_argument("--file", required=True, help="Markdown file (use '-' for stdin)")
     p_task_desc.add_argument("--json", action="store_true", help="JSON output")
-    p_task_desc.set_defaults(func=cmd_task_set_description)
+    p_task_desc.set_defaults(func=_handler("tasks", "cmd_task_set_description"))
 
     p_task_acc = task_sub.add_parser("set-acceptance", help="Set task acceptance")
     p_task_acc.add_argument("id", help="Task ID (e.g., fn-1.2, fn-1-add-auth.2)")
     p_task_acc.add_argument("--file", required=True, help="Markdown file (use '-' for stdin)")
     p_task_acc.add_argument("--json", action="store_true", help="JSON output")
-    p_task_acc.set_defaults(func=cmd_task_set_acceptance)
+    p_task_acc.set_defaults(func=_handler("tasks", "cmd_task_set_acceptance"))
 
     p_task_set_spec = task_sub.add_parser(
         "set-spec", help="Set task spec (full file or sections)"
@@ -419,7 +439,7 @@ def main() -> None:
         "--acceptance", help="Acceptance section file (use '-' for stdin)"
     )
     p_task_set_spec.add_argument("--json", action="store_true", help="JSON output")
-    p_task_set_spec.set_defaults(func=cmd_task_set_spec)
+    p_task_set_spec.set_defaults(func=_handler("tasks", "cmd_task_set_spec"))
 
     p_task_reset = task_sub.add_parser("reset", help="Reset task to todo")
     p_task_reset.add_argument("task_id", help="Task ID (e.g., fn-1.2, fn-1-add-auth.2)")
@@ -427,7 +447,7 @@ def main() -> None:
         "--cascade", action="store_true", help="Also reset dependent tasks (same epic)"
     )
     p_task_reset.add_argument("--json", action="store_true", help="JSON output")
-    p_task_reset.set_defaults(func=cmd_task_reset)
+    p_task_reset.set_defaults(func=_handler("tasks", "cmd_task_reset"))
 
     p_task_set_backend = task_sub.add_parser(
         "set-backend", help="Set backend specs for impl/review/sync"
@@ -443,14 +463,14 @@ def main() -> None:
         "--sync", help="Sync backend spec (e.g., 'claude:haiku')"
     )
     p_task_set_backend.add_argument("--json", action="store_true", help="JSON output")
-    p_task_set_backend.set_defaults(func=cmd_task_set_backend)
+    p_task_set_backend.set_defaults(func=_handler("tasks", "cmd_task_set_backend"))
 
     p_task_show_backend = task_sub.add_parser(
         "show-backend", help="Show effective backend specs (task + epic levels)"
     )
     p_task_show_backend.add_argument("id", help="Task ID (e.g., fn-1.2, fn-1-add-auth.2)")
     p_task_show_backend.add_argument("--json", action="store_true", help="JSON output")
-    p_task_show_backend.set_defaults(func=cmd_task_show_backend)
+    p_task_show_backend.set_defaults(func=_handler("tasks", "cmd_task_show_backend"))
 
     p_task_set_deps = task_sub.add_parser(
         "set-deps", help="Set task dependencies (comma-separated)"
@@ -460,39 +480,44 @@ def main() -> None:
         "--deps", required=True, help="Comma-separated dependency IDs (e.g., fn-1-add-auth.1,fn-1-add-auth.2)"
     )
     p_task_set_deps.add_argument("--json", action="store_true", help="JSON output")
-    p_task_set_deps.set_defaults(func=cmd_task_set_deps)
+    p_task_set_deps.set_defaults(func=_handler("tasks", "cmd_task_set_deps"))
+
 
-    # dep add
-    p_dep = subparsers.add_parser("dep", help="Dependency commands")
+# dep add
+@command("dep", "Dependency commands")
+def _add_dep(p_dep: argparse.ArgumentParser) -> None:
     dep_sub = p_dep.add_subparsers(dest="dep_cmd", required=True)
 
     p_dep_add = dep_sub.add_parser("add", help="Add dependency")
     p_dep_add.add_argument("task", help="Task ID (e.g., fn-1.2, fn-1-add-auth.2)")
     p_dep_add.add_argument("depends_on", help="Dependency task ID (e.g., fn-1.1, fn-1-add-auth.1)")
     p_dep_add.add_argument("--json", action="store_true", help="JSON output")
-    p_dep_add.set_defaults(func=cmd_dep_add)
+    p_dep_add.set_defaults(func=_handler("tasks", "cmd_dep_add"))
 
-    # show
-    p_show = subparsers.add_parser("show", help="Show epic or task")
+
+@command("show", "Show epic or task")
+def _add_show(p_show: argparse.ArgumentParser) -> None:
     p_show.add_argument("id", help="Epic or task ID (e.g., fn-1-add-auth, fn-1-add-auth.2)")
     p_show.add_argument("--json", action="store_true", help="JSON output")
-    p_show.set_defaults(func=cmd_show)
+    p_show.set_defaults(func=_handler("epics", "cmd_show"))
+
 
-    # objective
-    p_objective = subparsers.add_parser("objective", help="Objective commands")
+@command("objective", "Objective commands")
+def _add_objective(p_objective: argparse.ArgumentParser) -> None:
     objective_sub = p_objective.add_subparsers(dest="objective_cmd", required=True)
 
     p_objective_current = objective_sub.add_parser("current", help="Show active objective")
     p_objective_current.add_argument("--json", action="store_true", help="JSON output")
-    p_objective_current.set_defaults(func=cmd_objective_current)
+    p_objective_current.set_defaults(func=_handler("epics", "cmd_objective_current"))
 
     p_objective_switch = objective_sub.add_parser("switch", help="Switch active objective")
     p_objective_switch.add_argument("id", help="Epic ID (e.g., fn-1-add-auth)")
     p_objective_switch.add_argument("--json", action="store_true", help="JSON output")
-    p_objective_switch.set_defaults(func=cmd_objective_switch)
+    p_objective_switch.set_defaults(func=_handler("epics", "cmd_objective_switch"))
+
 
-    # artifact
-    p_artifact = subparsers.add_parser("artifact", help="Workflow artifact commands")
+@command("artifact", "Workflow artifact commands")
+def _add_artifact(p_artifact: argparse.ArgumentParser) -> None:
     artifact_sub = p_artifact.add_subparsers(dest="artifact_cmd", required=True)
 
     p_artifact_write = artifact_sub.add_parser("write", help="Write phase artifact")
@@ -503,48 +528,86 @@ def main() -> None:
         "--activate", action="store_true", help="Make this the active objective"
     )
     p_artifact_write.add_argument("--json", action="store_true", help="JSON output")
-    p_artifact_write.set_defaults(func=cmd_artifact_write)
+    p_artifact_write.set_defaults(func=_handler("epics", "cmd_artifact_write"))
 
     p_artifact_read = artifact_sub.add_parser("read", help="Read phase artifact")
     p_artifact_read.add_argument("id", help="Epic ID (e.g., fn-1-add-auth)")
     p_artifact_read.add_argument("--phase", required=True, help="Workflow phase")
     p_artifact_read.add_argument("--json", action="store_true", help="JSON output")
-    p_artifact_read.set_defaults(func=cmd_artifact_read)
+    p_artifact_read.set_defaults(func=_handler("epics", "cmd_artifact_read"))
+
+
+@command("epics", "List all epics")
+def _add_epics(p_epics: argparse.ArgumentParser) -> None:
+    p_epics.add_argument("--status", choices=EPIC_STATUS, help="Filter by status")
+    _listing_args(p_epics)
+    p_epics.set_defaults(func=_handler("epics", "cmd_epics"))
 
-    # epics
-    p_epics = subparsers.add_parser("epics", help="List all epics")
-    p_epics.add_argument("--json", action="store_true", help="JSON output")
-    p_epics.set_defaults(func=cmd_epics)
 
-    # tasks
-    p_tasks = subparsers.add_parser("tasks", help="List tasks")
+@command("tasks", "List tasks")
+def _add_tasks(p_tasks: argparse.ArgumentParser) -> None:
     p_tasks.add_argument("--epic", help="Filter by epic ID (e.g., fn-1, fn-1-add-auth)")
     p_tasks.add_argument(
         "--status",
         choices=["todo", "in_progress", "blocked", "done"],
         help="Filter by status",
     )
-    p_tasks.add_argument("--json", action="store_true", help="JSON output")
-    p_tasks.set_defaults(func=cmd_tasks)
+    p_tasks.add_argument("--assignee", help="Filter by assignee")
+    _listing_args(p_tasks)
+    p_tasks.set_defaults(func=_handler("tasks", "cmd_tasks"))
 
-    # list
-    p_list = subparsers.add_parser("list", help="List all epics and tasks")
-    p_list.add_argument("--json", action="store_true", help="JSON output")
-    p_list.set_defaults(func=cmd_list)
 
-    # cat
-    p_cat = subparsers.add_parser("cat", help="Print spec markdown")
+@command("list", "List all epics and tasks")
+def _add_list(p_list: argparse.ArgumentParser) -> None:
+    p_list.add_argument("--epic", help="Only this epic and its tasks")
+    p_list.add_argument("--status", choices=TASK_STATUS, help="Filter tasks by status")
+    p_list.add_argument("--assignee", help="Filter tasks by assignee")
+    _listing_args(p_list)
+    p_list.set_defaults(func=_handler("epics", "cmd_list"))
+
+
+def _listing_args(parser: argparse.ArgumentParser) -> None:
+    """Output, projection and paging flags shared by list/tasks/epics."""
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    parser.add_argument(
+        "--format",
+        choices=["text", "json", "jsonl"],
+        help="Output format (jsonl: one record per line, streamed)",
+    )
+    parser.add_argument("--fields", help="Comma-separated fields per record (json/jsonl)")
+    parser.add_argument("--limit", type=int, help="Return at most N records")
+    parser.add_argument("--cursor", help="Resume after this ID (next_cursor of the previous page)")
+
+
+@command("query", "Filter/aggregate tasks or epics with a query expression")
+def _add_query(p_query: argparse.ArgumentParser) -> None:
+    p_query.add_argument(
+        "expr",
+        help="Query, e.g. \"status = todo and priority < 3 and not has_dep(status != done)\" "
+        "or \"status = in_progress group by assignee\"",
+    )
+    p_query.add_argument(
+        "--explain", action="store_true", help="Show the parsed query plan instead of running it"
+    )
+    _listing_args(p_query)
+    p_query.set_defaults(func=_handler("query", "cmd_query"))
+
+
+@command("cat", "Print spec markdown")
+def _add_cat(p_cat: argparse.ArgumentParser) -> None:
     p_cat.add_argument("id", help="Epic or task ID (e.g., fn-1-add-auth, fn-1-add-auth.2)")
-    p_cat.set_defaults(func=cmd_cat)
+    p_cat.set_defaults(func=_handler("epics", "cmd_cat"))
+
 
-    # ready
-    p_ready = subparsers.add_parser("ready", help="List ready tasks")
+@command("ready", "List ready tasks")
+def _add_ready(p_ready: argparse.ArgumentParser) -> None:
     p_ready.add_argument("--epic", required=True, help="Epic ID (e.g., fn-1, fn-1-add-auth)")
     p_ready.add_argument("--json", action="store_true", help="JSON output")
-    p_ready.set_defaults(func=cmd_ready)
+    p_ready.set_defaults(func=_handler("tasks", "cmd_ready"))
 
-    # next
-    p_next = subparsers.add_parser("next", help="Select next plan/work unit")
+
+@command("next", "Select next plan/work unit")
+def _add_next(p_next: argparse.ArgumentParser) -> None:
     p_next.add_argument("--epics-file", help="JSON file with ordered epic list")
     p_next.add_argument(
         "--require-plan-review",
@@ -556,21 +619,44 @@ def main() -> None:
         action="store_true",
         help="Require completion review when all tasks done",
     )
+    p_next.add_argument(
+        "--slots",
+        type=int,
+        help="Return up to N non-conflicting units across epics (one per worker)",
+    )
+    p_next.add_argument(
+        "--claim",
+        action="store_true",
+        help="With --slots: claim the returned tasks (start them) for their actors",
+    )
+    p_next.add_argument(
+        "--actors",
+        help="With --slots: comma-separated actors, one per slot (default: current actor)",
+    )
     p_next.add_argument("--json", action="store_true", help="JSON output")
-    p_next.set_defaults(func=cmd_next)
+    p_next.set_defaults(func=_handler("tasks", "cmd_next"))
+
 
-    # start
-    p_start = subparsers.add_parser("start", help="Start task")
+@command("start", "Start task")
+def _add_start(p_start: argparse.ArgumentParser) -> None:
     p_start.add_argument("id", help="Task ID (e.g., fn-1.2, fn-1-add-auth.2)")
     p_start.add_argument(
         "--force", action="store_true", help="Skip status/dependency/claim checks"
     )
     p_start.add_argument("--note", help="Claim note (e.g., reason for taking over)")
+    p_start.add_argument(
+        "--siblings",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Also claim up to N ready tasks from the same epic (one atomic claim)",
+    )
     p_start.add_argument("--json", action="store_true", help="JSON output")
-    p_start.set_defaults(func=cmd_start)
+    p_start.set_defaults(func=_handler("tasks", "cmd_start"))
 
-    # done
-    p_done = subparsers.add_parser("done", help="Complete task")
+
+@command("done", "Complete task")
+def _add_done(p_done: argparse.ArgumentParser) -> None:
     p_done.add_argument("id", help="Task ID (e.g., fn-1.2, fn-1-add-auth.2)")
     p_done.add_argument("--summary-file", help="Done summary markdown file")
     p_done.add_argument("--summary", help="Done summary (inline text)")
@@ -578,29 +664,28 @@ def main() -> None:
     p_done.add_argument("--evidence", help="Evidence JSON (inline string)")
     p_done.add_argument("--force", action="store_true", help="Skip status checks")
     p_done.add_argument("--json", action="store_true", help="JSON output")
-    p_done.set_defaults(func=cmd_done)
+    p_done.set_defaults(func=_handler("tasks", "cmd_done"))
+
 
-    # block
-    p_block = subparsers.add_parser("block", help="Block task with reason")
+@command("block", "Block task with reason")
+def _add_block(p_block: argparse.ArgumentParser) -> None:
     p_block.add_argument("id", help="Task ID (e.g., fn-1.2, fn-1-add-auth.2)")
     p_block.add_argument(
         "--reason-file", required=True, help="Markdown file with block reason"
     )
     p_block.add_argument("--json", action="store_true", help="JSON output")
-    p_block.set_defaults(func=cmd_block)
+    p_block.set_defaults(func=_handler("tasks", "cmd_block"))
 
-    # state-path
-    p_state_path = subparsers.add_parser(
-        "state-path", help="Show resolved state directory path"
-    )
+
+@command("state-path", "Show resolved state directory path")
+def _add_state_path(p_state_path: argparse.ArgumentParser) -> None:
     p_state_path.add_argument("--task", help="Task ID to show state file path for")
     p_state_path.add_argument("--json", action="store_true", help="JSON output")
-    p_state_path.set_defaults(func=cmd_state_path)
+    p_state_path.set_defaults(func=_handler("init", "cmd_state_path"))
 
-    # agentmap
-    p_agentmap = subparsers.add_parser(
-        "agentmap", help="Generate or inspect an agentmap artifact"
-    )
+
+@command("agentmap", "Generate or inspect an agentmap artifact")
+def _add_agentmap(p_agentmap: argparse.ArgumentParser) -> None:
     p_agentmap.add_argument(
         "dir",
         nargs="?",
@@ -634,31 +719,113 @@ def main() -> None:
         help="Ignore pattern to exclude (repeatable)",
     )
     p_agentmap.add_argument("--json", action="store_true", help="JSON output")
-    p_agentmap.set_defaults(func=cmd_agentmap)
+    p_agentmap.set_defaults(func=_handler("init", "cmd_agentmap"))
+
+
+@command("index", "Validate or rebuild the persistent task/epic index")
+def _add_index(p_index: argparse.ArgumentParser) -> None:
+    p_index.add_argument(
+        "--rebuild", action="store_true", help="Discard the index and rebuild from scratch"
+    )
+    p_index.add_argument("--json", action="store_true", help="JSON output")
+    p_index.set_defaults(func=_handler("index", "cmd_index"))
+
+
+@command("watch", "Stream task/epic/phase changes as JSONL events")
+def _add_watch(p_watch: argparse.ArgumentParser) -> None:
+    from .watch import DEFAULT_INTERVAL
 
-    # migrate-state
-    p_migrate = subparsers.add_parser(
-        "migrate-state", help="Migrate runtime state from definition files to state-dir"
+    p_watch.add_argument("--epic", help="Only events for this epic (e.g., fn-1)")
+    p_watch.add_argument(
+        "--since", metavar="CURSOR", help="Resume: first replay changes made since this cursor"
+    )
+    p_watch.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"Seconds between rescans without inotify wakeups (default: {DEFAULT_INTERVAL})",
+    )
+    p_watch.add_argument("--poll", action="store_true", help="Poll only (do not use inotify)")
+    p_watch.add_argument(
+        "--once", action="store_true", help="Emit pending events (see --since) and exit"
     )
+    p_watch.add_argument("--count", type=int, default=0, help="Exit after N change events")
+    p_watch.add_argument("--timeout", type=float, default=0, help="Exit after this many seconds")
+    p_watch.set_defaults(func=_handler("watch", "cmd_watch"))
+
+
+@command("batch", "Run subcommands from JSONL (one {argv, stdin} per line) in one process")
+def _add_batch(p_batch: argparse.ArgumentParser) -> None:
+    p_batch.add_argument(
+        "--file", default="-", help="JSONL input file (default: stdin)"
+    )
+    p_batch.add_argument(
+        "--atomic",
+        action="store_true",
+        help="All or nothing: stop at the first failure and roll back .flux/ and runtime state",
+    )
+    p_batch.add_argument(
+        "--stop-on-error", action="store_true", help="Stop at the first failing command"
+    )
+    p_batch.set_defaults(func=_handler("batch", "cmd_batch"))
+
+
+@command("serve", "Run a per-repo server that answers read commands over a Unix socket")
+def _add_serve(p_serve: argparse.ArgumentParser) -> None:
+    from .server import DEFAULT_IDLE_TIMEOUT
+
+    p_serve.add_argument(
+        "--detach", action="store_true", help="Start in the background and return"
+    )
+    p_serve.add_argument("--status", action="store_true", help="Show server status")
+    p_serve.add_argument("--stop", action="store_true", help="Stop the running server")
+    p_serve.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help=f"Exit after this many idle seconds (default: {DEFAULT_IDLE_TIMEOUT}, 0 = never)",
+    )
+    p_serve.add_argument("--json", action="store_true", help="JSON output")
+    p_serve.set_defaults(func=_handler("server", "cmd_serve"))
+
+
+@command("migrate-state", "Migrate runtime state from definition files to state-dir")
+def _add_migrate_state(p_migrate: argparse.ArgumentParser) -> None:
     p_migrate.add_argument(
         "--clean",
         action="store_true",
-        help="Remove runtime fields from definition files after migration",
+        help="Remove runtime fields from definition files after migration "
+        "(with --to: remove records from the old backend)",
+    )
+    p_migrate.add_argument(
+        "--to",
+        choices=["file", "journal", "sqlite"],
+        help="Move runtime state to this backend and set state.backend in config",
     )
     p_migrate.add_argument("--json", action="store_true", help="JSON output")
-    p_migrate.set_defaults(func=cmd_migrate_state)
+    p_migrate.set_defaults(func=_handler("init", "cmd_migrate_state"))
 
-    # validate
-    p_validate = subparsers.add_parser("validate", help="Validate epic or all")
+
+@command("validate", "Validate epic or all")
+def _add_validate(p_validate: argparse.ArgumentParser) -> None:
     p_validate.add_argument("--epic", help="Epic ID (e.g., fn-1, fn-1-add-auth)")
     p_validate.add_argument(
         "--all", action="store_true", help="Validate all epics and tasks"
     )
+    p_validate.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="Validate only epics whose .flux/ files changed since a git ref (implies --all)",
+    )
+    p_validate.add_argument(
+        "--no-cache", action="store_true", help="Revalidate every epic (ignore the cache)"
+    )
     p_validate.add_argument("--json", action="store_true", help="JSON output")
-    p_validate.set_defaults(func=cmd_validate)
+    p_validate.set_defaults(func=_handler("epics", "cmd_validate"))
+
 
-    # checkpoint
-    p_checkpoint = subparsers.add_parser("checkpoint", help="Checkpoint commands")
+@command("checkpoint", "Checkpoint commands")
+def _add_checkpoint(p_checkpoint: argparse.ArgumentParser) -> None:
     checkpoint_sub = p_checkpoint.add_subparsers(dest="checkpoint_cmd", required=True)
 
     p_checkpoint_save = checkpoint_sub.add_parser(
@@ -666,26 +833,54 @@ def main() -> None:
     )
     p_checkpoint_save.add_argument("--epic", required=True, help="Epic ID (e.g., fn-1, fn-1-add-auth)")
     p_checkpoint_save.add_argument("--json", action="store_true", help="JSON output")
-    p_checkpoint_save.set_defaults(func=cmd_checkpoint_save)
+    p_checkpoint_save.set_defaults(func=_handler("epics", "cmd_checkpoint_save"))
 
     p_checkpoint_restore = checkpoint_sub.add_parser(
         "restore", help="Restore epic state from checkpoint"
     )
     p_checkpoint_restore.add_argument("--epic", required=True, help="Epic ID (e.g., fn-1, fn-1-add-auth)")
+    p_checkpoint_restore.add_argument(
+        "--id", default=None, help="Checkpoint ID from 'checkpoint list' (default: newest)"
+    )
     p_checkpoint_restore.add_argument("--json", action="store_true", help="JSON output")
-    p_checkpoint_restore.set_defaults(func=cmd_checkpoint_restore)
+    p_checkpoint_restore.set_defaults(func=_handler("epics", "cmd_checkpoint_restore"))
+
+    p_checkpoint_list = checkpoint_sub.add_parser(
+        "list", help="List checkpoints for epic"
+    )
+    p_checkpoint_list.add_argument("--epic", required=True, help="Epic ID (e.g., fn-1, fn-1-add-auth)")
+    p_checkpoint_list.add_argument("--json", action="store_true", help="JSON output")
+    p_checkpoint_list.set_defaults(func=_handler("epics", "cmd_checkpoint_list"))
+
+    p_checkpoint_diff = checkpoint_sub.add_parser(
+        "diff", help="Show files changed between checkpoints"
+    )
+    p_checkpoint_diff.add_argument("--epic", required=True, help="Epic ID (e.g., fn-1, fn-1-add-auth)")
+    p_checkpoint_diff.add_argument(
+        "--from", dest="from_id", default=None,
+        help="Older checkpoint ID (default: the one before --to, or newest with --to current)",
+    )
+    p_checkpoint_diff.add_argument(
+        "--to", default="latest", help="Newer checkpoint ID, or 'current' for the working state (default: newest)"
+    )
+    p_checkpoint_diff.add_argument("--patch", action="store_true", help="Include unified diffs")
+    p_checkpoint_diff.add_argument("--json", action="store_true", help="JSON output")
+    p_checkpoint_diff.set_defaults(func=_handler("epics", "cmd_checkpoint_diff"))
 
     p_checkpoint_delete = checkpoint_sub.add_parser(
-        "delete", help="Delete checkpoint for epic"
+        "delete", help="Delete checkpoints for epic"
     )
     p_checkpoint_delete.add_argument("--epic", required=True, help="Epic ID (e.g., fn-1, fn-1-add-auth)")
+    p_checkpoint_delete.add_argument(
+        "--id", default=None, help="Delete only this checkpoint (default: all)"
+    )
     p_checkpoint_delete.add_argument("--json", action="store_true", help="JSON output")
-    p_checkpoint_delete.set_defaults(func=cmd_checkpoint_delete)
+    p_checkpoint_delete.set_defaults(func=_handler("epics", "cmd_checkpoint_delete"))
 
-    # prep-chat (for rp-cli chat_send JSON escaping)
-    p_prep = subparsers.add_parser(
-        "prep-chat", help="Prepare JSON for rp-cli chat_send"
-    )
+
+# prep-chat (for rp-cli chat_send JSON escaping)
+@command("prep-chat", "Prepare JSON for rp-cli chat_send")
+def _add_prep_chat(p_prep: argparse.ArgumentParser) -> None:
     p_prep.add_argument(
         "id", nargs="?", help="(ignored) Epic/task ID for compatibility"
     )
@@ -701,53 +896,57 @@ def main() -> None:
         "--selected-paths", nargs="*", help="Files to include in context"
     )
     p_prep.add_argument("--output", "-o", help="Output file (default: stdout)")
-    p_prep.set_defaults(func=cmd_prep_chat)
+    p_prep.set_defaults(func=_handler("ralph", "cmd_prep_chat"))
+
 
-    # ralph (Ralph run control)
-    p_ralph = subparsers.add_parser("ralph", help="Ralph run control commands")
+# ralph (Ralph run control)
+@command("ralph", "Ralph run control commands")
+def _add_ralph(p_ralph: argparse.ArgumentParser) -> None:
     ralph_sub = p_ralph.add_subparsers(dest="ralph_cmd", required=True)
 
     p_ralph_pause = ralph_sub.add_parser("pause", help="Pause a Ralph run")
     p_ralph_pause.add_argument("--run", help="Run ID (auto-detect if single)")
     p_ralph_pause.add_argument("--json", action="store_true", help="JSON output")
-    p_ralph_pause.set_defaults(func=cmd_ralph_pause)
+    p_ralph_pause.set_defaults(func=_handler("ralph", "cmd_ralph_pause"))
 
     p_ralph_resume = ralph_sub.add_parser("resume", help="Resume a paused Ralph run")
     p_ralph_resume.add_argument("--run", help="Run ID (auto-detect if single)")
     p_ralph_resume.add_argument("--json", action="store_true", help="JSON output")
-    p_ralph_resume.set_defaults(func=cmd_ralph_resume)
+    p_ralph_resume.set_defaults(func=_handler("ralph", "cmd_ralph_resume"))
 
     p_ralph_stop = ralph_sub.add_parser("stop", help="Request a Ralph run to stop")
     p_ralph_stop.add_argument("--run", help="Run ID (auto-detect if single)")
     p_ralph_stop.add_argument("--json", action="store_true", help="JSON output")
-    p_ralph_stop.set_defaults(func=cmd_ralph_stop)
+    p_ralph_stop.set_defaults(func=_handler("ralph", "cmd_ralph_stop"))
 
     p_ralph_status = ralph_sub.add_parser("status", help="Show Ralph run status")
     p_ralph_status.add_argument("--run", help="Run ID (auto-detect if single)")
     p_ralph_status.add_argument("--json", action="store_true", help="JSON output")
-    p_ralph_status.set_defaults(func=cmd_ralph_status)
+    p_ralph_status.set_defaults(func=_handler("ralph", "cmd_ralph_status"))
 
-    # rp (RepoPrompt wrappers)
-    p_rp = subparsers.add_parser("rp", help="RepoPrompt helpers")
+
+# rp (RepoPrompt wrappers)
+@command("rp", "RepoPrompt helpers")
+def _add_rp(p_rp: argparse.ArgumentParser) -> None:
     rp_sub = p_rp.add_subparsers(dest="rp_cmd", required=True)
 
     p_rp_windows = rp_sub.add_parser(
         "windows", help="List RepoPrompt windows (raw JSON)"
     )
     p_rp_windows.add_argument("--json", action="store_true", help="JSON output (raw)")
-    p_rp_windows.set_defaults(func=cmd_rp_windows)
+    p_rp_windows.set_defaults(func=_handler("ralph", "cmd_rp_windows"))
 
     p_rp_pick = rp_sub.add_parser("pick-window", help="Pick window by repo root")
     p_rp_pick.add_argument("--repo-root", required=True, help="Repo root path")
     p_rp_pick.add_argument("--json", action="store_true", help="JSON output")
-    p_rp_pick.set_defaults(func=cmd_rp_pick_window)
+    p_rp_pick.set_defaults(func=_handler("ralph", "cmd_rp_pick_window"))
 
     p_rp_ws = rp_sub.add_parser(
         "ensure-workspace", help="Ensure workspace and switch window"
     )
     p_rp_ws.add_argument("--window", type=int, required=True, help="Window id")
     p_rp_ws.add_argument("--repo-root", required=True, help="Repo root path")
-    p_rp_ws.set_defaults(func=cmd_rp_ensure_workspace)
+    p_rp_ws.set_defaults(func=_handler("ralph", "cmd_rp_ensure_workspace"))
 
     p_rp_builder = rp_sub.add_parser("builder", help="Run builder and return tab")
     p_rp_builder.add_argument("--window", type=int, required=True, help="Window id")
@@ -759,29 +958,29 @@ def main() -> None:
         help="Builder response type (requires RP 1.6.0+)",
     )
     p_rp_builder.add_argument("--json", action="store_true", help="JSON output")
-    p_rp_builder.set_defaults(func=cmd_rp_builder)
+    p_rp_builder.set_defaults(func=_handler("ralph", "cmd_rp_builder"))
 
     p_rp_prompt_get = rp_sub.add_parser("prompt-get", help="Get current prompt")
     p_rp_prompt_get.add_argument("--window", type=int, required=True, help="Window id")
     p_rp_prompt_get.add_argument("--tab", required=True, help="Tab id or name")
-    p_rp_prompt_get.set_defaults(func=cmd_rp_prompt_get)
+    p_rp_prompt_get.set_defaults(func=_handler("ralph", "cmd_rp_prompt_get"))
 
     p_rp_prompt_set = rp_sub.add_parser("prompt-set", help="Set current prompt")
     p_rp_prompt_set.add_argument("--window", type=int, required=True, help="Window id")
     p_rp_prompt_set.add_argument("--tab", required=True, help="Tab id or name")
     p_rp_prompt_set.add_argument("--message-file", required=True, help="Message file")
-    p_rp_prompt_set.set_defaults(func=cmd_rp_prompt_set)
+    p_rp_prompt_set.set_defaults(func=_handler("ralph", "cmd_rp_prompt_set"))
 
     p_rp_select_get = rp_sub.add_parser("select-get", help="Get selection")
     p_rp_select_get.add_argument("--window", type=int, required=True, help="Window id")
     p_rp_select_get.add_argument("--tab", required=True, help="Tab id or name")
-    p_rp_select_get.set_defaults(func=cmd_rp_select_get)
+    p_rp_select_get.set_defaults(func=_handler("ralph", "cmd_rp_select_get"))
 
     p_rp_select_add = rp_sub.add_parser("select-add", help="Add files to selection")
     p_rp_select_add.add_argument("--window", type=int, required=True, help="Window id")
     p_rp_select_add.add_argument("--tab", required=True, help="Tab id or name")
     p_rp_select_add.add_argument("paths", nargs="+", help="Paths to add")
-    p_rp_select_add.set_defaults(func=cmd_rp_select_add)
+    p_rp_select_add.set_defaults(func=_handler("ralph", "cmd_rp_select_add"))
 
     p_rp_chat = rp_sub.add_parser("chat-send", help="Send chat via rp-cli")
     p_rp_chat.add_argument("--window", type=int, required=True, help="Window id")
@@ -806,13 +1005,13 @@ def main() -> None:
     p_rp_chat.add_argument(
         "--json", action="store_true", help="JSON output (no review text)"
     )
-    p_rp_chat.set_defaults(func=cmd_rp_chat_send)
+    p_rp_chat.set_defaults(func=_handler("ralph", "cmd_rp_chat_send"))
 
     p_rp_export = rp_sub.add_parser("prompt-export", help="Export prompt to file")
     p_rp_export.add_argument("--window", type=int, required=True, help="Window id")
     p_rp_export.add_argument("--tab", required=True, help="Tab id or name")
     p_rp_export.add_argument("--out", required=True, help="Output file")
-    p_rp_export.set_defaults(func=cmd_rp_prompt_export)
+    p_rp_export.set_defaults(func=_handler("ralph", "cmd_rp_prompt_export"))
 
     p_rp_setup = rp_sub.add_parser(
         "setup-review", help="Atomic: pick-window + workspace + builder"
@@ -831,15 +1030,17 @@ def main() -> None:
         help="Create new RP window if none matches (requires RP 1.5.68+)",
     )
     p_rp_setup.add_argument("--json", action="store_true", help="JSON output")
-    p_rp_setup.set_defaults(func=cmd_rp_setup_review)
+    p_rp_setup.set_defaults(func=_handler("ralph", "cmd_rp_setup_review"))
+
 
-    # codex (Codex CLI wrappers)
-    p_codex = subparsers.add_parser("codex", help="Codex CLI helpers")
+# codex (Codex CLI wrappers)
+@command("codex", "Codex CLI helpers")
+def _add_codex(p_codex: argparse.ArgumentParser) -> None:
     codex_sub = p_codex.add_subparsers(dest="codex_cmd", required=True)
 
     p_codex_check = codex_sub.add_parser("check", help="Check codex availability")
     p_codex_check.add_argument("--json", action="store_true", help="JSON output")
-    p_codex_check.set_defaults(func=cmd_codex_check)
+    p_codex_check.set_defaults(func=_handler("codex", "cmd_codex_check"))
 
     p_codex_impl = codex_sub.add_parser("impl-review", help="Implementation review")
     p_codex_impl.add_argument(
@@ -862,7 +1063,7 @@ def main() -> None:
         default="auto",
         help="Sandbox mode (auto: danger-full-access on Windows, read-only on Unix)",
     )
-    p_codex_impl.set_defaults(func=cmd_codex_impl_review)
+    p_codex_impl.set_defaults(func=_handler("review", "cmd_codex_impl_review"))
 
     p_codex_plan = codex_sub.add_parser("plan-review", help="Plan review")
     p_codex_plan.add_argument("epic", help="Epic ID (e.g., fn-1, fn-1-add-auth)")
@@ -882,7 +1083,7 @@ def main() -> None:
         default="auto",
         help="Sandbox mode (auto: danger-full-access on Windows, read-only on Unix)",
     )
-    p_codex_plan.set_defaults(func=cmd_codex_plan_review)
+    p_codex_plan.set_defaults(func=_handler("review", "cmd_codex_plan_review"))
 
     p_codex_completion = codex_sub.add_parser(
         "completion-review", help="Epic completion review"
@@ -901,11 +1102,152 @@ def main() -> None:
         default="auto",
         help="Sandbox mode (auto: danger-full-access on Windows, read-only on Unix)",
     )
-    p_codex_completion.set_defaults(func=cmd_codex_completion_review)
+    p_codex_completion.set_defaults(func=_handler("review", "cmd_codex_completion_review"))
 
-    args = parser.parse_args()
+def build_parser(commands: Optional[set[str]] = None) -> argparse.ArgumentParser:
+    """Build the CLI parser.
+
+    All commands are listed; only those in `commands` (all when None) get
+    their arguments, which is all argparse needs to dispatch one command.
+    """
+    parser = argparse.ArgumentParser(
+        description="fluxctl - CLI for .flux/ task tracking",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report per-phase timings, file I/O and subprocesses to stderr (FLUX_PROFILE=1)",
+    )
+    parser.add_argument(
+        "--profile-out", metavar="FILE", help="Write the profile report to FILE (FLUX_PROFILE_OUT)"
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=["json", "chrome"],
+        help="Profile report format; chrome is a trace-event file (FLUX_PROFILE_FORMAT)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (help_text, builder) in COMMANDS.items():
+        p = subparsers.add_parser(name, help=help_text)
+        if commands is None or name in commands:
+            builder(p)
+    return parser
+
+
+# Top-level options that take a separate value
+_VALUE_OPTIONS = {"--profile-out", "--profile-format"}
+
+
+def _command_name(argv: list[str]) -> Optional[str]:
+    """The subcommand in argv (first non-option token), if any."""
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in _VALUE_OPTIONS:
+            skip = True
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def _profile_requested(argv: list[str]) -> bool:
+    """FLUX_PROFILE/FLUX_PROFILE_OUT set, or a --profile* option before the command."""
+    if os.environ.get("FLUX_PROFILE", "") not in ("", "0") or os.environ.get("FLUX_PROFILE_OUT"):
+        return True
+    for arg in argv:
+        if not arg.startswith("-"):
+            return False  # Options after the command name belong to it
+        if arg == "--profile" or arg.startswith("--profile-"):
+            return True
+    return False
+
+
+_PARSER: Optional[argparse.ArgumentParser] = None
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Build the full argparse tree once per process (reused by the server)."""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = build_parser()
+    return _PARSER
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    if argv is None:
+        argv = sys.argv[1:]
+    if _profile_requested(argv):
+        _main_profiled(argv)
+        return
+    args = _parse(argv)
     args.func(args)
 
 
+def _parse(argv: list[str]) -> argparse.Namespace:
+    name = _command_name(argv)
+    parser = build_parser({name} if name else set())
+    args = parser.parse_args(argv)
+    if os.environ.get("FLUX_SUBPROCESS_STATS"):
+        atexit.register(report_subprocess_count, args.command)
+    return args
+
+
+def _main_profiled(argv: list[str]) -> None:
+    """main() under FLUX_PROFILE; the report is written even on error exits."""
+    from . import profiling
+
+    profiler = profiling.start(argv)
+    try:
+        with profiler.span("parse", "parse"):
+            args = _parse(argv)
+        profiling.configure(profiler, args.command, args.profile_out, args.profile_format)
+        with profiler.span(f"command {args.command}", "command"):
+            args.func(args)
+    finally:
+        profiling.finish(profiler)
+
+
+def run_captured(argv: list[str], stdin: Optional[str] = None) -> tuple[int, str, str]:
+    """Run one fluxctl command in-process, capturing its output.
+
+    Returns (exit_code, stdout, stderr). Used by `fluxctl serve` and
+    `fluxctl batch` to produce the same output a fresh process would. When
+    stdin is given, it is what the command sees on sys.stdin (for "-" args).
+    """
+    from .git import reset_git_backends
+
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    reset_subprocess_count()
+    reset_git_backends()  # Cached diffs/blobs must not outlive a command
+    saved_stdin = sys.stdin
+    if stdin is not None:
+        sys.stdin = io.StringIO(stdin)
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            args = get_parser().parse_args(argv)
+            try:
+                args.func(args)
+            finally:
+                if os.environ.get("FLUX_SUBPROCESS_STATS"):
+                    report_subprocess_count(args.command)
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdin = saved_stdin
+    return code, out.getvalue(), err.getvalue()
+
+
 if __name__ == "__main__":
     main()
@@ -108,10 +108,11 @@ def is_seeded_architecture(content: str) -> bool:
     return ARCHITECTURE_PLACEHOLDER_MARKER in content
 
 
-def get_architecture_state(use_json: bool = True) -> dict:
-    """Return the current architecture artifact state."""
+def get_architecture_state(use_json: bool = True, meta: Optional[dict] = None) -> dict:
+    """Return the current architecture artifact state (from an already loaded meta if given)."""
     path = architecture_doc_path()
-    meta = load_meta(use_json=use_json) if ensure_flux_exists() else {}
+    if meta is None:
+        meta = load_meta(use_json=use_json) if ensure_flux_exists() else {}
     state = normalize_architecture_state(meta.get("architecture"))
     exists = path.exists()
 
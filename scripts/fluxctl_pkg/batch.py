@@ -0,0 +1,200 @@
+"""
+fluxctl_pkg.batch - `fluxctl batch`: run many subcommands from a JSONL stream in one process.
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional
+
+from .state import StateStore, VersionConflict, WriteLog, get_state_store, retry_busy, set_write_log
+from .utils import (
+    ensure_flux_exists,
+    error_exit,
+    get_flux_dir,
+    get_state_dir,
+    read_file_or_stdin,
+    set_write_hook,
+)
+
+
+# Commands that cannot run inside a batch (recursion, long-running servers,
+# and watch, which would hold the batch and its --atomic undo log open)
+BATCH_EXCLUDED = {"batch", "serve", "watch"}
+
+
+def parse_batch(text: str, use_json: bool = True) -> list[dict]:
+    """Parse JSONL batch input: one {"argv": [...], "stdin": "..."} per line."""
+    entries = []
+    for lineno, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            error_exit(f"Batch line {lineno}: invalid JSON ({e})", use_json=use_json)
+        if isinstance(entry, list):
+            entry = {"argv": entry}  # Bare argv arrays are accepted too
+        argv = entry.get("argv") if isinstance(entry, dict) else None
+        if not isinstance(argv, list) or not argv or not all(isinstance(a, str) for a in argv):
+            error_exit(
+                f"Batch line {lineno}: expected {{\"argv\": [\"cmd\", ...]}}",
+                use_json=use_json,
+            )
+        stdin = entry.get("stdin")
+        if stdin is not None and not isinstance(stdin, str):
+            error_exit(f"Batch line {lineno}: stdin must be a string", use_json=use_json)
+        entries.append({"line": lineno, "argv": argv, "stdin": stdin})
+    return entries
+
+
+def _read_bytes(path: Path) -> Optional[bytes]:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+class BatchUndo:
+    """What a batch wrote, for --atomic rollback.
+
+    Other agents share .flux/ and the state dir while a batch runs, so the
+    rollback must not reset everything to a snapshot. Instead it records:
+
+    - files: the content of each .flux/ file before the batch first wrote it
+      (via the utils write hook) and its content after each command.
+    - runtime: each record before the batch first wrote it and the version
+      the batch's last write left (via the state WriteLog).
+
+    restore() puts back only those, and only where nobody changed them since
+    (file content still as the batch left it, compare-and-swap on runtime
+    versions). Anything changed concurrently is kept and reported as a
+    conflict.
+    """
+
+    def __init__(self, flux_dir: Path, state_dir: Path):
+        self.flux_dir = Path(os.path.abspath(flux_dir))
+        self.state_dir = Path(os.path.abspath(state_dir))
+        self.files_before: dict[Path, Optional[bytes]] = {}
+        self.files_after: dict[Path, Optional[bytes]] = {}
+        self.runtime = WriteLog()
+
+    def _note_file(self, path: Path) -> None:
+        path = Path(os.path.abspath(path))
+        if path in self.files_before or not path.is_relative_to(self.flux_dir):
+            return
+        if path.is_relative_to(self.state_dir):
+            return  # Runtime state under .flux/state (non-git repos) goes through the WriteLog
+        self.files_before[path] = _read_bytes(path)
+
+    def __enter__(self) -> "BatchUndo":
+        set_write_hook(self._note_file)
+        set_write_log(self.runtime)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        set_write_hook(None)
+        set_write_log(None)
+
+    def command_done(self) -> None:
+        """Remember what the batch left in each file it touched so far."""
+        for path in self.files_before:
+            self.files_after[path] = _read_bytes(path)
+
+    def restore(self, store: StateStore) -> list[dict]:
+        """Undo the batch's writes; returns conflicts (entries changed by someone else)."""
+        conflicts = []
+        for path, before in self.files_before.items():
+            if _read_bytes(path) != self.files_after.get(path):
+                conflicts.append({"path": str(path.relative_to(self.flux_dir))})
+                continue
+            if before is None:
+                path.unlink(missing_ok=True)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.restore")
+                tmp.write_bytes(before)
+                os.replace(tmp, path)
+        for task_id, version in self.runtime.versions.items():
+            before = self.runtime.before[task_id]
+            try:
+                if before is None:
+                    retry_busy(lambda: store.delete_runtime(task_id, expected_version=version))
+                else:
+                    retry_busy(lambda: store.save_runtime(task_id, before, expected_version=version))
+            except VersionConflict as e:
+                conflicts.append({"task": task_id, "expected_version": e.expected, "version": e.actual})
+        return conflicts
+
+
+def _emit(record: dict) -> None:
+    sys.stdout.write(json.dumps(record, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def _result_record(entry: dict, index: int, code: int, stdout: str, stderr: str) -> dict:
+    record = {"index": index, "line": entry["line"], "argv": entry["argv"], "code": code}
+    try:
+        record["result"] = json.loads(stdout) if stdout.strip() else None
+    except json.JSONDecodeError:
+        record["stdout"] = stdout
+    if stderr:
+        record["stderr"] = stderr
+    return record
+
+
+def cmd_batch(args: argparse.Namespace) -> None:
+    """Run subcommands from JSONL input in this process, emitting JSONL results."""
+    from .__main__ import run_captured
+
+    if args.atomic and not ensure_flux_exists():
+        error_exit(".flux/ does not exist. Run 'fluxctl init' first.")
+    text = read_file_or_stdin(args.file, "batch input")
+    entries = parse_batch(text)
+
+    undo: Optional[BatchUndo] = None
+    if args.atomic:
+        undo = BatchUndo(get_flux_dir(), get_state_dir())
+
+    stop_on_error = args.atomic or args.stop_on_error
+    succeeded = failed = 0
+    rolled_back = False
+    conflicts: list[dict] = []
+    with undo or nullcontext():
+        for index, entry in enumerate(entries):
+            argv = entry["argv"]
+            if argv[0] in BATCH_EXCLUDED:
+                code, stdout, stderr = 2, "", f"fluxctl {argv[0]} cannot run inside a batch\n"
+            else:
+                code, stdout, stderr = run_captured(argv, stdin=entry["stdin"])
+            if undo is not None:
+                undo.command_done()
+            _emit(_result_record(entry, index, code, stdout, stderr))
+            if code == 0:
+                succeeded += 1
+                continue
+            failed += 1
+            if stop_on_error:
+                break
+
+    if undo is not None and failed:
+        conflicts = undo.restore(get_state_store())
+        rolled_back = True
+
+    _emit(
+        {
+            "summary": True,
+            "total": len(entries),
+            "succeeded": succeeded,
+            "failed": failed,
+            "skipped": len(entries) - succeeded - failed,
+            "atomic": args.atomic,
+            "rolled_back": rolled_back,
+            **({"conflicts": conflicts} if conflicts else {}),
+        }
+    )
+    if failed:
+        sys.exit(1)
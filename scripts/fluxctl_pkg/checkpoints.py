@@ -0,0 +1,342 @@
+"""
+fluxctl_pkg.checkpoints - Content-addressed checkpoint store for epic state.
+
+A checkpoint maps names of the files it captured (epics/<id>.json,
+specs/<id>.md, tasks/<task>.json, tasks/<task>.md, runtime/<task>) to
+sha256 digests. The contents live once each under .flux/.checkpoints/objects/
+as zlib-compressed blobs, so consecutive checkpoints only add the files that
+changed. Each epic keeps its last checkpoint.keep manifests in
+.flux/.checkpoints/<epic>.json; blobs no manifest references are removed when
+history is trimmed or deleted.
+
+Pre-store checkpoints (.flux/.checkpoint-<epic>.json) are still read as the
+oldest history entry, with ID "legacy".
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from .utils import (
+    EPICS_DIR,
+    LOCK_EX,
+    LOCK_UN,
+    SPECS_DIR,
+    TASKS_DIR,
+    _flock,
+    atomic_write_json,
+    ensure_flux_gitignore,
+    is_task_id,
+    load_json,
+    note_write,
+    now_iso,
+)
+from .config import get_config_snapshot
+
+
+CHECKPOINTS_DIR = ".checkpoints"
+OBJECTS_DIR = "objects"
+LOCK_FILE = ".lock"
+HISTORY_VERSION = 3  # Legacy single-file checkpoints were schema_version 2
+DEFAULT_KEEP = 10
+LEGACY_ID = "legacy"
+RUNTIME_PREFIX = "runtime/"
+
+
+class CheckpointError(Exception):
+    """Missing or corrupt checkpoint data."""
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def dump_json(data) -> str:
+    """Canonical JSON text, as atomic_write_json() writes it."""
+    return json.dumps(data, indent=2, sort_keys=True) + "\n"
+
+
+def manifest_digest(files: dict[str, str]) -> str:
+    """Identity of a checkpoint's contents (ignores ID and timestamp)."""
+    return _digest(json.dumps(files, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+
+
+def content_refs(files: dict[str, str]) -> dict[str, str]:
+    """Blob digests for a name -> content mapping, without storing anything."""
+    return {name: _digest(content.encode("utf-8")) for name, content in files.items()}
+
+
+def legacy_path(flux_dir: Path, epic_id: str) -> Path:
+    return flux_dir / f".checkpoint-{epic_id}.json"
+
+
+def checkpoint_keep() -> int:
+    """History length per epic (config checkpoint.keep, at least 1)."""
+    return max(1, get_config_snapshot().get_int("checkpoint.keep", DEFAULT_KEEP))
+
+
+def snapshot_files(flux_dir: Path, epic_id: str, store) -> dict[str, str]:
+    """Current contents of everything a checkpoint of epic_id captures.
+
+    Runtime records are stored without their version: restores bump it anyway.
+    """
+    files: dict[str, str] = {}
+    epic_path = flux_dir / EPICS_DIR / f"{epic_id}.json"
+    files[f"{EPICS_DIR}/{epic_id}.json"] = dump_json(load_json(epic_path))
+    spec_path = flux_dir / SPECS_DIR / f"{epic_id}.md"
+    if spec_path.exists():
+        files[f"{SPECS_DIR}/{epic_id}.md"] = spec_path.read_text(encoding="utf-8")
+
+    tasks_dir = flux_dir / TASKS_DIR
+    if not tasks_dir.exists():
+        return files
+    task_ids = [
+        task_file.stem
+        for task_file in sorted(tasks_dir.glob(f"{epic_id}.*.json"))
+        if is_task_id(task_file.stem)  # Skip non-task files (e.g., fn-1.2-review.json)
+    ]
+    runtimes = store.load_many(task_ids)
+    for task_id in task_ids:
+        files[f"{TASKS_DIR}/{task_id}.json"] = dump_json(load_json(tasks_dir / f"{task_id}.json"))
+        task_spec_path = tasks_dir / f"{task_id}.md"
+        if task_spec_path.exists():
+            files[f"{TASKS_DIR}/{task_id}.md"] = task_spec_path.read_text(encoding="utf-8")
+        runtime = runtimes.get(task_id)
+        if runtime is not None:
+            runtime = {k: v for k, v in runtime.items() if k != "version"}
+            files[f"{RUNTIME_PREFIX}{task_id}"] = dump_json(runtime)
+    return files
+
+
+def checkpoint_task_ids(files: dict[str, str]) -> list[str]:
+    """Task IDs captured by a checkpoint, in file order."""
+    prefix = f"{TASKS_DIR}/"
+    return [
+        name[len(prefix):-len(".json")]
+        for name in sorted(files)
+        if name.startswith(prefix) and name.endswith(".json")
+    ]
+
+
+def _legacy_files(checkpoint: dict) -> dict[str, str]:
+    """Convert a schema_version 2 checkpoint into the name -> content layout."""
+    epic_id = checkpoint["epic_id"]
+    files = {f"{EPICS_DIR}/{epic_id}.json": dump_json(checkpoint["epic"]["data"])}
+    if checkpoint["epic"].get("spec"):
+        files[f"{SPECS_DIR}/{epic_id}.md"] = checkpoint["epic"]["spec"]
+    for task in checkpoint["tasks"]:
+        task_id = task["id"]
+        files[f"{TASKS_DIR}/{task_id}.json"] = dump_json(task["data"])
+        if task.get("spec"):
+            files[f"{TASKS_DIR}/{task_id}.md"] = task["spec"]
+        if task.get("runtime") is not None:
+            runtime = {k: v for k, v in task["runtime"].items() if k != "version"}
+            files[f"{RUNTIME_PREFIX}{task_id}"] = dump_json(runtime)
+    return files
+
+
+class CheckpointStore:
+    """Blob store plus per-epic manifest history under .flux/.checkpoints/."""
+
+    def __init__(self, flux_dir: Path):
+        self.flux_dir = flux_dir
+        self.root = flux_dir / CHECKPOINTS_DIR
+        self.objects_dir = self.root / OBJECTS_DIR
+        self.blobs_written = 0
+        self.bytes_written = 0
+        self._legacy: dict[str, dict[str, str]] = {}
+
+    @contextmanager
+    def lock(self, lock_type: int = LOCK_EX):
+        """Store-wide flock: writers exclude each other and readers from GC."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / LOCK_FILE, "a") as f:
+            try:
+                _flock(f, lock_type)
+                yield
+            finally:
+                _flock(f, LOCK_UN)
+
+    # --- Blobs ---
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def put_blob(self, content: str) -> str:
+        """Store content (if new) and return its digest."""
+        raw = content.encode("utf-8")
+        digest = _digest(raw)
+        path = self._blob_path(digest)
+        if path.exists():
+            return digest
+        data = zlib.compress(raw, 6)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            note_write(path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.blobs_written += 1
+        self.bytes_written += len(data)
+        return digest
+
+    def get_blob(self, digest: str) -> str:
+        """Read and verify a blob. Raises CheckpointError if missing or corrupt."""
+        try:
+            raw = zlib.decompress(self._blob_path(digest).read_bytes())
+        except (OSError, zlib.error) as e:
+            raise CheckpointError(f"Checkpoint blob {digest[:12]} unreadable: {e}") from e
+        if _digest(raw) != digest:
+            raise CheckpointError(f"Checkpoint blob {digest[:12]} is corrupt")
+        return raw.decode("utf-8")
+
+    # --- History ---
+
+    def history_path(self, epic_id: str) -> Path:
+        return self.root / f"{epic_id}.json"
+
+    def _load_history(self, epic_id: str) -> dict:
+        path = self.history_path(epic_id)
+        if not path.exists():
+            return {"schema_version": HISTORY_VERSION, "epic_id": epic_id, "next_id": 1, "checkpoints": []}
+        try:
+            history = load_json(path)
+        except (OSError, ValueError) as e:
+            raise CheckpointError(f"Checkpoint history unreadable: {path} ({e})") from e
+        if history.get("schema_version") != HISTORY_VERSION:
+            raise CheckpointError(f"Unsupported checkpoint history version in {path}")
+        return history
+
+    def _legacy_entry(self, epic_id: str) -> Optional[dict]:
+        path = legacy_path(self.flux_dir, epic_id)
+        if not path.exists():
+            return None
+        try:
+            checkpoint = load_json(path)
+            files = _legacy_files({"epic_id": epic_id, **checkpoint})
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            raise CheckpointError(f"Invalid checkpoint format: {path} ({e})") from e
+        self._legacy[epic_id] = files
+        refs = content_refs(files)
+        return {
+            "id": LEGACY_ID,
+            "created_at": checkpoint.get("created_at"),
+            "digest": manifest_digest(refs),
+            "files": refs,
+        }
+
+    def entries(self, epic_id: str) -> list[dict]:
+        """Checkpoints for an epic, oldest first (legacy checkpoint first)."""
+        legacy = self._legacy_entry(epic_id)
+        entries = self._load_history(epic_id)["checkpoints"]
+        return ([legacy] if legacy else []) + entries
+
+    def find(self, epic_id: str, checkpoint_id: Optional[str] = None) -> Optional[dict]:
+        """Checkpoint by ID ("latest" or None for the newest)."""
+        entries = self.entries(epic_id)
+        if not entries:
+            return None
+        if checkpoint_id in (None, "latest"):
+            return entries[-1]
+        for entry in entries:
+            if str(entry["id"]) == str(checkpoint_id):
+                return entry
+        return None
+
+    def read_files(self, epic_id: str, entry: dict) -> dict[str, str]:
+        """Load every file of a checkpoint (all blobs verified before returning)."""
+        if entry["id"] == LEGACY_ID:
+            return dict(self._legacy[epic_id])
+        return {name: self.get_blob(digest) for name, digest in entry["files"].items()}
+
+    def save(self, epic_id: str, files: dict[str, str], keep: int) -> tuple[dict, bool]:
+        """Record a checkpoint; returns (entry, created).
+
+        A checkpoint identical to the newest one is not recorded again.
+        """
+        with self.lock():
+            history = self._load_history(epic_id)
+            ensure_flux_gitignore(self.flux_dir, CHECKPOINTS_DIR)
+            refs = {name: self.put_blob(content) for name, content in files.items()}
+            digest = manifest_digest(refs)
+            checkpoints = history["checkpoints"]
+            if checkpoints and checkpoints[-1]["digest"] == digest:
+                return checkpoints[-1], False
+            entry = {
+                "id": history["next_id"],
+                "created_at": now_iso(),
+                "digest": digest,
+                "files": refs,
+            }
+            history["next_id"] += 1
+            checkpoints.append(entry)
+            trimmed = len(checkpoints) > keep
+            history["checkpoints"] = checkpoints[-keep:]
+            atomic_write_json(self.history_path(epic_id), history)
+            if trimmed:
+                self._gc()
+        return entry, True
+
+    def delete(self, epic_id: str, checkpoint_id: Optional[str] = None) -> list:
+        """Delete one checkpoint, or all of an epic's; returns deleted IDs."""
+        deleted: list = []
+        with self.lock():
+            legacy = legacy_path(self.flux_dir, epic_id)
+            if legacy.exists() and checkpoint_id in (None, LEGACY_ID):
+                note_write(legacy)
+                legacy.unlink()
+                deleted.append(LEGACY_ID)
+            path = self.history_path(epic_id)
+            if not path.exists():
+                return deleted
+            history = self._load_history(epic_id)
+            keep = [
+                entry
+                for entry in history["checkpoints"]
+                if checkpoint_id is not None and str(entry["id"]) != str(checkpoint_id)
+            ]
+            deleted += [entry["id"] for entry in history["checkpoints"] if entry not in keep]
+            if checkpoint_id is not None:
+                history["checkpoints"] = keep  # Keeps next_id: IDs are never reused
+                atomic_write_json(path, history)
+            else:
+                note_write(path)
+                path.unlink()
+            if any(checkpoint != LEGACY_ID for checkpoint in deleted):
+                self._gc()
+        return deleted
+
+    def _gc(self) -> None:
+        """Remove blobs no epic's history references (caller holds the lock)."""
+        live: set[str] = set()
+        for path in self.root.glob("*.json"):
+            try:
+                history = load_json(path)
+            except (OSError, ValueError):
+                return  # Unreadable history: keep everything rather than guess
+            for entry in history.get("checkpoints", []):
+                live.update(entry.get("files", {}).values())
+        if not self.objects_dir.exists():
+            return
+        for fanout in self.objects_dir.iterdir():
+            for blob in fanout.iterdir():
+                if fanout.name + blob.name not in live:
+                    try:
+                        note_write(blob)
+                        blob.unlink()
+                    except OSError:
+                        pass
+            try:
+                fanout.rmdir()  # Only succeeds once empty
+            except OSError:
+                pass
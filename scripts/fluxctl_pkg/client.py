@@ -0,0 +1,183 @@
+"""
+fluxctl_pkg.client - Thin client that forwards read commands to `fluxctl serve`.
+
+Imported by scripts/fluxctl.py before anything else in the package, so it must
+stay stdlib-only and cheap to import: no git calls, no .flux/ parsing, and
+socket/hashlib are imported only once a command is actually forwarded. When no
+server is listening for this repo (or the command is not a read command), the
+caller falls back to running the command in-process.
+"""
+
+import json
+import os
+import stat
+import sys
+from typing import Optional
+
+
+# Commands safe to answer from a long-lived process: they only read .flux/ and
+# runtime state. The only files they may write are derived caches in the state
+# dir, rebuilt from those inputs and safe to delete (the task index for
+# list/ready/next and friends, validate-cache.json for validate). Entries are
+# the command, or (command, subcommand).
+READ_COMMANDS = {
+    "cat",
+    "detect",
+    "epics",
+    "list",
+    "next",
+    "prime-status",
+    "query",
+    "ready",
+    "scope-status",
+    "session-state",
+    "show",
+    "state-path",
+    "status",
+    "tasks",
+    "validate",
+    ("architecture", "path"),
+    ("architecture", "status"),
+    ("config", "get"),
+    ("config", "list"),
+    ("objective", "current"),
+    ("session-phase", "get"),
+}
+
+# Flags that turn a read command into a write (never forwarded)
+WRITE_FLAGS = {"next": ("--claim",)}
+
+# Environment forwarded with each request; the server applies it for the
+# duration of the command so overrides behave as in a fresh process.
+FORWARDED_ENV_PREFIXES = ("FLUX_",)
+FORWARDED_ENV_KEYS = ("USER",)
+
+CONNECT_TIMEOUT = 0.5
+RESPONSE_TIMEOUT = 120.0
+
+
+def find_flux_dir(cwd: Optional[str] = None) -> Optional[str]:
+    """Nearest .flux/ directory at or above cwd, without calling git."""
+    path = os.path.abspath(cwd or os.getcwd())
+    while True:
+        candidate = os.path.join(path, ".flux")
+        if os.path.isdir(candidate):
+            return os.path.realpath(candidate)
+        if os.path.exists(os.path.join(path, ".git")):
+            return None  # Repo root without .flux/
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _uid() -> int:
+    return os.getuid() if hasattr(os, "getuid") else 0
+
+
+def socket_dir() -> str:
+    """Per-user directory holding the sockets ($XDG_RUNTIME_DIR or a 0700 temp subdir)."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    # $TMPDIR rather than tempfile.gettempdir(): importing tempfile costs more
+    # than the rest of the client, and gettempdir() probes the disk.
+    base = runtime_dir or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(base, f"fluxctl-{_uid()}")
+
+
+def socket_path(flux_dir: str) -> str:
+    """Per-user, per-repo socket path inside socket_dir()."""
+    import hashlib
+
+    digest = hashlib.sha1(os.path.realpath(flux_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(socket_dir(), f"{digest}.sock")
+
+
+def is_private_dir(path: str) -> bool:
+    """True if path is a real directory owned by this user with mode 0700 (no symlink)."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == _uid() and not st.st_mode & 0o077
+
+
+def is_trusted_socket(path: str) -> bool:
+    """True if path is a socket we own, in a private directory.
+
+    In a shared temp dir anyone can create a path first; the client must not
+    send env to (or trust output from) a socket another user planted.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != _uid():
+        return False
+    return is_private_dir(os.path.dirname(path))
+
+
+def is_read_command(argv: list[str]) -> bool:
+    if not argv:
+        return False
+    if any(flag in argv for flag in WRITE_FLAGS.get(argv[0], ())):
+        return False
+    if argv[0] in READ_COMMANDS:
+        return True
+    return len(argv) > 1 and (argv[0], argv[1]) in READ_COMMANDS
+
+
+def request(path: str, payload: dict, timeout: float = RESPONSE_TIMEOUT) -> Optional[dict]:
+    """Send one JSON request to the server at path. None if unreachable or untrusted."""
+    import socket
+
+    if not hasattr(socket, "AF_UNIX") or not is_trusted_socket(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(payload).encode("utf-8"))
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def forward(argv: list[str]) -> Optional[int]:
+    """Run argv on the repo's server. Returns the exit code, or None to run locally."""
+    if os.environ.get("FLUX_NO_SERVER") or not is_read_command(argv):
+        return None
+    if os.environ.get("FLUX_PROFILE", "") not in ("", "0") or os.environ.get("FLUX_PROFILE_OUT"):
+        return None  # Profile this process, not the server
+    if "-" in argv:
+        return None  # Reads from the client's stdin
+    flux_dir = find_flux_dir()
+    if flux_dir is None:
+        return None
+    path = socket_path(flux_dir)
+    if not is_trusted_socket(path):
+        return None
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key.startswith(FORWARDED_ENV_PREFIXES) or key in FORWARDED_ENV_KEYS
+    }
+    response = request(
+        path, {"op": "run", "argv": argv, "cwd": os.getcwd(), "env": env}
+    )
+    if not response or response.get("fallback") or "code" not in response:
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return int(response["code"])
@@ -9,7 +9,7 @@ import shutil
 import subprocess
 from typing import Optional
 
-from .utils import error_exit
+from .utils import error_exit, run_subprocess
 
 
 def require_codex() -> str:
@@ -26,7 +26,7 @@ def get_codex_version() -> Optional[str]:
     if not codex:
         return None
     try:
-        result = subprocess.run(
+        result = run_subprocess(
             [codex, "--version"],
             capture_output=True,
             text=True,
@@ -107,7 +107,7 @@ def run_codex_exec(
         # Try resume first - use stdin for prompt (model already set in original session)
         cmd = [codex, "exec", "resume", session_id, "-"]
         try:
-            result = subprocess.run(
+            result = run_subprocess(
                 cmd,
                 input=prompt,
                 capture_output=True,
@@ -142,7 +142,7 @@ def run_codex_exec(
         "-",
     ]
     try:
-        result = subprocess.run(
+        result = run_subprocess(
             cmd,
             input=prompt,
             capture_output=True,
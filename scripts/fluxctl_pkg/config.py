@@ -1,15 +1,21 @@
 """
 fluxctl_pkg.config - Config loading/saving, defaults, deep_merge.
+
+Lookups go through a process-wide ConfigSnapshot: config.json is read and
+merged over the defaults once, then every dotted key is served from a flat
+table. The snapshot is rebuilt when the file's stat fingerprint (mtime, size,
+inode) changes, so long-lived processes (`fluxctl serve`, `fluxctl batch`)
+see edits without re-reading the file per lookup.
 """
 
+import copy
 import json
 import os
 import shlex
 import shutil
-import subprocess
 import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from .utils import (
     CONFIG_FILE,
@@ -18,6 +24,7 @@ from .utils import (
     error_exit,
     get_flux_dir,
     json_output,
+    run_subprocess,
 )
 
 
@@ -34,6 +41,7 @@ def get_default_config() -> dict:
             "humanReview": False,
         },
         "scouts": {"github": False},
+        "state": {"backend": "file"},
         "tracker": {"provider": None, "teamId": None},
         "workflow": {
             "technicalLevel": "semi_technical",
@@ -54,7 +62,10 @@ def ensure_config_file() -> Path:
 
 def load_raw_config(strict: bool = False) -> dict:
     """Load config.json without merging defaults."""
-    config_path = get_flux_dir() / CONFIG_FILE
+    return _read_config(get_flux_dir() / CONFIG_FILE, strict)
+
+
+def _read_config(config_path: Path, strict: bool) -> dict:
     if not config_path.exists():
         return {}
 
@@ -88,23 +99,94 @@ def deep_merge(base: dict, override: dict) -> dict:
     return result
 
 
+# --- Config snapshot ---
+
+
+def _flatten(config: dict, prefix: str, out: dict) -> dict:
+    """Every dotted key path -> value (empty dicts count as unset)."""
+    for key, value in config.items():
+        if value == {}:
+            continue
+        path = f"{prefix}{key}"
+        out[path] = value
+        if isinstance(value, dict):
+            _flatten(value, f"{path}.", out)
+    return out
+
+
+class ConfigSnapshot:
+    """config.json merged over the defaults, with precomputed dotted-key lookups."""
+
+    def __init__(self, path: str, fingerprint: Optional[tuple], config: dict):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.config = config
+        self._values = _flatten(config, "", {})
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Nested value like 'review.backend' (a copy for dicts and lists)."""
+        value = self._values.get(key, default)
+        if isinstance(value, (dict, list)) and value is not default:
+            return copy.deepcopy(value)
+        return value
+
+    def get_str(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        value = self._values.get(key)
+        return value if isinstance(value, str) else default
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        value = self._values.get(key)
+        return value if isinstance(value, bool) else default
+
+    def get_int(self, key: str, default: int) -> int:
+        value = self._values.get(key, default)
+        if isinstance(value, bool):
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+
+# Keyed by working directory (like the repo context), so a lookup costs a
+# getcwd() and one stat of config.json
+_SNAPSHOTS: dict[str, ConfigSnapshot] = {}
+
+
+def _fingerprint(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def get_config_snapshot() -> ConfigSnapshot:
+    """The current config; re-read only when config.json changed on disk."""
+    cwd = os.getcwd()
+    snapshot = _SNAPSHOTS.get(cwd)
+    if snapshot is not None and snapshot.fingerprint == _fingerprint(snapshot.path):
+        return snapshot
+    config_path = get_flux_dir() / CONFIG_FILE
+    fingerprint = _fingerprint(str(config_path))
+    config = deep_merge(get_default_config(), _read_config(config_path, strict=False))
+    snapshot = _SNAPSHOTS[cwd] = ConfigSnapshot(str(config_path), fingerprint, config)
+    return snapshot
+
+
+def reset_config_snapshots() -> None:
+    """Drop cached snapshots (after writing config.json or a repo context reset)."""
+    _SNAPSHOTS.clear()
+
+
 def load_flux_config() -> dict:
     """Load .flux/config.json, merging with defaults for missing keys."""
-    defaults = get_default_config()
-    data = load_raw_config(strict=False)
-    return deep_merge(defaults, data)
+    return copy.deepcopy(get_config_snapshot().config)
 
 
 def get_config(key: str, default=None):
     """Get nested config value like 'review.backend'."""
-    config = load_flux_config()
-    for part in key.split("."):
-        if not isinstance(config, dict):
-            return default
-        config = config.get(part, {})
-        if config == {}:
-            return default
-    return config if config != {} else default
+    return get_config_snapshot().get(key, default)
 
 
 def set_config(key: str, value) -> dict:
@@ -131,6 +213,7 @@ def set_config(key: str, value) -> dict:
 
     current[parts[-1]] = value
     atomic_write_json(config_path, config)
+    reset_config_snapshots()
     return config
 
 
@@ -219,7 +302,7 @@ def cmd_config_edit(args) -> None:
         )
 
     try:
-        result = subprocess.run([*editor_cmd, str(config_path)], check=False)
+        result = run_subprocess([*editor_cmd, str(config_path)], check=False)
     except Exception as exc:
         error_exit(
             f"Failed to launch editor {' '.join(editor_cmd)}: {exc}",
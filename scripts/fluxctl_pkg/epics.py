@@ -3,18 +3,21 @@ fluxctl_pkg.epics - Epic normalization, CRUD, workflow progress, artifacts, obje
 """
 
 import argparse
+import difflib
 import json
 import os
 import re
 import sys
+import tempfile
 from pathlib import Path
-from typing import Any, Optional
+from typing import Optional
 
 from .utils import (
     ARTIFACTS_DIR,
     EPICS_DIR,
     FLUX_DIR,
     IMPLEMENTATION_TARGETS,
+    LOCK_SH,
     META_FILE,
     OBJECTIVE_KINDS,
     SCOPE_MODES,
@@ -38,246 +41,71 @@ from .utils import (
     json_output,
     load_json,
     load_json_or_exit,
+    note_write,
     now_iso,
     parse_id,
     read_file_or_stdin,
     read_text_or_exit,
     require_creation_approval,
-    scan_max_epic_id,
     slugify,
     workflow_phases_for_mode,
 )
 from .config import get_config, get_default_config, deep_merge
+from .ids import get_allocator
 from .architecture import get_architecture_state
 from . import tracker
 from .state import (
+    artifact_dir_for_epic,
+    artifact_path_for_phase,
+    choose_current_objective,
     default_prime_state,
     delete_task_runtime,
     get_active_objective,
     get_prime_state,
     get_session_phase,
     get_state_store,
+    load_all_epics,
     load_meta,
     load_task_with_state,
+    load_tasks_with_state_bulk,
+    normalize_epic,
     normalize_task,
+    ready_state_for_epic,
     save_meta,
     set_active_objective,
     set_prime_state,
     set_session_phase,
+    tasks_for_epic,
+    workflow_progress,
+)
+from .graph import DependencyGraph
+from .index import get_index
+from .listing import (
+    Page,
+    check_paging,
+    emit_records,
+    epic_summary,
+    output_format,
+    parse_fields,
+    print_next_cursor,
+    project,
+    task_summary,
+    write_jsonl,
+    write_next_cursor,
+)
+from .validation import ValidationCache, changed_epic_ids
+from .session import get_session_state
+from .checkpoints import (
+    RUNTIME_PREFIX,
+    CheckpointError,
+    CheckpointStore,
+    checkpoint_keep,
+    checkpoint_task_ids,
+    content_refs,
+    dump_json,
+    legacy_path,
+    snapshot_files,
 )
-
-
-def normalize_epic(epic_data: dict) -> dict:
-    """Apply defaults for optional epic fields."""
-    if "plan_review_status" not in epic_data:
-        epic_data["plan_review_status"] = "unknown"
-    if "plan_reviewed_at" not in epic_data:
-        epic_data["plan_reviewed_at"] = None
-    if "completion_review_status" not in epic_data:
-        epic_data["completion_review_status"] = "unknown"
-    if "completion_reviewed_at" not in epic_data:
-        epic_data["completion_reviewed_at"] = None
-    if "branch_name" not in epic_data:
-        epic_data["branch_name"] = None
-    if "depends_on_epics" not in epic_data:
-        epic_data["depends_on_epics"] = []
-    # Backend spec defaults (for orchestration products like flux-swarm)
-    if "default_impl" not in epic_data:
-        epic_data["default_impl"] = None
-    if "default_review" not in epic_data:
-        epic_data["default_review"] = None
-    if "default_sync" not in epic_data:
-        epic_data["default_sync"] = None
-    if "objective_kind" not in epic_data:
-        epic_data["objective_kind"] = "feature"
-    if epic_data["objective_kind"] not in OBJECTIVE_KINDS:
-        epic_data["objective_kind"] = "feature"
-    if "scope_mode" not in epic_data:
-        epic_data["scope_mode"] = "shallow"
-    if epic_data["scope_mode"] not in SCOPE_MODES:
-        epic_data["scope_mode"] = "shallow"
-    if "technical_level" not in epic_data:
-        epic_data["technical_level"] = None
-    if epic_data["technical_level"] not in TECHNICAL_LEVELS:
-        epic_data["technical_level"] = None
-    if "implementation_target" not in epic_data:
-        epic_data["implementation_target"] = "self_with_ai"
-    if epic_data["implementation_target"] not in IMPLEMENTATION_TARGETS:
-        epic_data["implementation_target"] = "self_with_ai"
-    allowed_phases = workflow_phases_for_mode(epic_data["scope_mode"])
-    if "workflow_phase" not in epic_data:
-        epic_data["workflow_phase"] = allowed_phases[0]
-    if epic_data["workflow_phase"] not in allowed_phases:
-        epic_data["workflow_phase"] = allowed_phases[0]
-    if "workflow_step" not in epic_data:
-        epic_data["workflow_step"] = "intake"
-    if "workflow_status" not in epic_data:
-        epic_data["workflow_status"] = "not_started"
-    if epic_data["workflow_status"] not in WORKFLOW_STATUSES:
-        epic_data["workflow_status"] = "not_started"
-    if "workflow_summary" not in epic_data:
-        epic_data["workflow_summary"] = ""
-    if "open_questions" not in epic_data or not isinstance(epic_data["open_questions"], list):
-        epic_data["open_questions"] = []
-    if "resolved_decisions" not in epic_data or not isinstance(epic_data["resolved_decisions"], list):
-        epic_data["resolved_decisions"] = []
-    if "next_action" not in epic_data:
-        epic_data["next_action"] = None
-    if "scope_artifacts" not in epic_data or not isinstance(epic_data["scope_artifacts"], dict):
-        epic_data["scope_artifacts"] = {}
-    return epic_data
-
-
-def workflow_progress(epic_data: dict) -> dict:
-    """Compute workflow progress metrics for an epic."""
-    phases = workflow_phases_for_mode(epic_data.get("scope_mode", "shallow"))
-    current_phase = epic_data.get("workflow_phase", phases[0])
-    try:
-        phase_index = phases.index(current_phase)
-    except ValueError:
-        phase_index = 0
-        current_phase = phases[0]
-    completed = phase_index
-    total = len(phases)
-    percent = int((completed / total) * 100) if total else 0
-    if epic_data.get("workflow_status") == "done":
-        completed = total
-        percent = 100
-    elif epic_data.get("workflow_status") in {"ready_for_work", "ready_for_handoff"}:
-        percent = int(((phase_index + 1) / total) * 100)
-    return {
-        "phases": phases,
-        "current_phase": current_phase,
-        "phase_index": phase_index,
-        "completed_phases": completed,
-        "total_phases": total,
-        "percent": percent,
-    }
-
-
-def artifact_dir_for_epic(epic_id: str) -> Path:
-    """Get artifact directory for an epic."""
-    return get_flux_dir() / ARTIFACTS_DIR / epic_id
-
-
-def artifact_path_for_phase(epic_id: str, phase: str) -> Path:
-    """Get artifact path for an epic phase."""
-    return artifact_dir_for_epic(epic_id) / f"{phase}.md"
-
-
-def load_all_epics(use_json: bool = True) -> list[dict]:
-    """Load all epics with defaults applied."""
-    flux_dir = get_flux_dir()
-    epics_dir = flux_dir / EPICS_DIR
-    if not epics_dir.exists():
-        return []
-    epics = []
-    for epic_file in sorted(epics_dir.glob("fn-*.json")):
-        try:
-            epics.append(
-                normalize_epic(
-                    load_json_or_exit(epic_file, f"Epic {epic_file.stem}", use_json=use_json)
-                )
-            )
-        except SystemExit:
-            raise
-        except Exception:
-            continue
-    epics.sort(key=lambda e: parse_id(e.get("id", ""))[0] or 0)
-    return epics
-
-
-def choose_current_objective(current_actor: str, use_json: bool = True) -> Optional[dict]:
-    """Choose the current objective based on active meta pointer and live state."""
-    open_epics = [e for e in load_all_epics(use_json=use_json) if e.get("status") != "done"]
-    if not open_epics:
-        return None
-
-    active_id = get_active_objective(use_json=use_json)
-    if active_id:
-        for epic in open_epics:
-            if epic.get("id") == active_id:
-                return epic
-
-    # Prefer epic with in-progress task assigned to current actor.
-    for epic in open_epics:
-        tasks_dir = get_flux_dir() / TASKS_DIR
-        if not tasks_dir.exists():
-            break
-        for task_file in sorted(tasks_dir.glob(f"{epic['id']}.*.json")):
-            task_id = task_file.stem
-            if not is_task_id(task_id):
-                continue
-            task_data = load_task_with_state(task_id, use_json=use_json)
-            if (
-                task_data.get("status") == "in_progress"
-                and task_data.get("assignee") == current_actor
-            ):
-                return epic
-
-    # Otherwise use most recently updated open epic.
-    return sorted(
-        open_epics,
-        key=lambda e: (e.get("updated_at") or e.get("created_at") or "", e.get("id", "")),
-        reverse=True,
-    )[0]
-
-
-def tasks_for_epic(epic_id: str, use_json: bool = True) -> list[dict]:
-    """Load all tasks for an epic."""
-    tasks_dir = get_flux_dir() / TASKS_DIR
-    if not tasks_dir.exists():
-        return []
-    tasks = []
-    for task_file in sorted(tasks_dir.glob(f"{epic_id}.*.json")):
-        task_id = task_file.stem
-        if not is_task_id(task_id):
-            continue
-        task = load_task_with_state(task_id, use_json=use_json)
-        if "id" in task:
-            tasks.append(task)
-    tasks.sort(key=lambda t: parse_id(t.get("id", ""))[1] or 0)
-    return tasks
-
-
-def ready_state_for_epic(epic_id: str, use_json: bool = True) -> dict:
-    """Compute ready/in-progress/blocked state for an epic."""
-    from .utils import task_priority
-    current_actor = get_actor()
-    tasks = {task["id"]: task for task in tasks_for_epic(epic_id, use_json=use_json)}
-    ready = []
-    in_progress = []
-    blocked = []
-    for task in tasks.values():
-        if task.get("status") == "in_progress":
-            in_progress.append(task)
-            continue
-        if task.get("status") == "done":
-            continue
-        if task.get("status") == "blocked":
-            blocked.append({"task": task, "blocked_by": ["status=blocked"]})
-            continue
-        deps_done = True
-        blocking_deps = []
-        for dep in task.get("depends_on", []):
-            dep_task = tasks.get(dep)
-            if not dep_task or dep_task.get("status") != "done":
-                deps_done = False
-                blocking_deps.append(dep)
-        if deps_done:
-            ready.append(task)
-        else:
-            blocked.append({"task": task, "blocked_by": blocking_deps})
-    ready.sort(key=lambda t: ((task_priority(t)), parse_id(t["id"])[1] or 0, t.get("title", "")))
-    in_progress.sort(
-        key=lambda t: (
-            0 if t.get("assignee") == current_actor else 1,
-            task_priority(t),
-            parse_id(t["id"])[1] or 0,
-        )
-    )
-    blocked.sort(key=lambda b: (task_priority(b["task"]), parse_id(b["task"]["id"])[1] or 0))
-    return {"ready": ready, "in_progress": in_progress, "blocked": blocked}
 
 
 def validate_flux_root(flux_dir: Path) -> list[str]:
@@ -312,9 +140,16 @@ def validate_flux_root(flux_dir: Path) -> list[str]:
 
 
 def validate_epic(
-    flux_dir: Path, epic_id: str, use_json: bool = True
+    flux_dir: Path,
+    epic_id: str,
+    use_json: bool = True,
+    epic_tasks: Optional[list[dict]] = None,
 ) -> tuple[list[str], list[str], int]:
-    """Validate a single epic. Returns (errors, warnings, task_count)."""
+    """Validate a single epic. Returns (errors, warnings, task_count).
+
+    epic_tasks lets callers validating many epics pass in tasks from one
+    load_tasks_with_state_bulk() call instead of loading them per epic.
+    """
     from .tasks import validate_task_spec_headings
 
     errors = []
@@ -354,18 +189,9 @@ def validate_epic(
                 errors.append(f"Epic {epic_id}: depends_on_epics missing epic {dep}")
 
     # Get all tasks (with merged runtime state for accurate status)
-    tasks_dir = flux_dir / TASKS_DIR
-    tasks = {}
-    if tasks_dir.exists():
-        for task_file in tasks_dir.glob(f"{epic_id}.*.json"):
-            task_id = task_file.stem
-            if not is_task_id(task_id):
-                continue  # Skip non-task files (e.g., fn-1.2-review.json)
-            # Use merged state to get accurate status
-            task_data = load_task_with_state(task_id, use_json=use_json)
-            if "id" not in task_data:
-                continue  # Skip artifact files (GH-21)
-            tasks[task_data["id"]] = task_data
+    if epic_tasks is None:
+        epic_tasks = load_tasks_with_state_bulk(epic_id, use_json=use_json)
+    tasks = {task_data["id"]: task_data for task_data in epic_tasks}
 
     # Validate each task
     for task_id, task in tasks.items():
@@ -398,29 +224,10 @@ def validate_epic(
                     f"Task {task_id}: dependency {dep} is outside epic {epic_id}"
                 )
 
-    # Cycle detection using DFS
-    def has_cycle(task_id: str, visited: set, rec_stack: set) -> list[str]:
-        visited.add(task_id)
-        rec_stack.add(task_id)
-
-        for dep in tasks.get(task_id, {}).get("depends_on", []):
-            if dep not in visited:
-                cycle = has_cycle(dep, visited, rec_stack)
-                if cycle:
-                    return [task_id] + cycle
-            elif dep in rec_stack:
-                return [task_id, dep]
-
-        rec_stack.remove(task_id)
-        return []
-
-    visited = set()
-    for task_id in tasks:
-        if task_id not in visited:
-            cycle = has_cycle(task_id, visited, set())
-            if cycle:
-                errors.append(f"Dependency cycle detected: {' -> '.join(cycle)}")
-                break
+    # Cycle detection
+    cycle = DependencyGraph(tasks.values()).find_cycle()
+    if cycle:
+        errors.append(f"Dependency cycle detected: {' -> '.join(cycle)}")
 
     # Check epic done status consistency
     if epic_data["status"] == "done":
@@ -479,16 +286,16 @@ def cmd_epic_create(args: argparse.Namespace) -> None:
     meta_path = flux_dir / META_FILE
     load_json_or_exit(meta_path, "meta.json", use_json=args.json)
 
-    # MU-1: Scan-based allocation for merge safety
-    # Scan existing epics to determine next ID (don't rely on counter)
-    max_epic = scan_max_epic_id(flux_dir)
-    epic_num = max_epic + 1
+    # MU-1: Allocate from the shared, lock-protected counter (see ids.py);
+    # it rescans the tree only when the counter is missing or the next ID is taken
+    allocator = get_allocator()
+    epic_num = allocator.allocate_epics()[0]
     # Use slugified title as suffix, fallback to random if empty/invalid
     slug = slugify(args.title)
     suffix = slug if slug else generate_epic_suffix()
     epic_id = f"fn-{epic_num}-{suffix}"
 
-    # Double-check no collision (shouldn't happen with scan-based allocation)
+    # Double-check no collision (shouldn't happen with allocator-based IDs)
     epic_json_path = flux_dir / EPICS_DIR / f"{epic_id}.json"
     epic_spec_path = flux_dir / SPECS_DIR / f"{epic_id}.md"
     if epic_json_path.exists() or epic_spec_path.exists():
@@ -538,14 +345,15 @@ def cmd_epic_create(args: argparse.Namespace) -> None:
     spec_content = create_epic_spec(epic_id, args.title)
     atomic_write(flux_dir / SPECS_DIR / f"{epic_id}.md", spec_content)
 
-    # NOTE: We no longer update meta["next_epic"] since scan-based allocation
-    # is the source of truth. This reduces merge conflicts.
+    # NOTE: We no longer update meta["next_epic"]: the allocator in the state
+    # dir is the source of truth. This reduces merge conflicts.
 
     # Tracker hook: create Linear project if configured
     linear_project_id = tracker.on_epic_created(epic_data)
     if linear_project_id:
         epic_data["linear_project_id"] = linear_project_id
         atomic_write_json(flux_dir / EPICS_DIR / f"{epic_id}.json", epic_data)
+    allocator.register_epic(epic_id)
 
     if args.json:
         json_output(
@@ -578,25 +386,16 @@ def cmd_show(args: argparse.Namespace) -> None:
         )
 
         # Get tasks for this epic (with merged runtime state)
-        tasks = []
-        tasks_dir = flux_dir / TASKS_DIR
-        if tasks_dir.exists():
-            for task_file in sorted(tasks_dir.glob(f"{args.id}.*.json")):
-                task_id = task_file.stem
-                if not is_task_id(task_id):
-                    continue  # Skip non-task files (e.g., fn-1.2-review.json)
-                task_data = load_task_with_state(task_id, use_json=args.json)
-                if "id" not in task_data:
-                    continue  # Skip artifact files (GH-21)
-                tasks.append(
-                    {
-                        "id": task_data["id"],
-                        "title": task_data["title"],
-                        "status": task_data["status"],
-                        "priority": task_data.get("priority"),
-                        "depends_on": task_data.get("depends_on", task_data.get("deps", [])),
-                    }
-                )
+        tasks = [
+            {
+                "id": task_data["id"],
+                "title": task_data["title"],
+                "status": task_data["status"],
+                "priority": task_data.get("priority"),
+                "depends_on": task_data.get("depends_on", task_data.get("deps", [])),
+            }
+            for task_data in load_tasks_with_state_bulk(args.id, use_json=args.json)
+        ]
 
         # Sort tasks by numeric suffix (safe via parse_id)
         def task_sort_key(t):
@@ -647,174 +446,155 @@ def cmd_show(args: argparse.Namespace) -> None:
         )
 
 
+def _list_epic_key(epic_id: str) -> tuple:
+    return (0, parse_id(epic_id)[0] or 0, epic_id)
+
+
+def _list_task_key(task_id: str) -> tuple:
+    return (1, 0, task_id)
+
+
 def cmd_epics(args: argparse.Namespace) -> None:
     """List all epics."""
+    fmt = output_format(args)
     if not ensure_flux_exists():
         error_exit(
             ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
         )
+    check_paging(args, is_epic_id)
 
-    flux_dir = get_flux_dir()
-    epics_dir = flux_dir / EPICS_DIR
-
-    epics = []
-    if epics_dir.exists():
-        for epic_file in sorted(epics_dir.glob("fn-*.json")):
-            epic_data = normalize_epic(
-                load_json_or_exit(
-                    epic_file, f"Epic {epic_file.stem}", use_json=args.json
-                )
-            )
-            # Count tasks (with merged runtime state)
-            tasks_dir = flux_dir / TASKS_DIR
-            task_count = 0
-            done_count = 0
-            if tasks_dir.exists():
-                for task_file in tasks_dir.glob(f"{epic_data['id']}.*.json"):
-                    task_id = task_file.stem
-                    if not is_task_id(task_id):
-                        continue  # Skip non-task files (e.g., fn-1.2-review.json)
-                    task_data = load_task_with_state(task_id, use_json=args.json)
-                    task_count += 1
-                    if task_data.get("status") == "done":
-                        done_count += 1
-
-            epics.append(
-                {
-                    "id": epic_data["id"],
-                    "title": epic_data["title"],
-                    "status": epic_data["status"],
-                    "tasks": task_count,
-                    "done": done_count,
-                }
-            )
-
-    # Sort by epic number
-    def epic_sort_key(e):
-        epic_num, _ = parse_id(e["id"])
-        return epic_num if epic_num is not None else 0
-
-    epics.sort(key=epic_sort_key)
+    # Epics and task counts (with merged runtime state) from the index
+    index = get_index(use_json=args.json)
+    counts = index.task_counts(use_json=args.json)
+    epics = index.iter_epics(
+        status=args.status,
+        after=_list_epic_key(args.cursor)[1:] if args.cursor else None,
+        use_json=args.json,
+    )
+    page = Page(epics, args.limit)
+    epics = emit_records(
+        args, fmt, page, lambda epic_data: epic_summary(epic_data, counts), "epics"
+    )
+    if epics is None:
+        return
 
-    if args.json:
-        json_output({"success": True, "epics": epics, "count": len(epics)})
+    if not epics:
+        print("No epics found.")
     else:
-        if not epics:
-            print("No epics found.")
-        else:
-            print(f"Epics ({len(epics)}):\n")
-            for e in epics:
-                progress = f"{e['done']}/{e['tasks']}" if e["tasks"] > 0 else "0/0"
-                print(
-                    f"  [{e['status']}] {e['id']}: {e['title']} ({progress} tasks done)"
-                )
+        print(f"Epics ({len(epics)}):\n")
+        for e in epics:
+            progress = f"{e['done']}/{e['tasks']}" if e["tasks"] > 0 else "0/0"
+            print(
+                f"  [{e['status']}] {e['id']}: {e['title']} ({progress} tasks done)"
+            )
+        print_next_cursor(page)
 
 
 def cmd_list(args: argparse.Namespace) -> None:
     """List all epics and their tasks."""
+    fmt = output_format(args)
     if not ensure_flux_exists():
         error_exit(
             ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
         )
+    if fmt == "text" and (args.limit is not None or args.cursor is not None):
+        error_exit("--limit/--cursor require --json or --format jsonl", use_json=False)
+    check_paging(args, lambda cursor: is_epic_id(cursor) or is_task_id(cursor))
+    if args.epic and not is_epic_id(args.epic):
+        error_exit(
+            f"Invalid epic ID: {args.epic}. Expected format: fn-N or fn-N-slug (e.g., fn-1, fn-1-add-auth)",
+            use_json=args.json,
+        )
 
-    flux_dir = get_flux_dir()
-    epics_dir = flux_dir / EPICS_DIR
-    tasks_dir = flux_dir / TASKS_DIR
-
-    # Load all epics
-    epics = []
-    if epics_dir.exists():
-        for epic_file in sorted(epics_dir.glob("fn-*.json")):
-            epic_data = normalize_epic(
-                load_json_or_exit(
-                    epic_file, f"Epic {epic_file.stem}", use_json=args.json
-                )
-            )
-            epics.append(epic_data)
-
-    # Sort epics by number
-    def epic_sort_key(e):
-        epic_num, _ = parse_id(e["id"])
-        return epic_num if epic_num is not None else 0
-
-    epics.sort(key=epic_sort_key)
-
-    # Load all tasks grouped by epic (with merged runtime state)
-    tasks_by_epic = {}
-    all_tasks = []
-    if tasks_dir.exists():
-        for task_file in sorted(tasks_dir.glob("fn-*.json")):
-            task_id = task_file.stem
-            if not is_task_id(task_id):
-                continue  # Skip non-task files (e.g., fn-1.2-review.json)
-            task_data = load_task_with_state(task_id, use_json=args.json)
-            if "id" not in task_data or "epic" not in task_data:
-                continue  # Skip artifact files (GH-21)
-            epic_id = task_data["epic"]
-            if epic_id not in tasks_by_epic:
-                tasks_by_epic[epic_id] = []
-            tasks_by_epic[epic_id].append(task_data)
-            all_tasks.append(
-                {
-                    "id": task_data["id"],
-                    "epic": task_data["epic"],
-                    "title": task_data["title"],
-                    "status": task_data["status"],
-                    "priority": task_data.get("priority"),
-                    "depends_on": task_data.get("depends_on", task_data.get("deps", [])),
-                }
-            )
-
-    # Sort tasks within each epic
-    for epic_id in tasks_by_epic:
-        tasks_by_epic[epic_id].sort(key=lambda t: parse_id(t["id"])[1] or 0)
+    # Epics and tasks (with merged runtime state) come from the persistent index
+    index = get_index(use_json=args.json)
+    counts = index.task_counts(use_json=args.json)
+    task_filters = {"epic_id": args.epic or None, "status": args.status, "assignee": args.assignee}
 
-    if args.json:
-        epics_out = []
-        for e in epics:
-            task_list = tasks_by_epic.get(e["id"], [])
-            done_count = sum(1 for t in task_list if t["status"] == "done")
-            epics_out.append(
-                {
-                    "id": e["id"],
-                    "title": e["title"],
-                    "status": e["status"],
-                    "tasks": len(task_list),
-                    "done": done_count,
-                }
-            )
-        json_output(
-            {
-                "success": True,
-                "epics": epics_out,
-                "tasks": all_tasks,
-                "epic_count": len(epics),
-                "task_count": len(all_tasks),
-            }
-        )
-    else:
+    if fmt == "text":
+        epics = [
+            e for e in index.iter_epics(use_json=False) if not args.epic or e["id"] == args.epic
+        ]
         if not epics:
             print("No epics or tasks found.")
             return
 
-        total_tasks = len(all_tasks)
+        tasks_by_epic = {}
+        for e in epics:
+            tasks_by_epic[e["id"]] = list(
+                index.iter_tasks(
+                    **{**task_filters, "epic_id": e["id"]},
+                    key=lambda t: parse_id(t)[1] or 0,
+                    use_json=False,
+                )
+            )
+        all_tasks = [t for task_list in tasks_by_epic.values() for t in task_list]
         total_done = sum(1 for t in all_tasks if t["status"] == "done")
         print(
-            f"Flow Status: {len(epics)} epics, {total_tasks} tasks ({total_done} done)\n"
+            f"Flow Status: {len(epics)} epics, {len(all_tasks)} tasks ({total_done} done)\n"
         )
 
         for e in epics:
-            task_list = tasks_by_epic.get(e["id"], [])
-            done_count = sum(1 for t in task_list if t["status"] == "done")
-            progress = f"{done_count}/{len(task_list)}" if task_list else "0/0"
+            task_count, done_count = counts.get(e["id"], [0, 0])
+            progress = f"{done_count}/{task_count}" if task_count else "0/0"
             print(f"[{e['status']}] {e['id']}: {e['title']} ({progress} done)")
 
-            for t in task_list:
-                deps = (
-                    f" (deps: {', '.join(t['depends_on'])})" if t["depends_on"] else ""
-                )
+            for t in tasks_by_epic[e["id"]]:
+                depends_on = t.get("depends_on", t.get("deps", []))
+                deps = f" (deps: {', '.join(depends_on)})" if depends_on else ""
                 print(f"    [{t['status']}] {t['id']}: {t['title']}{deps}")
             print()
+        return
+
+    # One stream: epics by number, then tasks by ID; a cursor resumes after
+    # the last record of either kind
+    after = None
+    if args.cursor:
+        after = (_list_epic_key if is_epic_id(args.cursor) else _list_task_key)(args.cursor)
+
+    def records():
+        if after is None or after[0] == 0:
+            for epic_data in index.iter_epics(
+                after=after[1:] if after else None, use_json=args.json
+            ):
+                if not args.epic or epic_data["id"] == args.epic:
+                    yield epic_data
+        for task_data in index.iter_tasks(
+            **task_filters,
+            after=after[2] if after and after[0] == 1 else None,
+            use_json=args.json,
+        ):
+            if "epic" in task_data:  # Skip artifact files (GH-21)
+                yield task_data
+
+    def summarize(data: dict) -> tuple[str, dict]:
+        if is_task_id(data["id"]):
+            return "task", task_summary(data)
+        return "epic", epic_summary(data, counts)
+
+    fields = parse_fields(args, fmt)
+    page = Page(records(), args.limit)
+    if fmt == "jsonl":
+        for data in page:
+            kind, record = summarize(data)
+            write_jsonl({"type": kind, **project(record, data, fields)})
+        write_next_cursor(page)
+        return
+
+    epics_out, tasks_out = [], []
+    for data in page:
+        kind, record = summarize(data)
+        (tasks_out if kind == "task" else epics_out).append(project(record, data, fields))
+    result = {
+        "success": True,
+        "epics": epics_out,
+        "tasks": tasks_out,
+        "epic_count": len(epics_out),
+        "task_count": len(tasks_out),
+    }
+    if args.limit is not None or args.cursor is not None:
+        result["next_cursor"] = page.next_cursor
+    json_output(result)
 
 
 def cmd_cat(args: argparse.Namespace) -> None:
@@ -1073,15 +853,20 @@ def cmd_epic_set_title(args: argparse.Namespace) -> None:
                 if old_task_md.exists():
                     renames.append((old_task_md, tasks_dir / f"{new_task_id}.md"))
 
-    # Checkpoint file
-    old_checkpoint = flux_dir / f".checkpoint-{old_id}.json"
+    # Checkpoint history (and pre-store checkpoint file)
+    checkpoints = CheckpointStore(flux_dir)
+    if checkpoints.history_path(old_id).exists():
+        renames.append((checkpoints.history_path(old_id), checkpoints.history_path(new_id)))
+    old_checkpoint = legacy_path(flux_dir, old_id)
     if old_checkpoint.exists():
-        renames.append((old_checkpoint, flux_dir / f".checkpoint-{new_id}.json"))
+        renames.append((old_checkpoint, legacy_path(flux_dir, new_id)))
 
     # Perform renames (collect errors but continue)
     rename_errors: list[str] = []
     for old_path, new_path in renames:
         try:
+            note_write(old_path)
+            note_write(new_path)
             old_path.rename(new_path)
         except OSError as e:
             rename_errors.append(f"{old_path.name} -> {new_path.name}: {e}")
@@ -1159,16 +944,11 @@ def cmd_epic_set_title(args: argparse.Namespace) -> None:
 
     # Update state files if they exist
     state_store = get_state_store()
-    state_tasks_dir = state_store.tasks_dir
-    if state_tasks_dir.exists():
-        for old_task_id, new_task_id in task_files:
-            old_state = state_tasks_dir / f"{old_task_id}.state.json"
-            new_state = state_tasks_dir / f"{new_task_id}.state.json"
-            if old_state.exists():
-                try:
-                    old_state.rename(new_state)
-                except OSError:
-                    pass  # Non-critical
+    for old_task_id, new_task_id in task_files:
+        try:
+            state_store.rename_runtime(old_task_id, new_task_id)
+        except OSError:
+            pass  # Non-critical
 
     result = {
         "old_id": old_id,
@@ -1242,6 +1022,14 @@ def cmd_epic_add_dep(args: argparse.Namespace) -> None:
             print(f"{dep_id} already in {epic_id} dependencies")
         return
 
+    graph = DependencyGraph(epics=load_all_epics(use_json=args.json))
+    cycle = graph.cycle_if_added(epic_id, dep_id)
+    if cycle:
+        error_exit(
+            f"Epic dependency cycle: {' -> '.join(cycle)}. Not adding {dep_id} to {epic_id}",
+            use_json=args.json,
+        )
+
     deps.append(dep_id)
     epic_data["depends_on_epics"] = deps
     epic_data["updated_at"] = now_iso()
@@ -1679,229 +1467,18 @@ def cmd_scope_status(args: argparse.Namespace) -> None:
 
 def cmd_session_state(args: argparse.Namespace) -> None:
     """Summarize the current workflow routing state."""
-    router_registry = {
-        "/flux:setup": {"skill": "flux-setup", "node": "Setup"},
-        "/flux:prime": {"skill": "flux-prime", "node": "Prime"},
-        "/flux:scope": {"skill": "flux-scope", "node": "Scope"},
-        "/flux:plan": {"skill": "flux-plan", "node": "Scope"},
-        "/flux:plan-review": {"skill": "flux-plan-review", "node": "Plan Review"},
-        "/flux:work": {"skill": "flux-work", "node": "Work"},
-        "/flux:impl-review": {"skill": "flux-impl-review", "node": "Impl Review"},
-        "/flux:epic-review": {"skill": "flux-epic-review", "node": "Epic Review"},
-        "/flux:grill": {"skill": "flux-grill", "node": "Grill"},
-        "/flux:tdd": {"skill": "flux-tdd", "node": "TDD"},
-        "/flux:design-interface": {
-            "skill": "flux-design-interface",
-            "node": "Design Interface",
-        },
-        "/flux:ubiquitous-language": {
-            "skill": "flux-ubiquitous-language",
-            "node": "Ubiquitous Language",
-        },
-        "/flux:propose": {"skill": "flux-propose", "node": "Propose"},
-        "/flux:rca": {"skill": "flux-rca", "node": "RCA"},
-        "/flux:dejank": {"skill": "dejank", "node": "Dejank"},
-        "/flux:reflect": {"skill": "flux-reflect", "node": "Reflect"},
-        "/flux:ruminate": {"skill": "flux-ruminate", "node": "Ruminate"},
-        "/flux:meditate": {"skill": "flux-meditate", "node": "Meditate"},
-        "/flux:remember": {"skill": "flux-remember", "node": "Remember"},
-        "/flux:improve": {"skill": "flux-improve", "node": "Improve"},
-        "/flux:autofix": {"skill": "flux-autofix", "node": "Autofix"},
-        "/flux:export-context": {
-            "skill": "flux-export-context",
-            "node": "Export Context",
-        },
-        "/flux:gate": {"skill": "flux-gate", "node": "Gate"},
-        "/flux:security-scan": {
-            "skill": "flux-security-scan",
-            "node": "Security Scan",
-        },
-        "/flux:security-review": {
-            "skill": "flux-security-review",
-            "node": "Security Review",
-        },
-        "/flux:threat-model": {
-            "skill": "flux-threat-model",
-            "node": "Threat Model",
-        },
-        "/flux:vuln-validate": {
-            "skill": "flux-vuln-validate",
-            "node": "Vuln Validate",
-        },
-        "/flux:sync": {"skill": "flux-sync", "node": "Sync"},
-        "/flux:desloppify": {"skill": "flux-desloppify", "node": "Desloppify"},
-        "/flux:skill-builder": {
-            "skill": "flux-skill-builder",
-            "node": "Skill Builder",
-        },
-        "/flux:profile": {"skill": "flux-profile", "node": "Profile"},
-        "/flux:ralph-init": {"skill": "flux-ralph-init", "node": "Ralph"},
-        "/flux:contribute": {"skill": "flux-contribute", "node": "Contribute"},
-        "/flux:upgrade": {"skill": "flux-upgrade", "node": "Upgrade"},
-        "/flux:release": {"skill": "flux-release", "node": "Release"},
-        "/flux:improve-claude-md": {
-            "skill": "flux-improve-claude-md",
-            "node": "Improve CLAUDE.md",
-        },
-    }
-
-    def router_for(next_action: str | None, state_name: str) -> dict[str, Any]:
-        if not next_action:
-            return {
-                "command": None,
-                "skill": None,
-                "node": None,
-                "reason": state_name,
-            }
-
-        command = next_action.split()[0]
-        route = router_registry.get(command, {})
-        return {
-            "command": command,
-            "skill": route.get("skill"),
-            "node": route.get("node"),
-            "reason": state_name,
-        }
-
-    if not ensure_flux_exists():
-        next_action = "/flux:setup"
-        result = {
-            "state": "fresh_session_no_objective",
-            "session_phase": {"phase": "idle", "detail": None, "epic_id": None, "task_id": None, "updated_at": None},
-            "flux_exists": False,
-            "objective": None,
-            "task": None,
-            "prime": default_prime_state(),
-            "architecture": get_architecture_state(use_json=args.json),
-            "message": "Flux is not initialized yet.",
-            "next_action": next_action,
-            "router": router_for(next_action, "fresh_session_no_objective"),
-        }
-        if args.json:
-            json_output(result)
-        else:
-            print(result["message"])
-        return
-
-    prime_state = get_prime_state(use_json=args.json)
-    architecture_state = get_architecture_state(use_json=args.json)
-    if prime_state.get("status") != "done":
-        current_actor = get_actor()
-        epic_data = choose_current_objective(current_actor, use_json=args.json)
-        next_action = "/flux:prime"
-        result = {
-            "state": "needs_prime",
-            "session_phase": get_session_phase(use_json=args.json),
-            "flux_exists": True,
-            "objective": None
-            if not epic_data
-            else {
-                "id": epic_data["id"],
-                "title": epic_data["title"],
-                "objective_kind": epic_data["objective_kind"],
-                "scope_mode": epic_data["scope_mode"],
-                "workflow_phase": epic_data["workflow_phase"],
-                "workflow_step": epic_data["workflow_step"],
-                "workflow_status": epic_data["workflow_status"],
-            },
-            "task": None,
-            "prime": prime_state,
-            "architecture": architecture_state,
-            "message": "Flux is installed, but this repository has not been primed yet. Run /flux:prime before scoping or implementation.",
-            "next_action": next_action,
-            "router": router_for(next_action, "needs_prime"),
-        }
-        if args.json:
-            json_output(result)
-        else:
-            print(result["message"])
-        return
-
-    current_actor = get_actor()
-    epic_data = choose_current_objective(current_actor, use_json=args.json)
-    if not epic_data:
-        next_action = "/flux:scope"
-        result = {
-            "state": "fresh_session_no_objective",
-            "session_phase": get_session_phase(use_json=args.json),
-            "flux_exists": True,
-            "objective": None,
-            "task": None,
-            "prime": prime_state,
-            "architecture": architecture_state,
-            "message": "No open objective. Start a new feature, bug, upgrade, or refactor scope.",
-            "next_action": next_action,
-            "router": router_for(next_action, "fresh_session_no_objective"),
-        }
-        if args.json:
-            json_output(result)
-        else:
-            print(result["message"])
-        return
-
-    readiness = ready_state_for_epic(epic_data["id"], use_json=args.json)
-    current_task = None
-    for task in readiness["in_progress"]:
-        if task.get("assignee") == current_actor:
-            current_task = task
-            break
-
-    all_tasks = tasks_for_epic(epic_data["id"], use_json=args.json)
-    if current_task:
-        state = "resume_work"
-        message = f"Resume task {current_task['id']} for {epic_data['title']}."
-        next_action = f"/flux:work {current_task['id']}"
-    elif all_tasks and all(t.get("status") == "done" for t in all_tasks) and epic_data.get("completion_review_status") != "ship":
-        state = "needs_completion_review"
-        message = f"Implementation is done for {epic_data['title']}, but completion review is pending."
-        next_action = f"/flux:epic-review {epic_data['id']}"
-    elif epic_data.get("workflow_status") in {"not_started", "in_progress", "needs_confirmation"}:
-        state = "resume_scope"
-        message = f"Resume scoping for {epic_data['title']} at {epic_data['workflow_phase']}."
-        next_action = f"/flux:scope {epic_data['title']}"
-    elif epic_data.get("workflow_status") == "ready_for_handoff":
-        state = "needs_review"
-        message = f"{epic_data['title']} is ready for handoff."
-        next_action = f"/flux:scope {epic_data['title']}"
-    elif readiness["ready"]:
-        state = "resume_work"
-        current_task = readiness["ready"][0]
-        message = f"Continue implementation with ready task {current_task['id']}."
-        next_action = f"/flux:work {current_task['id']}"
-    else:
-        state = "idle_with_open_epics"
-        message = f"{epic_data['title']} is open but waiting for the next decision."
-        next_action = epic_data.get("next_action") or f"/flux:scope {epic_data['title']}"
-
-    session_phase = get_session_phase(use_json=args.json)
-    result = {
-        "state": state,
-        "session_phase": session_phase,
-        "flux_exists": True,
-        "prime": prime_state,
-        "architecture": architecture_state,
-        "objective": {
-            "id": epic_data["id"],
-            "title": epic_data["title"],
-            "objective_kind": epic_data["objective_kind"],
-            "scope_mode": epic_data["scope_mode"],
-            "workflow_phase": epic_data["workflow_phase"],
-            "workflow_step": epic_data["workflow_step"],
-            "workflow_status": epic_data["workflow_status"],
-        },
-        "task": None if not current_task else {"id": current_task["id"], "title": current_task["title"]},
-        "message": message,
-        "next_action": next_action,
-        "router": router_for(next_action, state),
-    }
+    result = get_session_state(use_json=args.json)
     if args.json:
         json_output(result)
+    elif result["state"] == "needs_prime" or result["objective"] is None:
+        print(result["message"])
     else:
+        session_phase = result["session_phase"]
         phase_str = session_phase["phase"]
         detail = session_phase.get("detail")
         if detail:
             phase_str = f"{phase_str} ({detail})"
-        print(f"[{phase_str}] {message}")
+        print(f"[{phase_str}] {result['message']}")
 
 
 def cmd_session_phase_get(args: argparse.Namespace) -> None:
@@ -2098,14 +1675,11 @@ def cmd_epic_close(args: argparse.Namespace) -> None:
             f"{TASKS_DIR}/ missing. Run 'fluxctl init' or fix repo state.",
             use_json=args.json,
         )
-    incomplete = []
-    for task_file in tasks_dir.glob(f"{args.id}.*.json"):
-        task_id = task_file.stem
-        if not is_task_id(task_id):
-            continue  # Skip non-task files (e.g., fn-1.2-review.json)
-        task_data = load_task_with_state(task_id, use_json=args.json)
-        if task_data["status"] != "done":
-            incomplete.append(f"{task_data['id']} ({task_data['status']})")
+    incomplete = [
+        f"{task_data['id']} ({task_data['status']})"
+        for task_data in load_tasks_with_state_bulk(args.id, use_json=args.json)
+        if task_data["status"] != "done"
+    ]
 
     if incomplete:
         error_exit(
@@ -2129,13 +1703,8 @@ def cmd_epic_close(args: argparse.Namespace) -> None:
         print(f"Epic {args.id} closed")
 
 
-def cmd_checkpoint_save(args: argparse.Namespace) -> None:
-    """Save full epic + tasks state to checkpoint file.
-
-    Creates .flux/.checkpoint-fn-N.json with complete state snapshot.
-    Use before plan-review or other long operations to enable recovery
-    if context compaction occurs.
-    """
+def _checkpoint_args(args: argparse.Namespace) -> tuple[str, Path]:
+    """Common checks for checkpoint commands; returns (epic_id, flux_dir)."""
     if not ensure_flux_exists():
         error_exit(
             ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
@@ -2147,194 +1716,271 @@ def cmd_checkpoint_save(args: argparse.Namespace) -> None:
             f"Invalid epic ID: {epic_id}. Expected format: fn-N or fn-N-slug (e.g., fn-1, fn-1-add-auth)",
             use_json=args.json,
         )
+    return epic_id, get_flux_dir()
 
-    flux_dir = get_flux_dir()
-    epic_path = flux_dir / EPICS_DIR / f"{epic_id}.json"
-    spec_path = flux_dir / SPECS_DIR / f"{epic_id}.md"
 
-    if not epic_path.exists():
-        error_exit(f"Epic {epic_id} not found", use_json=args.json)
-
-    # Load epic data
-    epic_data = load_json_or_exit(epic_path, f"Epic {epic_id}", use_json=args.json)
+def _find_checkpoint(
+    checkpoints: CheckpointStore, epic_id: str, checkpoint_id: Optional[str], use_json: bool
+) -> dict:
+    try:
+        entry = checkpoints.find(epic_id, checkpoint_id)
+    except CheckpointError as e:
+        error_exit(str(e), use_json=use_json)
+    if entry is None:
+        if checkpoint_id in (None, "latest"):
+            error_exit(f"No checkpoint found for {epic_id}", use_json=use_json)
+        error_exit(f"Checkpoint {checkpoint_id} not found for {epic_id}", use_json=use_json)
+    return entry
 
-    # Load epic spec
-    epic_spec = ""
-    if spec_path.exists():
-        epic_spec = spec_path.read_text(encoding="utf-8")
 
-    # Load all tasks for this epic (including runtime state)
-    tasks_dir = flux_dir / TASKS_DIR
-    store = get_state_store()
-    tasks = []
-    if tasks_dir.exists():
-        for task_file in sorted(tasks_dir.glob(f"{epic_id}.*.json")):
-            task_id = task_file.stem
-            if not is_task_id(task_id):
-                continue  # Skip non-task files (e.g., fn-1.2-review.json)
-            task_data = load_json(task_file)
-            task_spec_path = tasks_dir / f"{task_id}.md"
-            task_spec = ""
-            if task_spec_path.exists():
-                task_spec = task_spec_path.read_text(encoding="utf-8")
-            # Include runtime state in checkpoint
-            runtime_state = store.load_runtime(task_id)
-            tasks.append({
-                "id": task_id,
-                "data": task_data,
-                "spec": task_spec,
-                "runtime": runtime_state,  # May be None if no state file
-            })
-
-    # Build checkpoint
-    checkpoint = {
-        "schema_version": 2,  # Bumped for runtime state support
-        "created_at": now_iso(),
-        "epic_id": epic_id,
-        "epic": {
-            "data": epic_data,
-            "spec": epic_spec,
-        },
-        "tasks": tasks,
-    }
+def cmd_checkpoint_save(args: argparse.Namespace) -> None:
+    """Save full epic + tasks state as a new checkpoint.
 
-    # Write checkpoint
-    checkpoint_path = flux_dir / f".checkpoint-{epic_id}.json"
-    atomic_write_json(checkpoint_path, checkpoint)
+    Only files that changed since earlier checkpoints add blobs; saving the
+    same state as the newest checkpoint records nothing. Use before
+    plan-review or other long operations to enable recovery if context
+    compaction occurs.
+    """
+    epic_id, flux_dir = _checkpoint_args(args)
+    epic_path = flux_dir / EPICS_DIR / f"{epic_id}.json"
+    if not epic_path.exists():
+        error_exit(f"Epic {epic_id} not found", use_json=args.json)
+    # Surface a broken epic file the same way other commands do
+    load_json_or_exit(epic_path, f"Epic {epic_id}", use_json=args.json)
 
+    files = snapshot_files(flux_dir, epic_id, get_state_store())
+    checkpoints = CheckpointStore(flux_dir)
+    try:
+        entry, created = checkpoints.save(epic_id, files, checkpoint_keep())
+    except CheckpointError as e:
+        error_exit(str(e), use_json=args.json)
+
+    checkpoint_path = checkpoints.history_path(epic_id)
+    task_count = len(checkpoint_task_ids(files))
+    if created:
+        message = f"Checkpoint {entry['id']} saved: {checkpoint_path}"
+    else:
+        message = f"Checkpoint {entry['id']} unchanged: {checkpoint_path}"
     if args.json:
         json_output({
             "epic_id": epic_id,
+            "checkpoint_id": entry["id"],
             "checkpoint_path": str(checkpoint_path),
-            "task_count": len(tasks),
-            "message": f"Checkpoint saved: {checkpoint_path}",
+            "created": created,
+            "task_count": task_count,
+            "blobs_written": checkpoints.blobs_written,
+            "bytes_written": checkpoints.bytes_written,
+            "message": message,
         })
     else:
-        print(f"Checkpoint saved: {checkpoint_path} ({len(tasks)} tasks)")
+        print(f"{message} ({task_count} tasks, {checkpoints.blobs_written} new blobs)")
 
 
 def cmd_checkpoint_restore(args: argparse.Namespace) -> None:
-    """Restore epic + tasks state from checkpoint file.
+    """Restore epic + tasks state from a checkpoint (newest by default).
 
-    Reads .flux/.checkpoint-fn-N.json and overwrites current state.
+    Every blob is read and verified before anything is written; files are
+    then staged next to their targets and renamed into place together.
     Use to recover after context compaction or to rollback changes.
     """
-    if not ensure_flux_exists():
-        error_exit(
-            ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
-        )
-
-    epic_id = args.epic
-    if not is_epic_id(epic_id):
-        error_exit(
-            f"Invalid epic ID: {epic_id}. Expected format: fn-N or fn-N-slug (e.g., fn-1, fn-1-add-auth)",
-            use_json=args.json,
-        )
-
-    flux_dir = get_flux_dir()
-    checkpoint_path = flux_dir / f".checkpoint-{epic_id}.json"
-
-    if not checkpoint_path.exists():
-        error_exit(f"No checkpoint found for {epic_id}", use_json=args.json)
-
-    # Load checkpoint
-    checkpoint = load_json_or_exit(
-        checkpoint_path, f"Checkpoint {epic_id}", use_json=args.json
-    )
-
-    # Validate checkpoint structure
-    if "epic" not in checkpoint or "tasks" not in checkpoint:
-        error_exit("Invalid checkpoint format", use_json=args.json)
-
-    # Restore epic
-    epic_path = flux_dir / EPICS_DIR / f"{epic_id}.json"
-    spec_path = flux_dir / SPECS_DIR / f"{epic_id}.md"
-
-    epic_data = checkpoint["epic"]["data"]
-    epic_data["updated_at"] = now_iso()
-    atomic_write_json(epic_path, epic_data)
-
-    if checkpoint["epic"]["spec"]:
-        atomic_write(spec_path, checkpoint["epic"]["spec"])
+    epic_id, flux_dir = _checkpoint_args(args)
+    checkpoints = CheckpointStore(flux_dir)
+    with checkpoints.lock(LOCK_SH):
+        entry = _find_checkpoint(checkpoints, epic_id, args.id, args.json)
+        try:
+            files = checkpoints.read_files(epic_id, entry)
+        except CheckpointError as e:
+            error_exit(str(e), use_json=args.json)
+
+    restored_tasks = checkpoint_task_ids(files)
+    timestamp = now_iso()
+    writes: list[tuple[Path, str]] = []
+    runtimes: dict[str, dict] = {}
+    for name, content in sorted(files.items()):
+        if name.startswith(RUNTIME_PREFIX):
+            runtimes[name[len(RUNTIME_PREFIX):]] = json.loads(content)
+        elif name.endswith(".json"):
+            data = json.loads(content)
+            data["updated_at"] = timestamp
+            writes.append((flux_dir / name, dump_json(data)))
+        else:
+            writes.append((flux_dir / name, content))
 
-    # Restore tasks (including runtime state)
-    tasks_dir = flux_dir / TASKS_DIR
+    staged: list[tuple[str, Path]] = []
+    try:
+        for path, content in writes:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            staged.append((tmp_path, path))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+    except OSError as e:
+        for tmp_path, _ in staged:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        error_exit(f"Failed to stage checkpoint restore: {e}", use_json=args.json)
+    for tmp_path, path in staged:
+        note_write(path)
+        os.replace(tmp_path, path)
+
+    # Runtime state: one atomic write for every task that had some, and
+    # tasks without runtime in the checkpoint lose any they gained since
     store = get_state_store()
-    restored_tasks = []
-    for task in checkpoint["tasks"]:
-        task_id = task["id"]
-        task_json_path = tasks_dir / f"{task_id}.json"
-        task_spec_path = tasks_dir / f"{task_id}.md"
-
-        task_data = task["data"]
-        task_data["updated_at"] = now_iso()
-        atomic_write_json(task_json_path, task_data)
-
-        if task["spec"]:
-            atomic_write(task_spec_path, task["spec"])
-
-        # Restore runtime state from checkpoint (schema_version >= 2)
-        runtime = task.get("runtime")
-        if runtime is not None:
-            # Restore saved runtime state
-            with store.lock_task(task_id):
-                store.save_runtime(task_id, runtime)
-        else:
-            # No runtime in checkpoint - delete any existing runtime state
+    if runtimes:
+        store.save_many(runtimes)
+    for task_id in restored_tasks:
+        if task_id not in runtimes:
             delete_task_runtime(task_id)
 
-        restored_tasks.append(task_id)
-
+    created_at = entry.get("created_at")
+    message = f"Restored {epic_id} from checkpoint {entry['id']} ({len(restored_tasks)} tasks)"
     if args.json:
         json_output({
             "epic_id": epic_id,
-            "checkpoint_created_at": checkpoint.get("created_at"),
+            "checkpoint_id": entry["id"],
+            "checkpoint_created_at": created_at,
             "tasks_restored": restored_tasks,
-            "message": f"Restored {epic_id} from checkpoint ({len(restored_tasks)} tasks)",
+            "message": message,
         })
     else:
-        print(f"Restored {epic_id} from checkpoint ({len(restored_tasks)} tasks)")
-        print(f"Checkpoint was created at: {checkpoint.get('created_at', 'unknown')}")
+        print(message)
+        print(f"Checkpoint was created at: {created_at or 'unknown'}")
 
 
-def cmd_checkpoint_delete(args: argparse.Namespace) -> None:
-    """Delete checkpoint file for an epic."""
-    if not ensure_flux_exists():
-        error_exit(
-            ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
+def cmd_checkpoint_list(args: argparse.Namespace) -> None:
+    """List an epic's checkpoints, oldest first."""
+    epic_id, flux_dir = _checkpoint_args(args)
+    checkpoints = CheckpointStore(flux_dir)
+    try:
+        with checkpoints.lock(LOCK_SH):
+            entries = checkpoints.entries(epic_id)
+    except CheckpointError as e:
+        error_exit(str(e), use_json=args.json)
+
+    rows = [
+        {
+            "id": entry["id"],
+            "created_at": entry.get("created_at"),
+            "task_count": len(checkpoint_task_ids(entry["files"])),
+            "file_count": len(entry["files"]),
+        }
+        for entry in entries
+    ]
+    if args.json:
+        json_output({"epic_id": epic_id, "keep": checkpoint_keep(), "checkpoints": rows})
+        return
+    if not rows:
+        print(f"No checkpoints for {epic_id}")
+        return
+    print(f"Checkpoints for {epic_id} (oldest first, keeping {checkpoint_keep()}):")
+    for row in rows:
+        print(
+            f"  {row['id']:>6}  {row['created_at'] or 'unknown'}  "
+            f"{row['task_count']} tasks, {row['file_count']} files"
         )
 
-    epic_id = args.epic
-    if not is_epic_id(epic_id):
-        error_exit(
-            f"Invalid epic ID: {epic_id}. Expected format: fn-N or fn-N-slug (e.g., fn-1, fn-1-add-auth)",
-            use_json=args.json,
-        )
 
-    flux_dir = get_flux_dir()
-    checkpoint_path = flux_dir / f".checkpoint-{epic_id}.json"
+def cmd_checkpoint_diff(args: argparse.Namespace) -> None:
+    """Show which files differ between two checkpoints (or a checkpoint and now).
 
-    if not checkpoint_path.exists():
-        if args.json:
-            json_output({
-                "epic_id": epic_id,
-                "deleted": False,
-                "message": f"No checkpoint found for {epic_id}",
-            })
+    Compares blob digests, so only --patch reads file contents.
+    """
+    epic_id, flux_dir = _checkpoint_args(args)
+    checkpoints = CheckpointStore(flux_dir)
+    current = args.to == "current"
+    with checkpoints.lock(LOCK_SH):
+        new_entry = None if current else _find_checkpoint(checkpoints, epic_id, args.to, args.json)
+        if args.from_id is not None or current:
+            old_entry = _find_checkpoint(checkpoints, epic_id, args.from_id, args.json)
         else:
-            print(f"No checkpoint found for {epic_id}")
+            # Default: the checkpoint just before --to
+            entries = checkpoints.entries(epic_id)
+            position = next(i for i, entry in enumerate(entries) if entry["id"] == new_entry["id"])
+            if position == 0:
+                error_exit(
+                    f"No checkpoint before {new_entry['id']} for {epic_id}; use --from or --to current",
+                    use_json=args.json,
+                )
+            old_entry = entries[position - 1]
+        try:
+            old_files = checkpoints.read_files(epic_id, old_entry) if args.patch else None
+            new_files = checkpoints.read_files(epic_id, new_entry) if args.patch and new_entry else None
+        except CheckpointError as e:
+            error_exit(str(e), use_json=args.json)
+
+    old_refs = old_entry["files"]
+    if current:
+        if not (flux_dir / EPICS_DIR / f"{epic_id}.json").exists():
+            error_exit(f"Epic {epic_id} not found", use_json=args.json)
+        new_files = snapshot_files(flux_dir, epic_id, get_state_store())
+        new_refs = content_refs(new_files)
+    else:
+        new_refs = new_entry["files"]
+
+    changes = []
+    for name in sorted(set(old_refs) | set(new_refs)):
+        if name not in new_refs:
+            status = "removed"
+        elif name not in old_refs:
+            status = "added"
+        elif old_refs[name] != new_refs[name]:
+            status = "modified"
+        else:
+            continue
+        change = {"file": name, "status": status}
+        if args.patch:
+            change["patch"] = "".join(difflib.unified_diff(
+                old_files.get(name, "").splitlines(keepends=True),
+                new_files.get(name, "").splitlines(keepends=True),
+                fromfile=f"{old_entry['id']}/{name}",
+                tofile=f"{'current' if current else new_entry['id']}/{name}",
+            ))
+        changes.append(change)
+
+    to_label = "current" if current else new_entry["id"]
+    if args.json:
+        json_output({
+            "epic_id": epic_id,
+            "from": old_entry["id"],
+            "to": to_label,
+            "changes": changes,
+        })
+        return
+    if not changes:
+        print(f"No differences between {old_entry['id']} and {to_label}")
         return
+    marks = {"added": "A", "removed": "D", "modified": "M"}
+    for change in changes:
+        if args.patch:
+            print(change["patch"], end="")
+        else:
+            print(f"{marks[change['status']]} {change['file']}")
 
-    checkpoint_path.unlink()
 
+def cmd_checkpoint_delete(args: argparse.Namespace) -> None:
+    """Delete one checkpoint (--id) or every checkpoint of an epic."""
+    epic_id, flux_dir = _checkpoint_args(args)
+    try:
+        deleted = CheckpointStore(flux_dir).delete(epic_id, args.id)
+    except CheckpointError as e:
+        error_exit(str(e), use_json=args.json)
+
+    what = f"checkpoint {args.id}" if args.id is not None else "checkpoint"
+    if not deleted:
+        message = f"No {what} found for {epic_id}"
+    elif args.id is not None:
+        message = f"Deleted {what} for {epic_id}"
+    else:
+        message = f"Deleted {len(deleted)} checkpoint(s) for {epic_id}"
     if args.json:
         json_output({
             "epic_id": epic_id,
-            "deleted": True,
-            "message": f"Deleted checkpoint for {epic_id}",
+            "deleted": bool(deleted),
+            "deleted_ids": deleted,
+            "message": message,
         })
     else:
-        print(f"Deleted checkpoint for {epic_id}")
+        print(message)
 
 
 def cmd_validate(args: argparse.Namespace) -> None:
@@ -2344,14 +1990,18 @@ def cmd_validate(args: argparse.Namespace) -> None:
             ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
         )
 
-    # Require either --epic or --all
-    if not args.epic and not getattr(args, "all", False):
+    changed_since = getattr(args, "changed_since", None)
+
+    # Require either --epic or --all (--changed-since narrows --all)
+    if not args.epic and not getattr(args, "all", False) and not changed_since:
         error_exit("Must specify --epic or --all", use_json=args.json)
+    if args.epic and changed_since:
+        error_exit("--changed-since cannot be combined with --epic", use_json=args.json)
 
     flux_dir = get_flux_dir()
 
     # MU-3: Validate all mode
-    if getattr(args, "all", False):
+    if getattr(args, "all", False) or changed_since:
         # First validate .flux/ root invariants
         root_errors = validate_flux_root(flux_dir)
 
@@ -2402,10 +2052,42 @@ def cmd_validate(args: argparse.Namespace) -> None:
         total_tasks = 0
         epic_results = []
 
+        index = get_index(use_json=args.json)
+        tasks_by_epic: dict[str, list[dict]] = {}
+        for task_data in index.all_tasks(use_json=args.json):
+            tasks_by_epic.setdefault(task_data["id"].rsplit(".", 1)[0], []).append(task_data)
+
+        all_epic_count = len(epic_ids)
+        if changed_since:
+            # Epics touched in the diff, plus epics depending on them (a
+            # deleted or renamed dependency leaves them dangling)
+            changed = changed_epic_ids(changed_since, use_json=args.json)
+            graph = DependencyGraph(epics=index.epics(use_json=args.json))
+            for epic_id in list(changed):
+                changed.update(graph.dependents(epic_id))
+            epic_ids = [epic_id for epic_id in epic_ids if epic_id in changed]
+
+        # Unchanged epics reuse their cached result (see validation.py)
+        cache = ValidationCache(flux_dir, enabled=not getattr(args, "no_cache", False))
+        known_epics = set(index.epic_ids())
         for epic_id in epic_ids:
-            errors, warnings, task_count = validate_epic(
-                flux_dir, epic_id, use_json=args.json
-            )
+            epic_tasks = tasks_by_epic.get(epic_id, [])
+            key = None
+            if cache.enabled and not index.epic_error(epic_id):
+                epic_data = index.epic(epic_id, use_json=args.json) or {}
+                key = cache.epic_key(epic_id, epic_data, epic_tasks, known_epics)
+            cached = cache.get(key) if key else None
+            if cached is not None:
+                errors, warnings, task_count = cached
+            else:
+                errors, warnings, task_count = validate_epic(
+                    flux_dir,
+                    epic_id,
+                    use_json=args.json,
+                    epic_tasks=epic_tasks,
+                )
+                if key:
+                    cache.put(key, (errors, warnings, task_count))
             all_errors.extend(errors)
             all_warnings.extend(warnings)
             total_tasks += task_count
@@ -2419,24 +2101,31 @@ def cmd_validate(args: argparse.Namespace) -> None:
                 }
             )
 
+        cache.save(epic_count=all_epic_count)
         valid = len(all_errors) == 0
 
         if args.json:
-            json_output(
-                {
-                    "valid": valid,
-                    "root_errors": root_errors,
-                    "epics": epic_results,
-                    "total_epics": len(epic_ids),
-                    "total_tasks": total_tasks,
-                    "total_errors": len(all_errors),
-                    "total_warnings": len(all_warnings),
-                },
-                success=valid,
-            )
+            payload = {
+                "valid": valid,
+                "root_errors": root_errors,
+                "epics": epic_results,
+                "total_epics": len(epic_ids),
+                "total_tasks": total_tasks,
+                "total_errors": len(all_errors),
+                "total_warnings": len(all_warnings),
+                "cache": {"hits": cache.hits, "misses": cache.misses},
+            }
+            if changed_since:
+                payload["changed_since"] = changed_since
+                payload["unchanged_epics"] = all_epic_count - len(epic_ids)
+            json_output(payload, success=valid)
         else:
-            print("Validation for all epics:")
-            print(f"  Epics: {len(epic_ids)}")
+            if changed_since:
+                print(f"Validation for epics changed since {changed_since}:")
+                print(f"  Epics: {len(epic_ids)} of {all_epic_count}")
+            else:
+                print("Validation for all epics:")
+                print(f"  Epics: {len(epic_ids)}")
             print(f"  Tasks: {total_tasks}")
             print(f"  Valid: {valid}")
             if all_errors:
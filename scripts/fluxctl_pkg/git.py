@@ -0,0 +1,307 @@
+"""
+fluxctl_pkg.git - GitBackend: git plumbing shared by one fluxctl invocation.
+
+Every git question used to be its own fork + exec, which on a large monorepo
+costs 30-80ms of git startup each. A GitBackend answers them per repository
+and per invocation:
+
+- scalar answers (toplevel, common dir, config values, rev-parse results,
+  changed files, diff stat) are computed once and cached. For the current
+  repo the toplevel and common dir come from the shared RepoContext, so
+  they cost no extra git call.
+- blob and object reads go through one long-lived `git cat-file --batch`
+  and one `--batch-check` process, started on first use and closed at exit.
+
+`fluxctl serve` and `fluxctl batch` drop the backends between commands
+(reset_git_backends), so cached answers never outlive one command.
+"""
+
+import atexit
+import os
+import subprocess
+from pathlib import Path
+from typing import IO, NamedTuple, Optional
+
+from .utils import get_repo_context, popen_subprocess, run_subprocess
+
+
+class GitError(Exception):
+    """A git command failed; the message is git's stderr."""
+
+
+class ObjectInfo(NamedTuple):
+    sha: str
+    type: str
+    size: int
+
+
+class Diff(NamedTuple):
+    text: str
+    truncated: bool
+    error: Optional[str]  # git's stderr when the diff failed
+
+
+def _is_sha(text: str) -> bool:
+    return len(text) in (40, 64) and all(c in "0123456789abcdef" for c in text)
+
+
+class _BatchProcess:
+    """A `git cat-file --batch[-check]` process: one request line, one answer."""
+
+    def __init__(self, cwd: Path, mode: str):
+        self.proc = popen_subprocess(
+            ["git", "cat-file", mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd,
+        )
+        self.stdin: IO[bytes] = self.proc.stdin
+        self.stdout: IO[bytes] = self.proc.stdout
+
+    def ask(self, spec: str) -> Optional[ObjectInfo]:
+        if "\n" in spec:  # Would be read as two requests
+            return None
+        self.stdin.write(spec.encode("utf-8") + b"\n")
+        self.stdin.flush()
+        line = self.stdout.readline().decode("utf-8", errors="replace").rstrip("\n")
+        # "<spec> missing" / "<spec> ambiguous" echo the spec, which may hold spaces
+        if not line or line.endswith((" missing", " ambiguous")):
+            return None
+        header = line.rsplit(" ", 2)
+        if len(header) != 3 or not _is_sha(header[0]) or not header[2].isdigit():
+            return None
+        return ObjectInfo(header[0], header[1], int(header[2]))
+
+    def read(self, size: int) -> bytes:
+        data = self.stdout.read(size)
+        self.stdout.read(1)  # Trailing newline
+        return data
+
+    def close(self) -> None:
+        try:
+            self.stdin.close()
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+
+
+class GitBackend:
+    """Cached git queries and object reads for one repository."""
+
+    def __init__(self, cwd: Path):
+        self.cwd = cwd
+        self._cache: dict[tuple, object] = {}
+        self._batch: Optional[_BatchProcess] = None
+        self._check: Optional[_BatchProcess] = None
+        self._atexit_registered = False
+
+    def _run(self, *args: str) -> subprocess.CompletedProcess:
+        return run_subprocess(["git", *args], capture_output=True, text=True, cwd=self.cwd)
+
+    def _cached(self, key: tuple, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _lines(self, *args: str) -> list[str]:
+        """Output lines of a git command; GitError if it fails."""
+        result = self._run(*args)
+        if result.returncode != 0:
+            raise GitError(result.stderr.strip() or f"git {args[0]} failed")
+        return [line for line in result.stdout.splitlines() if line.strip()]
+
+    # --- Scalars ---
+
+    def _context(self):
+        ctx = get_repo_context()
+        return ctx if ctx.cwd == self.cwd else None
+
+    def _rev_parse_dirs(self) -> tuple[Optional[Path], Optional[Path]]:
+        def compute():
+            result = self._run("rev-parse", "--path-format=absolute", "--show-toplevel", "--git-common-dir")
+            lines = result.stdout.splitlines()
+            if result.returncode != 0 or len(lines) < 2:
+                return None, None
+            return Path(lines[0].strip()), Path(lines[1].strip())
+
+        return self._cached(("dirs",), compute)
+
+    @property
+    def toplevel(self) -> Optional[Path]:
+        """Work tree root, or None outside a work tree."""
+        ctx = self._context()
+        if ctx is not None:
+            return ctx.repo_root if ctx.git_common_dir is not None else None
+        return self._rev_parse_dirs()[0]
+
+    @property
+    def common_dir(self) -> Optional[Path]:
+        ctx = self._context()
+        if ctx is not None:
+            return ctx.git_common_dir
+        return self._rev_parse_dirs()[1]
+
+    def is_repo(self) -> bool:
+        return self._cached(("is_repo",), lambda: self._run("rev-parse", "--git-dir").returncode == 0)
+
+    def config(self, key: str) -> Optional[str]:
+        """Effective value of a git config key (all keys are read in one call)."""
+
+        def compute():
+            result = run_subprocess(
+                ["git", "config", "--list", "-z"], capture_output=True, cwd=self.cwd
+            )
+            values: dict[str, str] = {}
+            if result.returncode == 0:
+                for entry in result.stdout.decode("utf-8", errors="replace").split("\0"):
+                    name, _, value = entry.partition("\n")
+                    if name:
+                        values[name.lower()] = value  # Last value wins, like `git config <key>`
+            return values
+
+        return self._cached(("config",), compute).get(key.lower())
+
+    def rev_parse(self, rev: str) -> Optional[str]:
+        """Object name for rev, or None if it does not resolve."""
+
+        def compute():
+            result = self._run("rev-parse", "--verify", "--quiet", rev)
+            if result.returncode != 0:
+                return None
+            return result.stdout.strip() or None
+
+        return self._cached(("rev", rev), compute)
+
+    def tree_sha(self, rev: str = "HEAD") -> Optional[str]:
+        return self.rev_parse(f"{rev}^{{tree}}")
+
+    # --- Diffs and file lists ---
+
+    def changed_files(self, base: str, *paths: str, committed: bool = True) -> list[str]:
+        """Files differing between base and HEAD (committed) or the working tree."""
+        spec = f"{base}..HEAD" if committed else base
+        args = ("diff", "--name-only", spec, "--", *paths) if paths else ("diff", "--name-only", spec)
+        return list(self._cached(("diff-names", spec, paths), lambda: [f.strip() for f in self._lines(*args)]))
+
+    def diff_stat(self, base: str) -> str:
+        """`git diff --stat base..HEAD`, or "" if it fails."""
+
+        def compute():
+            result = self._run("diff", "--stat", f"{base}..HEAD")
+            return result.stdout.strip() if result.returncode == 0 else ""
+
+        return self._cached(("diff-stat", base), compute)
+
+    def diff(self, base: str, max_bytes: int) -> Diff:
+        """`git diff base..HEAD`, reading at most max_bytes of it into memory."""
+
+        def compute():
+            proc = popen_subprocess(
+                ["git", "diff", f"{base}..HEAD"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=self.cwd,
+            )
+            data = proc.stdout.read(max_bytes + 1)
+            truncated = len(data) > max_bytes
+            # Consume the rest in chunks (avoid allocating the entire diff)
+            while proc.stdout.read(65536):
+                pass
+            stderr = proc.stderr.read()
+            proc.stdout.close()
+            proc.stderr.close()
+            if proc.wait() != 0 and stderr:
+                return Diff("", False, stderr.decode("utf-8", errors="replace").strip())
+            return Diff(data[:max_bytes].decode("utf-8", errors="replace").strip(), truncated, None)
+
+        return self._cached(("diff", base, max_bytes), compute)
+
+    def ls_files(self, *paths: str, others: bool = False) -> list[str]:
+        """Tracked files (or untracked, non-ignored ones with others=True)."""
+        args = ["ls-files", "-z"]
+        if others:
+            args += ["--others", "--exclude-standard"]
+        if paths:
+            args += ["--", *paths]
+
+        def compute():
+            result = run_subprocess(["git", *args], capture_output=True, cwd=self.cwd)
+            if result.returncode != 0:
+                raise GitError(result.stderr.decode("utf-8", errors="replace").strip())
+            return [p for p in result.stdout.decode("utf-8", errors="surrogateescape").split("\0") if p]
+
+        return list(self._cached(("ls-files", others, paths), compute))
+
+    def ls_tree(self, rev: str = "HEAD") -> dict[str, str]:
+        """path -> blob SHA for every file in rev's tree (recursive)."""
+
+        def compute():
+            result = run_subprocess(["git", "ls-tree", "-r", "-z", rev], capture_output=True, cwd=self.cwd)
+            if result.returncode != 0:
+                raise GitError(result.stderr.decode("utf-8", errors="replace").strip())
+            blobs = {}
+            for entry in result.stdout.decode("utf-8", errors="surrogateescape").split("\0"):
+                meta, _, path = entry.partition("\t")
+                parts = meta.split()
+                if len(parts) == 3 and parts[1] == "blob":
+                    blobs[path] = parts[2]
+            return blobs
+
+        return dict(self._cached(("ls-tree", rev), compute))
+
+    # --- Objects (cat-file --batch) ---
+
+    def _start(self, mode: str) -> _BatchProcess:
+        if not self._atexit_registered:
+            atexit.register(self.close)
+            self._atexit_registered = True
+        return _BatchProcess(self.cwd, mode)
+
+    def object_info(self, spec: str) -> Optional[ObjectInfo]:
+        """sha/type/size of an object spec like "HEAD:src/app.py", or None."""
+        if self._check is None:
+            self._check = self._start("--batch-check")
+        return self._check.ask(spec)
+
+    def blob_id(self, path: str, rev: str = "HEAD") -> Optional[str]:
+        info = self.object_info(f"{rev}:{path}")
+        return info.sha if info is not None and info.type == "blob" else None
+
+    def read_blob(self, rev: str, path: str) -> Optional[bytes]:
+        """Contents of path at rev (rev may also be a blob SHA with path "")."""
+        if self._batch is None:
+            self._batch = self._start("--batch")
+        info = self._batch.ask(f"{rev}:{path}" if path else rev)
+        if info is None:
+            return None
+        data = self._batch.read(info.size)
+        return data if info.type == "blob" else None
+
+    def close(self) -> None:
+        for proc in (self._batch, self._check):
+            if proc is not None:
+                proc.close()
+        self._batch = self._check = None
+        if self._atexit_registered:
+            atexit.unregister(self.close)
+            self._atexit_registered = False
+
+
+_BACKENDS: dict[str, GitBackend] = {}
+
+
+def get_git(cwd: Optional[Path] = None) -> GitBackend:
+    """The GitBackend for cwd (default: the current working directory)."""
+    key = str(cwd) if cwd is not None else os.getcwd()
+    backend = _BACKENDS.get(key)
+    if backend is None:
+        backend = _BACKENDS[key] = GitBackend(Path(key))
+    return backend
+
+
+def reset_git_backends() -> None:
+    """Close batch processes and drop cached answers (between in-process commands)."""
+    for backend in _BACKENDS.values():
+        backend.close()
+    _BACKENDS.clear()
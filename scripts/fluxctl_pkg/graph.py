@@ -0,0 +1,200 @@
+"""
+fluxctl_pkg.graph - In-memory task/epic dependency graph with a reverse-dependency index.
+
+The graph is built once from already-loaded records (normally the task index),
+so dependents, cycle checks and ready computation are walks over in-memory
+adjacency lists instead of re-globbing .flux/tasks/ per visited node. Edges
+point from a node to what it depends on: task `depends_on` and epic
+`depends_on_epics`.
+"""
+
+import heapq
+from collections import deque
+from typing import Iterable, Optional
+
+from .index import FluxIndex, get_index
+
+
+class DependencyGraph:
+    """Forward and reverse dependency adjacency for tasks and epics.
+
+    Dependencies on unknown IDs are kept as edges (they still block a task)
+    but have no record of their own. Node order is insertion order, which for
+    index-built graphs is task-number order within an epic.
+    """
+
+    def __init__(self, tasks: Iterable[dict] = (), epics: Iterable[dict] = ()):
+        self.tasks: dict[str, dict] = {}
+        self.epics: dict[str, dict] = {}
+        self._deps: dict[str, list[str]] = {}
+        self._dependents: dict[str, list[str]] = {}
+        for task in tasks:
+            self.tasks[task["id"]] = task
+            self._add_node(task["id"], task.get("depends_on") or [])
+        for epic in epics:
+            self.epics[epic["id"]] = epic
+            deps = [d for d in epic.get("depends_on_epics") or [] if isinstance(d, str)]
+            self._add_node(epic["id"], deps)
+
+    @classmethod
+    def from_index(
+        cls,
+        epic_id: Optional[str] = None,
+        with_epics: bool = False,
+        index: Optional[FluxIndex] = None,
+        use_json: bool = True,
+    ) -> "DependencyGraph":
+        """Graph of one epic's tasks (or all tasks), optionally with epic-level edges."""
+        index = index or get_index(use_json=use_json)
+        if epic_id is None:
+            tasks = index.all_tasks(use_json=use_json)
+        else:
+            tasks = index.tasks_for_epic(epic_id, use_json=use_json)
+        epics = index.epics(use_json=use_json) if with_epics else []
+        return cls(tasks, epics)
+
+    def _add_node(self, node: str, deps: list[str]) -> None:
+        self._deps.setdefault(node, [])
+        self._dependents.setdefault(node, [])
+        for dep in deps:
+            self.add_dependency(node, dep)
+
+    def add_dependency(self, node: str, dep: str) -> None:
+        """Add the edge node -> dep (idempotent)."""
+        deps = self._deps.setdefault(node, [])
+        if dep not in deps:
+            deps.append(dep)
+            self._dependents.setdefault(dep, []).append(node)
+
+    def dependencies(self, node: str) -> list[str]:
+        """Direct dependencies of node."""
+        return list(self._deps.get(node, []))
+
+    def dependents(self, node: str) -> list[str]:
+        """Nodes that depend directly on node."""
+        return list(self._dependents.get(node, []))
+
+    def transitive_dependents(self, node: str) -> list[str]:
+        """Everything that depends on node, directly or not, in BFS order."""
+        seen = {node}
+        result = []
+        queue = deque([node])
+        while queue:
+            for dependent in self._dependents.get(queue.popleft(), []):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    result.append(dependent)
+                    queue.append(dependent)
+        return result
+
+    def path(self, start: str, goal: str) -> Optional[list[str]]:
+        """Shortest dependency chain start -> ... -> goal, or None."""
+        parents: dict[str, Optional[str]] = {start: None}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if node == goal:
+                chain = []
+                while node is not None:
+                    chain.append(node)
+                    node = parents[node]
+                return chain[::-1]
+            for dep in self._deps.get(node, []):
+                if dep not in parents:
+                    parents[dep] = node
+                    queue.append(dep)
+        return None
+
+    def cycle_if_added(self, node: str, dep: str) -> Optional[list[str]]:
+        """The cycle that adding node -> dep would close (node ... node), or None."""
+        if dep == node:
+            return [node, node]
+        chain = self.path(dep, node)
+        return [node] + chain if chain else None
+
+    def find_cycle(self) -> Optional[list[str]]:
+        """One dependency cycle as a closed path (a -> b -> a), or None."""
+        state: dict[str, int] = {}  # 1 = on the DFS stack, 2 = finished
+        for root in self._deps:
+            if root in state:
+                continue
+            stack = [(root, iter(self._deps[root]))]
+            trail = [root]
+            state[root] = 1
+            while stack:
+                node, deps = stack[-1]
+                dep = next(deps, None)
+                if dep is None:
+                    stack.pop()
+                    trail.pop()
+                    state[node] = 2
+                elif state.get(dep) == 1:
+                    return trail[trail.index(dep):] + [dep]
+                elif dep not in state:
+                    state[dep] = 1
+                    trail.append(dep)
+                    stack.append((dep, iter(self._deps.get(dep, []))))
+        return None
+
+    def topological_order(self) -> list[str]:
+        """Nodes ordered so dependencies come first (ties keep insertion order).
+
+        Dependencies on unknown IDs are ignored; nodes on a cycle are omitted
+        (use find_cycle() to report them).
+        """
+        position = {node: i for i, node in enumerate(self._deps)}
+        pending = {
+            node: sum(1 for dep in deps if dep in position)
+            for node, deps in self._deps.items()
+        }
+        heap = [position[node] for node, count in pending.items() if count == 0]
+        heapq.heapify(heap)
+        nodes = list(self._deps)
+        order = []
+        while heap:
+            node = nodes[heapq.heappop(heap)]
+            order.append(node)
+            for dependent in self._dependents.get(node, []):
+                if dependent in pending:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        heapq.heappush(heap, position[dependent])
+        return order
+
+    def unfinished_dependencies(self, node: str) -> list[str]:
+        """Dependencies of node that are missing or not done."""
+        records = self.epics if node in self.epics else self.tasks
+        return [
+            dep
+            for dep in self._deps.get(node, [])
+            if dep != node and (records.get(dep) or {}).get("status") != "done"
+        ]
+
+    def ready_frontier(self) -> dict[str, list]:
+        """Classify tasks into ready / in_progress / blocked (unsorted).
+
+        Blocked entries are {"task", "blocked_by"}: either ["status=blocked"]
+        or the dependencies that are not done yet. Done tasks are omitted.
+        """
+        ready: list[dict] = []
+        in_progress: list[dict] = []
+        blocked: list[dict] = []
+        for task_id, task in self.tasks.items():
+            status = task.get("status")
+            if status == "in_progress":
+                in_progress.append(task)
+            elif status == "done":
+                continue
+            elif status == "blocked":
+                blocked.append({"task": task, "blocked_by": ["status=blocked"]})
+            else:
+                blocking = [
+                    dep
+                    for dep in self._deps.get(task_id, [])
+                    if (self.tasks.get(dep) or {}).get("status") != "done"
+                ]
+                if blocking:
+                    blocked.append({"task": task, "blocked_by": blocking})
+                else:
+                    ready.append(task)
+        return {"ready": ready, "in_progress": in_progress, "blocked": blocked}
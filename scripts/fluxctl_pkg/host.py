@@ -6,11 +6,10 @@ import argparse
 import json
 import os
 import shutil
-import subprocess
 from pathlib import Path
 from typing import Any, Optional
 
-from .utils import current_flux_version, get_repo_root, json_output
+from .utils import current_flux_version, get_repo_root, json_output, run_subprocess
 
 KNOWN_DRIVERS = {"codex", "claude", "opencode", "cursor", "windsurf", "unknown"}
 
@@ -46,7 +45,7 @@ def _command_version(command: str) -> Optional[str]:
     if not shutil.which(command):
         return None
     try:
-        result = subprocess.run(
+        result = run_subprocess(
             [command, "--version"],
             capture_output=True,
             text=True,
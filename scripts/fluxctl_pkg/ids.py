@@ -0,0 +1,136 @@
+"""
+fluxctl_pkg.ids - Persistent epic/task ID allocator in the state directory.
+
+`epic create` and `task create` used to find the next number by scanning
+.flux/epics/, .flux/specs/ and .flux/tasks/, so two planners creating at the
+same time could pick the same ID. The allocator keeps the last number handed
+out (globally for epics, per epic for tasks) in `<state-dir>/ids.json` and
+updates it under an exclusive lock. Because the state directory is shared by
+every worktree of the repo, parallel planners in different worktrees never
+get the same number either.
+
+The counters only go up and are trusted as they are. A scan of .flux/ runs
+only when a counter is missing (first use, a new state dir, an epic created
+elsewhere) or when the next number is already taken on disk: a pull, merge
+or hand-made file brought in IDs from another allocator. The counter then
+becomes max(counter, scan). Ordinary edits (set-spec, dep add, done) never
+trigger a scan, so `task create` stays O(1) in the plan workflow.
+`task reserve-ids` hands out a block of task IDs up front, so a planner can
+wire dependencies between tasks before creating them with `task create --id`.
+"""
+
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from .utils import (
+    EPICS_DIR,
+    LOCK_EX,
+    LOCK_UN,
+    SPECS_DIR,
+    TASKS_DIR,
+    _flock,
+    atomic_write_json,
+    get_flux_dir,
+    get_state_dir,
+    scan_max_epic_id,
+    scan_max_task_id,
+)
+
+
+ALLOCATOR_FILE = "ids.json"
+ALLOCATOR_LOCK = "ids.lock"
+ALLOCATOR_SCHEMA_VERSION = 1
+
+
+class IdAllocator:
+    """Monotonic epic and task numbers for one .flux/ tree."""
+
+    def __init__(self, state_dir: Path, flux_dir: Path):
+        self.path = state_dir / ALLOCATOR_FILE
+        self.lock_path = state_dir / ALLOCATOR_LOCK
+        self.flux_dir = flux_dir
+
+    @contextmanager
+    def _locked(self) -> Iterator[dict]:
+        """Exclusive lock; yields the allocator state and saves it on exit."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            _flock(lock, LOCK_EX)
+            try:
+                data = self._load()
+                yield data
+                atomic_write_json(self.path, data)
+            finally:
+                _flock(lock, LOCK_UN)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        if (
+            not isinstance(data, dict)
+            or data.get("schema_version") != ALLOCATOR_SCHEMA_VERSION
+            or not isinstance(data.get("epic"), (int, type(None)))
+            or not isinstance(data.get("tasks"), dict)
+        ):
+            # Missing or unreadable: every counter is healed from a scan on use
+            data = {"schema_version": ALLOCATOR_SCHEMA_VERSION, "epic": None, "tasks": {}}
+        data.pop("trees", None)  # Directory mtimes from older versions; no longer used
+        return data
+
+    def _epic_taken(self, number: int) -> bool:
+        """True if an epic (or orphaned spec) with this number exists on disk."""
+        return any(
+            True
+            for dirname, suffix in ((EPICS_DIR, ".json"), (SPECS_DIR, ".md"))
+            for pattern in (f"fn-{number}{suffix}", f"fn-{number}-*{suffix}")
+            for _ in (self.flux_dir / dirname).glob(pattern)
+        )
+
+    def _task_taken(self, epic_id: str, number: int) -> bool:
+        return (self.flux_dir / TASKS_DIR / f"{epic_id}.{number}.json").exists()
+
+    def _epic_base(self, data: dict, count: int = 1) -> int:
+        last = data["epic"]
+        if last is None or any(self._epic_taken(last + i) for i in range(1, count + 1)):
+            last = max(last or 0, scan_max_epic_id(self.flux_dir))
+        return last
+
+    def _task_base(self, data: dict, epic_id: str, count: int = 1) -> int:
+        last = data["tasks"].get(epic_id)
+        if not isinstance(last, int) or any(
+            self._task_taken(epic_id, last + i) for i in range(1, count + 1)
+        ):
+            last = max(last if isinstance(last, int) else 0, scan_max_task_id(self.flux_dir, epic_id))
+        return last
+
+    def allocate_epics(self, count: int = 1) -> list[int]:
+        """Reserve the next `count` epic numbers."""
+        with self._locked() as data:
+            base = self._epic_base(data, count)
+            data["epic"] = base + count
+        return list(range(base + 1, base + count + 1))
+
+    def allocate_tasks(self, epic_id: str, count: int = 1) -> list[int]:
+        """Reserve the next `count` task numbers of an epic."""
+        with self._locked() as data:
+            base = self._task_base(data, epic_id, count)
+            data["tasks"][epic_id] = base + count
+        return list(range(base + 1, base + count + 1))
+
+    def last_task(self, epic_id: str) -> int:
+        """Highest task number handed out for the epic (0 if none); read-only."""
+        return self._task_base(self._load(), epic_id)
+
+    def register_epic(self, epic_id: str) -> None:
+        """Start a new epic's task counter at 0, so its first task create needs no scan."""
+        with self._locked() as data:
+            data["tasks"].setdefault(epic_id, 0)
+
+
+def get_allocator() -> IdAllocator:
+    return IdAllocator(get_state_dir(), get_flux_dir())
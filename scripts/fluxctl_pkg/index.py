@@ -0,0 +1,395 @@
+"""
+fluxctl_pkg.index - Persistent task/epic index (in the state dir) validated by file signatures.
+
+List-style queries used to glob .flux/tasks/ and json.load every definition and
+runtime file on each call. The index keeps the normalized epic records and the
+merged (definition + runtime) task records in a single file. Every lookup
+re-stats the epic, task and runtime-state directories and re-reads only the
+entries whose (mtime_ns, size, inode) signature changed, so a warm index
+answers without opening per-task files.
+
+The index lives in `<state-dir>/task-index/`, one file per .flux/ directory
+(worktrees share the state dir but each has its own .flux/), so read-only
+commands never create or modify anything in the checkout.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from .utils import (
+    EPICS_DIR,
+    TASKS_DIR,
+    atomic_write,
+    ensure_flux_exists,
+    error_exit,
+    file_signatures,
+    get_flux_dir,
+    get_state_dir,
+    is_task_id,
+    json_output,
+    parse_id,
+    profile_span,
+)
+from .state import get_state_store, merge_task_runtime, normalize_epic
+
+
+INDEX_DIR = "task-index"
+INDEX_VERSION = 1
+
+# Files modified this close to the previous scan are re-read even when their
+# signature matches: coarse filesystem timestamps can hide a same-size rewrite
+# (same idea as git's "racily clean" index entries).
+RACY_WINDOW_NS = 2_000_000_000
+
+# In-process copy of the last index per .flux/ dir, so repeated lookups in one
+# invocation skip re-parsing the index file (entries are still re-validated).
+_MEMO: dict[str, dict] = {}
+
+
+def index_enabled() -> bool:
+    """Persisting the index can be disabled with FLUX_INDEX=0."""
+    return os.environ.get("FLUX_INDEX", "1") not in ("0", "false", "off")
+
+
+def index_path(flux_dir: Optional[Path] = None) -> Path:
+    flux_dir = flux_dir or get_flux_dir()
+    key = hashlib.sha1(os.path.realpath(flux_dir).encode("utf-8")).hexdigest()[:16]
+    return get_state_dir() / INDEX_DIR / f"{key}.json"
+
+
+class FluxIndex:
+    """Read-only view over indexed epics and tasks.
+
+    Accessors return shallow copies so callers can annotate records freely.
+    Entries whose file failed to parse carry the original load error, which is
+    raised (via error_exit) only when a query actually needs that entry.
+    """
+
+    def __init__(self, epics: dict[str, dict], tasks: dict[str, dict]):
+        self._epics = epics
+        self._tasks = tasks
+        self._by_epic: Optional[dict[str, list[str]]] = None
+
+    def _check(self, entry: dict, use_json: bool) -> Optional[dict]:
+        if entry.get("error"):
+            error_exit(entry["error"], use_json=use_json)
+        data = entry.get("data")
+        return dict(data) if isinstance(data, dict) else None
+
+    def epic_ids(self) -> list[str]:
+        """Epic IDs (file stems) sorted by epic number."""
+        return sorted(sorted(self._epics), key=lambda e: parse_id(e)[0] or 0)
+
+    def has_epic(self, epic_id: str) -> bool:
+        return epic_id in self._epics
+
+    def epic_error(self, epic_id: str) -> Optional[str]:
+        """Why an epic's file failed to load, or None."""
+        entry = self._epics.get(epic_id)
+        return entry.get("error") if entry else None
+
+    def epic(self, epic_id: str, use_json: bool = True) -> Optional[dict]:
+        entry = self._epics.get(epic_id)
+        if entry is None:
+            return None
+        return self._check(entry, use_json)
+
+    def epics(self, use_json: bool = True) -> list[dict]:
+        """All epics (normalized), sorted by epic number."""
+        result = []
+        for epic_id in sorted(self._epics):
+            data = self._check(self._epics[epic_id], use_json)
+            if data is not None:
+                result.append(data)
+        result.sort(key=lambda e: parse_id(e.get("id", ""))[0] or 0)
+        return result
+
+    def _group(self) -> dict[str, list[str]]:
+        if self._by_epic is None:
+            groups: dict[str, list[str]] = {}
+            for task_id in self._tasks:
+                groups.setdefault(task_id.rsplit(".", 1)[0], []).append(task_id)
+            for ids in groups.values():
+                ids.sort(key=lambda t: parse_id(t)[1] or 0)
+            self._by_epic = groups
+        return self._by_epic
+
+    def task(self, task_id: str, use_json: bool = True) -> Optional[dict]:
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return None
+        return self._check(entry, use_json)
+
+    def tasks_for_epic(self, epic_id: str, use_json: bool = True) -> list[dict]:
+        """Tasks of one epic (merged with runtime state), sorted by task number."""
+        result = []
+        for task_id in self._group().get(epic_id, []):
+            data = self._check(self._tasks[task_id], use_json)
+            if data is not None and "id" in data:
+                result.append(data)
+        return result
+
+    def all_tasks(self, use_json: bool = True) -> list[dict]:
+        """All tasks (merged with runtime state), in task file name order."""
+        result = []
+        for task_id in sorted(self._tasks):
+            data = self._check(self._tasks[task_id], use_json)
+            if data is not None and "id" in data:
+                result.append(data)
+        return result
+
+    def iter_epics(
+        self,
+        status: Optional[str] = None,
+        key: Optional[Callable[[str], Any]] = None,
+        after: Any = None,
+        use_json: bool = True,
+    ) -> Iterator[dict]:
+        """Epics sorted by key(epic_id) (epic number by default), optionally
+        only those sorting after `after`. Filters are checked against the
+        stored record, so skipped epics are never copied."""
+        key = key or (lambda epic_id: (parse_id(epic_id)[0] or 0, epic_id))
+        for epic_id in sorted(self._epics, key=key):
+            if after is not None and key(epic_id) <= after:
+                continue
+            entry = self._epics[epic_id]
+            data = entry.get("data")
+            if status and isinstance(data, dict) and data.get("status") != status:
+                continue
+            data = self._check(entry, use_json)
+            if data is not None:
+                yield data
+
+    def iter_tasks(
+        self,
+        epic_id: Optional[str] = None,
+        status: Optional[str] = None,
+        assignee: Optional[str] = None,
+        key: Optional[Callable[[str], Any]] = None,
+        after: Any = None,
+        use_json: bool = True,
+    ) -> Iterator[dict]:
+        """Tasks (merged with runtime state) sorted by key(task_id) (task ID by
+        default), optionally only those sorting after `after`. Filters are
+        checked against the stored record, so skipped tasks are never copied."""
+        key = key or (lambda task_id: task_id)
+        task_ids = self._group().get(epic_id, []) if epic_id else self._tasks
+        for task_id in sorted(task_ids, key=key):
+            if after is not None and key(task_id) <= after:
+                continue
+            entry = self._tasks[task_id]
+            data = entry.get("data")
+            if isinstance(data, dict) and (
+                (status and data.get("status") != status)
+                or (assignee and data.get("assignee") != assignee)
+            ):
+                continue
+            data = self._check(entry, use_json)
+            if data is not None and "id" in data:
+                yield data
+
+    def task_counts(self, use_json: bool = True) -> dict[str, list[int]]:
+        """epic_id -> [tasks, done tasks], read off the stored records."""
+        counts: dict[str, list[int]] = {}
+        for epic_id, task_ids in self._group().items():
+            count = counts.setdefault(epic_id, [0, 0])
+            for task_id in task_ids:
+                entry = self._tasks[task_id]
+                if entry.get("error"):
+                    self._check(entry, use_json)
+                data = entry.get("data")
+                if not isinstance(data, dict) or "id" not in data:
+                    continue
+                count[0] += 1
+                if data.get("status") == "done":
+                    count[1] += 1
+        return counts
+
+
+def _load_persisted(path: Path) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return None
+    return data
+
+
+def _read_json_entry(path: Path, what: str) -> dict:
+    """Load one JSON file into an index entry, capturing errors instead of exiting."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {"data": json.load(f), "error": None}
+    except FileNotFoundError:
+        return {"data": None, "error": f"{what} missing: {path}"}
+    except json.JSONDecodeError as e:
+        return {"data": None, "error": f"{what} invalid JSON: {path} ({e})"}
+    except Exception as e:
+        return {"data": None, "error": f"{what} unreadable: {path} ({e})"}
+
+
+def _trusted(old: Optional[dict], sig: list, cutoff_ns: int) -> bool:
+    return old is not None and old.get("sig") == sig and sig[0] < cutoff_ns
+
+
+def build_index(use_json: bool = True, rebuild: bool = False) -> tuple[FluxIndex, dict]:
+    """Validate the persisted index against the tree and refresh changed entries.
+
+    Returns (index, stats) where stats reports how many entries were re-read.
+    """
+    with profile_span("index", "load") as span:
+        index, stats = _build_index(use_json, rebuild)
+        span.update(stats)
+        return index, stats
+
+
+def _build_index(use_json: bool, rebuild: bool) -> tuple[FluxIndex, dict]:
+    flux_dir = get_flux_dir()
+    epics_dir = flux_dir / EPICS_DIR
+    tasks_dir = flux_dir / TASKS_DIR
+    store = get_state_store()
+    state_dir = str(store.state_dir)
+    memo_key = str(flux_dir)
+
+    previous = None
+    if not rebuild:
+        previous = _MEMO.get(memo_key)
+        if previous is None and index_enabled():
+            previous = _load_persisted(index_path(flux_dir))
+        if previous is not None and previous.get("state_dir") != state_dir:
+            previous = None
+
+    scanned_at_ns = time.time_ns()
+    cutoff_ns = (previous or {}).get("scanned_at_ns", 0) - RACY_WINDOW_NS
+    old_epics = (previous or {}).get("epics", {})
+    old_tasks = (previous or {}).get("tasks", {})
+
+    epic_sigs = file_signatures(epics_dir, ".json", prefix="fn-")
+    task_sigs = {
+        stem: sig
+        for stem, sig in file_signatures(tasks_dir, ".json", prefix="fn-").items()
+        if is_task_id(stem)
+    }
+    state_sigs = store.runtime_signatures()
+
+    stats = {"epics": len(epic_sigs), "tasks": len(task_sigs), "reloaded": 0}
+
+    epics: dict[str, dict] = {}
+    for epic_id, sig in epic_sigs.items():
+        old = old_epics.get(epic_id)
+        if _trusted(old, sig, cutoff_ns):
+            epics[epic_id] = old
+            continue
+        entry = _read_json_entry(epics_dir / f"{epic_id}.json", f"Epic {epic_id}")
+        if isinstance(entry["data"], dict):
+            entry["data"] = normalize_epic(entry["data"])
+        elif entry["error"] is None:
+            entry["data"] = None
+        entry["sig"] = sig
+        epics[epic_id] = entry
+        stats["reloaded"] += 1
+
+    tasks: dict[str, dict] = {}
+    stale: list[str] = []
+    for task_id, sig in task_sigs.items():
+        old = old_tasks.get(task_id)
+        state_sig = state_sigs.get(task_id) if state_sigs is not None else None
+        if (
+            state_sigs is not None
+            and _trusted(old, sig, cutoff_ns)
+            and old.get("state_sig") == state_sig
+            and (state_sig is None or state_sig[0] < cutoff_ns)
+        ):
+            tasks[task_id] = old
+        else:
+            stale.append(task_id)
+
+    if stale:
+        # One bulk read for all stale runtime records: a full directory pass
+        # (or query) when most of the index is stale, targeted reads otherwise.
+        if len(stale) * 2 >= len(task_sigs):
+            runtimes = store.load_all()
+        else:
+            runtimes = store.load_many(stale)
+        for task_id in stale:
+            entry = _read_json_entry(tasks_dir / f"{task_id}.json", f"Task {task_id}")
+            if isinstance(entry["data"], dict):
+                entry["data"] = merge_task_runtime(entry["data"], runtimes.get(task_id))
+            elif entry["error"] is None:
+                entry["data"] = None
+            entry["sig"] = task_sigs[task_id]
+            entry["state_sig"] = state_sigs.get(task_id) if state_sigs is not None else None
+            tasks[task_id] = entry
+        stats["reloaded"] += len(stale)
+
+    changed = (
+        stats["reloaded"] > 0
+        or previous is None
+        or len(epics) != len(old_epics)
+        or len(tasks) != len(old_tasks)
+    )
+    snapshot = previous
+    if changed:
+        snapshot = {
+            "version": INDEX_VERSION,
+            "state_dir": state_dir,
+            "scanned_at_ns": scanned_at_ns,
+            "epics": epics,
+            "tasks": tasks,
+        }
+        if index_enabled() and flux_dir.exists():
+            _persist(flux_dir, snapshot)
+    _MEMO[memo_key] = snapshot
+    return FluxIndex(epics, tasks), stats
+
+
+def _persist(flux_dir: Path, snapshot: dict) -> None:
+    """Best-effort write; a read-only state dir just falls back to rescanning."""
+    path = index_path(flux_dir)
+    try:
+        atomic_write(path, json.dumps(snapshot, separators=(",", ":"), default=str))
+    except OSError:
+        pass
+
+
+def get_index(use_json: bool = True) -> FluxIndex:
+    """Get an up-to-date index of all epics and tasks."""
+    index, _ = build_index(use_json=use_json)
+    return index
+
+
+def cmd_index(args: argparse.Namespace) -> None:
+    """Show (or force a rebuild of) the persistent task/epic index."""
+    if not ensure_flux_exists():
+        error_exit(
+            ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
+        )
+    started = time.perf_counter()
+    _, stats = build_index(use_json=args.json, rebuild=args.rebuild)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    path = index_path()
+    if args.json:
+        json_output(
+            {
+                "path": str(path),
+                "enabled": index_enabled(),
+                "rebuilt": args.rebuild,
+                "epics": stats["epics"],
+                "tasks": stats["tasks"],
+                "reloaded": stats["reloaded"],
+                "elapsed_ms": elapsed_ms,
+            }
+        )
+    else:
+        action = "Rebuilt" if args.rebuild else "Validated"
+        print(
+            f"{action} index {path}: {stats['epics']} epics, {stats['tasks']} tasks "
+            f"({stats['reloaded']} re-read) in {elapsed_ms}ms"
+        )
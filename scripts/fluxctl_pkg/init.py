@@ -7,7 +7,6 @@ import fnmatch
 import json
 import os
 import re
-import subprocess
 from pathlib import Path
 from typing import Any, Optional
 
@@ -38,9 +37,13 @@ from .utils import (
     current_flux_version,
 )
 from .state import (
+    JournalFileStateStore,
+    LocalFileStateStore,
+    SqliteStateStore,
+    get_state_backend,
     get_state_dir,
     get_state_store,
-    load_task_with_state,
+    load_tasks_with_state_bulk,
     normalize_epic,
     load_meta,
     save_meta,
@@ -49,9 +52,10 @@ from .state import (
     choose_current_objective,
     load_all_epics,
 )
-from .config import get_default_config, deep_merge, load_flux_config
+from .config import get_default_config, deep_merge, load_flux_config, set_config
 from .ralph import find_active_runs
 from .architecture import ARCHITECTURE_TEMPLATE
+from .git import GitError, get_git
 
 
 # ---------------------------------------------------------------------------
@@ -208,6 +212,12 @@ def cmd_init(args: argparse.Namespace) -> None:
             atomic_write_json(config_path, merged)
             actions.append("upgraded config.json (added missing keys)")
 
+    # The task index used to live in .flux/; it is in the state dir now
+    legacy_index = flux_dir / ".index.json"
+    if legacy_index.exists():
+        legacy_index.unlink()
+        actions.append("removed .index.json (the task index now lives in the state dir)")
+
     ensure_brain_layout(repo_root, flux_dir, actions)
 
     # Output
@@ -296,7 +306,6 @@ def cmd_status(args: argparse.Namespace) -> None:
 
     if flux_exists:
         epics_dir = flux_dir / EPICS_DIR
-        tasks_dir = flux_dir / TASKS_DIR
 
         if epics_dir.exists():
             for epic_file in epics_dir.glob("fn-*.json"):
@@ -308,19 +317,11 @@ def cmd_status(args: argparse.Namespace) -> None:
                 except Exception:
                     pass
 
-        if tasks_dir.exists():
-            for task_file in tasks_dir.glob("fn-*.json"):
-                task_id = task_file.stem
-                if not is_task_id(task_id):
-                    continue  # Skip non-task files (e.g., fn-1.2-review.json)
-                try:
-                    # Use merged state for accurate status counts
-                    task_data = load_task_with_state(task_id, use_json=True)
-                    status = task_data.get("status", "todo")
-                    if status in task_counts:
-                        task_counts[status] += 1
-                except Exception:
-                    pass
+        # Use merged state for accurate status counts
+        for task_data in load_tasks_with_state_bulk(use_json=True):
+            status = task_data.get("status", "todo")
+            if status in task_counts:
+                task_counts[status] += 1
 
     # Get active runs
     active_runs = find_active_runs()
@@ -418,6 +419,8 @@ def cmd_status(args: argparse.Namespace) -> None:
 def cmd_state_path(args: argparse.Namespace) -> None:
     """Show resolved state directory path."""
     state_dir = get_state_dir()
+    backend = get_state_backend(use_json=args.json)
+    store = get_state_store(backend)
 
     if args.task:
         if not is_task_id(args.task):
@@ -425,14 +428,29 @@ def cmd_state_path(args: argparse.Namespace) -> None:
                 f"Invalid task ID: {args.task}. Expected format: fn-N.M or fn-N-slug.M (e.g., fn-1.2, fn-1-add-auth.2)",
                 use_json=args.json,
             )
-        state_path = state_dir / "tasks" / f"{args.task}.state.json"
+        if isinstance(store, SqliteStateStore):
+            # All task records live in one database
+            state_path = store.db_path
+        else:
+            state_path = state_dir / "tasks" / f"{args.task}.state.json"
         if args.json:
-            json_output({"state_dir": str(state_dir), "task_state_path": str(state_path)})
+            payload = {
+                "state_dir": str(state_dir),
+                "backend": backend,
+                "task_state_path": str(state_path),
+            }
+            if isinstance(store, JournalFileStateStore):
+                # The state file is only the snapshot; newer updates live here
+                payload["journal_path"] = str(store.journal_path)
+            json_output(payload)
         else:
             print(state_path)
     else:
         if args.json:
-            json_output({"state_dir": str(state_dir)})
+            payload = {"state_dir": str(state_dir), "backend": backend}
+            if isinstance(store, JournalFileStateStore):
+                payload["journal_path"] = str(store.journal_path)
+            json_output(payload)
         else:
             print(state_dir)
 
@@ -786,27 +804,13 @@ def _generate_agentmap_yaml(target_dir: Path, filters: list[str], ignores: list[
     if target_dir.resolve() == Path.home().resolve():
         return "\n".join(_agentmap_render_yaml(tree)) + "\n", 0
 
-    try:
-        subprocess.run(
-            ["git", "rev-parse", "--git-dir"],
-            cwd=target_dir,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-    except subprocess.CalledProcessError:
+    git = get_git(target_dir)
+    if not git.is_repo():
         return "\n".join(_agentmap_render_yaml(tree)) + "\n", 0
 
     try:
-        result = subprocess.run(
-            ["git", "ls-files"],
-            cwd=target_dir,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        tracked_files = [line.strip() for line in result.stdout.splitlines() if line.strip()]
-    except subprocess.CalledProcessError:
+        tracked_files = git.ls_files()
+    except GitError:
         tracked_files = []
 
     for rel_path in sorted(tracked_files):
@@ -909,6 +913,59 @@ def cmd_agentmap(args: argparse.Namespace) -> None:
 # cmd_migrate_state
 # ---------------------------------------------------------------------------
 
+def _migrate_state_backend(args: argparse.Namespace) -> None:
+    """Copy runtime state from the current backend into args.to and switch config."""
+    source_backend = get_state_backend(use_json=args.json)
+    if source_backend == args.to:
+        error_exit(
+            f"Runtime state already uses the '{args.to}' backend", use_json=args.json
+        )
+    source = get_state_store(source_backend)
+    target = get_state_store(args.to)
+
+    if isinstance(source, LocalFileStateStore) and isinstance(target, LocalFileStateStore):
+        # file <-> journal share the per-task state files: fold (or drop a
+        # stale) journal instead of copying records onto themselves.
+        if isinstance(source, JournalFileStateStore):
+            source.compact()
+        if isinstance(target, JournalFileStateStore):
+            target.compact(discard=True)
+        copied = sorted(source.load_all())
+        args.clean = False
+    else:
+        copied = []
+        for task_id, data in sorted(source.load_all().items()):
+            with target.lock_task(task_id):
+                target.save_runtime(task_id, data)
+            copied.append(task_id)
+
+    if args.clean:
+        for task_id in copied:
+            with source.lock_task(task_id):
+                source.delete_runtime(task_id)
+
+    set_config("state.backend", args.to)
+    env_override = os.environ.get("FLUX_STATE_BACKEND")
+
+    if args.json:
+        payload = {
+            "from": source_backend,
+            "to": args.to,
+            "migrated": copied,
+            "cleaned": args.clean,
+        }
+        if env_override:
+            payload["warning"] = f"FLUX_STATE_BACKEND={env_override} overrides config"
+        json_output(payload)
+    else:
+        print(f"Migrated {len(copied)} task states: {source_backend} -> {args.to}")
+        if args.clean:
+            print(f"Removed migrated records from the {source_backend} backend")
+        print(f"Set state.backend = {args.to} in .flux/config.json")
+        if env_override:
+            print(f"Note: FLUX_STATE_BACKEND={env_override} overrides config")
+
+
 def cmd_migrate_state(args: argparse.Namespace) -> None:
     """Migrate runtime state from definition files to state-dir."""
     if not ensure_flux_exists():
@@ -916,6 +973,10 @@ def cmd_migrate_state(args: argparse.Namespace) -> None:
             ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
         )
 
+    if args.to:
+        _migrate_state_backend(args)
+        return
+
     flux_dir = get_flux_dir()
     tasks_dir = flux_dir / TASKS_DIR
     store = get_state_store()
@@ -930,13 +991,14 @@ def cmd_migrate_state(args: argparse.Namespace) -> None:
             print("No tasks directory found.")
         return
 
+    existing = store.load_all()
     for task_file in tasks_dir.glob("fn-*.json"):
         task_id = task_file.stem
         if not is_task_id(task_id):
             continue  # Skip non-task files (e.g., fn-1.2-review.json)
 
         # Check if state file already exists
-        if store.load_runtime(task_id) is not None:
+        if task_id in existing:
             skipped.append(task_id)
             continue
 
@@ -0,0 +1,140 @@
+"""
+fluxctl_pkg.listing - Output formats, field projection and paging for `list`, `tasks` and `epics`.
+
+`--json` prints one indented document once every record is collected.
+`--format jsonl` instead writes one compact record per line as it is produced,
+`--fields id,status,title` projects each record onto the named fields (any
+field of the underlying epic/task, missing ones are null) and `--limit N`
+stops after N records. When records remain, the output ends with the cursor
+to pass as `--cursor` for the next page: the ID of the last record returned.
+Pages resume after that ID in the command's sort order, so a cursor stays
+valid when records are added or removed in between.
+"""
+
+import argparse
+import json
+import sys
+from typing import Callable, Iterable, Iterator, Optional
+
+from .utils import error_exit, json_output
+
+
+OUTPUT_FORMATS = ["text", "json", "jsonl"]
+
+
+def output_format(args: argparse.Namespace) -> str:
+    """Resolve --format/--json; machine formats also report errors as JSON."""
+    fmt = args.format or ("json" if args.json else "text")
+    args.json = fmt != "text"
+    return fmt
+
+
+def parse_fields(args: argparse.Namespace, fmt: str) -> Optional[list[str]]:
+    if not args.fields:
+        return None
+    if fmt == "text":
+        error_exit("--fields requires --json or --format jsonl", use_json=False)
+    fields = [name.strip() for name in args.fields.split(",") if name.strip()]
+    if not fields:
+        error_exit("--fields needs at least one field name", use_json=True)
+    return fields
+
+
+def check_paging(args: argparse.Namespace, valid_cursor: Callable[[str], bool]) -> None:
+    if args.limit is not None and args.limit < 1:
+        error_exit("--limit must be at least 1", use_json=args.json)
+    if args.cursor is not None and not valid_cursor(args.cursor):
+        error_exit(
+            f"Invalid cursor: {args.cursor}. Pass the next_cursor of a previous page.",
+            use_json=args.json,
+        )
+
+
+def project(record: dict, data: dict, fields: Optional[list[str]]) -> dict:
+    """record, or just the named fields, looked up in record then data."""
+    if fields is None:
+        return record
+    return {name: record[name] if name in record else data.get(name) for name in fields}
+
+
+def task_summary(task_data: dict) -> dict:
+    return {
+        "id": task_data["id"],
+        "epic": task_data["epic"],
+        "title": task_data["title"],
+        "status": task_data["status"],
+        "priority": task_data.get("priority"),
+        "depends_on": task_data.get("depends_on", task_data.get("deps", [])),
+    }
+
+
+def epic_summary(epic_data: dict, counts: dict[str, list[int]]) -> dict:
+    """Epic record with its task counts (see FluxIndex.task_counts)."""
+    task_count, done_count = counts.get(epic_data["id"], [0, 0])
+    return {
+        "id": epic_data["id"],
+        "title": epic_data["title"],
+        "status": epic_data["status"],
+        "tasks": task_count,
+        "done": done_count,
+    }
+
+
+class Page:
+    """Yields at most `limit` records; next_cursor is set once it stops early."""
+
+    def __init__(self, records: Iterable[dict], limit: Optional[int]):
+        self._records = records
+        self.limit = limit
+        self.count = 0
+        self.next_cursor: Optional[str] = None
+
+    def __iter__(self) -> Iterator[dict]:
+        last_id = None
+        for data in self._records:
+            if self.limit is not None and self.count >= self.limit:
+                self.next_cursor = last_id
+                return
+            yield data
+            last_id = data["id"]
+            self.count += 1
+
+
+def write_jsonl(record: dict) -> None:
+    sys.stdout.write(json.dumps(record, default=str) + "\n")
+
+
+def write_next_cursor(page: Page) -> None:
+    """JSONL trailer when the page stopped early."""
+    if page.next_cursor is not None:
+        write_jsonl({"next_cursor": page.next_cursor})
+
+
+def emit_records(
+    args: argparse.Namespace,
+    fmt: str,
+    page: Page,
+    summarize: Callable[[dict], dict],
+    key: str,
+) -> Optional[list[dict]]:
+    """Write a page of records as json/jsonl; for text, return the summaries."""
+    fields = parse_fields(args, fmt)
+    if fmt == "jsonl":
+        for data in page:
+            write_jsonl(project(summarize(data), data, fields))
+        write_next_cursor(page)
+        return None
+
+    records = [project(summarize(data), data, fields) for data in page]
+    if fmt == "json":
+        result = {key: records, "count": len(records)}
+        if args.limit is not None or args.cursor is not None:
+            result["next_cursor"] = page.next_cursor
+        json_output({"success": True, **result})
+        return None
+    return records
+
+
+def print_next_cursor(page: Page) -> None:
+    if page.next_cursor is not None:
+        print(f"\nMore results: --cursor {page.next_cursor}")
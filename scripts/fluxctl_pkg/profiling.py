@@ -0,0 +1,221 @@
+"""
+fluxctl_pkg.profiling - Opt-in per-command profile: FLUX_PROFILE=1 or `fluxctl --profile <command>`.
+
+While active, the process records:
+
+- spans: startup (interpreter entry to dispatch), parse and the command, and
+  inside it the central helpers in utils: load_json*, atomic_write,
+  json_output, run_subprocess, plus the task index refresh. Each span's self
+  time is split into phases: load, write, output, subprocess, and compute
+  for what the command does itself.
+- counters from a sys audit hook: files opened (read/write), bytes read
+  (size of files opened for reading), directory scans, renames, unlinks and
+  every subprocess spawned; bytes written by atomic_write/json_output.
+
+The report goes to stderr as JSON, or to FLUX_PROFILE_OUT / --profile-out.
+With FLUX_PROFILE_FORMAT=chrome / --profile-format chrome it is a Chrome
+trace-event file (chrome://tracing, https://ui.perfetto.dev) holding every
+span, with the JSON summary under "otherData".
+"""
+
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from . import STARTED_NS
+from . import utils
+
+
+PROFILE_FORMATS = ("json", "chrome")
+PHASES = ("load", "write", "output", "subprocess")
+MAX_SUBPROCESSES = 100  # Individually listed in the JSON report
+MAX_SPANS = 25  # Aggregated span names listed in the JSON report
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND
+
+_ACTIVE: Optional["Profiler"] = None
+_HOOKED = False
+
+
+def _audit(event: str, args: tuple) -> None:
+    profiler = _ACTIVE
+    if profiler is None:
+        return
+    counters = profiler.counters
+    if event == "open":
+        path, mode, flags = args
+        if path is None or isinstance(path, int):
+            return  # os.fdopen / open(fd): already counted when the fd was opened
+        writing = ("w" in mode or "a" in mode or "x" in mode or "+" in mode) if mode else bool(
+            flags & _WRITE_FLAGS
+        )
+        counters["files_opened"] += 1
+        if writing:
+            counters["files_opened_for_write"] += 1
+            return
+        try:
+            counters["bytes_read"] += os.stat(path).st_size
+        except (OSError, TypeError, ValueError):
+            pass
+    elif event in ("os.scandir", "os.listdir"):
+        counters["dir_scans"] += 1
+    elif event == "os.rename":
+        counters["renames"] += 1
+    elif event in ("os.remove", "os.rmdir"):
+        counters["unlinks"] += 1
+    elif event == "subprocess.Popen":
+        counters["subprocesses"] += 1
+
+
+class Profiler:
+    """Spans and counters for one command."""
+
+    def __init__(self, argv: list[str]):
+        self.argv = list(argv)
+        self.command: Optional[str] = None
+        self.out = os.environ.get("FLUX_PROFILE_OUT") or None
+        self.format = os.environ.get("FLUX_PROFILE_FORMAT") or "json"
+        self.started_ns = time.perf_counter_ns()
+        self.spans: list[dict] = []
+        self.counters: Counter = Counter()
+        self._children: list[int] = []  # Child time of each open span
+
+    @contextmanager
+    def span(self, name: str, cat: str, **args: Any) -> Iterator[dict]:
+        """Time a block; yields its args dict so callers can add results."""
+        start = time.perf_counter_ns()
+        self._children.append(0)
+        try:
+            yield args
+        finally:
+            dur = time.perf_counter_ns() - start
+            child = self._children.pop()
+            if self._children:
+                self._children[-1] += dur
+            self.spans.append(
+                {"name": name, "cat": cat, "ts": start, "dur": dur, "self": dur - child, "args": args}
+            )
+
+    def add_span(self, name: str, cat: str, start_ns: int, end_ns: int) -> None:
+        """A span measured elsewhere (startup happens before profiling starts)."""
+        self.spans.append(
+            {"name": name, "cat": cat, "ts": start_ns, "dur": end_ns - start_ns, "self": end_ns - start_ns, "args": {}}
+        )
+
+    # --- Reports ---
+
+    def summary(self, finished_ns: int) -> dict:
+        phases = Counter()
+        by_name: dict[tuple[str, str], list[int]] = {}
+        subprocesses = []
+        for span in self.spans:
+            phase = span["cat"] if span["cat"] in PHASES else None
+            if span["cat"] == "command":
+                phase = "compute"
+            elif span["cat"] in ("startup", "parse"):
+                phase = span["cat"]
+            if phase:
+                phases[phase] += span["self"]
+            stats = by_name.setdefault((span["cat"], span["name"]), [0, 0, 0])
+            stats[0] += 1
+            stats[1] += span["dur"]
+            stats[2] += span["self"]
+            if span["cat"] == "subprocess" and len(subprocesses) < MAX_SUBPROCESSES:
+                subprocesses.append({**span["args"], "ms": _ms(span["dur"])})
+
+        ordered = ("startup", "parse", "load", "compute", "write", "subprocess", "output")
+        spans = sorted(by_name.items(), key=lambda item: -item[1][1])[:MAX_SPANS]
+        return {
+            "command": self.command,
+            "argv": self.argv,
+            "wall_ms": _ms(finished_ns - STARTED_NS),
+            "phases_ms": {phase: _ms(phases.get(phase, 0)) for phase in ordered},
+            "counters": {
+                key: self.counters.get(key, 0)
+                for key in (
+                    "files_opened",
+                    "files_opened_for_write",
+                    "bytes_read",
+                    "bytes_written",
+                    "dir_scans",
+                    "renames",
+                    "unlinks",
+                    "subprocesses",
+                )
+            },
+            "subprocesses": subprocesses,
+            "spans": [
+                {"name": name, "cat": cat, "count": count, "total_ms": _ms(total), "self_ms": _ms(own)}
+                for (cat, name), (count, total, own) in spans
+            ],
+        }
+
+    def chrome_trace(self, summary: dict) -> dict:
+        pid = os.getpid()
+        events = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": f"fluxctl {self.command}"}}
+        ]
+        for span in sorted(self.spans, key=lambda s: (s["ts"], -s["dur"])):
+            events.append(
+                {
+                    "name": span["name"],
+                    "cat": span["cat"],
+                    "ph": "X",
+                    "ts": round((span["ts"] - STARTED_NS) / 1000, 3),
+                    "dur": round(span["dur"] / 1000, 3),
+                    "pid": pid,
+                    "tid": 0,
+                    "args": {k: v for k, v in span["args"].items() if v is not None},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": summary}
+
+    def write_report(self) -> None:
+        summary = self.summary(time.perf_counter_ns())
+        report = self.chrome_trace(summary) if self.format == "chrome" else summary
+        content = json.dumps(report, indent=None if self.format == "chrome" else 2, default=str)
+        if self.out:
+            try:
+                with open(self.out, "w", encoding="utf-8") as f:
+                    f.write(content + "\n")
+                return
+            except OSError as e:
+                print(f"fluxctl: cannot write profile to {self.out}: {e}", file=sys.stderr)
+        print(content, file=sys.stderr)
+
+
+def _ms(ns: int) -> float:
+    return round(ns / 1_000_000, 3)
+
+
+def start(argv: list[str]) -> Profiler:
+    """Activate profiling for this process (the startup span ends now)."""
+    global _ACTIVE, _HOOKED
+    profiler = Profiler(argv)
+    profiler.add_span("startup", "startup", STARTED_NS, profiler.started_ns)
+    if not _HOOKED:
+        sys.addaudithook(_audit)  # Cannot be removed: _audit checks _ACTIVE
+        _HOOKED = True
+    _ACTIVE = profiler
+    utils.set_profiler(profiler)
+    return profiler
+
+
+def configure(profiler: Profiler, command: str, out: Optional[str], fmt: Optional[str]) -> None:
+    """Apply the parsed --profile-out/--profile-format (override the environment)."""
+    profiler.command = command
+    profiler.out = out or profiler.out
+    profiler.format = fmt or profiler.format
+    if profiler.format not in PROFILE_FORMATS:
+        profiler.format = "json"
+
+
+def finish(profiler: Profiler) -> None:
+    """Deactivate and write the report."""
+    global _ACTIVE
+    _ACTIVE = None
+    utils.set_profiler(None)
+    profiler.write_report()
@@ -0,0 +1,473 @@
+"""
+fluxctl_pkg.query - `fluxctl query`: filter and aggregate tasks or epics in one pass over the index.
+
+    query      := [tasks | epics] [expr] [group by FIELD] [count]
+    expr       := term (or term)*
+    term       := factor (and factor)*
+    factor     := not factor | ( expr ) | has_dep [( expr )] | comparison
+    comparison := FIELD (= | == | != | < | <= | > | >=) VALUE
+                | FIELD [not] in ( VALUE [, VALUE]* )
+
+FIELD is any key of the task/epic record (tasks also have `deps`, epics
+`tasks` and `done` counts). VALUE is a number, null, true, false, a quoted
+string or a bare word (fn-1.2, todo). Comparisons against a missing or
+mismatched value are false, as in SQL. `has_dep` matches records with any
+dependency; `has_dep(expr)` those with a dependency matching expr, so
+"todo, priority < 3, every dependency done" is
+
+    status = todo and priority < 3 and not has_dep(status != done)
+
+The query compiles once into a predicate. Equality on status, epic and
+assignee that must hold for every match (top-level `and`) is pushed down to
+FluxIndex.iter_tasks, which selects the epic's task list directly and skips
+other records before they are copied; everything else is evaluated per
+record in the same pass.
+"""
+
+import argparse
+import re
+from typing import Any, Callable, Optional
+
+from .utils import ensure_flux_exists, error_exit, is_epic_id, is_task_id, json_output, parse_id
+from .index import get_index
+from .listing import (
+    Page,
+    check_paging,
+    emit_records,
+    epic_summary,
+    output_format,
+    print_next_cursor,
+    task_summary,
+    write_jsonl,
+)
+
+
+SOURCES = ("tasks", "epics")
+KEYWORDS = {"and", "or", "not", "in", "group", "by", "count", "has_dep"}
+PUSHDOWN_FIELDS = {"tasks": ("epic", "status", "assignee"), "epics": ("status",)}
+
+_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op>==|!=|<=|>=|=|<|>)
+      | (?P<punct>[(),])
+      | (?P<word>[^\s"'(),=!<>]+)
+    )""",
+    re.VERBOSE,
+)
+
+Predicate = Callable[[dict], bool]
+
+
+class QueryError(Exception):
+    """Invalid query text."""
+
+
+def tokenize(text: str) -> list[tuple[str, Any, int]]:
+    """(kind, value, offset) tokens; kind is string, op, punct, word or end."""
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        if text[pos:].strip() == "":
+            break
+        match = _TOKEN_RE.match(text, pos)
+        if not match:
+            raise QueryError(f"unexpected character {text[pos:].lstrip()[0]!r} at {pos}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        offset = match.start(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        tokens.append((kind, value, offset))
+        pos = match.end()
+    tokens.append(("end", None, len(text)))
+    return tokens
+
+
+def _literal(token: tuple[str, Any, int]) -> Any:
+    kind, value, _ = token
+    if kind == "string":
+        return value
+    lowered = value.lower()
+    if lowered in ("null", "none"):
+        return None
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    if op in ("=", "=="):
+        return left == right
+    if op == "!=":
+        return left != right
+    if left is None or right is None:
+        return False
+    try:
+        if op == "<":
+            return left < right
+        if op == "<=":
+            return left <= right
+        if op == ">":
+            return left > right
+        return left >= right
+    except TypeError:
+        return False
+
+
+class Query:
+    """A parsed query: source, compiled predicate, pushdown and aggregation."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._tokens = tokenize(text)
+        self._pos = 0
+        self.source = "tasks"
+        following = self._tokens[min(1, len(self._tokens) - 1)]
+        if self._peek_word() in SOURCES and not (
+            following[0] == "op" or (following[0] == "word" and following[1].lower() in ("in", "not"))
+        ):
+            self.source = self._next()[1].lower()  # Not a comparison on a field of that name
+        # Top-level conjuncts field = value, collected while parsing
+        self.pushdown: dict[str, Any] = {}
+        self.group_by: Optional[str] = None
+        self.count = False
+        # Dependency lookups for has_dep; bound to the index by run_query
+        self._lookup: Callable[[str], dict] = lambda dep_id: {"id": dep_id}
+
+        self.predicate: Optional[Predicate] = None
+        self.described = "true"
+        if self._peek_word() not in ("group", "count") and self._peek()[0] != "end":
+            self.predicate, self.described = self._expr(top=True)
+        if self._peek_word() == "group":
+            self._next()
+            self._expect_word("by")
+            self.group_by = self._field()
+        if self._peek_word() == "count":
+            self._next()
+            self.count = True
+        if self._peek()[0] != "end":
+            raise self._error("expected and, or, group by, count or end of query")
+
+    # --- Parsing ---
+
+    def _peek(self) -> tuple[str, Any, int]:
+        return self._tokens[self._pos]
+
+    def _peek_word(self) -> Optional[str]:
+        kind, value, _ = self._peek()
+        return value.lower() if kind == "word" else None
+
+    def _next(self) -> tuple[str, Any, int]:
+        token = self._tokens[self._pos]
+        self._pos += 1
+        return token
+
+    def _error(self, message: str) -> QueryError:
+        kind, value, offset = self._peek()
+        found = "end of query" if kind == "end" else repr(value)
+        return QueryError(f"{message} at {offset} (found {found})")
+
+    def _expect_word(self, word: str) -> None:
+        if self._peek_word() != word:
+            raise self._error(f"expected '{word}'")
+        self._next()
+
+    def _expect_punct(self, punct: str) -> None:
+        kind, value, _ = self._peek()
+        if kind != "punct" or value != punct:
+            raise self._error(f"expected '{punct}'")
+        self._next()
+
+    def _field(self) -> str:
+        kind, value, _ = self._peek()
+        if kind != "word" or value.lower() in KEYWORDS:
+            raise self._error("expected a field name")
+        self._next()
+        return value
+
+    def _value(self) -> Any:
+        kind, value, _ = self._peek()
+        if kind not in ("word", "string") or (kind == "word" and value.lower() in KEYWORDS):
+            raise self._error("expected a value")
+        return _literal(self._next())
+
+    def _expr(self, top: bool = False) -> tuple[Predicate, str]:
+        terms = [self._term(top)]
+        while self._peek_word() == "or":
+            self._next()
+            terms.append(self._term(False))
+        if len(terms) == 1:
+            return terms[0]
+        if top:
+            self.pushdown = {}  # A disjunction: nothing holds for every match
+        preds = [pred for pred, _ in terms]
+        return (lambda r: any(p(r) for p in preds)), "(" + " or ".join(d for _, d in terms) + ")"
+
+    def _term(self, top: bool) -> tuple[Predicate, str]:
+        factors = [self._factor(top)]
+        while self._peek_word() == "and":
+            self._next()
+            factors.append(self._factor(top))
+        if len(factors) == 1:
+            return factors[0]
+        preds = [pred for pred, _ in factors]
+        return (lambda r: all(p(r) for p in preds)), " and ".join(d for _, d in factors)
+
+    def _factor(self, top: bool) -> tuple[Predicate, str]:
+        word = self._peek_word()
+        if word == "not":
+            self._next()
+            pred, described = self._factor(False)
+            return (lambda r: not pred(r)), f"not {described}"
+        if self._peek()[:2] == ("punct", "("):
+            self._next()
+            result = self._expr()
+            self._expect_punct(")")
+            return result
+        if word == "has_dep":
+            self._next()
+            inner: Optional[Predicate] = None
+            described = "has_dep"
+            if self._peek()[:2] == ("punct", "("):
+                self._next()
+                inner, inner_described = self._expr()
+                self._expect_punct(")")
+                described = f"has_dep({inner_described})"
+            return self._has_dep(inner), described
+        return self._comparison(top)
+
+    def _comparison(self, top: bool) -> tuple[Predicate, str]:
+        field = self._field()
+        negate = self._peek_word() == "not"
+        if negate:
+            self._next()
+            if self._peek_word() != "in":
+                raise self._error("expected 'in' after 'not'")
+        if self._peek_word() == "in":
+            self._next()
+            self._expect_punct("(")
+            values = [self._value()]
+            while self._peek()[:2] == ("punct", ","):
+                self._next()
+                values.append(self._value())
+            self._expect_punct(")")
+            try:
+                members: Any = frozenset(values)
+            except TypeError:
+                members = values
+            get = self._getter(field)
+            described = f"{field} {'not in' if negate else 'in'} ({', '.join(map(repr, values))})"
+            if negate:
+                return (lambda r: get(r) not in members), described
+            return (lambda r: get(r) in members), described
+
+        kind, op, _ = self._peek()
+        if kind != "op":
+            raise self._error(f"expected a comparison after '{field}'")
+        self._next()
+        value = self._value()
+        op = "=" if op == "==" else op
+        if top and op == "=" and field in PUSHDOWN_FIELDS[self.source] and isinstance(value, str):
+            if self.pushdown.get(field, value) != value:
+                self.pushdown[field] = _NOTHING
+            else:
+                self.pushdown[field] = value
+        get = self._getter(field)
+        return (lambda r: _compare(op, get(r), value)), f"{field} {op} {value!r}"
+
+    # --- Compilation ---
+
+    def _getter(self, field: str) -> Callable[[dict], Any]:
+        if self.source == "tasks" and field == "deps":
+            return _task_deps
+        return lambda r: r.get(field)
+
+    def _has_dep(self, inner: Optional[Predicate]) -> Predicate:
+        if inner is None:
+            return lambda r: bool(self._deps_of(r))
+        return lambda r: any(inner(self._lookup(dep)) for dep in self._deps_of(r))
+
+    def _deps_of(self, record: dict) -> list[str]:
+        if self.source == "tasks":
+            return _task_deps(record)
+        return record.get("depends_on_epics") or []
+
+
+class _Nothing:
+    """Pushdown value for contradictory equalities (status = a and status = b)."""
+
+    def __repr__(self) -> str:
+        return "<nothing>"
+
+
+_NOTHING = _Nothing()
+
+
+def _task_deps(task: dict) -> list[str]:
+    return task.get("depends_on", task.get("deps")) or []
+
+
+def _task_sort_key(task_id: str) -> tuple:
+    epic_num, task_num = parse_id(task_id)
+    return (
+        epic_num if epic_num is not None else 0,
+        task_num if task_num is not None else 0,
+        task_id,
+    )
+
+
+def run_query(query: Query, after: Any = None, use_json: bool = True):
+    """Matching records (one pass, pushdown applied), plus epic task counts."""
+    index = get_index(use_json=use_json)
+    counts = index.task_counts(use_json=use_json)
+    if _NOTHING in query.pushdown.values():
+        return iter(()), counts
+
+    lookups: dict[str, dict] = {}
+
+    def lookup(dep_id: str) -> dict:
+        if dep_id not in lookups:
+            if query.source == "tasks":
+                found = index.task(dep_id, use_json=use_json)
+            else:
+                found = index.epic(dep_id, use_json=use_json)
+                if found is not None:
+                    found = {**found, **epic_summary(found, counts)}
+            lookups[dep_id] = found if found is not None else {"id": dep_id}
+        return lookups[dep_id]
+
+    query._lookup = lookup
+    predicate = query.predicate or (lambda r: True)
+    if query.source == "tasks":
+        records = index.iter_tasks(
+            epic_id=query.pushdown.get("epic"),
+            status=query.pushdown.get("status"),
+            assignee=query.pushdown.get("assignee"),
+            key=_task_sort_key,
+            after=after,
+            use_json=use_json,
+        )
+    else:
+        records = (
+            {**epic, **epic_summary(epic, counts)}
+            for epic in index.iter_epics(
+                status=query.pushdown.get("status"), after=after, use_json=use_json
+            )
+        )
+    return (record for record in records if predicate(record)), counts
+
+
+def _group_key(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return str(value)
+    return value
+
+
+def _group_order(key: Any) -> tuple:
+    """Nulls last; epic/task IDs in numeric order, anything else as text."""
+    epic_num, task_num = parse_id(key) if isinstance(key, str) else (None, None)
+    return (key is None, epic_num or 0, task_num or 0, str(key))
+
+
+def cmd_query(args: argparse.Namespace) -> None:
+    """Run a query over the task/epic index."""
+    fmt = output_format(args)
+    if not ensure_flux_exists():
+        error_exit(
+            ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
+        )
+    try:
+        query = Query(args.expr)
+    except QueryError as e:
+        error_exit(f"Invalid query: {e}", use_json=args.json)
+
+    if args.explain:
+        plan = {
+            "source": query.source,
+            "pushdown": {k: repr(v) if v is _NOTHING else v for k, v in query.pushdown.items()},
+            "predicate": query.described,
+            "group_by": query.group_by,
+            "count": query.count,
+        }
+        if args.json:
+            json_output({"plan": plan})
+        else:
+            for key, value in plan.items():
+                print(f"{key}: {value}")
+        return
+
+    aggregate = query.group_by is not None or query.count
+    if aggregate and (args.fields or args.limit is not None or args.cursor is not None):
+        error_exit("--fields/--limit/--cursor do not apply to group by/count", use_json=args.json)
+    valid_cursor = is_task_id if query.source == "tasks" else is_epic_id
+    check_paging(args, valid_cursor)
+    after = None
+    if args.cursor:
+        after = (
+            _task_sort_key(args.cursor)
+            if query.source == "tasks"
+            else (parse_id(args.cursor)[0] or 0, args.cursor)
+        )
+    records, counts = run_query(query, after=after, use_json=args.json)
+
+    if query.group_by is None and query.count:
+        total = sum(1 for _ in records)
+        if fmt == "text":
+            print(total)
+        elif fmt == "jsonl":
+            write_jsonl({"count": total})
+        else:
+            json_output({"source": query.source, "count": total})
+        return
+
+    if query.group_by is not None:
+        groups: dict[Any, list[str]] = {}
+        for record in records:
+            groups.setdefault(_group_key(record.get(query.group_by)), []).append(record["id"])
+        rows = []
+        for key in sorted(groups, key=_group_order):
+            row = {"key": key, "count": len(groups[key])}
+            if not query.count:
+                row["ids"] = groups[key]
+            rows.append(row)
+        if fmt == "text":
+            for row in rows:
+                ids = f": {', '.join(row['ids'])}" if "ids" in row else ""
+                print(f"{row['key']}  {row['count']}{ids}")
+        elif fmt == "jsonl":
+            for row in rows:
+                write_jsonl(row)
+        else:
+            json_output(
+                {
+                    "source": query.source,
+                    "group_by": query.group_by,
+                    "groups": rows,
+                    "count": sum(row["count"] for row in rows),
+                }
+            )
+        return
+
+    if query.source == "tasks":
+        summarize = task_summary
+    else:
+        summarize = lambda epic: epic_summary(epic, counts)  # noqa: E731
+    page = Page(records, args.limit)
+    rows = emit_records(args, fmt, page, summarize, query.source)
+    if rows is None:
+        return
+    if not rows:
+        print("No matches.")
+        return
+    for row in rows:
+        if query.source == "tasks":
+            print(f"[{row['status']}] {row['id']}: {row['title']}")
+        else:
+            print(f"[{row['status']}] {row['id']}: {row['title']} ({row['done']}/{row['tasks']} tasks done)")
+    print_next_cursor(page)
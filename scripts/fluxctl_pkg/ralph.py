@@ -18,6 +18,7 @@ from .utils import (
     get_repo_root,
     json_output,
     read_text_or_exit,
+    run_subprocess,
 )
 
 
@@ -48,7 +49,7 @@ def run_rp_cli(
     rp = require_rp_cli()
     cmd = [rp] + args
     try:
-        return subprocess.run(
+        return run_subprocess(
             cmd, capture_output=True, text=True, check=True, timeout=timeout
         )
     except subprocess.TimeoutExpired:
@@ -0,0 +1,183 @@
+"""
+fluxctl_pkg.references - Symbol reference index for review context hints.
+
+gather_context_hints used to run one `git grep -n -w <symbol>` per symbol: up
+to 10 symbols in each of up to 50 changed files, so hundreds of full-repo
+greps per impl review. ReferenceIndex.find() answers all symbols at once. It
+makes one pass over the tracked source files with a single alternation regex
+and git grep -w's word boundaries (ASCII letters, digits and underscore), and
+returns symbol -> [(path, line)] in git grep's order.
+
+Results are cached per blob in `<state-dir>/refs-index.json`, together with
+the set of symbols they cover and HEAD's tree SHA:
+
+- same tree, same symbols: no file is read (one rev-parse).
+- new tree: `git ls-tree` maps paths to blobs, and only blobs missing from
+  the cache are scanned (read through the shared `git cat-file --batch`).
+  Blobs that left the tree are dropped.
+- new symbols: cached blobs are rescanned for just those symbols.
+
+Files that differ from HEAD in the index or working tree (`git diff HEAD`)
+are read from disk and scanned on every call, like git grep would, and never
+cached.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .git import GitBackend, GitError
+from .utils import atomic_write
+
+
+# Source files searched for references (git grep pathspecs used to be "*.py" ...)
+REFERENCE_EXTENSIONS = (
+    ".py",
+    ".js", ".ts", ".tsx", ".jsx", ".mjs",
+    ".go",
+    ".rs",
+    ".c", ".h", ".cpp", ".hpp", ".cc", ".cxx",
+    ".java",
+    ".cs",
+)
+INDEX_FILE = "refs-index.json"
+INDEX_SCHEMA_VERSION = 1
+MAX_LINES_PER_FILE = 5  # Matching lines kept per symbol and file
+MAX_SYMBOLS = 5000  # Beyond this the cache starts over with the requested symbols
+BINARY_PROBE_BYTES = 8000  # Like git: a NUL in the first 8000 bytes means binary
+
+
+def _matcher(symbols: Iterable[str]) -> Optional["re.Pattern[bytes]"]:
+    """One regex for all symbols, matching whole words only (git grep -w)."""
+    words = sorted({s.encode("utf-8") for s in symbols if s}, key=lambda w: (-len(w), w))
+    if not words:
+        return None
+    alternation = b"|".join(re.escape(w) for w in words)
+    return re.compile(rb"(?<![A-Za-z0-9_])(?:" + alternation + rb")(?![A-Za-z0-9_])")
+
+
+def scan(content: bytes, pattern: Optional["re.Pattern[bytes]"]) -> dict[str, list[int]]:
+    """symbol -> first matching line numbers (1-based) in content."""
+    if pattern is None or b"\0" in content[:BINARY_PROBE_BYTES]:
+        return {}
+    hits: dict[str, list[int]] = {}
+    line, pos = 1, 0
+    for match in pattern.finditer(content):
+        line += content.count(b"\n", pos, match.start())
+        pos = match.start()
+        lines = hits.setdefault(match.group().decode("utf-8", errors="surrogateescape"), [])
+        if len(lines) < MAX_LINES_PER_FILE and (not lines or lines[-1] != line):
+            lines.append(line)
+    return hits
+
+
+def _is_source(path: str) -> bool:
+    return path.endswith(REFERENCE_EXTENSIONS)
+
+
+class ReferenceIndex:
+    """Cached symbol references over one repository's tracked source files."""
+
+    def __init__(self, git: GitBackend, cache_path: Optional[Path]):
+        self.git = git
+        self.cache_path = cache_path
+        self.stats = {"scanned": 0, "rescanned": 0, "reused": 0, "dirty": 0}
+
+    def _load(self) -> dict:
+        data = None
+        if self.cache_path is not None:
+            try:
+                with open(self.cache_path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+        if not isinstance(data, dict) or data.get("schema_version") != INDEX_SCHEMA_VERSION:
+            data = {"schema_version": INDEX_SCHEMA_VERSION, "tree": None, "symbols": [], "paths": {}, "blobs": {}}
+        return data
+
+    def _save(self, data: dict) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            atomic_write(self.cache_path, json.dumps(data, separators=(",", ":")))
+        except OSError:
+            pass  # The cache is an optimization; a read-only state dir just means rescans
+
+    def _committed(self, data: dict, tree: str) -> dict[str, str]:
+        """path -> blob SHA of HEAD's source files (ls-tree only when the tree changed)."""
+        if data["tree"] != tree:
+            data["tree"] = tree
+            data["paths"] = {p: sha for p, sha in self.git.ls_tree(tree).items() if _is_source(p)}
+        return data["paths"]
+
+    def _update_blobs(self, data: dict, committed: dict[str, str], wanted: set[str]) -> bool:
+        known = set(data["symbols"])
+        if len(known | wanted) > MAX_SYMBOLS:
+            data["blobs"], known = {}, set()
+        missing = wanted - known
+        blobs = data["blobs"]
+        live = set(committed.values())
+        changed = len(blobs) != len(live & blobs.keys()) or bool(missing)
+        for sha in [sha for sha in blobs if sha not in live]:
+            del blobs[sha]
+
+        full = _matcher(known | wanted)
+        partial = _matcher(missing)
+        for sha in sorted(live):
+            cached = blobs.get(sha)
+            if cached is not None and partial is None:
+                self.stats["reused"] += 1
+                continue
+            content = self.git.read_blob(sha, "") or b""
+            if cached is None:
+                blobs[sha] = scan(content, full)
+                self.stats["scanned"] += 1
+                changed = True
+            else:
+                cached.update(scan(content, partial))
+                self.stats["rescanned"] += 1
+        data["symbols"] = sorted(known | wanted)
+        return changed
+
+    def find(self, symbols: Iterable[str]) -> dict[str, list[tuple[str, int]]]:
+        """symbol -> [(path, line)], ordered by path then line (git grep order)."""
+        wanted = {s for s in symbols if s}
+        if not wanted:
+            return {}
+        tree = self.git.tree_sha("HEAD")
+        hits_by_path: dict[str, dict[str, list[int]]] = {}
+        try:
+            if tree is None:  # No commits yet: everything tracked is "dirty"
+                dirty = [p for p in self.git.ls_files() if _is_source(p)]
+            else:
+                data = self._load()
+                committed = self._committed(data, tree)
+                if self._update_blobs(data, committed, wanted):
+                    self._save(data)
+                hits_by_path = {path: data["blobs"].get(sha, {}) for path, sha in committed.items()}
+                dirty = [p for p in self.git.changed_files("HEAD", committed=False) if _is_source(p)]
+        except GitError:
+            return {}
+
+        pattern = _matcher(wanted)
+        for path in dirty:
+            self.stats["dirty"] += 1
+            try:
+                hits_by_path[path] = scan((self.git.cwd / path).read_bytes(), pattern)
+            except OSError:
+                hits_by_path.pop(path, None)  # Deleted in the working tree
+
+        references: dict[str, list[tuple[str, int]]] = {}
+        for path in sorted(hits_by_path):
+            for symbol, lines in hits_by_path[path].items():
+                if symbol in wanted:
+                    references.setdefault(symbol, []).extend((path, line) for line in lines)
+        return references
+
+
+def get_reference_index(repo_root: Path, state_dir: Optional[Path]) -> ReferenceIndex:
+    from .git import get_git
+
+    cache_path = state_dir / INDEX_FILE if state_dir is not None else None
+    return ReferenceIndex(get_git(repo_root), cache_path)
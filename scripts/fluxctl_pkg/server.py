@@ -0,0 +1,314 @@
+"""
+fluxctl_pkg.server - `fluxctl serve`: per-repo daemon that answers read commands over a Unix socket.
+
+The server keeps the argparse tree, repo context, state store and task index
+warm between calls. Each forwarded request runs the normal command function
+in-process (see __main__.run_captured) with the client's cwd and FLUX_* env,
+so output is byte-for-byte what a fresh process would print. Freshness comes
+from the same mtime checks a fresh process uses: the index re-stats .flux/ on
+every lookup, the config snapshot re-stats config.json, and the cached repo
+context is dropped whenever the git config file changes.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import stat
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from .client import (
+    FORWARDED_ENV_KEYS,
+    FORWARDED_ENV_PREFIXES,
+    is_private_dir,
+    is_read_command,
+    request,
+    socket_path,
+)
+from .config import reset_config_snapshots
+from .utils import (
+    ensure_flux_exists,
+    error_exit,
+    get_flux_dir,
+    get_repo_context,
+    get_repo_root,
+    json_output,
+    now_iso,
+    popen_subprocess,
+    reset_repo_context,
+)
+
+
+DEFAULT_IDLE_TIMEOUT = 1800  # seconds without requests before the server exits
+MAX_REQUEST_BYTES = 1 << 20
+
+
+def _source_signature() -> list:
+    """mtimes of the package sources; a change means the server is stale."""
+    package_dir = Path(__file__).parent
+    return sorted(
+        (entry.name, entry.stat().st_mtime_ns)
+        for entry in os.scandir(package_dir)
+        if entry.name.endswith(".py")
+    )
+
+
+def _mtime_ns(path: Optional[Path]) -> Optional[int]:
+    if path is None:
+        return None
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _forwarded_env() -> dict[str, str]:
+    return {
+        key: value
+        for key, value in os.environ.items()
+        if key.startswith(FORWARDED_ENV_PREFIXES) or key in FORWARDED_ENV_KEYS
+    }
+
+
+def _replace_env(env: dict[str, str]) -> None:
+    for key in list(_forwarded_env()):
+        del os.environ[key]
+    os.environ.update(env)
+
+
+class FluxServer:
+    """Accept loop for one repo's socket. Requests are handled one at a time."""
+
+    def __init__(self, flux_dir: Path, path: str, idle_timeout: float):
+        self.flux_dir = flux_dir.resolve()
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.started_at = now_iso()
+        self.requests = 0
+        self.running = True
+        self._source_sig = _source_signature()
+        self._git_config_mtime: Optional[int] = None
+        self._sock: Optional[socket.socket] = None
+        self._sock_ino: Optional[int] = None
+
+    def bind(self) -> None:
+        old_umask = os.umask(0o077)  # Socket is private to this user
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        sock.listen(64)
+        sock.settimeout(self.idle_timeout or None)
+        self._sock = sock
+        self._sock_ino = os.stat(self.path).st_ino
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        try:
+            # Only remove the socket if a newer server has not replaced it
+            if os.stat(self.path).st_ino == self._sock_ino:
+                os.unlink(self.path)
+        except OSError:
+            pass
+
+    def serve_forever(self) -> None:
+        while self.running:
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                break  # Idle: let the next call start fresh
+            with conn:
+                self._handle(conn)
+
+    def _handle(self, conn: socket.socket) -> None:
+        conn.settimeout(10)
+        chunks = []
+        size = 0
+        try:
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_REQUEST_BYTES:
+                    return
+                chunks.append(chunk)
+            payload = json.loads(b"".join(chunks))
+        except (OSError, ValueError):
+            return
+        response = self._dispatch(payload if isinstance(payload, dict) else {})
+        try:
+            conn.sendall(json.dumps(response).encode("utf-8"))
+        except OSError:
+            pass
+
+    def _dispatch(self, payload: dict) -> dict:
+        op = payload.get("op")
+        if op == "ping":
+            return self.status()
+        if op == "stop":
+            self.running = False
+            return {"stopped": True, **self.status()}
+        if op != "run":
+            return {"fallback": True, "reason": f"unknown op: {op}"}
+        if _source_signature() != self._source_sig:
+            # fluxctl was upgraded underneath us: answer nothing, shut down
+            self.running = False
+            return {"fallback": True, "reason": "stale"}
+        argv = payload.get("argv")
+        cwd = payload.get("cwd")
+        if not isinstance(argv, list) or not is_read_command(argv) or not isinstance(cwd, str):
+            return {"fallback": True, "reason": "not a read command"}
+        return self._run(argv, cwd, payload.get("env") or {})
+
+    def _run(self, argv: list[str], cwd: str, env: dict) -> dict:
+        from .__main__ import run_captured
+
+        saved_env = _forwarded_env()
+        try:
+            os.chdir(cwd)
+        except OSError:
+            return {"fallback": True, "reason": "cwd unavailable"}
+        _replace_env(env)
+        try:
+            self._refresh_repo_context()
+            if get_flux_dir().resolve() != self.flux_dir:
+                return {"fallback": True, "reason": "different repo"}
+            code, stdout, stderr = run_captured(argv)
+        finally:
+            _replace_env(saved_env)
+        self.requests += 1
+        return {"code": code, "stdout": stdout, "stderr": stderr}
+
+    def _refresh_repo_context(self) -> None:
+        """Drop cached git facts (actor, paths) when the git config changes."""
+        common_dir = get_repo_context().git_common_dir
+        mtime = _mtime_ns(common_dir / "config" if common_dir else None)
+        if mtime != self._git_config_mtime:
+            if self._git_config_mtime is not None:
+                reset_repo_context()
+                reset_config_snapshots()
+            self._git_config_mtime = mtime
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "flux_dir": str(self.flux_dir),
+            "socket": self.path,
+            "started_at": self.started_at,
+            "requests": self.requests,
+        }
+
+
+def _wait_for_server(path: str, timeout: float = 5.0) -> Optional[dict]:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = request(path, {"op": "ping"}, timeout=1.0)
+        if response:
+            return response
+        time.sleep(0.05)
+    return None
+
+
+def _prepare_socket_path(path: str, use_json: bool) -> None:
+    """Create the private socket dir and clear a stale socket, refusing anything we do not own."""
+    directory = os.path.dirname(path)
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    except OSError as e:
+        error_exit(f"Cannot create socket directory {directory}: {e}", use_json=use_json)
+    if not is_private_dir(directory):
+        error_exit(
+            f"Refusing to serve: {directory} must be a directory owned by you with mode 0700",
+            use_json=use_json,
+        )
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        error_exit(f"Refusing to replace {path}: not a socket owned by you", use_json=use_json)
+    os.unlink(path)  # Left behind by a server that did not exit cleanly
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    """Run (or control) the per-repo fluxctl server."""
+    if not hasattr(socket, "AF_UNIX"):
+        error_exit("fluxctl serve requires Unix domain sockets", use_json=args.json)
+    if not ensure_flux_exists():
+        error_exit(
+            ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
+        )
+    flux_dir = get_flux_dir()
+    path = socket_path(str(flux_dir))
+    running = request(path, {"op": "ping"}, timeout=2.0)
+
+    if args.status or args.stop:
+        if running is None:
+            if args.json:
+                json_output({"running": False, "socket": path})
+            else:
+                print(f"No fluxctl server running for {flux_dir}")
+            return
+        if args.stop:
+            running = request(path, {"op": "stop"}, timeout=2.0) or running
+        if args.json:
+            json_output({"running": not args.stop, **running})
+        else:
+            action = "Stopped" if args.stop else "Running"
+            print(
+                f"{action}: pid {running['pid']}, {running['requests']} requests "
+                f"since {running['started_at']} ({path})"
+            )
+        return
+
+    if running is not None:
+        error_exit(
+            f"fluxctl server already running (pid {running['pid']}) on {path}",
+            use_json=args.json,
+        )
+
+    if args.detach:
+        entry = Path(__file__).resolve().parent.parent / "fluxctl.py"
+        popen_subprocess(
+            [sys.executable, str(entry), "serve", "--idle-timeout", str(args.idle_timeout)],
+            cwd=str(get_repo_root()),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        started = _wait_for_server(path)
+        if started is None:
+            error_exit(f"fluxctl server did not start on {path}", use_json=args.json)
+        if args.json:
+            json_output({"running": True, **started})
+        else:
+            print(f"Started fluxctl server (pid {started['pid']}) on {path}")
+        return
+
+    _prepare_socket_path(path, args.json)
+    server = FluxServer(flux_dir, path, args.idle_timeout)
+    server.bind()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    if not args.json:
+        print(f"Serving {flux_dir} on {path} (Ctrl-C to stop)", file=sys.stderr)
+    try:
+        from .__main__ import run_captured
+
+        run_captured(["list", "--json"])  # Warm the parser and index up front
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
@@ -0,0 +1,334 @@
+"""
+fluxctl_pkg.session - SessionSnapshot: single-pass inputs for `session-state`, memoized per process.
+
+session-state used to load meta.json three times (prime state, architecture
+state, active objective), refresh the task index three times (objective
+choice, readiness, the epic's task list) and read the session phase twice.
+SessionSnapshot loads each input once and derives the whole answer from it.
+
+The answer is memoized per .flux/ directory on a fingerprint of stat
+signatures: meta.json, config.json, the architecture doc, the epic and task
+directories (fluxctl replaces files by rename, which touches the directory)
+and the state dir's entries (per-task state directory, journal, database,
+session phase; not the task index, which is derived from them). Like the task index, entries modified within the racy window
+of the memoized build are not trusted. Repeated calls in one process, e.g. a
+`fluxctl serve` session, then cost a handful of stat calls.
+"""
+
+import copy
+import os
+import time
+from typing import Any, Optional
+
+from .utils import (
+    CONFIG_FILE,
+    EPICS_DIR,
+    META_FILE,
+    TASKS_DIR,
+    ensure_flux_exists,
+    get_actor,
+    get_flux_dir,
+    get_state_dir,
+)
+from .state import (
+    choose_current_objective,
+    default_prime_state,
+    get_prime_state,
+    get_session_phase,
+    load_meta,
+    ready_state_for_epic,
+)
+from .architecture import architecture_doc_path, get_architecture_state
+from .index import INDEX_DIR, RACY_WINDOW_NS, get_index
+
+
+# In-process memo: .flux/ path -> (fingerprint, built_at_ns, result)
+_MEMO: dict[str, tuple[list, int, dict]] = {}
+
+IDLE_SESSION_PHASE = {"phase": "idle", "detail": None, "epic_id": None, "task_id": None, "updated_at": None}
+
+SESSION_ROUTES = {
+    "/flux:setup": {"skill": "flux-setup", "node": "Setup"},
+    "/flux:prime": {"skill": "flux-prime", "node": "Prime"},
+    "/flux:scope": {"skill": "flux-scope", "node": "Scope"},
+    "/flux:plan": {"skill": "flux-plan", "node": "Scope"},
+    "/flux:plan-review": {"skill": "flux-plan-review", "node": "Plan Review"},
+    "/flux:work": {"skill": "flux-work", "node": "Work"},
+    "/flux:impl-review": {"skill": "flux-impl-review", "node": "Impl Review"},
+    "/flux:epic-review": {"skill": "flux-epic-review", "node": "Epic Review"},
+    "/flux:grill": {"skill": "flux-grill", "node": "Grill"},
+    "/flux:tdd": {"skill": "flux-tdd", "node": "TDD"},
+    "/flux:design-interface": {
+        "skill": "flux-design-interface",
+        "node": "Design Interface",
+    },
+    "/flux:ubiquitous-language": {
+        "skill": "flux-ubiquitous-language",
+        "node": "Ubiquitous Language",
+    },
+    "/flux:propose": {"skill": "flux-propose", "node": "Propose"},
+    "/flux:rca": {"skill": "flux-rca", "node": "RCA"},
+    "/flux:dejank": {"skill": "dejank", "node": "Dejank"},
+    "/flux:reflect": {"skill": "flux-reflect", "node": "Reflect"},
+    "/flux:ruminate": {"skill": "flux-ruminate", "node": "Ruminate"},
+    "/flux:meditate": {"skill": "flux-meditate", "node": "Meditate"},
+    "/flux:remember": {"skill": "flux-remember", "node": "Remember"},
+    "/flux:improve": {"skill": "flux-improve", "node": "Improve"},
+    "/flux:autofix": {"skill": "flux-autofix", "node": "Autofix"},
+    "/flux:export-context": {
+        "skill": "flux-export-context",
+        "node": "Export Context",
+    },
+    "/flux:gate": {"skill": "flux-gate", "node": "Gate"},
+    "/flux:security-scan": {
+        "skill": "flux-security-scan",
+        "node": "Security Scan",
+    },
+    "/flux:security-review": {
+        "skill": "flux-security-review",
+        "node": "Security Review",
+    },
+    "/flux:threat-model": {
+        "skill": "flux-threat-model",
+        "node": "Threat Model",
+    },
+    "/flux:vuln-validate": {
+        "skill": "flux-vuln-validate",
+        "node": "Vuln Validate",
+    },
+    "/flux:sync": {"skill": "flux-sync", "node": "Sync"},
+    "/flux:desloppify": {"skill": "flux-desloppify", "node": "Desloppify"},
+    "/flux:skill-builder": {
+        "skill": "flux-skill-builder",
+        "node": "Skill Builder",
+    },
+    "/flux:profile": {"skill": "flux-profile", "node": "Profile"},
+    "/flux:ralph-init": {"skill": "flux-ralph-init", "node": "Ralph"},
+    "/flux:contribute": {"skill": "flux-contribute", "node": "Contribute"},
+    "/flux:upgrade": {"skill": "flux-upgrade", "node": "Upgrade"},
+    "/flux:release": {"skill": "flux-release", "node": "Release"},
+    "/flux:improve-claude-md": {
+        "skill": "flux-improve-claude-md",
+        "node": "Improve CLAUDE.md",
+    },
+}
+
+
+def route_for(next_action: Optional[str], state_name: str) -> dict[str, Any]:
+    """Router entry (command, skill, node) for a next action."""
+    if not next_action:
+        return {
+            "command": None,
+            "skill": None,
+            "node": None,
+            "reason": state_name,
+        }
+
+    command = next_action.split()[0]
+    route = SESSION_ROUTES.get(command, {})
+    return {
+        "command": command,
+        "skill": route.get("skill"),
+        "node": route.get("node"),
+        "reason": state_name,
+    }
+
+
+def _objective_summary(epic_data: Optional[dict]) -> Optional[dict]:
+    if not epic_data:
+        return None
+    return {
+        "id": epic_data["id"],
+        "title": epic_data["title"],
+        "objective_kind": epic_data["objective_kind"],
+        "scope_mode": epic_data["scope_mode"],
+        "workflow_phase": epic_data["workflow_phase"],
+        "workflow_step": epic_data["workflow_step"],
+        "workflow_status": epic_data["workflow_status"],
+    }
+
+
+class SessionSnapshot:
+    """Everything session-state reads, each loaded exactly once."""
+
+    def __init__(self, use_json: bool = True):
+        self.use_json = use_json
+        self.flux_exists = ensure_flux_exists()
+        self.meta = load_meta(use_json=use_json) if self.flux_exists else {}
+        self.prime = (
+            get_prime_state(use_json=use_json, meta=self.meta)
+            if self.flux_exists
+            else default_prime_state()
+        )
+        self.architecture = get_architecture_state(use_json=use_json, meta=self.meta)
+        self.session_phase = (
+            get_session_phase(use_json=use_json) if self.flux_exists else dict(IDLE_SESSION_PHASE)
+        )
+        self.index = get_index(use_json=use_json) if self.flux_exists else None
+        self.actor = get_actor()
+
+    def objective(self) -> Optional[dict]:
+        return choose_current_objective(
+            self.actor, use_json=self.use_json, index=self.index, meta=self.meta
+        )
+
+    def readiness(self, epic_id: str) -> dict:
+        return ready_state_for_epic(
+            epic_id, use_json=self.use_json, index=self.index, current_actor=self.actor
+        )
+
+    def _result(self, state: str, message: str, next_action: Optional[str], **fields) -> dict:
+        return {
+            "state": state,
+            "session_phase": self.session_phase,
+            "flux_exists": self.flux_exists,
+            **fields,
+            "message": message,
+            "next_action": next_action,
+            "router": route_for(next_action, state),
+        }
+
+    def session_state(self) -> dict:
+        """The session-state answer derived from this snapshot."""
+        if not self.flux_exists:
+            return self._result(
+                "fresh_session_no_objective",
+                "Flux is not initialized yet.",
+                "/flux:setup",
+                objective=None,
+                task=None,
+                prime=self.prime,
+                architecture=self.architecture,
+            )
+
+        epic_data = self.objective()
+        if self.prime.get("status") != "done":
+            return self._result(
+                "needs_prime",
+                "Flux is installed, but this repository has not been primed yet. Run /flux:prime before scoping or implementation.",
+                "/flux:prime",
+                objective=_objective_summary(epic_data),
+                task=None,
+                prime=self.prime,
+                architecture=self.architecture,
+            )
+
+        if not epic_data:
+            return self._result(
+                "fresh_session_no_objective",
+                "No open objective. Start a new feature, bug, upgrade, or refactor scope.",
+                "/flux:scope",
+                objective=None,
+                task=None,
+                prime=self.prime,
+                architecture=self.architecture,
+            )
+
+        readiness = self.readiness(epic_data["id"])
+        current_task = None
+        for task in readiness["in_progress"]:
+            if task.get("assignee") == self.actor:
+                current_task = task
+                break
+
+        all_tasks = self.index.tasks_for_epic(epic_data["id"], use_json=self.use_json)
+        if current_task:
+            state = "resume_work"
+            message = f"Resume task {current_task['id']} for {epic_data['title']}."
+            next_action = f"/flux:work {current_task['id']}"
+        elif all_tasks and all(t.get("status") == "done" for t in all_tasks) and epic_data.get("completion_review_status") != "ship":
+            state = "needs_completion_review"
+            message = f"Implementation is done for {epic_data['title']}, but completion review is pending."
+            next_action = f"/flux:epic-review {epic_data['id']}"
+        elif epic_data.get("workflow_status") in {"not_started", "in_progress", "needs_confirmation"}:
+            state = "resume_scope"
+            message = f"Resume scoping for {epic_data['title']} at {epic_data['workflow_phase']}."
+            next_action = f"/flux:scope {epic_data['title']}"
+        elif epic_data.get("workflow_status") == "ready_for_handoff":
+            state = "needs_review"
+            message = f"{epic_data['title']} is ready for handoff."
+            next_action = f"/flux:scope {epic_data['title']}"
+        elif readiness["ready"]:
+            state = "resume_work"
+            current_task = readiness["ready"][0]
+            message = f"Continue implementation with ready task {current_task['id']}."
+            next_action = f"/flux:work {current_task['id']}"
+        else:
+            state = "idle_with_open_epics"
+            message = f"{epic_data['title']} is open but waiting for the next decision."
+            next_action = epic_data.get("next_action") or f"/flux:scope {epic_data['title']}"
+
+        return self._result(
+            state,
+            message,
+            next_action,
+            prime=self.prime,
+            architecture=self.architecture,
+            objective=_objective_summary(epic_data),
+            task=None if not current_task else {"id": current_task["id"], "title": current_task["title"]},
+        )
+
+
+# --- Memo ---
+
+
+def _sig(path: str) -> Optional[list[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def session_fingerprint() -> list:
+    """Stat signatures of everything a SessionSnapshot reads (no file opens)."""
+    flux_dir = str(get_flux_dir())
+    state_dir = str(get_state_dir())
+    fingerprint: list = [
+        flux_dir,
+        state_dir,
+        get_actor(),
+        _sig(os.path.join(flux_dir, META_FILE)),
+        _sig(os.path.join(flux_dir, CONFIG_FILE)),
+        _sig(str(architecture_doc_path())),
+        _sig(os.path.join(flux_dir, EPICS_DIR)),
+        _sig(os.path.join(flux_dir, TASKS_DIR)),
+        _sig(os.path.join(state_dir, TASKS_DIR)),
+    ]
+    try:
+        with os.scandir(state_dir) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.name == INDEX_DIR:
+                    continue  # Derived from the inputs above; rewritten by every index refresh
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                fingerprint.append([entry.name, st.st_mtime_ns, st.st_size, st.st_ino])
+    except OSError:
+        pass
+    return fingerprint
+
+
+def _newest_mtime_ns(fingerprint: list) -> int:
+    return max(
+        (item[-3] for item in fingerprint if isinstance(item, list) and len(item) >= 3),
+        default=0,
+    )
+
+
+def get_session_state(use_json: bool = True) -> dict:
+    """session-state answer, reusing the last one while nothing it reads changed."""
+    fingerprint = session_fingerprint()
+    key = fingerprint[0]
+    cached = _MEMO.get(key)
+    if (
+        cached is not None
+        and cached[0] == fingerprint
+        and _newest_mtime_ns(fingerprint) < cached[1] - RACY_WINDOW_NS
+    ):
+        return copy.deepcopy(cached[2])
+    built_at_ns = time.time_ns()
+    result = SessionSnapshot(use_json=use_json).session_state()
+    _MEMO[key] = (fingerprint, built_at_ns, copy.deepcopy(result))
+    return result
@@ -5,18 +5,19 @@ epic normalization, workflow progress, objectives, and epic/task queries.
 
 import json
 import os
-import subprocess
+import time
 from abc import ABC, abstractmethod
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 from .utils import (
     ARTIFACTS_DIR,
-    EPICS_DIR,
     FLUX_DIR,
     IMPLEMENTATION_TARGETS,
     LOCK_EX,
+    LOCK_NB,
+    LOCK_SH,
     LOCK_UN,
     META_FILE,
     OBJECTIVE_KINDS,
@@ -35,12 +36,13 @@ from .utils import (
     atomic_write,
     atomic_write_json,
     error_exit,
+    file_signatures,
     get_actor,
     get_flux_dir,
     get_repo_root,
+    get_state_dir,
     is_epic_id,
     is_supported_schema,
-    is_task_id,
     load_json,
     load_json_or_exit,
     now_iso,
@@ -48,57 +50,138 @@ from .utils import (
     task_priority,
     workflow_phases_for_mode,
 )
-from .config import load_flux_config, get_default_config, deep_merge
+from .config import load_flux_config, get_config_snapshot, get_default_config, deep_merge
 
 
-# --- State Directory ---
+# --- StateStore (runtime task state) ---
+
+
+class VersionConflict(Exception):
+    """A runtime record changed since it was read (optimistic concurrency)."""
+
+    def __init__(self, task_id: str, expected: int, actual: int):
+        super().__init__(
+            f"Task {task_id} runtime state changed concurrently "
+            f"(expected version {expected}, found {actual})"
+        )
+        self.task_id = task_id
+        self.expected = expected
+        self.actual = actual
 
 
-def get_state_dir() -> Path:
-    """Get state directory for runtime task state.
+class StoreBusy(VersionConflict):
+    """Another process is writing runtime state; a CAS write gives up instead of waiting.
 
-    Resolution order:
-    1. FLUX_STATE_DIR env var (explicit override for orchestrators)
-    2. git common-dir (shared across all worktrees automatically)
-    3. Fallback to .flux/state for non-git repos
+    A VersionConflict, so compare-and-swap loops (update_task_runtimes) simply
+    back off and retry on fresh records.
     """
-    # 1. Explicit override
-    if state_dir := os.environ.get("FLUX_STATE_DIR"):
-        return Path(state_dir).resolve()
 
-    # 2. Git common-dir (shared across worktrees)
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--git-common-dir", "--path-format=absolute"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        common = result.stdout.strip()
-        return Path(common) / "flux-state"
-    except subprocess.CalledProcessError:
-        pass
+    def __init__(self, task_id: str):
+        Exception.__init__(self, f"Runtime state for {task_id} is being written by another process")
+        self.task_id = task_id
+        self.expected = None
+        self.actual = None
 
-    # 3. Fallback for non-git repos
-    return get_flux_dir() / "state"
 
+def runtime_version(runtime: Optional[dict]) -> int:
+    """Version of a runtime record: 0 when absent or written before versioning."""
+    if not runtime:
+        return 0
+    version = runtime.get("version")
+    return version if isinstance(version, int) else 0
 
-# --- StateStore (runtime task state) ---
+
+class WriteLog:
+    """Runtime records written while installed (see set_write_log).
+
+    Keeps each record as it was before its first write (None = absent) and
+    the version the last write left (0 = deleted), so batch --atomic can undo
+    exactly its own writes with compare-and-swap.
+    """
+
+    def __init__(self):
+        self.before: dict[str, Optional[dict]] = {}
+        self.versions: dict[str, int] = {}
+
+    def note(self, task_id: str, before: Optional[dict], version: int) -> None:
+        self.before.setdefault(task_id, before)
+        self.versions[task_id] = version
+
+
+_WRITE_LOG: Optional[WriteLog] = None
+
+
+def set_write_log(log: Optional[WriteLog]) -> None:
+    """Record every runtime write made through any store into log (None: stop)."""
+    global _WRITE_LOG
+    _WRITE_LOG = log
+
+
+def _note_write(task_id: str, before: Optional[dict], version: int) -> None:
+    if _WRITE_LOG is not None:
+        _WRITE_LOG.note(task_id, before, version)
+
+
+def _check_version(task_id: str, current: Optional[dict], expected: Optional[int]) -> None:
+    actual = runtime_version(current)
+    if expected is not None and expected != actual:
+        raise VersionConflict(task_id, expected, actual)
 
 
 class StateStore(ABC):
-    """Abstract interface for runtime task state storage."""
+    """Abstract interface for runtime task state storage.
+
+    Every runtime record carries a `version` that each save increments.
+    Writers read a record, compute the new one and save it with
+    expected_version set to the version they read; a concurrent change makes
+    the save raise VersionConflict instead of silently overwriting it.
+    """
 
     @abstractmethod
     def load_runtime(self, task_id: str) -> Optional[dict]:
         """Load runtime state for a task. Returns None if no state file."""
         ...
 
+    def save_runtime(
+        self, task_id: str, data: dict, expected_version: Optional[int] = None
+    ) -> int:
+        """Save runtime state for a task. Returns the new version.
+
+        Raises VersionConflict if expected_version is given and the stored
+        record's version differs (0 = no record yet).
+        """
+        expected = None if expected_version is None else {task_id: expected_version}
+        return self.save_many({task_id: data}, expected)[task_id]
+
     @abstractmethod
-    def save_runtime(self, task_id: str, data: dict) -> None:
-        """Save runtime state for a task."""
+    def save_many(
+        self, records: dict[str, dict], expected_versions: Optional[dict[str, int]] = None
+    ) -> dict[str, int]:
+        """Save several runtime records atomically: all are written or none.
+
+        Returns task ID -> new version. Raises VersionConflict (writing
+        nothing) if any task's stored version differs from expected_versions.
+        """
         ...
 
+    def _next_versions(
+        self, records: dict[str, dict], expected_versions: Optional[dict[str, int]]
+    ) -> dict[str, int]:
+        """Check expected versions and number the new records.
+
+        Callers hold the store's write lock, so the check and the write are
+        one atomic step.
+        """
+        expected_versions = expected_versions or {}
+        current = self.load_many(list(records))
+        versions = {}
+        for task_id in records:
+            _check_version(task_id, current.get(task_id), expected_versions.get(task_id))
+            versions[task_id] = runtime_version(current.get(task_id)) + 1
+        for task_id, version in versions.items():
+            _note_write(task_id, current.get(task_id), version)
+        return versions
+
     @abstractmethod
     def lock_task(self, task_id: str):
         """Context manager for exclusive task lock."""
@@ -109,9 +192,57 @@ class StateStore(ABC):
         """List all task IDs that have runtime state files."""
         ...
 
+    def load_many(self, task_ids: list[str]) -> dict[str, dict]:
+        """Load runtime state for several tasks. Missing tasks are omitted."""
+        result = {}
+        for task_id in task_ids:
+            runtime = self.load_runtime(task_id)
+            if runtime is not None:
+                result[task_id] = runtime
+        return result
+
+    def load_all(self) -> dict[str, dict]:
+        """Load runtime state for every task that has any."""
+        return self.load_many(self.list_runtime_files())
+
+    def runtime_signatures(self) -> Optional[dict[str, list]]:
+        """Map task ID -> change signature for its runtime state.
+
+        Used by the task index to detect changed runtime state without loading
+        it. Signatures are lists whose first element is an mtime in ns (0 when
+        the signature is exact, e.g. a database sequence number). Returning
+        None means the store cannot tell, so every task's runtime is reloaded.
+        """
+        return None
+
+    @abstractmethod
+    def delete_runtime(self, task_id: str, expected_version: Optional[int] = None) -> None:
+        """Remove runtime state for a task (no-op if none).
+
+        Raises VersionConflict (deleting nothing) if expected_version is given
+        and the stored record's version differs.
+        """
+        ...
+
+    @abstractmethod
+    def rename_runtime(self, old_task_id: str, new_task_id: str) -> None:
+        """Move runtime state to a new task ID (epic rename)."""
+        ...
+
 
 class LocalFileStateStore(StateStore):
-    """File-based state store with fcntl locking."""
+    """File-based state store: one JSON file per task.
+
+    Saves check and bump the record version under a short exclusive flock on
+    the state directory itself, so the hot path creates no lock files and a
+    crashed process never leaves a lock behind. Compare-and-swap writes (those
+    with expected versions, i.e. start/done/block) never wait for that lock:
+    if another process holds it they raise StoreBusy and the caller retries
+    with backoff, so one slow writer cannot stall every other task. Only
+    unconditional maintenance writes (migration, import) wait for it.
+    lock_task() (per-task lock files) remains for multi-step maintenance
+    operations.
+    """
 
     def __init__(self, state_dir: Path):
         self.state_dir = state_dir
@@ -124,21 +255,72 @@ class LocalFileStateStore(StateStore):
     def _lock_path(self, task_id: str) -> Path:
         return self.locks_dir / f"{task_id}.lock"
 
-    def load_runtime(self, task_id: str) -> Optional[dict]:
-        state_path = self._state_path(task_id)
-        if not state_path.exists():
-            return None
+    def _read_state_file(self, path: Path) -> Optional[dict]:
+        # Open directly instead of exists() + open(): a missing file is an IOError
         try:
-            with open(state_path, encoding="utf-8") as f:
+            with open(path, encoding="utf-8") as f:
                 return json.load(f)
         except (json.JSONDecodeError, IOError):
             return None
 
-    def save_runtime(self, task_id: str, data: dict) -> None:
-        self.tasks_dir.mkdir(parents=True, exist_ok=True)
-        state_path = self._state_path(task_id)
+    def load_runtime(self, task_id: str) -> Optional[dict]:
+        return self._read_state_file(self._state_path(task_id))
+
+    def load_many(self, task_ids: list[str]) -> dict[str, dict]:
+        result = {}
+        for task_id in task_ids:
+            runtime = self._read_state_file(self._state_path(task_id))
+            if runtime is not None:
+                result[task_id] = runtime
+        return result
+
+    def load_all(self) -> dict[str, dict]:
+        # Single directory pass instead of list_runtime_files() + per-task lookups
+        result = {}
+        try:
+            with os.scandir(self.tasks_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".state.json"):
+                        continue
+                    runtime = self._read_state_file(entry.path)
+                    if runtime is not None:
+                        result[entry.name[: -len(".state.json")]] = runtime
+        except FileNotFoundError:
+            pass
+        return result
+
+    def _write_state_file(self, task_id: str, data: dict) -> None:
         content = json.dumps(data, indent=2, sort_keys=True) + "\n"
-        atomic_write(state_path, content)
+        atomic_write(self._state_path(task_id), content)
+
+    @contextmanager
+    def _dir_lock(self, task_id: str, wait: bool = False):
+        """Exclusive flock on the tasks directory fd (held only for check + rename).
+
+        Without wait, raises StoreBusy (for task_id) if another process holds it.
+        """
+        self.tasks_dir.mkdir(parents=True, exist_ok=True)
+        if not LOCK_EX:
+            yield  # No fcntl (Windows): directories cannot be opened or locked
+            return
+        fd = os.open(self.tasks_dir, os.O_RDONLY)
+        try:
+            try:
+                _flock(fd, LOCK_EX if wait else LOCK_EX | LOCK_NB)
+            except BlockingIOError:
+                raise StoreBusy(task_id) from None
+            yield
+        finally:
+            os.close(fd)  # Releases the lock
+
+    def save_many(
+        self, records: dict[str, dict], expected_versions: Optional[dict[str, int]] = None
+    ) -> dict[str, int]:
+        with self._dir_lock(next(iter(records), ""), wait=expected_versions is None):
+            versions = self._next_versions(records, expected_versions)
+            for task_id, data in records.items():
+                self._write_state_file(task_id, {**data, "version": versions[task_id]})
+        return versions
 
     @contextmanager
     def lock_task(self, task_id: str):
@@ -160,10 +342,529 @@ class LocalFileStateStore(StateStore):
             for f in self.tasks_dir.glob("*.state.json")
         ]
 
+    def runtime_signatures(self) -> dict[str, list]:
+        return file_signatures(self.tasks_dir, ".state.json")
+
+    def delete_runtime(self, task_id: str, expected_version: Optional[int] = None) -> None:
+        with self._dir_lock(task_id, wait=expected_version is None):
+            current = self.load_runtime(task_id)
+            _check_version(task_id, current, expected_version)
+            if current is not None:
+                _note_write(task_id, current, 0)
+            self._state_path(task_id).unlink(missing_ok=True)
+
+    def rename_runtime(self, old_task_id: str, new_task_id: str) -> None:
+        # Under the save lock: a save landing between the read and the rename
+        # would otherwise be lost, and the record keeps its version for CAS
+        with self._dir_lock(old_task_id, wait=True):
+            data = self.load_runtime(old_task_id)
+            if data is None:
+                return
+            _note_write(old_task_id, data, 0)
+            _note_write(new_task_id, self.load_runtime(new_task_id), runtime_version(data))
+            self._state_path(old_task_id).rename(self._state_path(new_task_id))
+
+
+class JournalFileStateStore(LocalFileStateStore):
+    """Per-task state files plus an append-only journal (journal.jsonl).
+
+    save/delete/rename append one small JSON line to the journal instead of
+    rewriting a state file through a temp file, so back-to-back start/done
+    calls cost an append each. The per-task files are the snapshot: reads fold
+    the journal over them (last record per task wins). Once the journal grows
+    past the compaction threshold it is folded back into the snapshot files at
+    process exit, after the command's output has been written.
+
+    Saves, deletes and renames take an exclusive lock on locks/journal.lock
+    while they read the current record, check its version and append, so no
+    write lands in between. Compare-and-swap writes do not wait for the
+    lock: they raise StoreBusy and retry, as in LocalFileStateStore.
+    Compaction also takes the exclusive lock, so it never races an append.
+    Compaction installs a fresh journal file, so (inode, offset) identifies a
+    record for the index.
+
+    Config (state.journal.*):
+      fsync         "always" (every append), "batch" (once at exit or every
+                    FSYNC_BATCH appends, default) or "off"
+      compactBytes  journal size that triggers compaction (default 256 KiB)
+    """
+
+    JOURNAL_FILE = "journal.jsonl"
+    FSYNC_POLICIES = ("always", "batch", "off")
+    FSYNC_BATCH = 64
+    DEFAULT_COMPACT_BYTES = 256 * 1024
+
+    def __init__(self, state_dir: Path):
+        super().__init__(state_dir)
+        self.journal_path = state_dir / self.JOURNAL_FILE
+        self._journal_lock_path = self.locks_dir / "journal.lock"
+        config = get_config_snapshot()
+        fsync = str(config.get("state.journal.fsync", "batch") or "batch").lower()
+        self.fsync_policy = fsync if fsync in self.FSYNC_POLICIES else "batch"
+        self.compact_bytes = config.get_int("state.journal.compactBytes", self.DEFAULT_COMPACT_BYTES)
+        # Folded journal: task ID -> (runtime or None if deleted, record offset)
+        self._folded: dict[str, tuple[Optional[dict], int]] = {}
+        self._journal_ino: Optional[int] = None
+        self._journal_offset = 0
+        self._unsynced = 0
+        self._exit_hook = False
+
+    # --- journal reading ---
+
+    def _refresh(self) -> None:
+        """Fold journal records appended since the last call."""
+        try:
+            fd = os.open(self.journal_path, os.O_RDONLY)
+        except FileNotFoundError:
+            self._folded, self._journal_ino, self._journal_offset = {}, None, 0
+            return
+        with os.fdopen(fd, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_ino != self._journal_ino or st.st_size < self._journal_offset:
+                # Compacted (new file) or first read: fold from the start
+                self._folded, self._journal_ino, self._journal_offset = {}, st.st_ino, 0
+            if st.st_size == self._journal_offset:
+                return
+            f.seek(self._journal_offset)
+            chunk = f.read(st.st_size - self._journal_offset)
+        offset = self._journal_offset
+        # Only complete lines; a trailing partial line is an append in flight
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines(keepends=True):
+            record_offset = offset
+            offset += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Torn write from a crash; later records still apply
+            self._apply(record, record_offset)
+        self._journal_offset = offset
+
+    def _apply(self, record: dict, offset: int) -> None:
+        task_id = record.get("task")
+        if not isinstance(task_id, str):
+            return
+        op = record.get("op")
+        if op == "set" and isinstance(record.get("data"), dict):
+            self._folded[task_id] = (record["data"], offset)
+        elif op == "delete":
+            self._folded[task_id] = (None, offset)
+
+    def changes(self, since: int = 0) -> tuple[list[dict], int]:
+        """Journal records at or after byte offset `since` (a change feed).
+
+        Returns (records, next_offset); each record carries its "offset".
+        Offsets restart at 0 after compaction, which callers can detect by
+        next_offset < since.
+        """
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(since)
+                chunk = f.read()
+        except FileNotFoundError:
+            return [], 0
+        if since and not chunk and os.path.getsize(self.journal_path) < since:
+            return [], 0
+        records = []
+        offset = since
+        for line in chunk[: chunk.rfind(b"\n") + 1].splitlines(keepends=True):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if isinstance(record, dict):
+                records.append({**record, "offset": offset})
+            offset += len(line)
+        return records, offset
+
+    # --- journal writing ---
+
+    @contextmanager
+    def _journal_lock(self, lock_type, busy_task: Optional[str] = None):
+        """flock on locks/journal.lock; a LOCK_NB miss raises StoreBusy(busy_task) if given."""
+        self.locks_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._journal_lock_path, "a") as f:
+            try:
+                _flock(f, lock_type)
+            except BlockingIOError:
+                if busy_task is None:
+                    raise
+                raise StoreBusy(busy_task) from None
+            try:
+                yield
+            finally:
+                _flock(f, LOCK_UN)
+
+    def _append(self, *records: dict, locked: bool = False) -> None:
+        """Append records in one write (locked=True: caller holds the journal lock)."""
+        payload = "".join(
+            json.dumps({**r, "ts": now_iso()}, sort_keys=True, separators=(",", ":")) + "\n"
+            for r in records
+        ).encode("utf-8")
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        with nullcontext() if locked else self._journal_lock(LOCK_SH):
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, payload)  # Single write: concurrent appenders never interleave
+                self._unsynced += 1
+                if self.fsync_policy == "always" or (
+                    self.fsync_policy == "batch" and self._unsynced >= self.FSYNC_BATCH
+                ):
+                    os.fsync(fd)
+                    self._unsynced = 0
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+        if not self._exit_hook and (
+            size >= self.compact_bytes or (self._unsynced and self.fsync_policy == "batch")
+        ):
+            import atexit
+
+            atexit.register(self._at_exit)
+            self._exit_hook = True
+
+    def _at_exit(self) -> None:
+        try:
+            if self._unsynced and self.fsync_policy == "batch":
+                self.sync()
+            if self.journal_path.stat().st_size >= self.compact_bytes:
+                self.compact(wait=False)
+        except OSError:
+            pass  # Best effort: the next invocation compacts instead
+
+    def sync(self) -> None:
+        """fsync the journal now (flushes batched appends)."""
+        try:
+            fd = os.open(self.journal_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._unsynced = 0
+
+    def compact(self, wait: bool = True, discard: bool = False) -> bool:
+        """Fold the journal into the per-task state files and start a new journal.
+
+        With wait=False, gives up (returns False) if another process holds the
+        journal. discard=True drops the journal without applying it (used when
+        the plain file backend has been writing the snapshot files directly).
+        """
+        if not self.journal_path.exists():
+            return True
+        lock_type = LOCK_EX if wait else LOCK_EX | LOCK_NB
+        try:
+            with self._journal_lock(lock_type):
+                self._refresh()
+                if not discard:
+                    for task_id, (data, _) in self._folded.items():
+                        if data is None:
+                            super().delete_runtime(task_id)
+                        else:
+                            self.tasks_dir.mkdir(parents=True, exist_ok=True)
+                            self._write_state_file(task_id, data)
+                    if self.fsync_policy != "off":
+                        self.sync()
+                atomic_write(self.journal_path, "")
+        except BlockingIOError:
+            return False
+        self._folded, self._journal_ino, self._journal_offset = {}, None, 0
+        return True
+
+    # --- StateStore interface ---
+
+    def load_runtime(self, task_id: str) -> Optional[dict]:
+        self._refresh()  # Journal before snapshot: see compact()
+        folded = self._folded.get(task_id)
+        if folded is not None:
+            return folded[0]
+        return super().load_runtime(task_id)
+
+    def load_many(self, task_ids: list[str]) -> dict[str, dict]:
+        self._refresh()
+        result = super().load_many([t for t in task_ids if t not in self._folded])
+        for task_id in task_ids:
+            folded = self._folded.get(task_id)
+            if folded is not None and folded[0] is not None:
+                result[task_id] = folded[0]
+        return result
+
+    def load_all(self) -> dict[str, dict]:
+        self._refresh()
+        result = super().load_all()
+        for task_id, (data, _) in self._folded.items():
+            if data is None:
+                result.pop(task_id, None)
+            else:
+                result[task_id] = data
+        return result
+
+    def save_many(
+        self, records: dict[str, dict], expected_versions: Optional[dict[str, int]] = None
+    ) -> dict[str, int]:
+        task_id = next(iter(records), "")
+        with self._journal_lock(LOCK_EX if expected_versions is None else LOCK_EX | LOCK_NB, task_id):
+            versions = self._next_versions(records, expected_versions)
+            self._append(
+                *(
+                    {"op": "set", "task": task_id, "data": {**data, "version": versions[task_id]}}
+                    for task_id, data in records.items()
+                ),
+                locked=True,
+            )
+        return versions
+
+    def list_runtime_files(self) -> list[str]:
+        self._refresh()
+        ids = set(super().list_runtime_files())
+        for task_id, (data, _) in self._folded.items():
+            if data is None:
+                ids.discard(task_id)
+            else:
+                ids.add(task_id)
+        return sorted(ids)
+
+    def runtime_signatures(self) -> dict[str, list]:
+        self._refresh()
+        sigs = super().runtime_signatures()
+        for task_id, (data, offset) in self._folded.items():
+            if data is None:
+                sigs.pop(task_id, None)
+            else:
+                # Exact: journal records are immutable until compaction swaps the file
+                sigs[task_id] = [0, self._journal_ino, offset]
+        return sigs
+
+    def delete_runtime(self, task_id: str, expected_version: Optional[int] = None) -> None:
+        with self._journal_lock(LOCK_EX if expected_version is None else LOCK_EX | LOCK_NB, task_id):
+            current = self.load_runtime(task_id)
+            _check_version(task_id, current, expected_version)
+            if current is not None:
+                _note_write(task_id, current, 0)
+            self._append({"op": "delete", "task": task_id}, locked=True)
+
+    def rename_runtime(self, old_task_id: str, new_task_id: str) -> None:
+        with self._journal_lock(LOCK_EX):
+            data = self.load_runtime(old_task_id)
+            if data is None:
+                return
+            _note_write(old_task_id, data, 0)
+            _note_write(new_task_id, self.load_runtime(new_task_id), runtime_version(data))
+            self._append(
+                {"op": "set", "task": new_task_id, "data": data},
+                {"op": "delete", "task": old_task_id},
+                locked=True,
+            )
+
+
+class SqliteStateStore(StateStore):
+    """SQLite state store in the state dir (WAL mode).
+
+    One database replaces the per-task state and lock files, which keeps
+    flux-state/ small when many worktree agents run in parallel. lock_task()
+    is a BEGIN IMMEDIATE transaction, so claims serialize inside SQLite rather
+    than on fcntl lock files. Each write stamps the row with a database-wide
+    sequence number that doubles as an exact change signature for the index.
+    """
+
+    DB_FILE = "state.db"
+
+    def __init__(self, state_dir: Path):
+        self.state_dir = state_dir
+        self.db_path = state_dir / self.DB_FILE
+        self._conn = None
+        self._depth = 0
+
+    def _connect(self):
+        if self._conn is None:
+            import sqlite3
+
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            created = not self.db_path.exists()
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runtime ("
+                "task_id TEXT PRIMARY KEY, data TEXT NOT NULL, seq INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._conn = conn
+            if created:
+                # First use in this state dir: carry over existing per-task
+                # state files so switching backends never loses claims.
+                self.import_from(LocalFileStateStore(self.state_dir))
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        if self._depth:
+            self._depth += 1
+            try:
+                yield conn
+            finally:
+                self._depth -= 1
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._depth = 1
+        try:
+            yield conn
+        except BaseException:
+            self._depth = 0
+            conn.execute("ROLLBACK")
+            raise
+        self._depth = 0
+        conn.execute("COMMIT")
+
+    def _next_seq(self, conn) -> int:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('seq', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+        return conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()[0]
+
+    def load_runtime(self, task_id: str) -> Optional[dict]:
+        row = self._connect().execute(
+            "SELECT data FROM runtime WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+
+    def load_many(self, task_ids: list[str]) -> dict[str, dict]:
+        """Load runtime state for several tasks in one query per 500 IDs."""
+        conn = self._connect()
+        result: dict[str, dict] = {}
+        ids = list(task_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for task_id, data in conn.execute(
+                f"SELECT task_id, data FROM runtime WHERE task_id IN ({placeholders})",
+                chunk,
+            ):
+                try:
+                    result[task_id] = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+        return result
+
+    def load_all(self) -> dict[str, dict]:
+        result: dict[str, dict] = {}
+        for task_id, data in self._connect().execute("SELECT task_id, data FROM runtime"):
+            try:
+                result[task_id] = json.loads(data)
+            except json.JSONDecodeError:
+                continue
+        return result
+
+    def save_many(
+        self, records: dict[str, dict], expected_versions: Optional[dict[str, int]] = None
+    ) -> dict[str, int]:
+        with self._transaction() as conn:
+            versions = self._next_versions(records, expected_versions)
+            for task_id, data in records.items():
+                content = json.dumps({**data, "version": versions[task_id]}, sort_keys=True)
+                seq = self._next_seq(conn)
+                conn.execute(
+                    "INSERT INTO runtime (task_id, data, seq) VALUES (?, ?, ?) "
+                    "ON CONFLICT(task_id) DO UPDATE SET data = excluded.data, seq = excluded.seq",
+                    (task_id, content, seq),
+                )
+        return versions
+
+    @contextmanager
+    def lock_task(self, task_id: str):
+        """Hold a write transaction for the duration of the block."""
+        with self._transaction():
+            yield
+
+    def list_runtime_files(self) -> list[str]:
+        return [
+            row[0] for row in self._connect().execute("SELECT task_id FROM runtime")
+        ]
+
+    def runtime_signatures(self) -> dict[str, list]:
+        return {
+            task_id: [0, seq]
+            for task_id, seq in self._connect().execute("SELECT task_id, seq FROM runtime")
+        }
 
-def get_state_store() -> LocalFileStateStore:
-    """Get the state store instance."""
-    return LocalFileStateStore(get_state_dir())
+    def delete_runtime(self, task_id: str, expected_version: Optional[int] = None) -> None:
+        with self._transaction() as conn:
+            current = self.load_runtime(task_id)
+            _check_version(task_id, current, expected_version)
+            if current is not None:
+                _note_write(task_id, current, 0)
+            conn.execute("DELETE FROM runtime WHERE task_id = ?", (task_id,))
+
+    def rename_runtime(self, old_task_id: str, new_task_id: str) -> None:
+        with self._transaction() as conn:
+            data = self.load_runtime(old_task_id)
+            if data is not None:
+                _note_write(old_task_id, data, 0)
+                _note_write(new_task_id, self.load_runtime(new_task_id), runtime_version(data))
+            seq = self._next_seq(conn)
+            conn.execute(
+                "UPDATE runtime SET task_id = ?, seq = ? WHERE task_id = ?",
+                (new_task_id, seq, old_task_id),
+            )
+
+    def import_from(self, source: StateStore) -> list[str]:
+        """Copy records that are not in the database yet. Returns imported IDs."""
+        imported = []
+        with self._transaction():
+            existing = set(self.list_runtime_files())
+            for task_id, data in sorted(source.load_all().items()):
+                if task_id in existing:
+                    continue
+                self.save_runtime(task_id, data)
+                imported.append(task_id)
+        return imported
+
+
+STATE_BACKENDS = {
+    "file": LocalFileStateStore,
+    "journal": JournalFileStateStore,
+    "sqlite": SqliteStateStore,
+}
+
+# Store instances are reused within a process so the SQLite connection is
+# opened once; the configured backend comes from the config snapshot, which
+# is re-read only when config.json changes on disk.
+_STORES: dict[tuple[str, str], StateStore] = {}
+
+
+def get_state_backend(use_json: bool = True) -> str:
+    """Resolve the state backend: FLUX_STATE_BACKEND > config state.backend > file."""
+    backend = os.environ.get("FLUX_STATE_BACKEND")
+    if not backend:
+        backend = get_config_snapshot().get_str("state.backend") or "file"
+    backend = backend.strip().lower()
+    if backend not in STATE_BACKENDS:
+        error_exit(
+            f"Unknown state backend: {backend}. Valid: {', '.join(STATE_BACKENDS)}",
+            use_json=use_json,
+        )
+    return backend
+
+
+def get_state_store(backend: Optional[str] = None) -> StateStore:
+    """Get the state store instance for the configured (or given) backend."""
+    backend = backend or get_state_backend()
+    state_dir = get_state_dir()
+    key = (str(state_dir), backend)
+    store = _STORES.get(key)
+    if store is None:
+        store = _STORES[key] = STATE_BACKENDS[backend](state_dir)
+    return store
 
 
 # --- Task Loading with State Merge ---
@@ -186,43 +887,121 @@ def load_task_with_state(task_id: str, use_json: bool = True) -> dict:
 
     # Load runtime state
     store = get_state_store()
-    runtime = store.load_runtime(task_id)
+    return merge_task_runtime(definition, store.load_runtime(task_id))
 
+
+def merge_task_runtime(definition: dict, runtime: Optional[dict]) -> dict:
+    """Merge a task definition with its runtime state (None = no state file)."""
     if runtime is None:
         # Backward compat: extract runtime fields from definition
         runtime = {k: definition[k] for k in RUNTIME_FIELDS if k in definition}
         if not runtime:
             runtime = {"status": "todo"}
 
-    # Merge: runtime overwrites definition for runtime fields
+    # Merge: runtime overwrites definition for runtime fields ("version" is
+    # store bookkeeping, not task data)
     merged = {**definition, **runtime}
+    merged.pop("version", None)
     return normalize_task(merged)
 
 
+# Optimistic-concurrency retries: attempts and base backoff in seconds
+# (doubled per attempt, with jitter so racing workers spread out)
+CAS_ATTEMPTS = 8
+CAS_BACKOFF = 0.005
+
+
+def _cas_backoff(attempt: int) -> None:
+    import random  # Only on contention; keeps it off the startup path
+
+    time.sleep(CAS_BACKOFF * (2**attempt) * (1 + random.random()))
+
+
+def retry_busy(write: Callable[[], object]):
+    """Run a store write, retrying with backoff while the store is busy (StoreBusy).
+
+    For writes whose version check must not be redone on fresh records (such
+    as batch rollback); a real VersionConflict propagates at once.
+    """
+    for attempt in range(CAS_ATTEMPTS - 1):
+        try:
+            return write()
+        except StoreBusy:
+            _cas_backoff(attempt)
+    return write()
+
+
+def update_task_runtimes(
+    task_ids: list[str],
+    update: Callable[[dict[str, Optional[dict]]], dict[str, dict]],
+    store: Optional[StateStore] = None,
+    use_json: bool = True,
+) -> dict[str, dict]:
+    """Read-modify-write several tasks' runtime state as one compare-and-swap.
+
+    update(current) gets {task_id: stored record or None} and returns the
+    full new records to write (any subset of task_ids); it may call
+    error_exit to reject the change. The records are saved atomically against
+    the versions that were read; on a concurrent write update() is re-run on
+    fresh records, up to CAS_ATTEMPTS times. Returns the records as saved.
+    """
+    store = store or get_state_store()
+    for attempt in range(CAS_ATTEMPTS):
+        loaded = store.load_many(task_ids)
+        current = {task_id: loaded.get(task_id) for task_id in task_ids}
+        records = update(current)
+        expected = {task_id: runtime_version(current.get(task_id)) for task_id in records}
+        try:
+            versions = store.save_many(records, expected)
+        except VersionConflict:  # Including StoreBusy
+            if attempt + 1 < CAS_ATTEMPTS:
+                _cas_backoff(attempt)
+            continue
+        return {task_id: {**data, "version": versions[task_id]} for task_id, data in records.items()}
+    error_exit(
+        f"Runtime state for {', '.join(task_ids)} kept changing concurrently "
+        f"({CAS_ATTEMPTS} attempts); try again",
+        use_json=use_json,
+    )
+
+
+def update_task_runtime(
+    task_id: str,
+    update: Callable[[Optional[dict]], dict],
+    store: Optional[StateStore] = None,
+    use_json: bool = True,
+) -> dict:
+    """update_task_runtimes() for one task: update(current) returns the new record."""
+    saved = update_task_runtimes(
+        [task_id], lambda current: {task_id: update(current[task_id])}, store, use_json
+    )
+    return saved[task_id]
+
+
 def save_task_runtime(task_id: str, updates: dict) -> None:
     """Write runtime state only (merge with existing). Never touch definition file."""
-    store = get_state_store()
-    with store.lock_task(task_id):
-        current = store.load_runtime(task_id) or {"status": "todo"}
-        merged = {**current, **updates, "updated_at": now_iso()}
-        store.save_runtime(task_id, merged)
+    update_task_runtime(
+        task_id,
+        lambda current: {**(current or {"status": "todo"}), **updates, "updated_at": now_iso()},
+    )
 
 
 def reset_task_runtime(task_id: str) -> None:
     """Reset runtime state to baseline (overwrite, not merge). Used by task reset."""
-    store = get_state_store()
-    with store.lock_task(task_id):
-        # Overwrite with clean baseline state
-        store.save_runtime(task_id, {"status": "todo", "updated_at": now_iso()})
+    update_task_runtime(task_id, lambda current: {"status": "todo", "updated_at": now_iso()})
 
 
 def delete_task_runtime(task_id: str) -> None:
     """Delete runtime state file entirely. Used by checkpoint restore when no runtime."""
     store = get_state_store()
-    with store.lock_task(task_id):
-        state_path = store._state_path(task_id)
-        if state_path.exists():
-            state_path.unlink()
+    for attempt in range(CAS_ATTEMPTS):
+        try:
+            store.delete_runtime(task_id, expected_version=runtime_version(store.load_runtime(task_id)))
+            return
+        except VersionConflict:  # Including StoreBusy
+            if attempt + 1 < CAS_ATTEMPTS:
+                _cas_backoff(attempt)
+    error_exit(f"Runtime state for {task_id} kept changing concurrently ({CAS_ATTEMPTS} attempts); try again")
 
 
 def save_task_definition(task_id: str, definition: dict) -> None:
@@ -376,9 +1155,10 @@ def save_meta(meta: dict) -> None:
     atomic_write_json(get_flux_dir() / META_FILE, meta)
 
 
-def get_active_objective(use_json: bool = True) -> Optional[str]:
-    """Get active objective ID from meta.json."""
-    meta = load_meta(use_json=use_json)
+def get_active_objective(use_json: bool = True, meta: Optional[dict] = None) -> Optional[str]:
+    """Get active objective ID from meta.json (or an already loaded meta)."""
+    if meta is None:
+        meta = load_meta(use_json=use_json)
     active = meta.get("active_objective")
     return active if isinstance(active, str) and is_epic_id(active) else None
 
@@ -393,9 +1173,10 @@ def set_active_objective(epic_id: Optional[str], use_json: bool = True) -> None:
     save_meta(meta)
 
 
-def get_prime_state(use_json: bool = True) -> dict:
-    """Get repo prime-state metadata."""
-    meta = load_meta(use_json=use_json)
+def get_prime_state(use_json: bool = True, meta: Optional[dict] = None) -> dict:
+    """Get repo prime-state metadata (from an already loaded meta if given)."""
+    if meta is None:
+        meta = load_meta(use_json=use_json)
     prime = meta.get("prime")
     if not isinstance(prime, dict):
         return default_prime_state()
@@ -528,33 +1309,29 @@ def artifact_path_for_phase(epic_id: str, phase: str) -> Path:
 
 def load_all_epics(use_json: bool = True) -> list[dict]:
     """Load all epics with defaults applied."""
-    flux_dir = get_flux_dir()
-    epics_dir = flux_dir / EPICS_DIR
-    if not epics_dir.exists():
-        return []
-    epics = []
-    for epic_file in sorted(epics_dir.glob("fn-*.json")):
-        try:
-            epics.append(
-                normalize_epic(
-                    load_json_or_exit(epic_file, f"Epic {epic_file.stem}", use_json=use_json)
-                )
-            )
-        except SystemExit:
-            raise
-        except Exception:
-            continue
-    epics.sort(key=lambda e: parse_id(e.get("id", ""))[0] or 0)
-    return epics
+    from .index import get_index
 
+    return get_index(use_json=use_json).epics(use_json=use_json)
+
+
+def choose_current_objective(
+    current_actor: str,
+    use_json: bool = True,
+    index=None,
+    meta: Optional[dict] = None,
+) -> Optional[dict]:
+    """Choose the current objective based on active meta pointer and live state.
 
-def choose_current_objective(current_actor: str, use_json: bool = True) -> Optional[dict]:
-    """Choose the current objective based on active meta pointer and live state."""
-    open_epics = [e for e in load_all_epics(use_json=use_json) if e.get("status") != "done"]
+    Pass index/meta to reuse ones the caller already loaded.
+    """
+    from .index import get_index
+
+    index = index or get_index(use_json=use_json)
+    open_epics = [e for e in index.epics(use_json=use_json) if e.get("status") != "done"]
     if not open_epics:
         return None
 
-    active_id = get_active_objective(use_json=use_json)
+    active_id = get_active_objective(use_json=use_json, meta=meta)
     if active_id:
         for epic in open_epics:
             if epic.get("id") == active_id:
@@ -562,14 +1339,7 @@ def choose_current_objective(current_actor: str, use_json: bool = True) -> Optio
 
     # Prefer epic with in-progress task assigned to current actor.
     for epic in open_epics:
-        tasks_dir = get_flux_dir() / TASKS_DIR
-        if not tasks_dir.exists():
-            break
-        for task_file in sorted(tasks_dir.glob(f"{epic['id']}.*.json")):
-            task_id = task_file.stem
-            if not is_task_id(task_id):
-                continue
-            task_data = load_task_with_state(task_id, use_json=use_json)
+        for task_data in index.tasks_for_epic(epic["id"], use_json=use_json):
             if (
                 task_data.get("status") == "in_progress"
                 and task_data.get("assignee") == current_actor
@@ -584,50 +1354,43 @@ def choose_current_objective(current_actor: str, use_json: bool = True) -> Optio
     )[0]
 
 
+def load_tasks_with_state_bulk(
+    epic_id: Optional[str] = None, use_json: bool = True
+) -> list[dict]:
+    """Load tasks merged with runtime state, for one epic or all epics.
+
+    Definitions and runtime state are each discovered with one directory pass
+    (or one query for the SQLite backend) through the task index; only records
+    that changed since the last call are re-read and merged. Tasks are sorted
+    by task number for a single epic and by task ID otherwise.
+    """
+    from .index import get_index
+
+    index = get_index(use_json=use_json)
+    if epic_id is None:
+        return index.all_tasks(use_json=use_json)
+    return index.tasks_for_epic(epic_id, use_json=use_json)
+
+
 def tasks_for_epic(epic_id: str, use_json: bool = True) -> list[dict]:
     """Load all tasks for an epic."""
-    tasks_dir = get_flux_dir() / TASKS_DIR
-    if not tasks_dir.exists():
-        return []
-    tasks = []
-    for task_file in sorted(tasks_dir.glob(f"{epic_id}.*.json")):
-        task_id = task_file.stem
-        if not is_task_id(task_id):
-            continue
-        task = load_task_with_state(task_id, use_json=use_json)
-        if "id" in task:
-            tasks.append(task)
-    tasks.sort(key=lambda t: parse_id(t.get("id", ""))[1] or 0)
-    return tasks
+    return load_tasks_with_state_bulk(epic_id, use_json=use_json)
 
 
-def ready_state_for_epic(epic_id: str, use_json: bool = True) -> dict:
+def ready_state_for_epic(
+    epic_id: str,
+    use_json: bool = True,
+    index=None,
+    current_actor: Optional[str] = None,
+) -> dict:
     """Compute ready/in-progress/blocked state for an epic."""
-    current_actor = get_actor()
-    tasks = {task["id"]: task for task in tasks_for_epic(epic_id, use_json=use_json)}
-    ready = []
-    in_progress = []
-    blocked = []
-    for task in tasks.values():
-        if task.get("status") == "in_progress":
-            in_progress.append(task)
-            continue
-        if task.get("status") == "done":
-            continue
-        if task.get("status") == "blocked":
-            blocked.append({"task": task, "blocked_by": ["status=blocked"]})
-            continue
-        deps_done = True
-        blocking_deps = []
-        for dep in task.get("depends_on", []):
-            dep_task = tasks.get(dep)
-            if not dep_task or dep_task.get("status") != "done":
-                deps_done = False
-                blocking_deps.append(dep)
-        if deps_done:
-            ready.append(task)
-        else:
-            blocked.append({"task": task, "blocked_by": blocking_deps})
+    from .graph import DependencyGraph
+
+    current_actor = current_actor or get_actor()
+    frontier = DependencyGraph.from_index(epic_id, index=index, use_json=use_json).ready_frontier()
+    ready = frontier["ready"]
+    in_progress = frontier["in_progress"]
+    blocked = frontier["blocked"]
     ready.sort(key=lambda t: ((task_priority(t)), parse_id(t["id"])[1] or 0, t.get("title", "")))
     in_progress.sort(
         key=lambda t: (
@@ -0,0 +1,306 @@
+"""
+fluxctl_pkg.symbols - Per-language symbol extractors for review context hints.
+
+Each language registers an Extractor (file extensions + precompiled patterns)
+in EXTRACTORS. A pattern captures a `name` group, and optionally an `items`
+group holding a list of names (Python `__all__`, JS `export { a, b }`). Its
+visibility rule decides whether a match is exported (public API) or only
+defined.
+
+Symbols come back deduplicated and ordered deterministically: exported
+symbols first, then the rest, each by position of first definition. The
+"first 10 symbols" used by gather_context_hints are therefore stable and
+favor the file's public API.
+
+SymbolCache keys results by the git blob hash of the file content
+(sha1("blob <size>\\0" + content), computed in-process, so no git call) and
+persists them to `<state-dir>/symbols-cache.json`. Impl-review, re-review and
+completion-review never rescan an unchanged file. extract_many() scans
+large changed-file sets on a thread pool.
+"""
+
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from .utils import atomic_write
+
+
+CACHE_FILE = "symbols-cache.json"
+CACHE_SCHEMA_VERSION = 1
+MAX_CACHE_ENTRIES = 20000  # Least recently used blobs are dropped beyond this
+PARALLEL_THRESHOLD = 16  # extract_many uses a thread pool from this many files
+MAX_WORKERS = 8
+
+Visibility = Callable[[str, "re.Match[str]"], bool]
+
+
+class Pattern(NamedTuple):
+    regex: "re.Pattern[str]"
+    exported: Visibility
+    items: Optional["re.Pattern[str]"] = None  # Splits the `items` group into names
+
+
+class Extractor(NamedTuple):
+    language: str
+    extensions: tuple[str, ...]
+    patterns: tuple[Pattern, ...]
+
+
+# --- Visibility rules ---
+
+
+def _always(name: str, match: "re.Match[str]") -> bool:
+    return True
+
+
+def _never(name: str, match: "re.Match[str]") -> bool:
+    return False
+
+
+def _not_underscored(name: str, match: "re.Match[str]") -> bool:
+    return not name.startswith("_")
+
+
+def _capitalized(name: str, match: "re.Match[str]") -> bool:
+    return name[:1].isupper()
+
+
+def _has_vis(name: str, match: "re.Match[str]") -> bool:
+    return match.group("vis") is not None
+
+
+def _public(name: str, match: "re.Match[str]") -> bool:
+    return match.group("vis") == "public"
+
+
+def _not_static(name: str, match: "re.Match[str]") -> bool:
+    return not match.group(0).startswith("static")
+
+
+# --- Registry ---
+
+_WORD = re.compile(r"\w+")
+_QUOTED = re.compile(r"['\"](\w+)['\"]")
+_M = re.MULTILINE
+
+EXTRACTORS: dict[str, Extractor] = {}
+
+
+def register(extractor: Extractor) -> Extractor:
+    """Register an extractor for its file extensions (later ones win)."""
+    for ext in extractor.extensions:
+        EXTRACTORS[ext] = extractor
+    return extractor
+
+
+register(Extractor("python", (".py",), (
+    # def/class definitions
+    Pattern(re.compile(r"^(?:def|class)\s+(?P<name>\w+)", _M), _not_underscored),
+    # Explicit exports
+    Pattern(re.compile(r"__all__\s*=\s*\[(?P<items>[^\]]+)\]"), _always, _QUOTED),
+)))
+
+register(Extractor("javascript", (".js", ".ts", ".jsx", ".tsx", ".mjs"), (
+    Pattern(
+        re.compile(r"export\s+(?:default\s+)?(?:function|class|const|let|var)\s+(?P<name>\w+)"),
+        _always,
+    ),
+    # Named exports: export { foo, bar }
+    Pattern(re.compile(r"export\s*\{(?P<items>[^}]+)\}"), _always, _WORD),
+)))
+
+register(Extractor("go", (".go",), (
+    Pattern(re.compile(r"^func\s+(?P<name>\w+)", _M), _capitalized),
+    Pattern(re.compile(r"^type\s+(?P<name>\w+)", _M), _capitalized),
+)))
+
+register(Extractor("rust", (".rs",), (
+    # pub fn/struct/enum/trait, also private fn for references
+    Pattern(re.compile(r"^(?P<vis>pub\s+)?fn\s+(?P<name>\w+)", _M), _has_vis),
+    Pattern(re.compile(r"^(?P<vis>pub\s+)?(?:struct|enum|trait|type)\s+(?P<name>\w+)", _M), _has_vis),
+    # impl blocks: impl Name or impl Trait for Name
+    Pattern(re.compile(r"^impl(?:<[^>]+>)?\s+(?P<name>\w+)", _M), _never),
+)))
+
+register(Extractor("c", (".c", ".h", ".cpp", ".hpp", ".cc", ".cxx"), (
+    # Function definitions: type name( at line start (simplified)
+    Pattern(re.compile(r"^[a-zA-Z_][\w\s\*]+\s+(?P<name>\w+)\s*\([^;]*$", _M), _not_static),
+    Pattern(re.compile(r"^(?:typedef\s+)?(?:struct|enum|union)\s+(?P<name>\w+)", _M), _always),
+    Pattern(re.compile(r"^#define\s+(?P<name>\w+)", _M), _always),
+)))
+
+register(Extractor("java", (".java",), (
+    Pattern(
+        re.compile(
+            r"^(?P<vis>public|private|protected)?\s*(?:static\s+)?"
+            r"(?:class|interface|enum)\s+(?P<name>\w+)",
+            _M,
+        ),
+        _public,
+    ),
+    # Method definitions
+    Pattern(
+        re.compile(
+            r"^\s*(?P<vis>public|private|protected)\s+(?:static\s+)?"
+            r"[\w<>\[\]]+\s+(?P<name>\w+)\s*\(",
+            _M,
+        ),
+        _public,
+    ),
+)))
+
+register(Extractor("csharp", (".cs",), (
+    Pattern(
+        re.compile(
+            r"^(?P<vis>public|private|protected|internal)?\s*(?:static\s+)?(?:partial\s+)?"
+            r"(?:class|interface|struct|enum|record)\s+(?P<name>\w+)",
+            _M,
+        ),
+        _public,
+    ),
+    # Method definitions
+    Pattern(
+        re.compile(
+            r"^\s*(?P<vis>public|private|protected|internal)\s+(?:static\s+)?(?:async\s+)?"
+            r"[\w<>\[\]?]+\s+(?P<name>\w+)\s*\(",
+            _M,
+        ),
+        _public,
+    ),
+)))
+
+
+def get_extractor(path: Path) -> Optional[Extractor]:
+    return EXTRACTORS.get(path.suffix.lower())
+
+
+def extract(content: str, extractor: Extractor) -> list[str]:
+    """Symbols in content: exported first, then by first definition position."""
+    found: dict[str, list] = {}  # name -> [position, exported]
+    for pattern in extractor.patterns:
+        for match in pattern.regex.finditer(content):
+            if pattern.items is None:
+                names = [(match.start("name"), match.group("name"))]
+            else:
+                offset = match.start("items")
+                names = [
+                    (offset + item.start(), item.group(item.lastindex or 0))
+                    for item in pattern.items.finditer(match.group("items"))
+                ]
+            exported = pattern.exported
+            for position, name in names:
+                entry = found.setdefault(name, [position, False])
+                entry[0] = min(entry[0], position)
+                entry[1] = entry[1] or exported(name, match)
+    return sorted(found, key=lambda name: (not found[name][1], found[name][0]))
+
+
+def blob_hash(data: bytes) -> str:
+    """Git blob id of data (what `git hash-object` prints)."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+# --- Cache ---
+
+
+class SymbolCache:
+    """Extracted symbols by git blob hash, persisted in the state dir."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.entries: dict[str, list[str]] = {}
+        self.dirty = False
+        if path is not None:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and data.get("schema_version") == CACHE_SCHEMA_VERSION:
+                    self.entries = dict(data.get("blobs", {}))
+            except (OSError, ValueError):
+                pass
+
+    def get(self, key: str) -> Optional[list[str]]:
+        symbols = self.entries.pop(key, None)
+        if symbols is not None:
+            self.entries[key] = symbols  # Most recently used last
+        return symbols
+
+    def put(self, key: str, symbols: list[str]) -> None:
+        self.entries[key] = symbols
+        self.dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        blobs = self.entries
+        if len(blobs) > MAX_CACHE_ENTRIES:
+            blobs = dict(list(blobs.items())[-MAX_CACHE_ENTRIES:])
+        data = {"schema_version": CACHE_SCHEMA_VERSION, "blobs": blobs}
+        try:
+            atomic_write(self.path, json.dumps(data, separators=(",", ":")))
+            self.dirty = False
+        except OSError:
+            pass  # The cache is an optimization; a read-only state dir just means rescans
+
+
+def _read(path: Path, extractor: Extractor) -> tuple[Optional[str], bytes]:
+    """(cache key, content) for path; (None, b"") if it is empty or unreadable."""
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None, b""
+    if not data:
+        return None, b""
+    return f"{extractor.language}:{blob_hash(data)}", data
+
+
+def _map(fn, items: list, parallel: bool) -> list:
+    if parallel and len(items) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(items))) as pool:
+            return list(pool.map(fn, items))
+    return [fn(item) for item in items]
+
+
+def extract_symbols(path: Path, cache: Optional[SymbolCache] = None) -> list[str]:
+    """Symbols defined in one file ([] for unknown languages or unreadable files)."""
+    return extract_many([path], cache)[path]
+
+
+def extract_many(
+    paths: Iterable[Path], cache: Optional[SymbolCache] = None, parallel: Optional[bool] = None
+) -> dict[Path, list[str]]:
+    """path -> symbols for many files; blobs already in the cache are not rescanned.
+
+    parallel defaults to True from PARALLEL_THRESHOLD files: reading, hashing
+    and scanning then run on a thread pool (the cache is only touched here).
+    """
+    paths = list(paths)
+    results: dict[Path, list[str]] = {path: [] for path in paths}
+    jobs = [(path, get_extractor(path)) for path in paths]
+    jobs = [(path, extractor) for path, extractor in jobs if extractor is not None]
+    if parallel is None:
+        parallel = len(jobs) >= PARALLEL_THRESHOLD
+
+    misses = []
+    for (path, extractor), (key, data) in zip(jobs, _map(lambda job: _read(*job), jobs, parallel)):
+        if key is None:
+            continue
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            results[path] = list(cached)
+        else:
+            misses.append((path, extractor, key, data))
+
+    def scan(miss: tuple) -> list[str]:
+        _, extractor, _, data = miss
+        return extract(data.decode("utf-8", errors="ignore"), extractor)
+
+    for (path, _, key, _), symbols in zip(misses, _map(scan, misses, parallel)):
+        if cache is not None:
+            cache.put(key, symbols)
+        results[path] = list(symbols)
+    return results
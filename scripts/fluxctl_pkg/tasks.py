@@ -36,7 +36,6 @@ from .utils import (
     read_text_or_exit,
     require_creation_approval,
     require_keys,
-    scan_max_task_id,
     task_priority,
     workflow_phases_for_mode,
 )
@@ -45,10 +44,11 @@ from .state import (
     load_task_definition,
     load_task_with_state,
     save_task_runtime,
+    update_task_runtime,
+    update_task_runtimes,
     save_task_definition,
     reset_task_runtime,
     delete_task_runtime,
-    get_state_store,
     load_meta,
     save_meta,
     get_active_objective,
@@ -60,6 +60,17 @@ from .state import (
     artifact_dir_for_epic,
 )
 from .config import load_flux_config, get_config
+from .graph import DependencyGraph
+from .ids import get_allocator
+from .index import get_index
+from .listing import (
+    Page,
+    check_paging,
+    emit_records,
+    output_format,
+    print_next_cursor,
+    task_summary,
+)
 from . import tracker
 
 
@@ -221,46 +232,6 @@ def clear_task_evidence(task_id: str) -> None:
         atomic_write(spec_path, new_content)
 
 
-def find_dependents(task_id: str, same_epic: bool = False) -> list[str]:
-    """Find tasks that depend on task_id (recursive). Returns list of dependent task IDs."""
-    flux_dir = get_flux_dir()
-    tasks_dir = flux_dir / TASKS_DIR
-    if not tasks_dir.exists():
-        return []
-
-    epic_id = epic_id_from_task(task_id) if same_epic else None
-    dependents: set[str] = set()  # Use set to avoid duplicates
-    to_check = [task_id]
-    checked = set()
-
-    while to_check:
-        checking = to_check.pop(0)
-        if checking in checked:
-            continue
-        checked.add(checking)
-
-        for task_file in tasks_dir.glob("fn-*.json"):
-            if not is_task_id(task_file.stem):
-                continue  # Skip non-task files (e.g., fn-1.2-review.json)
-            try:
-                task_data = load_json(task_file)
-                tid = task_data.get("id", task_file.stem)
-                if tid in checked or tid in dependents:
-                    continue
-                # Skip if same_epic filter and different epic
-                if same_epic and epic_id_from_task(tid) != epic_id:
-                    continue
-                # Support both legacy "deps" and current "depends_on"
-                deps = task_data.get("depends_on", task_data.get("deps", []))
-                if checking in deps:
-                    dependents.add(tid)
-                    to_check.append(tid)
-            except Exception:
-                pass
-
-    return sorted(dependents)
-
-
 def cmd_task_create(args: argparse.Namespace) -> None:
     """Create a new task under an epic."""
     require_creation_approval(args.approve, "Task creation", use_json=args.json)
@@ -280,19 +251,9 @@ def cmd_task_create(args: argparse.Namespace) -> None:
 
     load_json_or_exit(epic_path, f"Epic {args.epic}", use_json=args.json)
 
-    # MU-1: Scan-based allocation for merge safety
-    # Scan existing tasks to determine next ID (don't rely on counter)
-    max_task = scan_max_task_id(flux_dir, args.epic)
-    task_num = max_task + 1
-    task_id = f"{args.epic}.{task_num}"
-
-    # Double-check no collision (shouldn't happen with scan-based allocation)
-    task_json_path = flux_dir / TASKS_DIR / f"{task_id}.json"
-    task_spec_path = flux_dir / TASKS_DIR / f"{task_id}.md"
-    if task_json_path.exists() or task_spec_path.exists():
+    if args.id and (not is_task_id(args.id) or epic_id_from_task(args.id) != args.epic):
         error_exit(
-            f"Refusing to overwrite existing task {task_id}. "
-            f"This shouldn't happen - check for orphaned files.",
+            f"Invalid task ID: {args.id}. Expected a task of epic {args.epic} (e.g., {args.epic}.1)",
             use_json=args.json,
         )
 
@@ -320,6 +281,31 @@ def cmd_task_create(args: argparse.Namespace) -> None:
             Path(args.acceptance_file), "Acceptance file", use_json=args.json
         )
 
+    # MU-1: Allocate from the shared, lock-protected counter (see ids.py);
+    # --id uses an ID handed out earlier by `task reserve-ids`
+    allocator = get_allocator()
+    if args.id:
+        task_id = args.id
+        _, task_num = parse_id(task_id)
+        if task_num > allocator.last_task(args.epic):
+            error_exit(
+                f"Task ID {task_id} was not reserved. Use 'fluxctl task reserve-ids --epic {args.epic}'.",
+                use_json=args.json,
+            )
+    else:
+        task_num = allocator.allocate_tasks(args.epic)[0]
+        task_id = f"{args.epic}.{task_num}"
+
+    # Double-check no collision (shouldn't happen with allocator-based IDs)
+    task_json_path = flux_dir / TASKS_DIR / f"{task_id}.json"
+    task_spec_path = flux_dir / TASKS_DIR / f"{task_id}.md"
+    if task_json_path.exists() or task_spec_path.exists():
+        error_exit(
+            f"Refusing to overwrite existing task {task_id}. "
+            f"This shouldn't happen - check for orphaned files.",
+            use_json=args.json,
+        )
+
     # Create task JSON (MU-2: includes soft-claim fields)
     task_data = {
         "id": task_id,
@@ -341,8 +327,8 @@ def cmd_task_create(args: argparse.Namespace) -> None:
     spec_content = create_task_spec(task_id, args.title, acceptance)
     atomic_write(flux_dir / TASKS_DIR / f"{task_id}.md", spec_content)
 
-    # NOTE: We no longer update epic["next_task"] since scan-based allocation
-    # is the source of truth. This reduces merge conflicts.
+    # NOTE: We no longer update epic["next_task"]: the allocator in the state
+    # dir is the source of truth. This reduces merge conflicts.
 
     # Tracker hook: create Linear issue if configured
     epic_data = load_json(epic_path) or {}
@@ -367,6 +353,30 @@ def cmd_task_create(args: argparse.Namespace) -> None:
         print(f"Task {task_id} created: {args.title}")
 
 
+def cmd_task_reserve_ids(args: argparse.Namespace) -> None:
+    """Reserve a block of task IDs for `task create --id`."""
+    if not ensure_flux_exists():
+        error_exit(
+            ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
+        )
+    if not is_epic_id(args.epic):
+        error_exit(
+            f"Invalid epic ID: {args.epic}. Expected format: fn-N or fn-N-slug (e.g., fn-1, fn-1-add-auth)", use_json=args.json
+        )
+    if args.count < 1:
+        error_exit("--count must be at least 1", use_json=args.json)
+
+    flux_dir = get_flux_dir()
+    load_json_or_exit(flux_dir / EPICS_DIR / f"{args.epic}.json", f"Epic {args.epic}", use_json=args.json)
+    task_ids = [f"{args.epic}.{n}" for n in get_allocator().allocate_tasks(args.epic, args.count)]
+
+    if args.json:
+        json_output({"epic": args.epic, "ids": task_ids, "count": len(task_ids)})
+    else:
+        for task_id in task_ids:
+            print(task_id)
+
+
 def cmd_dep_add(args: argparse.Namespace) -> None:
     """Add a dependency to a task."""
     if not ensure_flux_exists():
@@ -404,6 +414,13 @@ def cmd_dep_add(args: argparse.Namespace) -> None:
         task_data["depends_on"] = task_data.pop("deps", [])
 
     if args.depends_on not in task_data["depends_on"]:
+        graph = DependencyGraph.from_index(task_epic, use_json=args.json)
+        cycle = graph.cycle_if_added(args.task, args.depends_on)
+        if cycle:
+            error_exit(
+                f"Dependency cycle: {' -> '.join(cycle)}. Not adding {args.depends_on} to {args.task}",
+                use_json=args.json,
+            )
         task_data["depends_on"].append(args.depends_on)
         task_data["updated_at"] = now_iso()
         atomic_write_json(task_path, task_data)
@@ -453,6 +470,7 @@ def cmd_task_set_deps(args: argparse.Namespace) -> None:
     if "depends_on" not in task_data:
         task_data["depends_on"] = task_data.pop("deps", [])
 
+    graph = DependencyGraph.from_index(task_epic, use_json=args.json)
     added = []
     for dep_id in dep_ids:
         if not is_task_id(dep_id):
@@ -467,6 +485,13 @@ def cmd_task_set_deps(args: argparse.Namespace) -> None:
                 use_json=args.json,
             )
         if dep_id not in task_data["depends_on"]:
+            cycle = graph.cycle_if_added(args.task_id, dep_id)
+            if cycle:
+                error_exit(
+                    f"Dependency cycle: {' -> '.join(cycle)}. No dependencies set for {args.task_id}",
+                    use_json=args.json,
+                )
+            graph.add_dependency(args.task_id, dep_id)
             task_data["depends_on"].append(dep_id)
             added.append(dep_id)
 
@@ -491,66 +516,52 @@ def cmd_task_set_deps(args: argparse.Namespace) -> None:
             print(f"No new dependencies added (already set)")
 
 
+def _task_sort_key(task_id: str) -> tuple:
+    """Epic number, then task number (task ID breaks ties)."""
+    epic_num, task_num = parse_id(task_id)
+    return (
+        epic_num if epic_num is not None else 0,
+        task_num if task_num is not None else 0,
+        task_id,
+    )
+
+
 def cmd_tasks(args: argparse.Namespace) -> None:
     """List tasks."""
+    fmt = output_format(args)
     if not ensure_flux_exists():
         error_exit(
             ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
         )
+    check_paging(args, is_task_id)
+
+    # Filters run against the index records, so skipped tasks are never copied
+    tasks = get_index(use_json=args.json).iter_tasks(
+        epic_id=args.epic or None,
+        status=args.status,
+        assignee=args.assignee,
+        key=_task_sort_key,
+        after=_task_sort_key(args.cursor) if args.cursor else None,
+        use_json=args.json,
+    )
+    page = Page(tasks, args.limit)
+    tasks = emit_records(args, fmt, page, task_summary, "tasks")
+    if tasks is None:
+        return
 
-    flux_dir = get_flux_dir()
-    tasks_dir = flux_dir / TASKS_DIR
-
-    tasks = []
-    if tasks_dir.exists():
-        pattern = f"{args.epic}.*.json" if args.epic else "fn-*.json"
-        for task_file in sorted(tasks_dir.glob(pattern)):
-            task_id = task_file.stem
-            if not is_task_id(task_id):
-                continue  # Skip non-task files (e.g., fn-1.2-review.json)
-            # Load task with merged runtime state
-            task_data = load_task_with_state(task_id, use_json=args.json)
-            if "id" not in task_data:
-                continue  # Skip artifact files (GH-21)
-            # Filter by status if requested
-            if args.status and task_data["status"] != args.status:
-                continue
-            tasks.append(
-                {
-                    "id": task_data["id"],
-                    "epic": task_data["epic"],
-                    "title": task_data["title"],
-                    "status": task_data["status"],
-                    "priority": task_data.get("priority"),
-                    "depends_on": task_data.get("depends_on", task_data.get("deps", [])),
-                }
-            )
-
-    # Sort tasks by epic number then task number
-    def task_sort_key(t):
-        epic_num, task_num = parse_id(t["id"])
-        return (
-            epic_num if epic_num is not None else 0,
-            task_num if task_num is not None else 0,
-        )
-
-    tasks.sort(key=task_sort_key)
-
-    if args.json:
-        json_output({"success": True, "tasks": tasks, "count": len(tasks)})
+    if not tasks:
+        scope = f" for epic {args.epic}" if args.epic else ""
+        status_filter = f" with status '{args.status}'" if args.status else ""
+        print(f"No tasks found{scope}{status_filter}.")
     else:
-        if not tasks:
-            scope = f" for epic {args.epic}" if args.epic else ""
-            status_filter = f" with status '{args.status}'" if args.status else ""
-            print(f"No tasks found{scope}{status_filter}.")
-        else:
-            scope = f" for {args.epic}" if args.epic else ""
-            print(f"Tasks{scope} ({len(tasks)}):\n")
-            for t in tasks:
-                deps = (
-                    f" (deps: {', '.join(t['depends_on'])})" if t["depends_on"] else ""
-                )
-                print(f"  [{t['status']}] {t['id']}: {t['title']}{deps}")
+        scope = f" for {args.epic}" if args.epic else ""
+        print(f"Tasks{scope} ({len(tasks)}):\n")
+        for t in tasks:
+            deps = (
+                f" (deps: {', '.join(t['depends_on'])})" if t["depends_on"] else ""
+            )
+            print(f"  [{t['status']}] {t['id']}: {t['title']}{deps}")
+        print_next_cursor(page)
 
 
 def cmd_task_set_backend(args: argparse.Namespace) -> None:
@@ -857,14 +868,14 @@ def cmd_task_reset(args: argparse.Namespace) -> None:
 
     # Handle cascade
     if args.cascade:
-        dependents = find_dependents(task_id, same_epic=True)
-        for dep_id in dependents:
+        # One graph for the epic: dependents and their merged state in a single pass
+        graph = DependencyGraph.from_index(epic_id, use_json=args.json)
+        for dep_id in sorted(graph.transitive_dependents(task_id)):
             dep_path = flux_dir / TASKS_DIR / f"{dep_id}.json"
-            if not dep_path.exists():
+            dep_data = graph.tasks.get(dep_id)
+            if dep_data is None or not dep_path.exists():
                 continue
 
-            # Load merged state for dependent
-            dep_data = load_task_with_state(dep_id, use_json=args.json)
             dep_status = dep_data.get("status", "todo")
 
             # Skip in_progress and already todo
@@ -979,49 +990,13 @@ def cmd_ready(args: argparse.Namespace) -> None:
             f"{TASKS_DIR}/ missing. Run 'fluxctl init' or fix repo state.",
             use_json=args.json,
         )
-    tasks = {}
-    for task_file in tasks_dir.glob(f"{args.epic}.*.json"):
-        task_id = task_file.stem
-        if not is_task_id(task_id):
-            continue  # Skip non-task files (e.g., fn-1.2-review.json)
-        task_data = load_task_with_state(task_id, use_json=args.json)
-        if "id" not in task_data:
-            continue  # Skip artifact files (GH-21)
-        tasks[task_data["id"]] = task_data
-
-    # Find ready tasks (status=todo, all deps done)
-    ready = []
-    in_progress = []
-    blocked = []
-
-    for task_id, task in tasks.items():
-        # MU-2: Track in_progress tasks separately
-        if task["status"] == "in_progress":
-            in_progress.append(task)
-            continue
-
-        if task["status"] == "done":
-            continue
-
-        if task["status"] == "blocked":
-            blocked.append({"task": task, "blocked_by": ["status=blocked"]})
-            continue
+    graph = DependencyGraph.from_index(args.epic, use_json=args.json)
 
-        # Check all deps are done
-        deps_done = True
-        blocking_deps = []
-        for dep in task["depends_on"]:
-            if dep not in tasks:
-                deps_done = False
-                blocking_deps.append(dep)
-            elif tasks[dep]["status"] != "done":
-                deps_done = False
-                blocking_deps.append(dep)
-
-        if deps_done:
-            ready.append(task)
-        else:
-            blocked.append({"task": task, "blocked_by": blocking_deps})
+    # Find ready tasks (status=todo, all deps done); MU-2: in_progress separately
+    frontier = graph.ready_frontier()
+    ready = frontier["ready"]
+    in_progress = frontier["in_progress"]
+    blocked = frontier["blocked"]
 
     # Sort by numeric suffix
     def sort_key(t):
@@ -1087,7 +1062,7 @@ def cmd_next(args: argparse.Namespace) -> None:
             ".flux/ does not exist. Run 'fluxctl init' first.", use_json=args.json
         )
 
-    flux_dir = get_flux_dir()
+    index = get_index(use_json=args.json)
 
     # Resolve epics list
     epic_ids: list[str] = []
@@ -1105,176 +1080,260 @@ def cmd_next(args: argparse.Namespace) -> None:
                 error_exit(f"Invalid epic ID in epics file: {e}", use_json=args.json)
             epic_ids.append(e)
     else:
-        epics_dir = flux_dir / EPICS_DIR
-        if epics_dir.exists():
-            for epic_file in sorted(epics_dir.glob("fn-*.json")):
-                # Match: fn-N.json, fn-N-xxx.json (short), fn-N-slug.json (long)
-                match = re.match(
-                    r"^fn-(\d+)(?:-[a-z0-9][a-z0-9-]*[a-z0-9]|-[a-z0-9]{1,3})?\.json$",
-                    epic_file.name,
-                )
-                if match:
-                    epic_ids.append(epic_file.stem)  # Use full ID from filename
-        epic_ids.sort(key=lambda e: parse_id(e)[0] or 0)
+        # Match: fn-N.json, fn-N-xxx.json (short), fn-N-slug.json (long)
+        epic_ids = [e for e in index.epic_ids() if is_epic_id(e)]
 
     current_actor = get_actor()
 
-    def sort_key(t: dict) -> tuple[int, int]:
-        _, task_num = parse_id(t["id"])
-        return (task_priority(t), task_num if task_num is not None else 0)
+    if args.slots is not None:
+        _next_slots(args, index, epic_ids, current_actor)
+        return
+    if args.claim or args.actors:
+        error_exit("--claim and --actors require --slots", use_json=args.json)
 
-    blocked_epics: dict[str, list[str]] = {}
+    units, blocked_epics = _next_candidates(args, index, epic_ids, {current_actor}, limit=1)
+    if units:
+        unit = units[0]
+        unit.pop("assignee", None)
+        if args.json:
+            json_output(unit)
+        else:
+            print(f"{unit['status']} {unit['task'] or unit['epic']} {unit['reason']}")
+        return
+
+    if args.json:
+        payload = {"status": "none", "epic": None, "task": None, "reason": "none"}
+        if blocked_epics:
+            payload["reason"] = "blocked_by_epic_deps"
+            payload["blocked_epics"] = blocked_epics
+        json_output(payload)
+    else:
+        if blocked_epics:
+            print("none blocked_by_epic_deps")
+            for epic_id, deps in blocked_epics.items():
+                print(f"  {epic_id}: {', '.join(deps)}")
+        else:
+            print("none")
+
+
+def _next_sort_key(t: dict) -> tuple[int, int]:
+    """`next` order within an epic: priority, then task number."""
+    _, task_num = parse_id(t["id"])
+    return (task_priority(t), task_num if task_num is not None else 0)
 
+
+def _next_candidates(
+    args: argparse.Namespace,
+    index,
+    epic_ids: list[str],
+    actors: set[str],
+    limit: Optional[int] = None,
+) -> tuple[list[dict], dict[str, list[str]]]:
+    """Plan/work units `next` could hand out, in dispatch order (at most `limit`).
+
+    Single `next` takes the first unit, `next --slots` several: epics in
+    order, epic-level deps honoured, and within an epic resumable
+    in_progress tasks (owned by one of `actors`) before ready tasks by
+    priority. Tasks claimed by anyone outside `actors` are skipped.
+    """
+    tasks_dir = get_flux_dir() / TASKS_DIR
+    units: list[dict] = []
+    blocked_epics: dict[str, list[str]] = {}
+    epic_graph = DependencyGraph(epics=index.epics(use_json=args.json))
     for epic_id in epic_ids:
-        epic_path = flux_dir / EPICS_DIR / f"{epic_id}.json"
-        if not epic_path.exists():
+        if not index.has_epic(epic_id):
             if args.epics_file:
                 error_exit(f"Epic {epic_id} not found", use_json=args.json)
             continue
-
-        epic_data = normalize_epic(
-            load_json_or_exit(epic_path, f"Epic {epic_id}", use_json=args.json)
-        )
+        epic_data = index.epic(epic_id, use_json=args.json) or normalize_epic({})
         if epic_data.get("status") == "done":
             continue
-
-        # Skip epics blocked by epic-level dependencies
-        blocked_by: list[str] = []
-        for dep in epic_data.get("depends_on_epics", []) or []:
-            if dep == epic_id:
-                continue
-            dep_path = flux_dir / EPICS_DIR / f"{dep}.json"
-            if not dep_path.exists():
-                blocked_by.append(dep)
-                continue
-            dep_data = normalize_epic(
-                load_json_or_exit(dep_path, f"Epic {dep}", use_json=args.json)
-            )
-            if dep_data.get("status") != "done":
-                blocked_by.append(dep)
+        blocked_by = epic_graph.unfinished_dependencies(epic_id)
         if blocked_by:
             blocked_epics[epic_id] = blocked_by
             continue
-
         if args.require_plan_review and epic_data.get("plan_review_status") != "ship":
-            if args.json:
-                json_output(
-                    {
-                        "status": "plan",
-                        "epic": epic_id,
-                        "task": None,
-                        "reason": "needs_plan_review",
-                    }
-                )
-            else:
-                print(f"plan {epic_id} needs_plan_review")
-            return
+            units.append(
+                {"status": "plan", "epic": epic_id, "task": None, "reason": "needs_plan_review"}
+            )
+            if limit is not None and len(units) >= limit:
+                break
+            continue
 
-        tasks_dir = flux_dir / TASKS_DIR
         if not tasks_dir.exists():
             error_exit(
                 f"{TASKS_DIR}/ missing. Run 'fluxctl init' or fix repo state.",
                 use_json=args.json,
             )
-
-        tasks: dict[str, dict] = {}
-        for task_file in tasks_dir.glob(f"{epic_id}.*.json"):
-            task_id = task_file.stem
-            if not is_task_id(task_id):
-                continue  # Skip non-task files (e.g., fn-1.2-review.json)
-            # Load task with merged runtime state
-            task_data = load_task_with_state(task_id, use_json=args.json)
-            if "id" not in task_data:
-                continue  # Skip artifact files (GH-21)
-            tasks[task_data["id"]] = task_data
-
-        # Resume in_progress tasks owned by current actor
-        in_progress = [
-            t
-            for t in tasks.values()
-            if t.get("status") == "in_progress" and t.get("assignee") == current_actor
-        ]
-        in_progress.sort(key=sort_key)
-        if in_progress:
-            task_id = in_progress[0]["id"]
-            if args.json:
-                json_output(
-                    {
-                        "status": "work",
-                        "epic": epic_id,
-                        "task": task_id,
-                        "reason": "resume_in_progress",
-                    }
-                )
-            else:
-                print(f"work {task_id} resume_in_progress")
-            return
-
-        # Ready tasks by deps + priority
-        ready: list[dict] = []
-        for task in tasks.values():
-            if task.get("status") != "todo":
-                continue
-            if task.get("status") == "blocked":
+        graph = DependencyGraph.from_index(epic_id, index=index, use_json=args.json)
+        frontier = graph.ready_frontier()
+        resumable = sorted(
+            (t for t in frontier["in_progress"] if t.get("assignee") in actors),
+            key=_next_sort_key,
+        )
+        for task in resumable:
+            units.append(
+                {
+                    "status": "work",
+                    "epic": epic_id,
+                    "task": task["id"],
+                    "reason": "resume_in_progress",
+                    "assignee": task.get("assignee"),
+                }
+            )
+        for task in sorted(frontier["ready"], key=_next_sort_key):
+            if task.get("assignee") and task.get("assignee") not in actors:
                 continue
-            deps_done = True
-            for dep in task.get("depends_on", []):
-                dep_task = tasks.get(dep)
-                if not dep_task or dep_task.get("status") != "done":
-                    deps_done = False
-                    break
-            if deps_done:
-                ready.append(task)
-
-        ready.sort(key=sort_key)
-        if ready:
-            task_id = ready[0]["id"]
-            if args.json:
-                json_output(
-                    {
-                        "status": "work",
-                        "epic": epic_id,
-                        "task": task_id,
-                        "reason": "ready_task",
-                    }
-                )
-            else:
-                print(f"work {task_id} ready_task")
-            return
-
-        # Check if all tasks are done and completion review is needed
+            units.append(
+                {
+                    "status": "work",
+                    "epic": epic_id,
+                    "task": task["id"],
+                    "reason": "ready_task",
+                    "assignee": task.get("assignee"),
+                }
+            )
         if (
             args.require_completion_review
-            and tasks
-            and all(t.get("status") == "done" for t in tasks.values())
+            and graph.tasks
+            and all(t.get("status") == "done" for t in graph.tasks.values())
             and epic_data.get("completion_review_status") != "ship"
         ):
-            if args.json:
-                json_output(
-                    {
-                        "status": "completion_review",
-                        "epic": epic_id,
-                        "task": None,
-                        "reason": "needs_completion_review",
-                    }
-                )
-            else:
-                print(f"completion_review {epic_id} needs_completion_review")
-            return
+            units.append(
+                {
+                    "status": "completion_review",
+                    "epic": epic_id,
+                    "task": None,
+                    "reason": "needs_completion_review",
+                }
+            )
+        if limit is not None and len(units) >= limit:
+            del units[limit:]
+            break
+    return units, blocked_epics
+
+
+def _runtime_or_definition(runtime: Optional[dict], task_def: dict) -> dict:
+    """Stored runtime state, or (backward compat) the definition's runtime fields."""
+    if runtime is None:
+        runtime = {k: task_def[k] for k in RUNTIME_FIELDS if k in task_def}
+        if not runtime:
+            runtime = {"status": "todo"}
+    return runtime
+
+
+def _claimed(runtime: dict, actor: str) -> dict:
+    """runtime moved to in_progress and claimed by actor if nobody holds it."""
+    claimed = {**runtime, "status": "in_progress", "updated_at": now_iso()}
+    if not runtime.get("assignee"):
+        claimed["assignee"] = actor
+        claimed["claimed_at"] = now_iso()
+    return claimed
+
+
+def _claimable(runtime: dict, actor: str) -> bool:
+    """A todo task nobody else holds, or actor's own in_progress task."""
+    status = runtime.get("status", "todo")
+    assignee = runtime.get("assignee")
+    if assignee and assignee != actor:
+        return False
+    return status == "todo" or (status == "in_progress" and assignee == actor)
+
+
+def _claim_for_slot(task_id: str, actor: str, use_json: bool) -> Optional[str]:
+    """Claim a todo task (or keep actor's own in_progress one) with compare-and-swap.
+
+    Returns the previous status, or None if the task was taken or changed
+    since the index was read (another worker won the race).
+    """
+    task_def = normalize_task(load_task_definition(task_id, use_json=use_json))
+    previous: dict[str, Optional[str]] = {"status": None}
+
+    def claim(current: dict[str, Optional[dict]]) -> dict[str, dict]:
+        runtime = _runtime_or_definition(current[task_id], task_def)
+        if not _claimable(runtime, actor):
+            previous["status"] = None
+            return {}
+        previous["status"] = runtime.get("status", "todo")
+        return {task_id: _claimed(runtime, actor)}
+
+    update_task_runtimes([task_id], claim, use_json=use_json)
+    status = previous["status"]
+    if status is None:
+        return None
+
+    linear_issue_id = task_def.get("linear_issue_id")
+    if linear_issue_id and status != "in_progress":
+        tracker.on_status_changed(task_id, status, "in_progress", linear_issue_id)
+    return status
+
 
+def _next_slots(
+    args: argparse.Namespace, index, epic_ids: list[str], current_actor: str
+) -> None:
+    """`next --slots N`: up to N distinct units in one pass, optionally claimed."""
+    if args.slots < 1:
+        error_exit("--slots must be at least 1", use_json=args.json)
+    actors = [a.strip() for a in (args.actors or "").split(",") if a.strip()]
+    if actors and len(set(actors)) != len(actors):
+        error_exit("--actors must be distinct", use_json=args.json)
+    if len(actors) > args.slots:
+        error_exit(
+            f"--actors lists {len(actors)} actors for {args.slots} slots",
+            use_json=args.json,
+        )
+    # One actor per slot; unnamed slots go to the current actor
+    slot_actors = actors + [current_actor] * (args.slots - len(actors))
+
+    units, blocked_epics = _next_candidates(args, index, epic_ids, set(slot_actors))
+    used: set[int] = set()
+    assigned: list[Optional[dict]] = [None] * len(slot_actors)
+
+    def take(slot: int, unit_index: int) -> bool:
+        unit = dict(units[unit_index])
+        actor = slot_actors[slot]
+        if unit["task"] and unit.get("assignee") not in (None, actor):
+            return False
+        used.add(unit_index)
+        if args.claim and unit["task"]:
+            previous = _claim_for_slot(unit["task"], actor, args.json)
+            if previous is None:
+                return False  # Lost the race; try the next unit
+            unit["claimed"] = True
+        unit.pop("assignee", None)
+        unit["actor"] = actor
+        assigned[slot] = unit
+        return True
+
+    # Each actor resumes its own in_progress work first
+    for slot, actor in enumerate(slot_actors):
+        for i, unit in enumerate(units):
+            if i in used or unit["reason"] != "resume_in_progress":
+                continue
+            if unit.get("assignee") == actor and take(slot, i):
+                break
+    # Then fill the remaining slots in dispatch order
+    for slot in range(len(slot_actors)):
+        if assigned[slot] is not None:
+            continue
+        for i, unit in enumerate(units):
+            if i in used or unit["reason"] == "resume_in_progress":
+                continue
+            if take(slot, i):
+                break
+
+    slots = [unit for unit in assigned if unit is not None]
     if args.json:
-        payload = {"status": "none", "epic": None, "task": None, "reason": "none"}
+        payload = {"requested": args.slots, "claimed": args.claim, "slots": slots}
         if blocked_epics:
-            payload["reason"] = "blocked_by_epic_deps"
             payload["blocked_epics"] = blocked_epics
         json_output(payload)
     else:
-        if blocked_epics:
-            print("none blocked_by_epic_deps")
-            for epic_id, deps in blocked_epics.items():
-                print(f"  {epic_id}: {', '.join(deps)}")
-        else:
-            print("none")
+        if not slots:
+            print("none blocked_by_epic_deps" if blocked_epics else "none")
+        for unit in slots:
+            target = unit["task"] or unit["epic"]
+            print(f"{unit['status']} {target} {unit['reason']} {unit['actor']}")
 
 
 def cmd_start(args: argparse.Namespace) -> None:
@@ -1306,18 +1365,13 @@ def cmd_start(args: argparse.Namespace) -> None:
                 )
 
     current_actor = get_actor()
-    store = get_state_store()
-
-    # Atomic claim: validation + write inside lock to prevent race conditions
-    with store.lock_task(args.id):
-        # Re-load runtime state inside lock for accurate check
-        runtime = store.load_runtime(args.id)
-        if runtime is None:
-            # Backward compat: extract from definition
-            runtime = {k: task_def[k] for k in RUNTIME_FIELDS if k in task_def}
-            if not runtime:
-                runtime = {"status": "todo"}
+    siblings = _ready_siblings(args, current_actor) if args.siblings else {}
+    previous: dict[str, str] = {}
 
+    # Atomic claim: validation + write are one compare-and-swap, re-run if the
+    # task (or a sibling) changes concurrently
+    def claim(current: dict[str, Optional[dict]]) -> dict[str, dict]:
+        runtime = _runtime_or_definition(current[args.id], task_def)
         status = runtime.get("status", "todo")
         existing_assignee = runtime.get("assignee")
 
@@ -1353,10 +1407,7 @@ def cmd_start(args: argparse.Namespace) -> None:
                 )
 
         # Build runtime state updates
-        runtime_updates = {**runtime, "status": "in_progress", "updated_at": now_iso()}
-        if not existing_assignee:
-            runtime_updates["assignee"] = current_actor
-            runtime_updates["claimed_at"] = now_iso()
+        runtime_updates = _claimed(runtime, current_actor)
         if args.note:
             runtime_updates["claim_note"] = args.note
         elif args.force and existing_assignee and existing_assignee != current_actor:
@@ -1366,8 +1417,20 @@ def cmd_start(args: argparse.Namespace) -> None:
             if not args.note:
                 runtime_updates["claim_note"] = f"Taken over from {existing_assignee}"
 
-        # Write inside lock
-        store.save_runtime(args.id, runtime_updates)
+        records = {args.id: runtime_updates}
+        previous.clear()
+        previous[args.id] = status
+        # Siblings ride along only while still claimable; the save is all-or-nothing
+        for sibling_id, sibling_def in siblings.items():
+            sibling = _runtime_or_definition(current[sibling_id], sibling_def)
+            if sibling.get("status", "todo") == "todo" and _claimable(sibling, current_actor):
+                records[sibling_id] = _claimed(sibling, current_actor)
+                previous[sibling_id] = "todo"
+        return records
+
+    update_task_runtimes([args.id, *siblings], claim, use_json=args.json)
+    status = previous[args.id]
+    claimed_siblings = [task_id for task_id in siblings if task_id in previous]
 
     # NOTE: We no longer update epic timestamp on task start/done.
     # Epic timestamp only changes on epic-level operations (set-plan, close).
@@ -1379,17 +1442,46 @@ def cmd_start(args: argparse.Namespace) -> None:
     if linear_issue_id:
         old_status = status if status else "todo"
         tracker.on_status_changed(args.id, old_status, "in_progress", linear_issue_id)
+    for sibling_id in claimed_siblings:
+        sibling_issue_id = siblings[sibling_id].get("linear_issue_id")
+        if sibling_issue_id:
+            tracker.on_status_changed(sibling_id, "todo", "in_progress", sibling_issue_id)
 
     if args.json:
-        json_output(
-            {
-                "id": args.id,
-                "status": "in_progress",
-                "message": f"Task {args.id} started",
-            }
-        )
+        payload = {
+            "id": args.id,
+            "status": "in_progress",
+            "message": f"Task {args.id} started",
+        }
+        if args.siblings:
+            payload["siblings"] = claimed_siblings
+        json_output(payload)
     else:
         print(f"Task {args.id} started")
+        for sibling_id in claimed_siblings:
+            print(f"Task {sibling_id} started (sibling)")
+
+
+def _ready_siblings(args: argparse.Namespace, actor: str) -> dict[str, dict]:
+    """Up to args.siblings ready tasks from args.id's epic, in `next` order.
+
+    Returns task ID -> normalized definition. Tasks claimed by another actor
+    are skipped; whether each is still free is re-checked at claim time.
+    """
+    if args.siblings < 0:
+        error_exit("--siblings must be >= 0", use_json=args.json)
+
+    graph = DependencyGraph.from_index(epic_id_from_task(args.id), use_json=args.json)
+    siblings = {}
+    for task in sorted(graph.ready_frontier()["ready"], key=_next_sort_key):
+        if len(siblings) >= args.siblings:
+            break
+        if task["id"] == args.id or task.get("assignee") not in (None, actor):
+            continue
+        siblings[task["id"]] = normalize_task(
+            load_task_definition(task["id"], use_json=args.json)
+        )
+    return siblings
 
 
 def cmd_done(args: argparse.Namespace) -> None:
@@ -1410,29 +1502,33 @@ def cmd_done(args: argparse.Namespace) -> None:
     # Load task with merged runtime state (fail early before any writes)
     task_data = load_task_with_state(args.id, use_json=args.json)
 
-    # MU-2: Require in_progress status (unless --force)
-    if not args.force and task_data["status"] != "in_progress":
-        status = task_data["status"]
-        if status == "done":
-            error_exit(
-                f"Task {args.id} is already done.",
-                use_json=args.json,
-            )
-        else:
+    current_actor = get_actor()
+
+    def check_completable(status: str, existing_assignee: Optional[str]) -> None:
+        if args.force:
+            return
+        # MU-2: Require in_progress status (unless --force)
+        if status != "in_progress":
+            if status == "done":
+                error_exit(
+                    f"Task {args.id} is already done.",
+                    use_json=args.json,
+                )
+            else:
+                error_exit(
+                    f"Task {args.id} is '{status}', not 'in_progress'. Use --force to override.",
+                    use_json=args.json,
+                )
+
+        # MU-2: Prevent cross-actor completion (unless --force)
+        if existing_assignee and existing_assignee != current_actor:
             error_exit(
-                f"Task {args.id} is '{status}', not 'in_progress'. Use --force to override.",
+                f"Cannot complete task {args.id}: claimed by '{existing_assignee}'. "
+                f"Use --force to override.",
                 use_json=args.json,
             )
 
-    # MU-2: Prevent cross-actor completion (unless --force)
-    current_actor = get_actor()
-    existing_assignee = task_data.get("assignee")
-    if not args.force and existing_assignee and existing_assignee != current_actor:
-        error_exit(
-            f"Cannot complete task {args.id}: claimed by '{existing_assignee}'. "
-            f"Use --force to override.",
-            use_json=args.json,
-        )
+    check_completable(task_data["status"], task_data.get("assignee"))
 
     # Get summary: file > inline > default
     summary: str
@@ -1498,11 +1594,19 @@ def cmd_done(args: argparse.Namespace) -> None:
     except ValueError as e:
         error_exit(str(e), use_json=args.json)
 
-    # All validation passed - now write (spec to tracked file, runtime to state-dir)
-    atomic_write(task_spec_path, updated_spec)
+    # Write runtime state to state-dir (not definition file). The checks are
+    # repeated on the record being replaced: another worker may have finished
+    # or taken over the task since it was loaded.
+    def complete(runtime: Optional[dict]) -> dict:
+        if runtime is not None:
+            check_completable(runtime.get("status", "todo"), runtime.get("assignee"))
+        current = runtime or {"status": "todo"}
+        return {**current, "status": "done", "evidence": evidence, "updated_at": now_iso()}
 
-    # Write runtime state to state-dir (not definition file)
-    save_task_runtime(args.id, {"status": "done", "evidence": evidence})
+    update_task_runtime(args.id, complete, use_json=args.json)
+
+    # All validation passed - now write the spec (tracked file)
+    atomic_write(task_spec_path, updated_spec)
     epic_id = epic_id_from_task(args.id)
     set_active_objective(epic_id, use_json=args.json)
     epic_path = flux_dir / EPICS_DIR / f"{epic_id}.json"
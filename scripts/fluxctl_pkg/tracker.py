@@ -12,11 +12,9 @@ Reads LINEAR_API_KEY from environment. If missing, hooks silently skip.
 import json
 import os
 import sys
-import urllib.request
-import urllib.error
 from typing import Optional
 
-from .config import get_config
+from .config import get_config_snapshot
 
 
 # --- Linear GraphQL helpers ---
@@ -31,20 +29,20 @@ def _get_api_key() -> Optional[str]:
 
 def _get_team_id() -> Optional[str]:
     """Get Linear team ID. Resolves team key (e.g. 'ENG') to UUID on first use."""
-    return get_config("tracker.teamId")
+    return get_config_snapshot().get("tracker.teamId")
 
 
 def _is_enabled() -> bool:
     """Check if a tracker provider is configured and not 'none'."""
-    provider = get_config("tracker.provider")
-    return provider is not None and provider != "none"
+    return _get_provider() is not None
 
 
 def _get_provider() -> Optional[str]:
     """Get configured tracker provider name."""
-    if not _is_enabled():
+    provider = get_config_snapshot().get("tracker.provider")
+    if provider is None or provider == "none":
         return None
-    return get_config("tracker.provider")
+    return provider
 
 
 def _linear_request(query: str, variables: dict) -> Optional[dict]:
@@ -53,6 +51,11 @@ def _linear_request(query: str, variables: dict) -> Optional[dict]:
     if not api_key:
         return None
 
+    # Imported here: urllib.request (http.client, ssl, email) is the single
+    # most expensive import on fluxctl's startup path and only needed here.
+    import urllib.error
+    import urllib.request
+
     payload = json.dumps({"query": query, "variables": variables}).encode("utf-8")
     req = urllib.request.Request(
         LINEAR_API_URL,
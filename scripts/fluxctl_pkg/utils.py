@@ -15,10 +15,10 @@ import sys
 import tempfile
 import unicodedata
 from abc import ABC, abstractmethod
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import Any, ContextManager, Optional
+from typing import Any, Callable, ContextManager, Optional
 
 # Platform-specific file locking (fcntl on Unix, no-op on Windows)
 try:
@@ -28,6 +28,8 @@ try:
         fcntl.flock(f, lock_type)
 
     LOCK_EX = fcntl.LOCK_EX
+    LOCK_SH = fcntl.LOCK_SH
+    LOCK_NB = fcntl.LOCK_NB
     LOCK_UN = fcntl.LOCK_UN
 except ImportError:
     # Windows: fcntl not available, use no-op (acceptable for single-machine use)
@@ -35,6 +37,8 @@ except ImportError:
         pass
 
     LOCK_EX = 0
+    LOCK_SH = 0
+    LOCK_NB = 0
     LOCK_UN = 0
 
 
@@ -133,27 +137,254 @@ RUNTIME_FIELDS = {
 }
 
 
+# --- Profiling Hooks ---
+
+# Set by fluxctl_pkg.profiling while FLUX_PROFILE/--profile is active. The
+# helpers below (subprocesses, JSON loads, atomic writes, output) report
+# spans through it; when it is unset a span is a no-op context.
+_PROFILER = None
+
+
+def set_profiler(profiler: Any) -> None:
+    global _PROFILER
+    _PROFILER = profiler
+
+
+def profile_span(name: str, cat: str, **args: Any) -> ContextManager[dict]:
+    """Profiler span around a block; yields a dict for result details."""
+    if _PROFILER is None:
+        return nullcontext({})
+    return _PROFILER.span(name, cat, **args)
+
+
+def profile_count(counter: str, amount: int) -> None:
+    if _PROFILER is not None:
+        _PROFILER.counters[counter] += amount
+
+
+# --- Write Hook ---
+
+# Set by `fluxctl batch --atomic`: called with each file path just before
+# fluxctl creates, replaces or removes it, so the batch can keep the file's
+# previous content and undo only its own writes.
+_WRITE_HOOK: Optional[Callable[[Path], None]] = None
+
+
+def set_write_hook(hook: Optional[Callable[[Path], None]]) -> None:
+    global _WRITE_HOOK
+    _WRITE_HOOK = hook
+
+
+def note_write(path: Path) -> None:
+    """Report an imminent write to (or removal of) path to the write hook."""
+    if _WRITE_HOOK is not None:
+        _WRITE_HOOK(path)
+
+
+# --- Subprocess Accounting ---
+
+# Every process fluxctl spawns goes through run_subprocess()/popen_subprocess()
+# so a single invocation can report how many forks it paid for.
+_SUBPROCESS_STATS = {"count": 0}
+
+
+def run_subprocess(cmd: list[str], **kwargs: Any) -> subprocess.CompletedProcess:
+    """subprocess.run() wrapper that counts spawned processes."""
+    _SUBPROCESS_STATS["count"] += 1
+    if _PROFILER is None:
+        return subprocess.run(cmd, **kwargs)
+    with _PROFILER.span(os.path.basename(str(cmd[0])), "subprocess", argv=[str(c) for c in cmd]) as span:
+        result = subprocess.run(cmd, **kwargs)
+        span["returncode"] = result.returncode
+        return result
+
+
+def popen_subprocess(cmd: list[str], **kwargs: Any) -> subprocess.Popen:
+    """subprocess.Popen() wrapper that counts spawned processes."""
+    _SUBPROCESS_STATS["count"] += 1
+    return subprocess.Popen(cmd, **kwargs)
+
+
+def subprocess_count() -> int:
+    """Number of subprocesses spawned by this process so far."""
+    return _SUBPROCESS_STATS["count"]
+
+
+def report_subprocess_count(command: str) -> None:
+    """Print the subprocess count to stderr (enabled via FLUX_SUBPROCESS_STATS=1)."""
+    print(
+        f"fluxctl {command}: spawned {subprocess_count()} subprocess(es)",
+        file=sys.stderr,
+    )
+
+
+def reset_subprocess_count() -> None:
+    """Reset the subprocess counter (used between in-process invocations)."""
+    _SUBPROCESS_STATS["count"] = 0
+
+
+# --- Repo Context ---
+
+
+class RepoContext:
+    """Repository facts resolved at most once per process.
+
+    Every command used to re-run `git rev-parse` / `git config` for each
+    get_repo_root(), get_state_dir() and get_actor() call, which on list-style
+    commands meant one fork per task. The context resolves the git-derived
+    values lazily on first use and keeps them for the rest of the invocation.
+    Environment overrides (FLUX_STATE_DIR, FLUX_ACTOR) are still read on every
+    access so they keep their precedence.
+    """
+
+    def __init__(self, cwd: Path):
+        self.cwd = cwd
+        self._toplevel: Optional[Path] = None
+        self._common_dir: Optional[Path] = None
+        self._git_resolved = False
+        self._git_actor: Optional[str] = None
+        self._actor_resolved = False
+
+    def _resolve_git(self) -> None:
+        if self._git_resolved:
+            return
+        self._git_resolved = True
+        try:
+            result = run_subprocess(
+                [
+                    "git",
+                    "rev-parse",
+                    "--path-format=absolute",
+                    "--show-toplevel",
+                    "--git-common-dir",
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=self.cwd,
+            )
+            lines = result.stdout.splitlines()
+            if len(lines) >= 2:
+                self._toplevel = Path(lines[0].strip())
+                self._common_dir = Path(lines[1].strip())
+                return
+        except (subprocess.CalledProcessError, OSError):
+            pass
+        # Older git without --path-format, or not a work tree: resolve the
+        # top-level on its own so repo_root keeps its original behavior.
+        try:
+            result = run_subprocess(
+                ["git", "rev-parse", "--show-toplevel"],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=self.cwd,
+            )
+            self._toplevel = Path(result.stdout.strip())
+        except (subprocess.CalledProcessError, OSError):
+            pass
+
+    @property
+    def repo_root(self) -> Path:
+        """Git top-level, or the working directory outside a repo."""
+        self._resolve_git()
+        return self._toplevel or self.cwd
+
+    @property
+    def flux_dir(self) -> Path:
+        return self.repo_root / FLUX_DIR
+
+    @property
+    def git_common_dir(self) -> Optional[Path]:
+        self._resolve_git()
+        return self._common_dir
+
+    @property
+    def state_dir(self) -> Path:
+        """State directory for runtime task state.
+
+        Resolution order:
+        1. FLUX_STATE_DIR env var (explicit override for orchestrators)
+        2. git common-dir (shared across all worktrees automatically)
+        3. Fallback to .flux/state for non-git repos
+        """
+        if state_dir := os.environ.get("FLUX_STATE_DIR"):
+            return Path(state_dir).resolve()
+        if common := self.git_common_dir:
+            return common / "flux-state"
+        return self.flux_dir / "state"
+
+    @property
+    def actor(self) -> str:
+        """Current actor for soft-claim semantics.
+
+        Priority:
+        1. FLUX_ACTOR env var
+        2. git config user.email
+        3. git config user.name
+        4. $USER env var
+        5. "unknown"
+        """
+        if actor := os.environ.get("FLUX_ACTOR"):
+            return actor.strip()
+        if not self._actor_resolved:
+            self._actor_resolved = True
+            self._git_actor = self._read_git_identity()
+        if self._git_actor:
+            return self._git_actor
+        if user := os.environ.get("USER"):
+            return user
+        return "unknown"
+
+    def _read_git_identity(self) -> Optional[str]:
+        """Read user.email (preferred) or user.name with a single git call."""
+        try:
+            result = run_subprocess(
+                ["git", "config", "--get-regexp", r"^user\.(email|name)$"],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=self.cwd,
+            )
+        except (subprocess.CalledProcessError, OSError):
+            return None
+        values: dict[str, str] = {}
+        for line in result.stdout.splitlines():
+            key, _, value = line.partition(" ")
+            # Last value wins, matching `git config <key>` precedence
+            if value.strip():
+                values[key.lower()] = value.strip()
+        return values.get("user.email") or values.get("user.name")
+
+
+_REPO_CONTEXTS: dict[str, RepoContext] = {}
+
+
+def get_repo_context() -> RepoContext:
+    """Get the cached RepoContext for the current working directory."""
+    cwd = os.getcwd()
+    ctx = _REPO_CONTEXTS.get(cwd)
+    if ctx is None:
+        ctx = _REPO_CONTEXTS[cwd] = RepoContext(Path(cwd))
+    return ctx
+
+
+def reset_repo_context() -> None:
+    """Drop cached repo contexts (e.g. after git config or layout changes)."""
+    _REPO_CONTEXTS.clear()
+
+
 # --- Helpers ---
 
 
 def get_repo_root() -> Path:
     """Find git repo root."""
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        return Path(result.stdout.strip())
-    except subprocess.CalledProcessError:
-        # Fallback to current directory
-        return Path.cwd()
+    return get_repo_context().repo_root
 
 
 def get_flux_dir() -> Path:
     """Get .flux/ directory path."""
-    return get_repo_root() / FLUX_DIR
+    return get_repo_context().flux_dir
 
 
 def ensure_flux_exists() -> bool:
@@ -162,38 +393,60 @@ def ensure_flux_exists() -> bool:
 
 
 def get_state_dir() -> Path:
-    """Get state directory for runtime task state.
+    """Get state directory for runtime task state (see RepoContext.state_dir)."""
+    return get_repo_context().state_dir
 
-    Resolution order:
-    1. FLUX_STATE_DIR env var (explicit override for orchestrators)
-    2. git common-dir (shared across all worktrees automatically)
-    3. Fallback to .flux/state for non-git repos
-    """
-    # 1. Explicit override
-    if state_dir := os.environ.get("FLUX_STATE_DIR"):
-        return Path(state_dir).resolve()
 
-    # 2. Git common-dir (shared across worktrees)
+def file_signatures(directory: Path, suffix: str, prefix: str = "") -> dict[str, list[int]]:
+    """Map file stem -> [mtime_ns, size, inode] for files in a directory.
+
+    Uses a single scandir pass (no file opens). atomic_write() always swaps in
+    a new inode, so the signature changes on every fluxctl write even when
+    mtime granularity is coarse.
+    """
+    sigs: dict[str, list[int]] = {}
     try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--git-common-dir", "--path-format=absolute"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        common = result.stdout.strip()
-        return Path(common) / "flux-state"
-    except subprocess.CalledProcessError:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(suffix) or not name.startswith(prefix):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                sigs[name[: -len(suffix)]] = [st.st_mtime_ns, st.st_size, st.st_ino]
+    except (FileNotFoundError, NotADirectoryError):
         pass
+    return sigs
+
 
-    # 3. Fallback for non-git repos
-    return get_flux_dir() / "state"
+def ensure_flux_gitignore(flux_dir: Path, pattern: str) -> None:
+    """Make sure a generated file under .flux/ is listed in .flux/.gitignore."""
+    gitignore = flux_dir / ".gitignore"
+    try:
+        existing = gitignore.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        existing = ""
+    lines = existing.splitlines()
+    entry = f"/{pattern}"
+    if entry in lines or pattern in lines:
+        return
+    if existing and not existing.endswith("\n"):
+        existing += "\n"
+    atomic_write(gitignore, existing + entry + "\n")
 
 
 def json_output(data: dict, success: bool = True) -> None:
     """Output JSON response."""
     result = {"success": success, **data}
-    print(json.dumps(result, indent=2, default=str))
+    if _PROFILER is None:
+        print(json.dumps(result, indent=2, default=str))
+        return
+    with _PROFILER.span("json_output", "output"):
+        content = json.dumps(result, indent=2, default=str)
+        print(content)
+        profile_count("bytes_written", len(content) + 1)
 
 
 def error_exit(message: str, code: int = 1, use_json: bool = True) -> None:
@@ -235,6 +488,13 @@ def is_supported_schema(version: Any) -> bool:
 
 def atomic_write(path: Path, content: str) -> None:
     """Write file atomically via temp + rename."""
+    with profile_span("atomic_write", "write", path=str(path)):
+        _atomic_write(path, content)
+    profile_count("bytes_written", len(content))
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    note_write(path)
     path.parent.mkdir(parents=True, exist_ok=True)
     fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
     try:
@@ -255,7 +515,7 @@ def atomic_write_json(path: Path, data: dict) -> None:
 
 def load_json(path: Path) -> dict:
     """Load JSON file."""
-    with open(path, encoding="utf-8") as f:
+    with profile_span("load_json", "load"), open(path, encoding="utf-8") as f:
         return json.load(f)
 
 
@@ -264,7 +524,7 @@ def load_json_or_exit(path: Path, what: str, use_json: bool = True) -> dict:
     if not path.exists():
         error_exit(f"{what} missing: {path}", use_json=use_json)
     try:
-        with open(path, encoding="utf-8") as f:
+        with profile_span("load_json", "load"), open(path, encoding="utf-8") as f:
             return json.load(f)
     except json.JSONDecodeError as e:
         error_exit(f"{what} invalid JSON: {path} ({e})", use_json=use_json)
@@ -384,45 +644,8 @@ def workflow_phases_for_mode(scope_mode: str) -> list[str]:
 
 
 def get_actor() -> str:
-    """Determine current actor for soft-claim semantics.
-
-    Priority:
-    1. FLUX_ACTOR env var
-    2. git config user.email
-    3. git config user.name
-    4. $USER env var
-    5. "unknown"
-    """
-    # 1. FLUX_ACTOR env var
-    if actor := os.environ.get("FLUX_ACTOR"):
-        return actor.strip()
-
-    # 2. git config user.email (preferred)
-    try:
-        result = subprocess.run(
-            ["git", "config", "user.email"], capture_output=True, text=True, check=True
-        )
-        if email := result.stdout.strip():
-            return email
-    except subprocess.CalledProcessError:
-        pass
-
-    # 3. git config user.name
-    try:
-        result = subprocess.run(
-            ["git", "config", "user.name"], capture_output=True, text=True, check=True
-        )
-        if name := result.stdout.strip():
-            return name
-    except subprocess.CalledProcessError:
-        pass
-
-    # 4. $USER env var
-    if user := os.environ.get("USER"):
-        return user
-
-    # 5. fallback
-    return "unknown"
+    """Determine current actor for soft-claim semantics (see RepoContext.actor)."""
+    return get_repo_context().actor
 
 
 def require_keys(obj: dict, keys: list[str], what: str, use_json: bool = True) -> None:
@@ -511,7 +734,7 @@ def run_rp_cli(
     rp = require_rp_cli()
     cmd = [rp] + args
     try:
-        return subprocess.run(
+        return run_subprocess(
             cmd, capture_output=True, text=True, check=True, timeout=timeout
         )
     except subprocess.TimeoutExpired:
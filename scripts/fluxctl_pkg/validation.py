@@ -0,0 +1,215 @@
+"""
+fluxctl_pkg.validation - Content-hash cache for per-epic validation and git-diff epic selection.
+
+`validate --all` runs validate_epic() for every epic, re-reading every spec on
+each call. The cache stores each epic's result under a hash of everything
+validate_epic() looks at: the epic record and spec, its tasks (definitions
+merged with runtime state, from the index) and their specs, and which of its
+epic dependencies exist. Spec contents are hashed only when their
+(mtime_ns, size, inode) signature changes. Unchanged epics reuse their cached
+result; cross-epic checks are cheap and always re-run by the caller.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from .utils import (
+    EPICS_DIR,
+    SPECS_DIR,
+    TASKS_DIR,
+    atomic_write,
+    epic_id_from_task,
+    error_exit,
+    file_signatures,
+    get_flux_dir,
+    get_repo_root,
+    get_state_dir,
+    is_epic_id,
+    is_task_id,
+)
+from .index import RACY_WINDOW_NS
+from .git import GitError, get_git
+
+
+CACHE_FILE = "validate-cache.json"
+
+# Bump when validate_epic() changes what it checks or how it words errors:
+# results cached under an older version are ignored.
+CACHE_VERSION = 1
+
+# Results kept per cache file; least recently used entries beyond this go.
+# Worktrees sharing a state dir each keep their own entries.
+MIN_CACHED_RESULTS = 256
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ValidationCache:
+    """Per-epic validation results keyed by a content hash of the epic's inputs."""
+
+    def __init__(self, flux_dir: Optional[Path] = None, enabled: bool = True):
+        self.flux_dir = flux_dir or get_flux_dir()
+        self._root = str(self.flux_dir)
+        self.path = get_state_dir() / CACHE_FILE
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._scanned_at_ns = time.time_ns()
+        data = self._load() if enabled else {}
+        self._cutoff_ns = data.get("scanned_at_ns", 0) - RACY_WINDOW_NS
+        self._old_files: dict[str, list] = data.get("files", {})
+        self._files: dict[str, list] = {}
+        self._results: dict[str, dict] = data.get("results", {})
+        self._sigs = {
+            EPICS_DIR: file_signatures(self.flux_dir / EPICS_DIR, ".json", prefix="fn-"),
+            SPECS_DIR: file_signatures(self.flux_dir / SPECS_DIR, ".md", prefix="fn-"),
+            TASKS_DIR: file_signatures(self.flux_dir / TASKS_DIR, ".md", prefix="fn-"),
+        }
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {}
+        return data
+
+    def _file_hash(self, subdir: str, stem: str, suffix: str) -> Optional[str]:
+        """Content hash of .flux/<subdir>/<stem><suffix> (None if missing)."""
+        sig = self._sigs[subdir].get(stem)
+        if sig is None:
+            return None
+        path = os.path.join(self._root, subdir, stem + suffix)  # str: pathlib is slow here
+        old = self._old_files.get(path)
+        # Same racy-timestamp guard as the task index
+        if old is not None and old[:3] == sig and sig[0] < self._cutoff_ns:
+            self._files[path] = old
+            return old[3]
+        try:
+            with open(path, "rb") as f:
+                digest = _digest(f.read())
+        except OSError:
+            return None
+        self._files[path] = [*sig, digest]
+        self._dirty = True
+        return digest
+
+    def epic_key(
+        self, epic_id: str, epic: dict, epic_tasks: list[dict], known_epics: set[str]
+    ) -> str:
+        """Hash of everything validate_epic() reads for this epic."""
+        deps = epic.get("depends_on_epics")
+        dep_exists = (
+            sorted(
+                [dep, dep in known_epics]
+                for dep in deps
+                if isinstance(dep, str)
+            )
+            if isinstance(deps, list)
+            else None
+        )
+        material = [
+            CACHE_VERSION,
+            self._root,  # Error messages embed paths
+            epic,
+            self._file_hash(EPICS_DIR, epic_id, ".json"),
+            self._file_hash(SPECS_DIR, epic_id, ".md"),
+            dep_exists,
+            [[task, self._file_hash(TASKS_DIR, task["id"], ".md")] for task in epic_tasks],
+        ]
+        encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+        return _digest(encoded.encode("utf-8"))
+
+    def get(self, key: str) -> Optional[tuple[list[str], list[str], int]]:
+        entry = self._results.get(key) if self.enabled else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["used_ns"] = self._scanned_at_ns  # Persisted with the next change
+        return list(entry["errors"]), list(entry["warnings"]), entry["task_count"]
+
+    def put(self, key: str, result: tuple[list[str], list[str], int]) -> None:
+        errors, warnings, task_count = result
+        self._results[key] = {
+            "errors": errors,
+            "warnings": warnings,
+            "task_count": task_count,
+            "used_ns": self._scanned_at_ns,
+        }
+        self._dirty = True
+
+    def save(self, epic_count: int = 0) -> None:
+        """Best-effort write; a read-only state dir just means no caching."""
+        if not self.enabled or not self._dirty:
+            return
+        limit = max(MIN_CACHED_RESULTS, 2 * epic_count)
+        results = dict(
+            sorted(self._results.items(), key=lambda item: item[1]["used_ns"], reverse=True)[:limit]
+        )
+        # Keep hashes for files that still exist here, and for other trees
+        # (worktrees) sharing this state dir
+        present = {
+            os.path.join(self._root, subdir, stem + (".json" if subdir == EPICS_DIR else ".md"))
+            for subdir, sigs in self._sigs.items()
+            for stem in sigs
+        }
+        prefix = self._root + os.sep
+        files = {
+            path: entry
+            for path, entry in self._old_files.items()
+            if path in present or not path.startswith(prefix)
+        }
+        files.update(self._files)
+        snapshot = {
+            "version": CACHE_VERSION,
+            "scanned_at_ns": self._scanned_at_ns,
+            "files": files,
+            "results": results,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.path, json.dumps(snapshot, separators=(",", ":")))
+        except OSError:
+            pass
+
+
+def changed_epic_ids(ref: str, use_json: bool = True) -> set[str]:
+    """Epics whose .flux/ files differ between ref and the working tree.
+
+    Covers committed, staged and unstaged changes plus untracked files.
+    Deleted epics are included, so callers can find what depended on them.
+    """
+    repo_root = get_repo_root()
+    flux_rel = os.path.relpath(get_flux_dir(), repo_root)
+    git = get_git(repo_root)
+    try:
+        paths = git.changed_files(ref, flux_rel, committed=False)
+    except GitError as e:
+        error_exit(f"git diff against '{ref}' failed: {e}", use_json=use_json)
+    try:
+        paths += git.ls_files(flux_rel, others=True)
+    except GitError:
+        pass
+
+    changed = set()
+    for path in paths:
+        parts = Path(path).relative_to(flux_rel).parts if path.strip() else ()
+        if len(parts) != 2:
+            continue
+        subdir, name = parts
+        stem = name.rsplit(".", 1)[0]
+        if subdir in (EPICS_DIR, SPECS_DIR) and is_epic_id(stem):
+            changed.add(stem)
+        elif subdir == TASKS_DIR and is_task_id(stem):
+            changed.add(epic_id_from_task(stem))
+    return changed
@@ -0,0 +1,412 @@
+"""
+fluxctl_pkg.watch - `fluxctl watch`: JSONL stream of task, epic and session-phase changes.
+
+Each pass refreshes the task index (which re-reads only files whose signature
+changed), reduces it to the fields events are derived from, and diffs that
+against the previous pass held in memory. Passes run when inotify reports a
+change in .flux/epics, .flux/tasks or the state dir (Linux), and at least
+every --interval seconds otherwise, so consumers only see what changed.
+
+Every event carries the cursor of the state it leads to, so
+`watch --since CURSOR` replays the net changes made while nobody watched.
+A cursor is the hash of a small record under <state-dir>/watch/cursors/
+that points at content-addressed parts in <state-dir>/watch/parts/: the
+epics, the session phase, and each epic's tasks. A change writes only the
+parts it touched, and watchers seeing the same state share every file.
+The last MAX_CURSORS cursors (from any watcher) can be resumed; parts no
+kept cursor references are removed when the cursors are pruned.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import select
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from .utils import (
+    EPICS_DIR,
+    TASKS_DIR,
+    ensure_flux_exists,
+    epic_id_from_task,
+    error_exit,
+    get_flux_dir,
+    get_state_dir,
+    is_epic_id,
+    now_iso,
+)
+from .state import get_session_phase, get_state_store
+from .index import build_index
+
+
+WATCH_DIR = "watch"
+CURSORS_DIR = "cursors"
+PARTS_DIR = "parts"
+MAX_CURSORS = 64  # Cursors kept; older cursors can no longer resume
+PRUNE_SLACK = 16  # Prune once this many cursors beyond MAX_CURSORS piled up
+PART_GRACE_SECONDS = 60  # Parts this fresh survive pruning (a watcher may be saving)
+DEFAULT_INTERVAL = 1.0
+SETTLE_SECONDS = 0.02  # After an inotify wakeup, let a burst of writes land
+
+# inotify(7) constants (linux/inotify.h)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+class Inotify:
+    """Minimal inotify binding via ctypes; raises OSError where unavailable."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is Linux-only")
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watched: set[str] = set()
+
+    def add(self, path: Path) -> None:
+        """Watch a directory (no-op if already watched or missing)."""
+        key = str(path)
+        if key in self._watched or not path.is_dir():
+            return
+        if self._libc.inotify_add_watch(self.fd, key.encode(), WATCH_MASK) >= 0:
+            self._watched.add(key)
+
+    def wait(self, timeout: float) -> bool:
+        """Block until something changed (True) or timeout passed (False)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        time.sleep(SETTLE_SECONDS)
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+# --- Reduced state ---
+
+
+def current_state(use_json: bool = True) -> dict:
+    """The fields watch events are derived from, for every epic and task."""
+    index, _ = build_index(use_json=use_json)
+    epics = {}
+    for epic in index.epics(use_json=use_json):
+        epics[epic["id"]] = {
+            "status": epic.get("status"),
+            "workflow_phase": epic.get("workflow_phase"),
+        }
+    tasks = {}
+    for task in index.all_tasks(use_json=use_json):
+        tasks[task["id"]] = {
+            "status": task.get("status"),
+            "assignee": task.get("assignee"),
+            "claimed_at": task.get("claimed_at"),
+            "blocked_reason": task.get("blocked_reason"),
+        }
+    phase = get_session_phase(use_json=use_json)
+    return {
+        "epics": epics,
+        "tasks": tasks,
+        "phase": {key: phase.get(key) for key in ("phase", "detail", "epic_id", "task_id")},
+    }
+
+
+def _digest(value) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _split(state: dict) -> tuple[dict, dict[str, dict]]:
+    """(cursor record, digest -> part) for a reduced state."""
+    groups: dict[str, dict] = {}
+    for task_id, task in state["tasks"].items():
+        groups.setdefault(epic_id_from_task(task_id), {})[task_id] = task
+    parts = {_digest(state["epics"]): state["epics"]}
+    record = {"epics": next(iter(parts)), "phase": state["phase"], "tasks": {}}
+    for epic_id, tasks in groups.items():
+        digest = _digest(tasks)
+        parts[digest] = tasks
+        record["tasks"][epic_id] = digest
+    return record, parts
+
+
+def state_cursor(state: dict) -> str:
+    return _digest(_split(state)[0])[:16]
+
+
+def _write(path: Path, value) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(value, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def save_cursor(cursor: str, state: dict) -> None:
+    """Persist a cursor (best effort): its record plus the parts not stored yet."""
+    watch_dir = get_state_dir() / WATCH_DIR
+    cursors_dir, parts_dir = watch_dir / CURSORS_DIR, watch_dir / PARTS_DIR
+    path = cursors_dir / f"{cursor}.json"
+    try:
+        if path.exists():
+            os.utime(path)  # Recently used: keep it through pruning
+            return
+        record, parts = _split(state)
+        parts_dir.mkdir(parents=True, exist_ok=True)
+        cursors_dir.mkdir(parents=True, exist_ok=True)
+        for digest, part in parts.items():
+            part_path = parts_dir / f"{digest}.json"
+            if part_path.exists():
+                os.utime(part_path)  # Keeps it out of a concurrent prune's reach
+            else:
+                _write(part_path, part)
+        _write(path, record)
+        _prune(watch_dir)
+    except OSError:
+        pass
+
+
+def _prune(watch_dir: Path) -> None:
+    """Keep the newest MAX_CURSORS cursors and the parts they reference."""
+    for legacy in watch_dir.glob("*.json"):
+        legacy.unlink(missing_ok=True)  # Full-state snapshots from older versions
+    cursors = sorted(
+        (watch_dir / CURSORS_DIR).glob("*.json"),
+        key=lambda p: p.stat().st_mtime_ns,
+        reverse=True,
+    )
+    if len(cursors) <= MAX_CURSORS + PRUNE_SLACK:
+        return
+    for old in cursors[MAX_CURSORS:]:
+        old.unlink(missing_ok=True)
+    live: set[str] = set()
+    for path in cursors[:MAX_CURSORS]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        live.add(record.get("epics"))
+        live.update(record.get("tasks", {}).values())
+    cutoff = time.time() - PART_GRACE_SECONDS
+    for part in (watch_dir / PARTS_DIR).glob("*.json"):
+        if part.stem not in live and part.stat().st_mtime < cutoff:
+            part.unlink(missing_ok=True)
+
+
+def load_cursor(cursor: str) -> Optional[dict]:
+    """The reduced state behind a cursor, or None if unknown or pruned."""
+    if not cursor.isalnum():
+        return None
+    watch_dir = get_state_dir() / WATCH_DIR
+
+    def load(path: Path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    try:
+        record = load(watch_dir / CURSORS_DIR / f"{cursor}.json")
+        tasks = {}
+        for digest in record["tasks"].values():
+            tasks.update(load(watch_dir / PARTS_DIR / f"{digest}.json"))
+        return {
+            "epics": load(watch_dir / PARTS_DIR / f"{record['epics']}.json"),
+            "tasks": tasks,
+            "phase": record["phase"],
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+# --- Diffing ---
+
+
+def _task_events(task_id: str, old: Optional[dict], new: Optional[dict]) -> list[dict]:
+    base = {"task": task_id, "epic": epic_id_from_task(task_id)}
+    if old is None:
+        return [{"type": "task.added", **base, "status": new["status"]}]
+    if new is None:
+        return [{"type": "task.removed", **base, "status": old["status"]}]
+    events = []
+    if new["assignee"] and (
+        new["assignee"] != old["assignee"] or new["claimed_at"] != old["claimed_at"]
+    ):
+        events.append(
+            {"type": "task.claimed", **base, "assignee": new["assignee"], "previous": old["assignee"]}
+        )
+    elif old["assignee"] and not new["assignee"]:
+        events.append({"type": "task.released", **base, "previous": old["assignee"]})
+    if new["status"] != old["status"]:
+        if new["status"] == "blocked":
+            events.append(
+                {
+                    "type": "task.blocked",
+                    **base,
+                    "from": old["status"],
+                    "to": "blocked",
+                    "reason": new.get("blocked_reason"),
+                }
+            )
+        else:
+            events.append({"type": "task.status", **base, "from": old["status"], "to": new["status"]})
+    return events
+
+
+def _epic_events(epic_id: str, old: Optional[dict], new: Optional[dict]) -> list[dict]:
+    base = {"epic": epic_id}
+    if old is None:
+        return [{"type": "epic.added", **base, "status": new["status"]}]
+    if new is None:
+        return [{"type": "epic.removed", **base, "status": old["status"]}]
+    events = []
+    if new["status"] != old["status"]:
+        kind = "epic.closed" if new["status"] == "done" else "epic.status"
+        events.append({"type": kind, **base, "from": old["status"], "to": new["status"]})
+    if new["workflow_phase"] != old["workflow_phase"]:
+        events.append(
+            {"type": "epic.phase", **base, "from": old["workflow_phase"], "to": new["workflow_phase"]}
+        )
+    return events
+
+
+def diff_states(old: dict, new: dict, epic_filter: Optional[str] = None) -> list[dict]:
+    """Typed events turning state old into state new (epics, then tasks, then phase)."""
+    events = []
+    for epic_id in sorted(old["epics"].keys() | new["epics"].keys()):
+        if epic_filter and epic_id != epic_filter:
+            continue
+        old_epic, new_epic = old["epics"].get(epic_id), new["epics"].get(epic_id)
+        if old_epic != new_epic:
+            events.extend(_epic_events(epic_id, old_epic, new_epic))
+    for task_id in sorted(old["tasks"].keys() | new["tasks"].keys()):
+        if epic_filter and epic_id_from_task(task_id) != epic_filter:
+            continue
+        old_task, new_task = old["tasks"].get(task_id), new["tasks"].get(task_id)
+        if old_task != new_task:
+            events.extend(_task_events(task_id, old_task, new_task))
+    old_phase, new_phase = old["phase"], new["phase"]
+    if old_phase != new_phase and (
+        not epic_filter or epic_filter in (old_phase.get("epic_id"), new_phase.get("epic_id"))
+    ):
+        events.append(
+            {
+                "type": "session.phase",
+                "from": old_phase.get("phase"),
+                "to": new_phase.get("phase"),
+                "detail": new_phase.get("detail"),
+                "epic": new_phase.get("epic_id"),
+                "task": new_phase.get("task_id"),
+            }
+        )
+    return events
+
+
+def _emit(event: dict) -> None:
+    sys.stdout.write(json.dumps(event, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def cmd_watch(args: argparse.Namespace) -> None:
+    """Stream state changes as JSONL until interrupted (or --once/--count/--timeout)."""
+    if not ensure_flux_exists():
+        error_exit(".flux/ does not exist. Run 'fluxctl init' first.", use_json=True)
+    if args.epic and not is_epic_id(args.epic):
+        error_exit(
+            f"Invalid epic ID: {args.epic}. Expected format: fn-N or fn-N-slug (e.g., fn-1, fn-1-add-auth)",
+            use_json=True,
+        )
+    if args.interval <= 0:
+        error_exit("--interval must be positive", use_json=True)
+
+    state = current_state()
+    cursor = state_cursor(state)
+    save_cursor(cursor, state)
+    baseline, baseline_cursor = state, cursor
+    if args.since:
+        baseline = load_cursor(args.since)
+        if baseline is None:
+            error_exit(
+                f"Unknown or expired cursor: {args.since}. Re-read full state and watch without --since.",
+                use_json=True,
+            )
+        baseline_cursor = args.since
+
+    inotify = None
+    if not (args.once or args.poll):
+        try:
+            inotify = Inotify()
+        except (OSError, AttributeError):
+            inotify = None  # Fall back to mtime polling
+
+    emitted = 0
+    deadline = time.monotonic() + args.timeout if args.timeout else None
+    try:
+        _emit(
+            {
+                "type": "watch.started",
+                "cursor": baseline_cursor,
+                "mode": "inotify" if inotify else "poll",
+                "epic": args.epic,
+                "at": now_iso(),
+            }
+        )
+        while True:
+            events = diff_states(baseline, state, args.epic)
+            if events:
+                at = now_iso()
+                for event in events:
+                    _emit({**event, "cursor": cursor, "at": at})
+                    emitted += 1
+                    if args.count and emitted >= args.count:
+                        return
+            if args.once:
+                return
+            baseline = state
+
+            if inotify:
+                flux_dir = get_flux_dir()
+                state_dir = get_state_store().state_dir
+                # Re-added each pass: the state dirs may appear after startup
+                for path in (flux_dir / EPICS_DIR, flux_dir / TASKS_DIR, state_dir, state_dir / TASKS_DIR):
+                    inotify.add(path)
+            wait = args.interval
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return
+            if inotify:
+                inotify.wait(wait)  # Rescan on timeout too, for changes elsewhere
+            else:
+                time.sleep(wait)
+
+            state = current_state()
+            new_cursor = state_cursor(state)
+            if new_cursor != cursor:
+                cursor = new_cursor
+                save_cursor(cursor, state)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # Consumer went away; keep the interpreter's final flush from failing too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if inotify:
+            inotify.close()
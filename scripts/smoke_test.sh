@@ -517,7 +517,7 @@ git -C "$TEST_DIR/repo" commit -m "Update auth with expiry" >/dev/null
 # Test context hints: should find handler.py referencing validate_token/User
 cd "$TEST_DIR/repo"
 hints_output="$(PYTHONPATH="$SCRIPT_DIR" "$PYTHON_BIN" -c "
-from fluxctl import gather_context_hints
+from fluxctl_pkg.review import gather_context_hints
 hints = gather_context_hints('HEAD~1')
 print(hints)
 " 2>&1)"
@@ -538,7 +538,7 @@ cd "$TEST_DIR/repo"
 "$PYTHON_BIN" - "$SCRIPT_DIR" <<'PY'
 import sys
 sys.path.insert(0, sys.argv[1])
-from fluxctl import build_review_prompt
+from fluxctl_pkg.review import build_review_prompt
 
 # Test impl prompt has all 7 criteria
 impl_prompt = build_review_prompt("impl", "Test spec", "Test hints", "Test diff")
@@ -841,8 +841,8 @@ PASS=$((PASS + 1))
 echo -e "${YELLOW}--- checkpoint save/restore ---${NC}"
 # Save checkpoint
 scripts/fluxctl checkpoint save --epic "$STDIN_EPIC" --json >/dev/null
-# Verify checkpoint file exists
-[[ -f ".flux/.checkpoint-${STDIN_EPIC}.json" ]] || { echo "checkpoint file not created"; FAIL=$((FAIL + 1)); }
+# Verify checkpoint history exists
+[[ -f ".flux/.checkpoints/${STDIN_EPIC}.json" ]] || { echo "checkpoint history not created"; FAIL=$((FAIL + 1)); }
 # Modify epic spec
 scripts/fluxctl epic set-plan "$STDIN_EPIC" --file - --json <<'EOF'
 # Modified content
@@ -854,7 +854,7 @@ restored_spec="$(scripts/fluxctl cat "$STDIN_EPIC")"
 echo "$restored_spec" | grep -q "Testing stdin support" || { echo "checkpoint restore failed"; FAIL=$((FAIL + 1)); }
 # Delete checkpoint
 scripts/fluxctl checkpoint delete --epic "$STDIN_EPIC" --json >/dev/null
-[[ ! -f ".flux/.checkpoint-${STDIN_EPIC}.json" ]] || { echo "checkpoint delete failed"; FAIL=$((FAIL + 1)); }
+[[ ! -f ".flux/.checkpoints/${STDIN_EPIC}.json" ]] || { echo "checkpoint delete failed"; FAIL=$((FAIL + 1)); }
 echo -e "${GREEN}✓${NC} checkpoint save/restore/delete"
 PASS=$((PASS + 1))
 
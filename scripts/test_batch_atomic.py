@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for `fluxctl batch --atomic` rollback (scripts/fluxctl_pkg/batch.py).
+
+Run with: python -m pytest scripts/test_batch_atomic.py -v
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+FLUXCTL = SCRIPTS_DIR / "fluxctl.py"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from fluxctl_pkg import __main__ as cli  # noqa: E402
+from fluxctl_pkg.utils import reset_repo_context  # noqa: E402
+
+APPROVE = ["--approve", "I_APPROVE_CREATING_EPICS_AND_TASKS"]
+
+
+def fluxctl(repo: Path, *args: str, stdin: str = "") -> dict:
+    """Run fluxctl as a separate process (another agent)."""
+    env = dict(os.environ, FLUX_NO_SERVER="1", FLUX_ACTOR="other@example.com")
+    result = subprocess.run(
+        [sys.executable, str(FLUXCTL), *args, "--json"],
+        cwd=repo,
+        env=env,
+        input=stdin,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    monkeypatch.setenv("FLUX_STATE_DIR", str(tmp_path / "state"))
+    monkeypatch.setenv("FLUX_NO_SERVER", "1")
+    monkeypatch.setenv("FLUX_ACTOR", "batch@example.com")
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    fluxctl(repo, "init")
+    epic = fluxctl(repo, "epic", "create", "--title", "Atomic", *APPROVE)["id"]
+    for title in ("One", "Two", "Three"):
+        fluxctl(repo, "task", "create", "--epic", epic, "--title", title, *APPROVE)
+    monkeypatch.chdir(repo)
+    reset_repo_context()
+    yield repo, epic
+    reset_repo_context()
+
+
+def test_rollback_keeps_concurrent_changes(repo, monkeypatch, capsys):
+    repo, epic = repo
+    t1, t2, t3 = f"{epic}.1", f"{epic}.2", f"{epic}.3"
+    tasks_dir = repo / ".flux" / "tasks"
+    batch = repo / "batch.jsonl"
+    batch.write_text(
+        "\n".join(
+            json.dumps(entry)
+            for entry in (
+                {"argv": ["start", t1, "--json"]},
+                {"argv": ["task", "set-description", t1, "--file", "-", "--json"], "stdin": "From batch"},
+                {"argv": ["start", t3, "--json"]},
+                {"argv": ["dep", "add", t1, "fn-999.1", "--json"]},  # Fails: unknown task
+            )
+        )
+    )
+
+    real_run_captured = cli.run_captured
+    calls = []
+
+    def run_captured(argv, stdin=None):
+        result = real_run_captured(argv, stdin=stdin)
+        calls.append(argv)
+        if len(calls) == 3:
+            # Another agent works while the batch runs: claims and edits a
+            # task the batch never touched, and finishes a task the batch
+            # claimed (that change must win over the rollback)
+            fluxctl(repo, "start", t2)
+            fluxctl(repo, "task", "set-description", t2, "--file", "-", stdin="From other")
+            fluxctl(repo, "done", t3, "--summary", "Finished elsewhere", "--force")
+        return result
+
+    monkeypatch.setattr(cli, "run_captured", run_captured)
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["batch", "--atomic", "--file", str(batch)])
+    assert exc.value.code == 1
+    summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert summary["rolled_back"] is True
+    assert summary["conflicts"] == [{"task": t3, "expected_version": 1, "version": 2}]
+
+    tasks = {t["id"]: t for t in fluxctl(repo, "tasks", "--epic", epic)["tasks"]}
+    assert tasks[t1]["status"] == "todo"  # The batch's own claim and edit are undone
+    assert "From batch" not in (tasks_dir / f"{t1}.md").read_text()
+    assert tasks[t2]["status"] == "in_progress"  # The other agent's work survives
+    assert "From other" in (tasks_dir / f"{t2}.md").read_text()
+    assert tasks[t3]["status"] == "done"  # Changed after the batch: kept, reported
+
+
+def test_watch_is_rejected(repo):
+    repo, epic = repo
+    batch = "\n".join(
+        json.dumps({"argv": argv})
+        for argv in (["start", f"{epic}.1", "--json"], ["watch", "--json"])
+    )
+    result = subprocess.run(
+        [sys.executable, str(FLUXCTL), "batch", "--atomic"],
+        cwd=repo,
+        input=batch,
+        capture_output=True,
+        text=True,
+        timeout=60,  # An unbounded watch would never return
+    )
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert result.returncode == 1
+    assert records[1]["code"] == 2 and "cannot run inside a batch" in records[1]["stderr"]
+    assert records[-1]["rolled_back"] is True
+    assert fluxctl(repo, "show", f"{epic}.1")["status"] == "todo"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
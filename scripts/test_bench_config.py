@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for ConfigSnapshot and its benchmark (scripts/bench/config_lookup.py).
+
+Run with: python -m pytest scripts/test_bench_config.py -v
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+BENCH = SCRIPTS_DIR / "bench" / "config_lookup.py"
+sys.path.insert(0, str(SCRIPTS_DIR / "bench"))
+
+
+def test_bench_snapshot_matches_reload():
+    result = subprocess.run(
+        [sys.executable, str(BENCH), "--lookups", "2000", "--json"],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report["matches"]
+    assert report["speedup"]["get_config"] > 1
+    assert report["speedup"]["snapshot"] > report["speedup"]["get_config"]
+
+
+def test_snapshot_lookups_and_invalidation(tmp_path, monkeypatch):
+    from config_lookup import reload_lookup
+    from generate import generate
+    from fluxctl_pkg.config import get_config, get_config_snapshot
+
+    root = tmp_path / "repo"
+    generate(root, 1, 1)
+    monkeypatch.chdir(root)
+    config_path = root / ".flux" / "config.json"
+    config_path.write_text(
+        json.dumps({"review": {"backend": "rp", "extra": {}}, "tracker": "flat", "checkpoint": {"keep": "7"}})
+    )
+    keys = ["review.backend", "review.extra", "review.severities", "tracker.provider", "tracker", "nope.x"]
+    for key in keys:
+        assert get_config(key, "dflt") == reload_lookup(key, "dflt"), key
+    snapshot = get_config_snapshot()
+    assert snapshot.get_int("checkpoint.keep", 3) == 7
+    assert snapshot.get_str("tracker.provider") is None
+    assert snapshot.get_bool("planSync.enabled") is True
+    snapshot.get("review.severities").append("minor")
+    assert get_config("review.severities") == ["critical", "major"]
+
+    config_path.write_text(json.dumps({"review": {"backend": "codex"}}))
+    assert get_config("review.backend") == "codex"
+    assert get_config_snapshot() is not snapshot
+    assert get_config_snapshot() is get_config_snapshot()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
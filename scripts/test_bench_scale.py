@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the scale benchmark (scripts/bench/scale.py) and its generator.
+
+Run with: python -m pytest scripts/test_bench_scale.py -v
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+SCALE = SCRIPTS_DIR / "bench" / "scale.py"
+sys.path.insert(0, str(SCRIPTS_DIR / "bench"))
+
+
+def test_generator_is_deterministic(tmp_path):
+    from generate import generate
+
+    first = generate(tmp_path / "a", 3, 6, runtime=0.5, epic_dep_density=0.5, seed=7)
+    second = generate(tmp_path / "b", 3, 6, runtime=0.5, epic_dep_density=0.5, seed=7)
+    assert first["runtime_records"] == second["runtime_records"] > 0
+    for sub in (".flux/epics", ".flux/tasks", ".flux/specs", ".git/flux-state/tasks"):
+        names = sorted(p.name for p in (tmp_path / "a" / sub).iterdir())
+        assert names == sorted(p.name for p in (tmp_path / "b" / sub).iterdir())
+        for name in names:
+            a = (tmp_path / "a" / sub / name).read_bytes()
+            assert a == (tmp_path / "b" / sub / name).read_bytes(), f"{sub}/{name}"
+
+
+def test_scale_run_and_compare(tmp_path):
+    out = tmp_path / "base.json"
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(SCALE),
+            "--sizes", "tiny",
+            "--runs", "1",
+            "--cli-runs", "1",
+            "--out", str(out),
+        ],
+        capture_output=True,
+        text=True,
+        timeout=180,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(out.read_text())
+    commands = {(r["command"], r["mode"]) for r in report["results"]}
+    assert ("session-state", "in_process") in commands
+    assert ("task create", "subprocess") in commands
+    assert len(commands) == 14
+
+    slower = json.loads(out.read_text())
+    slower["results"][0]["p50"] = slower["results"][0]["p50"] * 2 + 5
+    (tmp_path / "new.json").write_text(json.dumps(slower))
+    compare = [sys.executable, str(SCALE), "--compare", str(out), str(tmp_path / "new.json"), "--json"]
+    same = subprocess.run(compare[:3] + [str(out), str(out), "--json"], capture_output=True, text=True)
+    assert same.returncode == 0 and json.loads(same.stdout)["regressions"] == 0
+    flagged = subprocess.run(compare, capture_output=True, text=True)
+    assert flagged.returncode == 1
+    assert json.loads(flagged.stdout)["regressions"] == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
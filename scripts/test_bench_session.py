@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the session-state snapshot memo and its benchmark (scripts/bench/session_state.py).
+
+Run with: python -m pytest scripts/test_bench_session.py -v
+"""
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+BENCH = SCRIPTS_DIR / "bench" / "session_state.py"
+sys.path.insert(0, str(SCRIPTS_DIR / "bench"))
+
+
+def test_bench_memo_matches_fresh_snapshot():
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(BENCH),
+            "--epics", "4",
+            "--tasks", "25",
+            "--runs", "3",
+            "--cli-runs", "0",
+            "--json",
+        ],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report["memo_matches"]
+    assert report["state"] == "resume_work"
+    latency = report["latency_ms"]
+    assert latency["memoized"]["p50"] < latency["single_pass"]["p50"]
+
+
+def test_memo_invalidated_by_state_change(tmp_path, monkeypatch):
+    from generate import generate
+    from fluxctl_pkg.__main__ import run_captured
+    from fluxctl_pkg import session
+    from fluxctl_pkg.index import RACY_WINDOW_NS
+
+    root = tmp_path / "repo"
+    generate(root, 2, 3)
+    monkeypatch.chdir(root)
+    monkeypatch.setenv("FLUX_ACTOR", "tester")
+    monkeypatch.setenv("FLUX_STATE_DIR", str(tmp_path / "state"))
+    assert run_captured(["prime-mark", "--status", "done", "--json"])[0] == 0
+    assert run_captured(["start", "fn-1-bench.1", "--force", "--json"])[0] == 0
+    time.sleep(RACY_WINDOW_NS / 1e9 + 0.1)
+
+    first = session.get_session_state()
+    assert first["task"]["id"] == "fn-1-bench.1"
+    key = str(root / ".flux")
+    assert session.get_session_state() == first
+    assert session._MEMO[key][2] == first  # Memoized
+
+    reason = tmp_path / "reason.md"
+    reason.write_text("stuck\n", encoding="utf-8")
+    assert run_captured(["block", "fn-1-bench.1", "--reason-file", str(reason), "--json"])[0] == 0
+    after = session.get_session_state()
+    assert after["task"] is None or after["task"]["id"] != "fn-1-bench.1"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Smoke test for the concurrency stress benchmark (scripts/bench/stress.py).
+
+Runs a small stress round per state backend and checks that every task gets
+finished exactly once: no double claims and no lost updates.
+
+Run with: python -m pytest scripts/test_bench_stress.py -v
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+STRESS = Path(__file__).parent / "bench" / "stress.py"
+
+
+@pytest.mark.parametrize("backend", ["file", "journal", "sqlite"])
+def test_parallel_workers_finish_every_task_once(backend):
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(STRESS),
+            "--workers", "4",
+            "--epics", "2",
+            "--tasks", "8",
+            "--backend", backend,
+            "--json",
+        ],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report["double_claims"] == []
+    assert report["lost_updates"] == 0
+    assert report["errors"] == 0
+    assert report["completed"] == 16
+    assert report["latency_ms"]["start"]["count"] >= 16
+    assert report["lock_wait_ms"]["count"] > 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Startup budget test for fluxctl.
+
+Runs `fluxctl detect --json` under `python -X importtime` and checks that cold
+start stays cheap: command modules other than the dispatched one are not
+imported. That check is structural, so it is stable on any machine.
+
+The total import time is wall-clock and noisy, so its budget is an opt-in
+benchmark: set FLUX_STARTUP_BUDGET_MS (e.g. 75 on a quiet machine) to run it.
+
+Run with: python -m pytest scripts/test_fluxctl_startup.py -v
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+script_dir = Path(__file__).parent
+FLUXCTL = script_dir / "fluxctl.py"
+
+# Summed import time (all modules, including the interpreter's own) for
+# `fluxctl detect --json`: ~50ms with lazy command loading, ~85ms when every
+# command module is imported up front. Unset: the benchmark is skipped.
+STARTUP_BUDGET_MS = os.environ.get("FLUX_STARTUP_BUDGET_MS")
+
+# Modules `detect` must not pull in; importing any of them means a command
+# module (or urllib.request via the tracker) leaked back onto the startup path.
+LAZY_MODULES = [
+    "fluxctl_pkg.batch",
+    "fluxctl_pkg.codex",
+    "fluxctl_pkg.epics",
+    "fluxctl_pkg.host",
+    "fluxctl_pkg.review",
+    "fluxctl_pkg.server",
+    "fluxctl_pkg.tasks",
+    "fluxctl_pkg.tracker",
+    "urllib.request",
+]
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Map module -> (cumulative import time in µs, nesting depth).
+
+    Only depth-0 entries should be summed: their cumulative time already
+    covers everything they imported.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        modules[name.strip()] = (int(cumulative), depth)
+    return modules
+
+
+def run_importtime(repo: Path, *argv: str) -> tuple[subprocess.CompletedProcess, dict]:
+    env = dict(os.environ)
+    env["FLUX_NO_SERVER"] = "1"  # Measure the in-process path, not the client
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # Measure with cached bytecode
+    cmd = [sys.executable, "-X", "importtime", str(FLUXCTL), *argv]
+    result = subprocess.run(cmd, cwd=repo, env=env, capture_output=True, text=True)
+    return result, parse_importtime(result.stderr)
+
+
+@pytest.fixture(scope="module")
+def repo(tmp_path_factory):
+    path = tmp_path_factory.mktemp("startup")
+    subprocess.run(["git", "init", "-q"], cwd=path, check=True)
+    env = dict(os.environ, FLUX_NO_SERVER="1")
+    subprocess.run(
+        [sys.executable, str(FLUXCTL), "init", "--json"],
+        cwd=path,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    # Warm-up run: writes __pycache__ so the measured run is a real cold start
+    run_importtime(path, "detect", "--json")
+    return path
+
+
+def test_detect_skips_unrelated_command_modules(repo):
+    result, modules = run_importtime(repo, "detect", "--json")
+    assert result.returncode == 0, result.stderr
+    assert '"exists": true' in result.stdout
+    assert "fluxctl_pkg.init" in modules
+    leaked = [name for name in LAZY_MODULES if name in modules]
+    assert not leaked, f"detect imported {leaked}"
+
+
+@pytest.mark.skipif(not STARTUP_BUDGET_MS, reason="set FLUX_STARTUP_BUDGET_MS to run the benchmark")
+def test_detect_import_time_within_budget(repo):
+    budget = float(STARTUP_BUDGET_MS)
+    # Best of five: import time is noisy on shared machines
+    totals = []
+    for _ in range(5):
+        result, modules = run_importtime(repo, "detect", "--json")
+        assert result.returncode == 0, result.stderr
+        totals.append(sum(us for us, depth in modules.values() if depth == 0) / 1000)
+    best = min(totals)
+    assert best <= budget, (
+        f"fluxctl detect --json imports took {best:.1f}ms (FLUX_STARTUP_BUDGET_MS={budget:.0f})"
+    )
+
+
+def test_help_lists_all_commands(repo):
+    result = subprocess.run(
+        [sys.executable, str(FLUXCTL), "--help"],
+        cwd=repo,
+        env=dict(os.environ, FLUX_NO_SERVER="1"),
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    for command in ("detect", "epic", "task", "ralph", "rp", "codex", "batch", "serve"):
+        assert f"    {command} " in result.stdout or f"    {command}\n" in result.stdout
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for GitBackend (scripts/fluxctl_pkg/git.py).
+
+Run with: python -m pytest scripts/test_git_backend.py -v
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from fluxctl_pkg import git as git_module  # noqa: E402
+from fluxctl_pkg.git import GitError, get_git, reset_git_backends  # noqa: E402
+from fluxctl_pkg.utils import reset_repo_context, subprocess_count  # noqa: E402
+
+
+def git(repo: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "dev@example.com")
+    git(repo, "config", "user.name", "Dev")
+    (repo / "a.py").write_text("def alpha():\n    pass\n")
+    git(repo, "add", "a.py")
+    git(repo, "commit", "-q", "-m", "base")
+    git(repo, "checkout", "-q", "-b", "feature")
+    (repo / "a.py").write_text("def alpha():\n    return 1\n")
+    (repo / "b.py").write_text("import a\n")
+    git(repo, "add", "a.py", "b.py")
+    git(repo, "commit", "-q", "-m", "change")
+    monkeypatch.chdir(repo)
+    reset_repo_context()
+    reset_git_backends()
+    yield repo
+    reset_git_backends()
+
+
+def test_queries_are_cached(repo):
+    backend = get_git()
+    assert backend.toplevel == repo.resolve()
+    assert backend.changed_files("main") == ["a.py", "b.py"]
+    assert "2 files changed" in backend.diff_stat("main")
+    diff = backend.diff("main", 20)
+    assert diff.truncated and diff.error is None and len(diff.text) <= 20
+    assert backend.config("user.email") == "dev@example.com"
+    assert backend.ls_files() == ["a.py", "b.py"]
+
+    forks = subprocess_count()
+    backend.changed_files("main")
+    backend.diff_stat("main")
+    backend.config("user.name")
+    backend.ls_files()
+    assert subprocess_count() == forks
+    with pytest.raises(GitError):
+        backend.changed_files("no-such-branch")
+
+
+def test_cat_file_batch_reads(repo):
+    backend = get_git()
+    assert backend.read_blob("main", "a.py") == b"def alpha():\n    pass\n"
+    assert backend.read_blob("HEAD", "b.py") == b"import a\n"
+    assert backend.read_blob("HEAD", "missing.py") is None
+    blob = backend.blob_id("a.py")
+    assert blob and backend.read_blob(blob, "") == b"def alpha():\n    return 1\n"
+    assert backend.object_info("HEAD").type == "commit"
+    assert backend.tree_sha("HEAD") == backend.object_info("HEAD^{tree}").sha
+
+    forks = subprocess_count()
+    for _ in range(5):
+        backend.read_blob("HEAD", "a.py")
+        backend.blob_id("b.py")
+    assert subprocess_count() == forks  # Served by the open batch processes
+
+
+def test_cat_file_specs_with_spaces(repo, monkeypatch):
+    (repo / "c d.py").write_text("spaced\n")
+    git(repo, "add", "c d.py")
+    git(repo, "commit", "-q", "-m", "spaced")
+    registered = []
+    monkeypatch.setattr(git_module.atexit, "register", registered.append)
+    monkeypatch.setattr(git_module.atexit, "unregister", registered.remove)
+
+    backend = get_git()
+    # Missing specs are echoed back with their spaces: "HEAD:a b missing"
+    assert backend.blob_id("a b") is None
+    assert backend.read_blob("HEAD", "x y") is None
+    assert backend.read_blob("HEAD", "x\ny") is None
+    assert backend.read_blob("HEAD", "c d.py") == b"spaced\n"
+    assert backend.blob_id("c d.py") == backend.object_info("HEAD:c d.py").sha
+    assert registered == [backend.close]  # Once per backend, not per batch process
+    reset_git_backends()
+    assert registered == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the epic/task ID allocator (scripts/fluxctl_pkg/ids.py).
+
+Run with: python -m pytest scripts/test_ids.py -v
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from fluxctl_pkg import ids  # noqa: E402
+from fluxctl_pkg.ids import IdAllocator  # noqa: E402
+from fluxctl_pkg.utils import atomic_write_json  # noqa: E402
+
+
+@pytest.fixture
+def allocator(tmp_path, monkeypatch):
+    flux_dir = tmp_path / ".flux"
+    for name in ("epics", "specs", "tasks"):
+        (flux_dir / name).mkdir(parents=True)
+    scans = []
+    real_scan = ids.scan_max_task_id
+    monkeypatch.setattr(ids, "scan_max_task_id", lambda *a: scans.append(a) or real_scan(*a))
+    yield IdAllocator(tmp_path / "state", flux_dir), scans
+
+
+def test_edits_between_creates_never_rescan(allocator):
+    allocator, scans = allocator
+    tasks_dir = allocator.flux_dir / "tasks"
+    allocator.register_epic("fn-1")
+    for expected in range(1, 6):
+        (number,) = allocator.allocate_tasks("fn-1")
+        assert number == expected
+        task_path = tasks_dir / f"fn-1.{number}.json"
+        atomic_write_json(task_path, {"id": f"fn-1.{number}"})
+        (tasks_dir / f"fn-1.{number}.md").write_text("spec")  # set-spec
+        atomic_write_json(task_path, {"id": f"fn-1.{number}", "deps": []})  # dep add
+    assert scans == []
+
+
+def test_heals_on_missing_counter_and_collision(allocator):
+    allocator, scans = allocator
+    tasks_dir = allocator.flux_dir / "tasks"
+    for n in (1, 2):
+        atomic_write_json(tasks_dir / f"fn-1.{n}.json", {})
+    assert allocator.allocate_tasks("fn-1") == [3]  # No counter yet: one scan
+    assert len(scans) == 1
+
+    # A merge brings in fn-1.4 and fn-1.5 from another allocator
+    for n in (4, 5):
+        atomic_write_json(tasks_dir / f"fn-1.{n}.json", {})
+    assert allocator.allocate_tasks("fn-1", 2) == [6, 7]
+    assert len(scans) == 2
+
+    epics_dir = allocator.flux_dir / "epics"
+    (epics_dir / "fn-3-merged.json").write_text("{}")
+    assert allocator.allocate_epics() == [4]  # No counter yet: scanned
+    (epics_dir / "fn-5-merged.json").write_text("{}")
+    assert allocator.allocate_epics() == [6]  # fn-5 is taken: healed past it
+
+
+def test_last_task_is_read_only(allocator):
+    allocator, scans = allocator
+    atomic_write_json(allocator.flux_dir / "tasks" / "fn-1.2.json", {})
+    assert allocator.last_task("fn-1") == 2
+    assert not allocator.path.exists()
+    assert not allocator.lock_path.exists()
+
+    allocator.allocate_tasks("fn-1")
+    saved = allocator.path.read_bytes()
+    assert allocator.last_task("fn-1") == 3
+    assert allocator.path.read_bytes() == saved
+    assert json.loads(saved)["tasks"] == {"fn-1": 3}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
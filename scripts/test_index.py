@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent task/epic index (scripts/fluxctl_pkg/index.py).
+
+Run with: python -m pytest scripts/test_index.py -v
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+FLUXCTL = SCRIPTS_DIR / "fluxctl.py"
+
+APPROVE = ["--approve", "I_APPROVE_CREATING_EPICS_AND_TASKS"]
+
+
+def run(repo: Path, *args: str) -> str:
+    env = dict(os.environ, FLUX_NO_SERVER="1")
+    env.pop("FLUX_STATE_DIR", None)  # Default state dir: inside .git, like a real checkout
+    result = subprocess.run(
+        [sys.executable, str(FLUXCTL), *args], cwd=repo, env=env, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+def git(repo: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True, check=True).stdout
+
+
+def test_read_commands_leave_a_clean_checkout_clean(tmp_path):
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "dev@example.com")
+    git(tmp_path, "config", "user.name", "Dev")
+    run(tmp_path, "init", "--json")
+    epic = json.loads(run(tmp_path, "epic", "create", "--title", "Index", *APPROVE, "--json"))["id"]
+    run(tmp_path, "task", "create", "--epic", epic, "--title", "One", *APPROVE, "--json")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "plan")
+
+    for command in (["list"], ["ready", "--epic", epic], ["next"], ["index", "--rebuild"]):
+        run(tmp_path, *command, "--json")
+    assert git(tmp_path, "status", "--porcelain", "--untracked-files=all") == ""
+
+    path = Path(json.loads(run(tmp_path, "index", "--json"))["path"])
+    assert path.is_file() and (tmp_path / ".git") in path.parents
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
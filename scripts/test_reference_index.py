@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the symbol reference index (scripts/fluxctl_pkg/references.py).
+
+Run with: python -m pytest scripts/test_reference_index.py -v
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from fluxctl_pkg.git import get_git, reset_git_backends  # noqa: E402
+from fluxctl_pkg.references import MAX_LINES_PER_FILE, REFERENCE_EXTENSIONS, ReferenceIndex  # noqa: E402
+from fluxctl_pkg.utils import reset_repo_context, subprocess_count  # noqa: E402
+
+SYMBOLS = ["validate_token", "User", "user", "load", "missing_symbol", "get"]
+
+
+def git(repo: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+
+def git_grep(repo: Path, symbol: str) -> list[tuple[str, int]]:
+    """What find_references used to run: git grep -n -w over source pathspecs."""
+    pathspecs = [f"*{ext}" for ext in REFERENCE_EXTENSIONS]
+    result = subprocess.run(
+        ["git", "grep", "-n", "-w", symbol, "--", *pathspecs], cwd=repo, capture_output=True, text=True
+    )
+    refs, per_file = [], {}
+    for line in result.stdout.splitlines():
+        if line.startswith("Binary file "):
+            continue
+        path, num, _ = line.split(":", 2)
+        per_file[path] = per_file.get(path, 0) + 1
+        if per_file[path] <= MAX_LINES_PER_FILE:
+            refs.append((path, int(num)))
+    return refs
+
+
+def index(repo: Path) -> ReferenceIndex:
+    reset_git_backends()
+    return ReferenceIndex(get_git(repo), repo.parent / "state" / "refs-index.json")
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    (repo / "state").mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "dev@example.com")
+    git(repo, "config", "user.name", "Dev")
+    (repo / "src" / "auth.py").write_text(
+        "class User:\n    pass\n\ndef validate_token(token):\n    return User()  # User\n"
+    )
+    (repo / "src" / "handler.ts").write_text(
+        "import { validate_token, User } from './auth'\n"
+        + "const user: User = load()\n" * 8
+        + "validate_tokens(x); my_validate_token(y)\n"
+    )
+    (repo / "README.md").write_text("validate_token User\n")
+    (repo / "data.c").write_bytes(b"User\0binary\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "base")
+    monkeypatch.chdir(repo)
+    reset_repo_context()
+    yield repo
+    reset_git_backends()
+
+
+def test_matches_git_grep(repo):
+    refs = index(repo).find(SYMBOLS)
+    for symbol in SYMBOLS:
+        assert refs.get(symbol, []) == git_grep(repo, symbol), symbol
+    assert refs["validate_token"] == [("src/auth.py", 4), ("src/handler.ts", 1)]
+
+
+def test_cached_and_incremental(repo):
+    first = index(repo)
+    first.find(SYMBOLS)
+    assert first.stats["scanned"] == 3  # auth.py, handler.ts, data.c
+
+    warm = index(repo)
+    forks = subprocess_count()
+    assert warm.find(["User", "validate_token"]) == first.find(["User", "validate_token"])
+    assert warm.stats["scanned"] == 0 and warm.stats["rescanned"] == 0
+    assert subprocess_count() - forks <= 2  # rev-parse + diff --name-only; no blob reads
+
+    (repo / "src" / "extra.go").write_text("func f() { validate_token(nil) }\n")
+    git(repo, "add", "src/extra.go")
+    git(repo, "commit", "-q", "-m", "extra")
+    after_commit = index(repo)
+    refs = after_commit.find(SYMBOLS)
+    assert after_commit.stats["scanned"] == 1  # Only the new blob
+    assert refs["validate_token"] == git_grep(repo, "validate_token")
+
+    # Uncommitted edits and deletions are seen without touching the cache
+    (repo / "src" / "auth.py").write_text("def validate_token():\n    pass\n")
+    (repo / "src" / "extra.go").unlink()
+    dirty = index(repo)
+    refs = dirty.find(SYMBOLS)
+    assert dirty.stats["dirty"] == 2 and dirty.stats["scanned"] == 0
+    for symbol in SYMBOLS:
+        assert refs.get(symbol, []) == git_grep(repo, symbol), symbol
+
+    # New symbols rescan cached blobs for just those symbols
+    extra = index(repo)
+    assert extra.find(["const"])["const"] == git_grep(repo, "const")
+    assert extra.stats["rescanned"] == 4
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
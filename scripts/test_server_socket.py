@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the fluxctl serve socket trust checks (scripts/fluxctl_pkg/client.py).
+
+Run with: python -m pytest scripts/test_server_socket.py -v
+"""
+
+import os
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from fluxctl_pkg import client  # noqa: E402
+from fluxctl_pkg.server import _prepare_socket_path  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+@pytest.fixture
+def sock_dir(tmp_path, monkeypatch):
+    # Short base path: AF_UNIX paths are limited to ~100 bytes
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    return Path(client.socket_dir())
+
+
+def bind(path: Path) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(path))
+    return sock
+
+
+def test_client_only_trusts_own_socket_in_private_dir(sock_dir):
+    path = client.socket_path("/repo/.flux")
+    assert Path(path).parent == sock_dir
+    assert not client.is_trusted_socket(path)
+
+    sock_dir.mkdir(mode=0o755)
+    os.chmod(sock_dir, 0o755)
+    with bind(Path(path)):
+        assert not client.is_trusted_socket(path)  # Directory readable by others
+        os.chmod(sock_dir, 0o700)
+        assert client.is_trusted_socket(path)
+    os.unlink(path)
+
+    Path(path).write_text("planted")  # Not a socket
+    assert not client.is_trusted_socket(path)
+    assert client.request(path, {"op": "ping"}) is None
+
+
+def test_server_refuses_untrusted_paths(sock_dir):
+    path = client.socket_path("/repo/.flux")
+    sock_dir.mkdir(mode=0o755)
+    os.chmod(sock_dir, 0o755)
+    with pytest.raises(SystemExit):
+        _prepare_socket_path(path, use_json=True)
+
+    os.chmod(sock_dir, 0o700)
+    Path(path).write_text("planted")
+    with pytest.raises(SystemExit):
+        _prepare_socket_path(path, use_json=True)
+    assert Path(path).read_text() == "planted"
+
+    os.unlink(path)
+    bind(Path(path)).close()  # Stale socket from a crashed server
+    _prepare_socket_path(path, use_json=True)
+    assert not os.path.exists(path)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
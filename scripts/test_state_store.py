@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for runtime state store writes under contention (scripts/fluxctl_pkg/state.py).
+
+Run with: python -m pytest scripts/test_state_store.py -v
+"""
+
+import fcntl
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from fluxctl_pkg.state import (  # noqa: E402
+    JournalFileStateStore,
+    LocalFileStateStore,
+    SqliteStateStore,
+    StoreBusy,
+    VersionConflict,
+    update_task_runtime,
+)
+
+
+def lock_path(store) -> Path:
+    if isinstance(store, JournalFileStateStore):
+        store.locks_dir.mkdir(parents=True, exist_ok=True)
+        return store.locks_dir / "journal.lock"
+    store.tasks_dir.mkdir(parents=True, exist_ok=True)
+    return store.tasks_dir
+
+
+@pytest.mark.parametrize("backend", [LocalFileStateStore, JournalFileStateStore])
+def test_cas_writes_do_not_wait_for_a_busy_store(tmp_path, monkeypatch, backend):
+    monkeypatch.chdir(tmp_path)
+    store = backend(tmp_path / "state")
+    store.save_runtime("fn-1.1", {"status": "todo"})
+
+    # Another process holds the store's write lock (a separate open file
+    # description conflicts with ours like a different process would)
+    fd = os.open(lock_path(store), os.O_RDONLY)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        with pytest.raises(StoreBusy):
+            store.save_runtime("fn-1.1", {"status": "in_progress"}, expected_version=1)
+        with pytest.raises(StoreBusy):
+            store.delete_runtime("fn-1.1", expected_version=1)
+
+        # update_task_runtime backs off and retries until the writer is done
+        threading.Timer(0.05, fcntl.flock, [fd, fcntl.LOCK_UN]).start()
+        saved = update_task_runtime("fn-1.1", lambda current: {**current, "status": "done"}, store)
+    finally:
+        os.close(fd)
+    assert saved["status"] == "done" and saved["version"] == 2
+    assert store.load_runtime("fn-1.1")["version"] == 2
+
+
+@pytest.mark.parametrize("backend", [LocalFileStateStore, JournalFileStateStore, SqliteStateStore])
+def test_rename_keeps_the_version_chain(tmp_path, monkeypatch, backend):
+    monkeypatch.chdir(tmp_path)
+    store = backend(tmp_path / "state")
+    store.save_runtime("fn-1.1", {"status": "todo"})
+    store.save_runtime("fn-1.1", {"status": "in_progress"}, expected_version=1)
+
+    store.rename_runtime("fn-1.1", "fn-1-slug.1")
+    assert store.load_runtime("fn-1.1") is None
+    assert store.load_runtime("fn-1-slug.1") == {"status": "in_progress", "version": 2}
+    # A writer that read the old ID before the rename cannot resurrect it
+    with pytest.raises(VersionConflict):
+        store.save_runtime("fn-1.1", {"status": "done"}, expected_version=2)
+    assert store.save_runtime("fn-1-slug.1", {"status": "done"}, expected_version=2) == 3
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the symbol extractor registry (scripts/fluxctl_pkg/symbols.py).
+
+Run with: python -m pytest scripts/test_symbols.py -v
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from fluxctl_pkg import symbols  # noqa: E402
+from fluxctl_pkg.symbols import SymbolCache, blob_hash, extract_many, extract_symbols  # noqa: E402
+
+
+PY_SOURCE = '''\
+def _helper():
+    pass
+
+class Zeta:
+    pass
+
+def alpha():
+    pass
+
+__all__ = ["alpha", "_helper", "Zeta"]
+'''
+
+
+def test_deterministic_order_and_visibility(tmp_path):
+    (tmp_path / "mod.py").write_text(PY_SOURCE)
+    (tmp_path / "lib.go").write_text("func helper() {}\ntype Server struct{}\nfunc Run() {}\n")
+    (tmp_path / "lib.rs").write_text("fn private() {}\nimpl Engine {}\npub struct Engine;\n")
+    (tmp_path / "App.java").write_text("class Hidden {}\npublic class App {\n    public void run() {}\n}\n")
+    (tmp_path / "notes.txt").write_text("def ignored():\n")
+
+    # __all__ exports _helper; order is by definition position
+    assert extract_symbols(tmp_path / "mod.py") == ["_helper", "Zeta", "alpha"]
+    assert extract_symbols(tmp_path / "lib.go") == ["Server", "Run", "helper"]
+    assert extract_symbols(tmp_path / "lib.rs") == ["Engine", "private"]
+    assert extract_symbols(tmp_path / "App.java") == ["App", "run", "Hidden"]
+    assert extract_symbols(tmp_path / "notes.txt") == []
+    assert extract_symbols(tmp_path / "missing.py") == []
+
+
+def test_blob_cache_and_parallel(tmp_path, monkeypatch):
+    files = []
+    for i in range(symbols.PARALLEL_THRESHOLD + 4):
+        path = tmp_path / f"m{i}.py"
+        path.write_text(f"def f{i}():\n    pass\n\nclass C{i % 3}:\n    pass\n")
+        files.append(path)
+    expected = extract_many(files, parallel=False)
+    assert extract_many(files) == expected  # Thread pool gives the same answers
+
+    blob = subprocess.run(
+        ["git", "hash-object", str(files[0])], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert blob_hash(files[0].read_bytes()) == blob
+
+    cache_path = tmp_path / "state" / "symbols-cache.json"
+    cache_path.parent.mkdir()
+    cache = SymbolCache(cache_path)
+    assert extract_many(files, cache) == expected
+    cache.save()
+
+    scans = []
+    real_extract = symbols.extract
+    monkeypatch.setattr(symbols, "extract", lambda content, ex: scans.append(1) or real_extract(content, ex))
+    files[1].write_text("def changed():\n    pass\n")
+    assert extract_many(files, SymbolCache(cache_path))[files[1]] == ["changed"]
+    assert len(scans) == 1  # Only the edited file is rescanned
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for `fluxctl watch` cursor storage (scripts/fluxctl_pkg/watch.py).
+
+Run with: python -m pytest scripts/test_watch.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from fluxctl_pkg import watch  # noqa: E402
+from fluxctl_pkg.utils import reset_repo_context  # noqa: E402
+
+
+def make_state(epics: int, tasks: int, done: int = 0) -> dict:
+    state = {"epics": {}, "tasks": {}, "phase": {"phase": None}}
+    for e in range(1, epics + 1):
+        state["epics"][f"fn-{e}"] = {"status": "open", "workflow_phase": None}
+        for t in range(1, tasks + 1):
+            status = "done" if (e - 1) * tasks + t <= done else "todo"
+            state["tasks"][f"fn-{e}.{t}"] = {"status": status, "assignee": None}
+    return state
+
+
+@pytest.fixture
+def watch_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("FLUX_STATE_DIR", str(tmp_path / "state"))
+    reset_repo_context()
+    yield tmp_path / "state" / watch.WATCH_DIR
+    reset_repo_context()
+
+
+def test_cursors_share_unchanged_parts(watch_dir):
+    first = make_state(20, 50)
+    cursor = watch.state_cursor(first)
+    watch.save_cursor(cursor, first)
+    parts = set((watch_dir / watch.PARTS_DIR).iterdir())
+    assert len(parts) == 21  # Epics + one task group per epic
+
+    second = make_state(20, 50, done=1)
+    second_cursor = watch.state_cursor(second)
+    assert second_cursor != cursor
+    watch.save_cursor(second_cursor, second)
+    added = set((watch_dir / watch.PARTS_DIR).iterdir()) - parts
+    assert len(added) == 1  # Only fn-1's task group changed
+
+    assert watch.load_cursor(cursor) == first
+    assert watch.load_cursor(second_cursor) == second
+    assert watch.load_cursor("0123456789abcdef") is None
+
+
+def test_pruning_keeps_parts_of_live_cursors(watch_dir, monkeypatch):
+    monkeypatch.setattr(watch, "PART_GRACE_SECONDS", -1)
+    watch_dir.mkdir(parents=True)
+    (watch_dir / "0123456789abcdef.json").write_text("{}")  # Legacy full snapshot
+    cursors = []
+    for done in range(watch.MAX_CURSORS + watch.PRUNE_SLACK + 1):
+        state = make_state(2, watch.MAX_CURSORS + watch.PRUNE_SLACK + 1, done=done)
+        cursors.append(watch.state_cursor(state))
+        watch.save_cursor(cursors[-1], state)
+
+    assert not (watch_dir / "0123456789abcdef.json").exists()
+    assert len(list((watch_dir / watch.CURSORS_DIR).iterdir())) == watch.MAX_CURSORS
+    assert watch.load_cursor(cursors[-1]) is not None
+    assert watch.load_cursor(cursors[-watch.MAX_CURSORS]) is not None
+    assert watch.load_cursor(cursors[0]) is None  # Expired
+    # Epics, fn-2's unchanged tasks, and fn-1's tasks once per kept cursor
+    assert len(list((watch_dir / watch.PARTS_DIR).iterdir())) == watch.MAX_CURSORS + 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))